@@ -17,6 +17,8 @@ class ParserResult:
     markdown_path: Optional[Path] = None
     metadata: Optional[dict[str, Any]] = None
     error: Optional[str] = None
+    # DoclingDocument JSON written next to the markdown (docling parsers)
+    document_json_path: Optional[Path] = None
 
     def __post_init__(self):
         """Validate result consistency."""
@@ -28,6 +30,14 @@ class ParserResult:
             raise ValueError("Failed parse must include error message")
 
 
+def docling_json_path(markdown_path: Path) -> Path:
+    """Sidecar path for the DoclingDocument JSON of a parsed markdown file.
+
+    Structure-aware chunkers read it instead of re-parsing the markdown.
+    """
+    return markdown_path.with_suffix(".docling.json")
+
+
 class ParserBackend(ABC):
     """Abstract base class for document parsers."""
 
@@ -1,11 +1,12 @@
 """Docling-serve parser backend implementation (HTTP REST API)."""
 
+import json
 from pathlib import Path
 from typing import Optional
 
 import requests
 
-from app.backends.parsers.base import ParserBackend, ParserResult
+from app.backends.parsers.base import ParserBackend, ParserResult, docling_json_path
 from app.config import Config
 from app.scrapers.models import DocumentMetadata
 from app.utils import get_logger
@@ -18,6 +19,7 @@ class DoclingServeParser(ParserBackend):
         self,
         url: Optional[str] = None,
         timeout: Optional[int] = None,
+        include_document_json: Optional[bool] = None,
     ):
         """
         Initialize docling-serve parser.
@@ -25,9 +27,16 @@ class DoclingServeParser(ParserBackend):
         Args:
             url: Base URL of docling-serve (e.g. http://localhost:4949)
             timeout: Request timeout in seconds
+            include_document_json: Also request the DoclingDocument JSON
+                and write it next to the markdown for structured chunking
         """
         self.url = (url or Config.DOCLING_SERVE_URL or "").rstrip("/")
         self.timeout = timeout or Config.DOCLING_SERVE_TIMEOUT
+        self.include_document_json = (
+            Config.DOCLING_SERVE_DOCUMENT_JSON
+            if include_document_json is None
+            else include_document_json
+        )
         self.logger = get_logger("backends.parser.docling_serve")
 
     @property
@@ -78,11 +87,12 @@ class DoclingServeParser(ParserBackend):
             )
 
             # POST to docling-serve convert endpoint
+            to_formats = ["md", "json"] if self.include_document_json else "md"
             with open(file_path, "rb") as f:
                 resp = requests.post(
                     f"{self.url}/v1/convert/file",
                     files={"files": (file_path.name, f)},
-                    params={"to_formats": "md"},
+                    params={"to_formats": to_formats},
                     timeout=self.timeout,
                 )
 
@@ -106,6 +116,8 @@ class DoclingServeParser(ParserBackend):
             markdown_path = file_path.with_suffix(".md")
             markdown_path.write_text(markdown_content, encoding="utf-8")
 
+            document_json_path = self._write_document_json(document, markdown_path)
+
             # Extract metadata
             extracted_metadata = self._extract_metadata(document, markdown_content)
 
@@ -119,6 +131,7 @@ class DoclingServeParser(ParserBackend):
                 markdown_path=markdown_path,
                 metadata=extracted_metadata,
                 parser_name=self.name,
+                document_json_path=document_json_path,
             )
 
         except requests.Timeout:
@@ -139,6 +152,24 @@ class DoclingServeParser(ParserBackend):
             self.logger.error(error_msg)
             return ParserResult(success=False, error=error_msg, parser_name=self.name)
 
+    def _write_document_json(self, document: dict, markdown_path: Path) -> Optional[Path]:
+        """Write the DoclingDocument JSON sidecar when it was requested.
+
+        A stale sidecar from an earlier parse is removed so chunkers never
+        pair new markdown with an old structure.
+        """
+        json_path = docling_json_path(markdown_path)
+        json_content = document.get("json_content") if self.include_document_json else None
+        if not isinstance(json_content, dict):
+            if self.include_document_json:
+                self.logger.warning(
+                    f"docling-serve returned no DoclingDocument JSON for {markdown_path.name}"
+                )
+            json_path.unlink(missing_ok=True)
+            return None
+        json_path.write_text(json.dumps(json_content), encoding="utf-8")
+        return json_path
+
     def _extract_metadata(self, document: dict, markdown: str) -> dict:
         """
         Extract metadata from docling-serve response.
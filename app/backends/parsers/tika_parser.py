@@ -68,8 +68,8 @@ class TikaParser(ParserBackend):
         try:
             self.logger.info(f"Parsing document with Tika: {file_path.name}")
 
-            # Extract text
-            text = self.client.extract_text(file_path)
+            # Extract text and metadata (one upload)
+            text, tika_meta = self.client.extract_text_and_metadata(file_path)
 
             if not text or not text.strip():
                 error_msg = f"Tika returned empty text for {file_path.name}"
@@ -78,9 +78,6 @@ class TikaParser(ParserBackend):
                     success=False, error=error_msg, parser_name=self.name
                 )
 
-            # Extract metadata
-            tika_meta = self.client.extract_metadata(file_path)
-
             # Build metadata dict
             extracted_metadata = self._extract_metadata(tika_meta, text)
 
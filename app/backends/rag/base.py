@@ -3,7 +3,7 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 
 @dataclass
@@ -101,6 +101,21 @@ class RAGBackend(ABC):
         """
         return []
 
+    def iter_documents(self, collection_id: Optional[str] = None) -> Iterator[dict[str, Any]]:
+        """
+        Iterate documents in a RAG collection/dataset.
+
+        Streaming counterpart of list_documents() for large collections.
+        Default delegates to list_documents(); override to page or stream.
+
+        Args:
+            collection_id: Optional collection/dataset ID
+
+        Yields:
+            Document dicts with at least 'id' and optional 'name' keys
+        """
+        yield from self.list_documents(collection_id=collection_id)
+
     @property
     @abstractmethod
     def name(self) -> str:
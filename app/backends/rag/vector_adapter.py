@@ -4,13 +4,28 @@ Chunks markdown, generates embeddings, and stores via any VectorStoreBackend.
 Replaces the pgvector-specific adapter with a store-agnostic version.
 """
 
+import json
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Any, Optional
+from typing import IO, Any, Iterable, Iterator, Optional
 
+from app.backends.parsers.base import docling_json_path
 from app.backends.rag.base import RAGBackend, RAGResult
-from app.backends.vectorstores.base import VectorStoreBackend
+from app.backends.vectorstores.base import (
+    VectorStoreBackend,
+    boilerplate_hash,
+    chunk_content_hash,
+    embedding_fingerprint,
+)
+from app.backends.vectorstores.ranking import mean_pool_embeddings, sum_unit_embeddings
 from app.utils import get_logger
 
+# Embedded windows of a streamed ingest stay in memory up to this size,
+# then spill to a temporary file until the store writes them
+_SPOOL_MEMORY_BYTES = 32 * 1024 * 1024
+
 
 class VectorRAGBackend(RAGBackend):
     """RAG backend using any VectorStoreBackend for chunking/embedding/retrieval."""
@@ -24,9 +39,21 @@ class VectorRAGBackend(RAGBackend):
         chunk_overlap_tokens: int = 64,
         docling_serve_url: str = "",
         docling_serve_timeout: int = 120,
+        boilerplate_min_documents: int = 0,
+        chunk_tokenizer: str = "",
+        ingest_stream_batch: int = 0,
+        force_reembed: bool = False,
     ):
         self._store = vector_store
         self._embedder = embedding_client
+        # Chunks repeated in more than this many other documents of a
+        # source are stored once as shared boilerplate (0 = disabled)
+        self._boilerplate_min_documents = boilerplate_min_documents
+        # New documents are embedded and written in windows of this many
+        # chunks (0 = embed the whole document in one call)
+        self._ingest_stream_batch = ingest_stream_batch
+        # Re-embed every chunk even when its stored hash matches
+        self._force_reembed = force_reembed
 
         from app.services.chunking import create_chunker
         self._chunker = create_chunker(
@@ -35,6 +62,7 @@ class VectorRAGBackend(RAGBackend):
             overlap_tokens=chunk_overlap_tokens,
             docling_serve_url=docling_serve_url,
             docling_serve_timeout=docling_serve_timeout,
+            tokenizer=chunk_tokenizer,
         )
         self.logger = get_logger("backends.rag.vector")
 
@@ -65,6 +93,15 @@ class VectorRAGBackend(RAGBackend):
             self.logger.error(f"Connection test failed: {e}")
             return False
 
+    def iter_documents(self, collection_id: Optional[str] = None) -> Iterator[dict[str, Any]]:
+        """Stream stored documents from the vector store (collection = source)."""
+        for doc in self._store.iter_documents(source=collection_id):
+            yield {
+                "id": f"{doc['source']}/{doc['filename']}",
+                "name": doc["filename"],
+                "metadata": doc.get("metadata") or {},
+            }
+
     def ingest_document(
         self,
         content_path: Path,
@@ -99,8 +136,26 @@ class VectorRAGBackend(RAGBackend):
                     rag_name=self.name,
                 )
 
+            # New documents stream chunk -> embed -> store. Boilerplate
+            # matching and contextual enrichment need the full chunk list,
+            # and changed documents need the diff below.
+            existing: Optional[dict] = None
+            contextual = self._contextual_enrichment_enabled()
+            fingerprint = embedding_fingerprint(self._embedder.model, contextual)
+            if (
+                self._ingest_stream_batch
+                and not self._boilerplate_min_documents
+                and not contextual
+            ):
+                self._store.ensure_ready()
+                existing = self._get_existing_hashes(source, filename)
+                if not existing:
+                    return self._ingest_stream(
+                        content_path, text, metadata, source, filename, fingerprint
+                    )
+
             # Chunk
-            chunks = self._chunker.chunk(text, metadata)
+            chunks = self._chunk(content_path, text, metadata)
             if not chunks:
                 return RAGResult(
                     success=False,
@@ -108,51 +163,85 @@ class VectorRAGBackend(RAGBackend):
                     rag_name=self.name,
                 )
 
+            # Diff against what is already stored so unchanged chunks are
+            # neither re-embedded nor rewritten
+            self._store.ensure_ready()
+            boilerplate = self._match_boilerplate(source, filename, chunks)
+            if boilerplate:
+                chunks = [c for c in chunks if c.index not in boilerplate]
+            hashes = [chunk_content_hash(c.content, fingerprint) for c in chunks]
+            if existing is None:
+                existing = self._get_existing_hashes(source, filename)
+            changed, reused = self._diff_chunks(source, filename, chunks, hashes, existing)
+
             # Contextual enrichment (optional — enriched text for embedding only)
-            texts = self._apply_contextual_enrichment(chunks, text)
+            texts = self._apply_contextual_enrichment(chunks, text, positions=changed)
 
             # Embed
-            embedding_result = self._embedder.embed(texts)
-
-            if not embedding_result.embeddings:
-                return RAGResult(
-                    success=False,
-                    error=f"Embedding failed for: {content_path}",
-                    rag_name=self.name,
-                )
-            if len(embedding_result.embeddings) != len(chunks):
-                return RAGResult(
-                    success=False,
-                    error=(
-                        f"Embedding count mismatch: got {len(embedding_result.embeddings)}, "
-                        f"expected {len(chunks)}"
-                    ),
-                    rag_name=self.name,
-                )
-
-            # Prepare chunks for storage
+            embeddings: list[list[float]] = []
+            if changed:
+                embedding_result = self._embedder.embed(texts)
+
+                if not embedding_result.embeddings:
+                    return RAGResult(
+                        success=False,
+                        error=f"Embedding failed for: {content_path}",
+                        rag_name=self.name,
+                    )
+                if len(embedding_result.embeddings) != len(changed):
+                    return RAGResult(
+                        success=False,
+                        error=(
+                            f"Embedding count mismatch: got {len(embedding_result.embeddings)}, "
+                            f"expected {len(changed)}"
+                        ),
+                        rag_name=self.name,
+                    )
+                embeddings = embedding_result.embeddings
+
+            # Prepare chunks for storage (unchanged chunks carry no embedding;
+            # moved chunks are rewritten with their stored vector)
+            new_embeddings = dict(zip(changed, embeddings))
+            new_embeddings.update(reused)
             storage_chunks = []
-            for chunk, embedding in zip(chunks, embedding_result.embeddings):
-                storage_chunks.append({
+            for pos, (chunk, digest) in enumerate(zip(chunks, hashes)):
+                storage_chunk = {
                     "content": chunk.content,
-                    "embedding": embedding,
+                    "content_hash": digest,
                     "chunk_index": chunk.index,
                     "metadata": chunk.metadata,
-                })
+                }
+                if pos in new_embeddings:
+                    storage_chunk["embedding"] = new_embeddings[pos]
+                storage_chunks.append(storage_chunk)
 
             # Store
-            self._store.ensure_ready()
             document_id = metadata.get("document_id")
-            count = self._store.store_chunks(
+            store_args = dict(
                 source=source,
                 filename=filename,
                 chunks=storage_chunks,
                 document_id=str(document_id) if document_id else None,
             )
+            if existing:
+                self._store.sync_chunks(**store_args)
+            else:
+                self._store.store_chunks(**store_args)
+            if self._boilerplate_min_documents:
+                self._record_boilerplate(source, filename, boilerplate)
+            self._store_document_embedding(
+                source,
+                filename,
+                {chunks[pos].index: vector for pos, vector in new_embeddings.items()},
+                [chunk.index for chunk in chunks],
+                chunks[0].metadata,
+            )
 
             self.logger.info(
-                f"Ingested {count} chunks for {source}/{filename} "
-                f"(model={embedding_result.model}, dims={embedding_result.dimensions})"
+                f"Ingested {len(chunks)} chunks for {source}/{filename} "
+                f"({len(changed)} embedded, {len(reused)} moved, "
+                f"{len(chunks) - len(changed) - len(reused)} unchanged"
+                + (f", {len(boilerplate)} boilerplate skipped)" if boilerplate else ")")
             )
 
             return RAGResult(
@@ -167,23 +256,288 @@ class VectorRAGBackend(RAGBackend):
             self.logger.error(error_msg)
             return RAGResult(success=False, error=error_msg, rag_name=self.name)
 
-    def _apply_contextual_enrichment(
+    def _ingest_stream(
         self,
-        chunks: list,
-        full_text: str,
-    ) -> list[str]:
-        """Apply contextual enrichment to chunks if enabled.
+        content_path: Path,
+        text: str,
+        metadata: dict[str, Any],
+        source: str,
+        filename: str,
+        fingerprint: str,
+    ) -> RAGResult:
+        """Store a new document window by window.
+
+        Chunks are embedded ``ingest_stream_batch`` at a time on a worker
+        thread while the next window is chunked, and each embedded window
+        is spooled (in memory, then to a temporary file) rather than kept
+        in a list. The store's single COPY starts only once every window is
+        embedded, so its pooled connection and open transaction — which
+        would hold back VACUUM — never wait on the embedding service. An
+        embedding failure leaves the store untouched.
+        """
+        document_id = metadata.get("document_id")
+        pooled: dict[str, Any] = {"sum": None, "indexes": [], "first": None}
+
+        def storage_batches(executor: ThreadPoolExecutor) -> Iterator[list[dict[str, Any]]]:
+            pending: Optional[tuple[list, Future]] = None
+            for window in self._windows(self._iter_chunks(content_path, text, metadata)):
+                future = executor.submit(self._embed_window, window)
+                if pending is not None:
+                    yield self._storage_batch(*pending, pooled, fingerprint)
+                pending = (window, future)
+            if pending is not None:
+                yield self._storage_batch(*pending, pooled, fingerprint)
+
+        with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MEMORY_BYTES) as spool:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-embed") as executor:
+                for batch in storage_batches(executor):
+                    spool.write(json.dumps(batch).encode("utf-8") + b"\n")
+            spool.seek(0)
+            count = self._store.store_chunk_stream(
+                source=source,
+                filename=filename,
+                batches=self._read_spool(spool),
+                document_id=str(document_id) if document_id else None,
+            )
 
-        Returns enriched text for embedding. Raw chunk.content is still
-        stored in the database (line 129 in store loop).
+        if not count:
+            return RAGResult(
+                success=False,
+                error=f"No chunks produced from: {content_path}",
+                rag_name=self.name,
+            )
 
-        Args:
-            chunks: List of Chunk objects
-            full_text: Full document text
+        try:
+            self._store.store_document_embeddings([{
+                "source": source,
+                "filename": filename,
+                "embedding": mean_pool_embeddings([pooled["sum"]]),
+                "chunk_count": len(pooled["indexes"]),
+                "metadata": pooled["first"],
+            }])
+        except Exception as e:
+            self.logger.warning(
+                f"Could not store document embedding for {source}/{filename}: {e}"
+            )
+
+        self.logger.info(
+            f"Ingested {count} chunks for {source}/{filename} "
+            f"(streamed in windows of {self._ingest_stream_batch})"
+        )
+        return RAGResult(
+            success=True,
+            document_id=str(document_id) if document_id else filename,
+            collection_id=source,
+            rag_name=self.name,
+        )
+
+    @staticmethod
+    def _read_spool(spool: IO[bytes]) -> Iterator[list[dict[str, Any]]]:
+        """Yield the storage batches written to ``spool`` by _ingest_stream()."""
+        for line in spool:
+            yield json.loads(line)
+
+    def _windows(self, chunks: Iterable) -> Iterator[list]:
+        """Group a chunk iterator into lists of ``ingest_stream_batch``."""
+        iterator = iter(chunks)
+        while window := list(islice(iterator, self._ingest_stream_batch)):
+            yield window
+
+    def _embed_window(self, window: list) -> list[list[float]]:
+        """Embed one window of chunks, checking one vector comes back per chunk."""
+        result = self._embedder.embed([chunk.content for chunk in window])
+        if len(result.embeddings) != len(window):
+            raise ValueError(
+                f"Embedding count mismatch: got {len(result.embeddings)}, "
+                f"expected {len(window)}"
+            )
+        return result.embeddings
+
+    @staticmethod
+    def _storage_batch(
+        window: list, future: Future, pooled: dict[str, Any], fingerprint: str
+    ) -> list[dict[str, Any]]:
+        """Wait for a window's embeddings and fold them into the running pool."""
+        embeddings = future.result()
+        partial = sum_unit_embeddings(embeddings)
+        pooled["sum"] = partial if pooled["sum"] is None else pooled["sum"] + partial
+        pooled["indexes"].extend(chunk.index for chunk in window)
+        if pooled["first"] is None:
+            pooled["first"] = window[0].metadata
+        return [
+            {
+                "content": chunk.content,
+                "content_hash": chunk_content_hash(chunk.content, fingerprint),
+                "chunk_index": chunk.index,
+                "metadata": chunk.metadata,
+                "embedding": embedding,
+            }
+            for chunk, embedding in zip(window, embeddings)
+        ]
+
+    def _chunk(self, content_path: Path, text: str, metadata: dict[str, Any]) -> list:
+        """Chunk the parser's DoclingDocument sidecar if present, else the markdown."""
+        return self._chunk_sidecar(content_path, metadata) or self._chunker.chunk(text, metadata)
+
+    def _iter_chunks(
+        self, content_path: Path, text: str, metadata: dict[str, Any]
+    ) -> Iterator:
+        """Like _chunk(), but chunks the markdown lazily."""
+        chunks = self._chunk_sidecar(content_path, metadata)
+        return iter(chunks) if chunks else self._chunker.iter_chunks(text, metadata)
+
+    def _chunk_sidecar(self, content_path: Path, metadata: dict[str, Any]) -> Optional[list]:
+        """Chunks of the DoclingDocument sidecar, or None when absent or unusable."""
+        json_path = docling_json_path(content_path)
+        if not json_path.exists():
+            return None
+        try:
+            document = json.loads(json_path.read_text(encoding="utf-8"))
+            return self._chunker.chunk_docling_document(document, metadata)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not chunk {json_path.name}, chunking markdown instead: {e}"
+            )
+            return None
+
+    def _diff_chunks(
+        self,
+        source: str,
+        filename: str,
+        chunks: list,
+        hashes: list[str],
+        existing: dict,
+    ) -> tuple[list[int], dict[int, list[float]]]:
+        """Find the chunks that need a new embedding.
+
+        A chunk is unchanged when the hash stored at its index matches.
+        Otherwise a stored chunk with the same hash at another index
+        (content shifted by an insert or delete above it) supplies its
+        vector, so the row is rewritten without re-embedding. Everything
+        else — and every chunk when ``force_reembed`` is set — is changed.
 
         Returns:
-            List of text strings for embedding
+            (positions to embed, position -> reused stored vector)
+        """
+        if self._force_reembed:
+            return list(range(len(chunks))), {}
+        changed: list[int] = []
+        moved: dict[int, int] = {}
+        stored_at = {digest: index for index, digest in existing.items() if digest}
+        for pos, (chunk, digest) in enumerate(zip(chunks, hashes)):
+            if existing.get(chunk.index) == digest:
+                continue
+            if digest in stored_at:
+                moved[pos] = stored_at[digest]
+            else:
+                changed.append(pos)
+        if not moved:
+            return changed, {}
+
+        try:
+            vectors = self._store.get_chunk_embeddings(source, filename)
+        except Exception as e:
+            self.logger.debug(f"Stored vectors unavailable for {source}/{filename}: {e}")
+            vectors = {}
+        reused = {pos: vectors[index] for pos, index in moved.items() if index in vectors}
+        changed.extend(pos for pos in moved if pos not in reused)
+        return sorted(changed), reused
+
+    def _get_existing_hashes(self, source: str, filename: str) -> dict:
+        """Fetch stored chunk hashes; empty on failure so the caller re-stores fully."""
+        try:
+            return self._store.get_chunk_hashes(source, filename)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not read existing chunks for {source}/{filename}, "
+                f"re-ingesting in full: {e}"
+            )
+            return {}
+
+    def _match_boilerplate(self, source: str, filename: str, chunks: list) -> dict[int, int]:
+        """Map chunk_index -> shared boilerplate ID for repeated chunks.
+
+        A document made up entirely of boilerplate keeps all its chunks,
+        so it stays searchable. Lookup failures disable dedup for this
+        ingest rather than failing it.
+        """
+        if not self._boilerplate_min_documents:
+            return {}
+        hashes = {c.index: boilerplate_hash(c.content) for c in chunks}
+        try:
+            matched = self._store.match_boilerplate(
+                source,
+                filename,
+                {hashes[c.index]: c.content for c in chunks},
+                self._boilerplate_min_documents,
+            )
+        except Exception as e:
+            self.logger.warning(
+                f"Boilerplate lookup failed for {source}/{filename}, storing all chunks: {e}"
+            )
+            return {}
+        references = {
+            index: matched[digest] for index, digest in hashes.items() if digest in matched
+        }
+        if len(references) == len(chunks):
+            return {}
+        return references
+
+    def _record_boilerplate(
+        self, source: str, filename: str, references: dict[int, int]
+    ) -> None:
+        """Store the document's boilerplate references (only feeds the report)."""
+        try:
+            self._store.set_document_boilerplate(source, filename, references)
+        except Exception as e:
+            self.logger.warning(
+                f"Could not record boilerplate for {source}/{filename}: {e}"
+            )
+
+    def _store_document_embedding(
+        self,
+        source: str,
+        filename: str,
+        new_vectors: dict[int, list[float]],
+        chunk_indexes: list[int],
+        metadata: dict[str, Any],
+    ) -> None:
+        """Mean-pool the document's chunk vectors into its document embedding.
+
+        Vectors of unchanged chunks are read back from the store. Nothing is
+        written when no chunk changed, since the stored document embedding
+        is still current. Failures only cost two-stage search coverage, so
+        they are logged rather than failing the ingest.
         """
+        if not new_vectors:
+            return
+        try:
+            vectors = dict(new_vectors)
+            missing = [i for i in chunk_indexes if i not in vectors]
+            if missing:
+                stored = self._store.get_chunk_embeddings(source, filename)
+                vectors.update({i: stored[i] for i in missing if i in stored})
+                if len(vectors) < len(chunk_indexes):
+                    self.logger.debug(
+                        f"Skipping document embedding for {source}/{filename}: "
+                        "stored chunk vectors unavailable"
+                    )
+                    return
+            self._store.store_document_embeddings([{
+                "source": source,
+                "filename": filename,
+                "embedding": mean_pool_embeddings([vectors[i] for i in chunk_indexes]),
+                "chunk_count": len(chunk_indexes),
+                "metadata": metadata,
+            }])
+        except Exception as e:
+            self.logger.warning(
+                f"Could not store document embedding for {source}/{filename}: {e}"
+            )
+
+    @staticmethod
+    def _contextual_enrichment_enabled() -> bool:
+        """Config flag, overridden by the pipeline settings when set."""
         from app.config import Config
 
         enabled = getattr(Config, "CONTEXTUAL_ENRICHMENT_ENABLED", False)
@@ -198,9 +552,38 @@ class VectorRAGBackend(RAGBackend):
                 enabled = override.lower() == "true"
         except Exception:
             pass
+        return enabled
+
+    def _log_enrichment_progress(self, completed: int, total: int) -> None:
+        """Log contextual enrichment progress every 10 chunks and at the end."""
+        if completed % 10 == 0 or completed == total:
+            self.logger.debug(f"Contextual enrichment: {completed}/{total} chunks")
+
+    def _apply_contextual_enrichment(
+        self,
+        chunks: list,
+        full_text: str,
+        positions: Optional[list[int]] = None,
+    ) -> list[str]:
+        """Apply contextual enrichment to chunks if enabled.
 
-        if not enabled:
-            return [c.content for c in chunks]
+        Returns enriched text for embedding. Raw chunk.content is still
+        stored in the database.
+
+        Args:
+            chunks: List of Chunk objects
+            full_text: Full document text
+            positions: Chunk list positions to return text for (default: all)
+
+        Returns:
+            List of text strings for embedding, one per position
+        """
+        from app.config import Config
+
+        targets = list(range(len(chunks))) if positions is None else positions
+
+        if not targets or not self._contextual_enrichment_enabled():
+            return [chunks[i].content for i in targets]
 
         try:
             from app.container import get_container
@@ -210,14 +593,23 @@ class VectorRAGBackend(RAGBackend):
             llm_client = container.llm_client
             if not llm_client.is_configured():
                 self.logger.debug("LLM client not configured, skipping contextual enrichment")
-                return [c.content for c in chunks]
+                return [chunks[i].content for i in targets]
 
             window = getattr(Config, "CONTEXTUAL_ENRICHMENT_WINDOW", 3)
             max_tokens = getattr(Config, "LLM_ENRICHMENT_MAX_TOKENS", 8000)
-            service = DocumentEnrichmentService(llm_client, max_tokens=max_tokens)
-            return service.enrich_chunks(chunks, full_text, window=window)
+            service = DocumentEnrichmentService(
+                llm_client,
+                max_tokens=max_tokens,
+                concurrency=getattr(Config, "CONTEXTUAL_ENRICHMENT_CONCURRENCY", 1),
+                chunk_timeout=getattr(Config, "CONTEXTUAL_ENRICHMENT_TIMEOUT", 0) or None,
+                batch_size=getattr(Config, "CONTEXTUAL_ENRICHMENT_BATCH_SIZE", 1),
+            )
+            return service.enrich_chunks(
+                chunks, full_text, window=window, positions=targets,
+                progress=self._log_enrichment_progress,
+            )
         except Exception as e:
             self.logger.warning(
                 f"Contextual enrichment failed, using raw content: {e}"
             )
-            return [c.content for c in chunks]
+            return [chunks[i].content for i in targets]
@@ -1,8 +1,114 @@
 """Abstract base class for vector store backends."""
 
+import hashlib
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Optional
+from datetime import date
+from typing import Any, Iterable, Iterator, Optional
+
+
+# Recall/latency presets accepted by search() and search_hybrid(). Each
+# backend maps them to its own index settings; backends without tunable
+# ANN parameters ignore them.
+SEARCH_PRESETS = ("fast", "balanced", "accurate")
+
+
+# Types allowed for metadata keys exposed to column filters (see
+# VectorStoreBackend.validate_filters)
+VALID_METADATA_COLUMN_TYPES = ("text", "date", "numeric")
+METADATA_KEY_RE = re.compile(r"^[a-z][a-z0-9_]{0,40}$")
+
+
+def parse_metadata_columns(spec: str) -> dict[str, str]:
+    """Parse a ``key:type,key:type`` spec of filterable metadata keys.
+
+    Args:
+        spec: Comma-separated ``key:type`` pairs, e.g.
+            ``"publication_date:date,organization:text"``
+
+    Returns:
+        Dict of metadata key to column type
+
+    Raises:
+        ValueError: If a key or type is invalid
+    """
+    columns: dict[str, str] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, col_type = item.partition(":")
+        key, col_type = key.strip(), (col_type.strip().lower() or "text")
+        if not METADATA_KEY_RE.match(key):
+            raise ValueError(
+                f"Invalid metadata column key {key!r}: use lowercase letters, digits and underscores"
+            )
+        if col_type not in VALID_METADATA_COLUMN_TYPES:
+            raise ValueError(
+                f"Invalid type {col_type!r} for metadata column {key!r}. "
+                f"Must be one of: {', '.join(VALID_METADATA_COLUMN_TYPES)}"
+            )
+        columns[key] = col_type
+    return columns
+
+
+def coerce_filter_value(key: str, col_type: str, value: Any) -> Any:
+    """Validate a column filter value against its column type.
+
+    Returns:
+        The value as a ``date`` for date columns, otherwise unchanged
+
+    Raises:
+        ValueError: If the value does not fit the column type
+    """
+    if col_type == "date":
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except ValueError:
+            raise ValueError(f"Filter on {key!r} needs an ISO date (YYYY-MM-DD), got {value!r}")
+    if col_type == "numeric":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Filter on {key!r} needs a number, got {value!r}")
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Filter on {key!r} needs a string, got {value!r}")
+    return value
+
+
+def embedding_fingerprint(model: str, contextual: bool = False) -> str:
+    """Identify how a chunk's vector was produced, for chunk_content_hash().
+
+    Args:
+        model: Embedding model name
+        contextual: Whether the embedded text carried an LLM-generated
+            context prefix (contextual enrichment)
+    """
+    return f"{model}|contextual" if contextual else model
+
+
+def chunk_content_hash(content: str, fingerprint: str = "") -> str:
+    """Return the hex SHA-256 of chunk content, used to detect unchanged chunks.
+
+    ``fingerprint`` (see embedding_fingerprint()) is hashed with the
+    content, so a chunk re-ingested with another embedding model or with
+    contextual enrichment toggled no longer matches its stored hash.
+    """
+    data = f"{fingerprint}\n{content}" if fingerprint else content
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def boilerplate_hash(content: str) -> str:
+    """Return the hex MD5 of chunk content normalised for boilerplate matching.
+
+    Lowercases, collapses whitespace runs to one space and trims, so the
+    same footer matches across documents despite reflowed line breaks.
+    Case and whitespace follow Python's Unicode rules; stores persist this
+    value rather than recomputing it in SQL, whose rules differ outside
+    ASCII.
+    """
+    normalised = _WHITESPACE_RE.sub(" ", content.lower()).strip(" ")
+    return hashlib.md5(normalised.encode("utf-8"), usedforsecurity=False).hexdigest()
 
 
 @dataclass
@@ -74,6 +180,9 @@ class VectorStoreBackend(ABC):
         sources: Optional[list[str]] = None,
         metadata_filter: Optional[dict[str, Any]] = None,
         limit: int = 10,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
     ) -> list[dict[str, Any]]:
         """Search for similar chunks using vector similarity.
 
@@ -82,6 +191,11 @@ class VectorStoreBackend(ABC):
             sources: Optional list of source names to filter by
             metadata_filter: Optional metadata filter
             limit: Maximum results to return
+            preset: Optional recall/latency preset (one of SEARCH_PRESETS)
+            filters: Optional range/equality filters on indexed metadata
+                keys (see validate_filters())
+            include_embeddings: Also return each chunk's vector under
+                "embedding", for client-side reranking
 
         Returns:
             List of result dicts with: source, filename, chunk_index,
@@ -131,6 +245,280 @@ class VectorStoreBackend(ABC):
         """Get vector store backend name for logging/identification."""
         raise NotImplementedError
 
+    def search_hybrid(
+        self,
+        query_embedding: list[float],
+        query_text: str,
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search combining vector similarity with lexical (full-text) matching.
+
+        Default implementation ignores ``query_text`` and falls back to
+        search(). Override in backends with a full-text index.
+
+        Args:
+            query_embedding: Query vector
+            query_text: Raw query text for lexical matching
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional metadata filter
+            limit: Maximum results to return
+            preset: Optional recall/latency preset (one of SEARCH_PRESETS)
+            filters: Optional range/equality filters on indexed metadata keys
+            include_embeddings: Also return each chunk's vector (see search())
+
+        Returns:
+            List of result dicts (same keys as search())
+        """
+        # Only forward options that are set, so search() overrides written
+        # without these parameters keep working
+        options: dict[str, Any] = {}
+        if preset is not None:
+            options["preset"] = preset
+        if filters:
+            options["filters"] = filters
+        if include_embeddings:
+            options["include_embeddings"] = True
+        return self.search(
+            query_embedding,
+            sources=sources,
+            metadata_filter=metadata_filter,
+            limit=limit,
+            **options,
+        )
+
+    def search_two_stage(
+        self,
+        query_embedding: list[float],
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        document_limit: int = 20,
+        mmr_lambda: Optional[float] = None,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search documents first, then chunks within the best documents.
+
+        Default implementation ignores ``document_limit`` and
+        ``mmr_lambda`` and falls back to search(). Override in backends
+        that store document embeddings.
+
+        Args:
+            query_embedding: Query vector
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional metadata filter
+            limit: Maximum results to return
+            document_limit: Documents retrieved in the first stage
+            mmr_lambda: Optional MMR relevance/diversity trade-off in [0, 1]
+                applied to the chunk candidates
+            preset: Optional recall/latency preset (one of SEARCH_PRESETS)
+            filters: Optional range/equality filters on indexed metadata keys
+            include_embeddings: Also return each chunk's vector (see search())
+
+        Returns:
+            List of result dicts (same keys as search())
+        """
+        options: dict[str, Any] = {}
+        if preset is not None:
+            options["preset"] = preset
+        if filters:
+            options["filters"] = filters
+        if include_embeddings:
+            options["include_embeddings"] = True
+        return self.search(
+            query_embedding,
+            sources=sources,
+            metadata_filter=metadata_filter,
+            limit=limit,
+            **options,
+        )
+
+    def store_document_embeddings(self, documents: list[dict[str, Any]]) -> int:
+        """Store document-level embeddings used by search_two_stage().
+
+        Default is a no-op. Override in backends that support two-stage
+        search.
+
+        Args:
+            documents: List of dicts with keys: source, filename, embedding,
+                chunk_count, and optionally metadata
+
+        Returns:
+            Number of document embeddings stored
+        """
+        return 0
+
+    def get_chunk_embeddings(self, source: str, filename: str) -> dict[int, list[float]]:
+        """Get stored chunk embeddings for a document, keyed by chunk_index.
+
+        Default returns an empty dict. Not all backends may support this.
+        """
+        return {}
+
+    def match_boilerplate(
+        self,
+        source: str,
+        filename: str,
+        chunks: dict[str, str],
+        min_documents: int,
+    ) -> dict[str, int]:
+        """Find chunks that are boilerplate repeated across a source.
+
+        A chunk is boilerplate when its boilerplate_hash() is already
+        registered for the source, or when it appears in at least
+        ``min_documents`` other documents of the source; newly detected
+        chunks are registered (their text stored once).
+
+        Default detects nothing. Override in backends that support
+        boilerplate deduplication.
+
+        Args:
+            source: Source (partition) name
+            filename: Document being ingested (excluded from the count)
+            chunks: boilerplate_hash() -> chunk content
+            min_documents: Other documents a chunk must appear in
+
+        Returns:
+            Dict of boilerplate_hash -> shared boilerplate ID
+        """
+        return {}
+
+    def set_document_boilerplate(
+        self, source: str, filename: str, references: dict[int, int]
+    ) -> None:
+        """Record which boilerplate chunks a document contains.
+
+        Default is a no-op. Override alongside match_boilerplate().
+
+        Args:
+            source: Source (partition) name
+            filename: Document filename
+            references: chunk_index -> shared boilerplate ID (replaces
+                the document's previous references)
+        """
+
+    def get_boilerplate_report(self) -> list[dict[str, Any]]:
+        """Summarise deduplicated boilerplate per source.
+
+        Default returns an empty list. Not all backends may support this.
+
+        Returns:
+            List of dicts with: source, snippets, chunks_deduplicated,
+            bytes_reclaimed
+        """
+        return []
+
+    def validate_filters(self, filters: Optional[dict[str, Any]]) -> None:
+        """Check that search() can apply ``filters``.
+
+        Default rejects any filters. Override in backends that index
+        metadata keys for range/equality filtering.
+
+        Raises:
+            ValueError: If the filters cannot be applied
+        """
+        if filters:
+            raise ValueError(f"{self.name} does not support column filters")
+
+    def store_documents(self, documents: list[dict[str, Any]]) -> int:
+        """Store chunks for many documents at once.
+
+        Default implementation calls store_chunks() per document. Backends
+        that can batch writes in one transaction should override this.
+
+        Args:
+            documents: List of dicts with keys: source, filename, chunks,
+                and optionally document_id
+
+        Returns:
+            Total number of chunks stored
+        """
+        return sum(
+            self.store_chunks(
+                source=doc["source"],
+                filename=doc["filename"],
+                chunks=doc["chunks"],
+                document_id=doc.get("document_id"),
+            )
+            for doc in documents
+        )
+
+    def get_chunk_hashes(self, source: str, filename: str) -> dict[int, Optional[str]]:
+        """Get stored content hashes for a document, keyed by chunk_index.
+
+        Default returns an empty dict (every chunk is treated as new).
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+
+        Returns:
+            Dict mapping chunk_index to content hash (None if unknown)
+        """
+        return {}
+
+    def sync_chunks(
+        self,
+        source: str,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Bring a stored document in line with a new chunk list.
+
+        Chunks carrying an ``embedding`` are (re)written; chunks without one
+        are already stored unchanged and are kept. Stored chunks whose
+        chunk_index is not in ``chunks`` are deleted.
+
+        Default implementation requires every chunk to carry an embedding
+        and delegates to store_chunks().
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+            chunks: Full chunk list for the document (same keys as store_chunks)
+            document_id: Optional document ID to store in metadata
+
+        Returns:
+            Number of chunks written
+        """
+        return self.store_chunks(source, filename, chunks, document_id=document_id)
+
+    def store_chunk_stream(
+        self,
+        source: str,
+        filename: str,
+        batches: Iterable[list[dict[str, Any]]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Replace a document with chunks arriving in batches.
+
+        ``batches`` is consumed lazily, so the caller can still be
+        producing (chunking, embedding) later batches while earlier ones
+        are written. The document is replaced atomically: if the iterable
+        raises, nothing is stored.
+
+        Default implementation collects every batch and delegates to
+        store_chunks(). Override in backends that can write incrementally.
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+            batches: Iterable of chunk lists (same keys as store_chunks)
+            document_id: Optional document ID to store in metadata
+
+        Returns:
+            Number of chunks stored
+        """
+        chunks = [chunk for batch in batches for chunk in batch]
+        return self.store_chunks(source, filename, chunks, document_id=document_id)
+
     def delete_by_source(self, source: str) -> int:
         """Delete all chunks for a source. Returns count deleted.
 
@@ -138,6 +526,17 @@ class VectorStoreBackend(ABC):
         """
         return 0
 
+    def reconcile_stats(self) -> int:
+        """Recompute any maintained counters from the stored chunks.
+
+        Default implementation is a no-op. Override in backends that keep
+        denormalised counters for get_sources()/get_stats().
+
+        Returns:
+            Number of sources whose counters were corrected
+        """
+        return 0
+
     def is_available(self) -> bool:
         """Check if the vector store is available for use.
 
@@ -176,3 +575,53 @@ class VectorStoreBackend(ABC):
             List of dicts with: chunk_index, content, metadata
         """
         return []
+
+    def iter_document_chunks(
+        self,
+        source: str,
+        filename: str,
+        after_index: int = -1,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate a document's chunks in chunk_index order (keyset paginated).
+
+        Default implementation pages over get_document_chunks(). Backends
+        that can stream from a server-side cursor should override this.
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+            after_index: Only chunks with a greater chunk_index
+            limit: Optional maximum number of chunks to yield
+
+        Yields:
+            Dicts with: chunk_index, content, metadata
+        """
+        yielded = 0
+        for chunk in self.get_document_chunks(source, filename):
+            if chunk["chunk_index"] <= after_index:
+                continue
+            if limit is not None and yielded >= limit:
+                return
+            yielded += 1
+            yield chunk
+
+    def iter_documents(
+        self,
+        source: Optional[str] = None,
+        after_filename: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate stored documents ordered by (source, filename).
+
+        Default yields nothing. Not all backends may support this.
+
+        Args:
+            source: Optional source to restrict to
+            after_filename: Keyset cursor within ``source``
+            limit: Optional maximum number of documents to yield
+
+        Yields:
+            Dicts with: source, filename, metadata
+        """
+        return iter(())
@@ -0,0 +1,943 @@
+"""Local on-disk vector store backend.
+
+Each source is a directory of append-only segments: a float32 embedding
+matrix (``.npy``, memory-mapped for search) and a JSON-lines file with the
+matching chunk records. ``manifest.json`` lists the live segments and the
+rows deleted from each. Every write creates new files and then atomically
+replaces the manifest, so readers (in this or any other process) never
+see a half-written update.
+
+Search is an exact NumPy cosine top-k by default, or an hnswlib graph per
+source when ``index="hnsw"`` and hnswlib is installed. Meant for
+development, CI and small single-host deployments without PostgreSQL.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import heapq
+import json
+import os
+import re
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from app.backends.vectorstores.base import (
+    METADATA_KEY_RE,
+    SEARCH_PRESETS,
+    VALID_METADATA_COLUMN_TYPES,
+    VectorStoreBackend,
+    chunk_content_hash,
+    coerce_filter_value,
+)
+from app.utils import get_logger
+
+_SOURCE_NAME_RE = re.compile(r"^[a-zA-Z0-9_-]+$")
+
+VALID_LOCAL_INDEXES = ("exact", "hnsw")
+
+_MANIFEST = "manifest.json"
+_LOCK_FILE = ".lock"
+
+# Rewrite a source into one segment once this share of its rows is
+# deleted, or once it has this many segments
+_COMPACT_DELETED_RATIO = 0.3
+_MAX_SEGMENTS = 16
+
+# hnswlib graph parameters and SEARCH_PRESETS mapped to ef
+_HNSW_M = 16
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH = {"fast": 20, "balanced": 40, "accurate": 200}
+
+_COMPARATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": lambda a, b: a == b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _is_member(value: Any, options: set[Any]) -> bool:
+    return value in options
+
+
+def _import_hnswlib() -> Any:
+    """Return the hnswlib module, or None when it is not installed."""
+    try:
+        import hnswlib
+    except ImportError:
+        return None
+    return hnswlib
+
+
+def _metadata_contains(value: Any, expected: Any) -> bool:
+    """JSON containment with the same semantics as jsonb ``@>``."""
+    if isinstance(expected, dict):
+        return isinstance(value, dict) and all(
+            k in value and _metadata_contains(value[k], v) for k, v in expected.items()
+        )
+    if isinstance(expected, list):
+        return isinstance(value, list) and all(
+            any(_metadata_contains(v, e) for v in value) for e in expected
+        )
+    return value == expected
+
+
+def _column_value(col_type: str, value: Any) -> Any:
+    """Read a metadata value as its column type; None if it does not parse.
+
+    Mirrors the pgvector generated columns: dates are read from an ISO
+    prefix and text is the JSON value rendered as text.
+    """
+    if value is None:
+        return None
+    if col_type == "date":
+        try:
+            return date.fromisoformat(str(value)[:10])
+        except ValueError:
+            return None
+    if col_type == "numeric":
+        if isinstance(value, bool):
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _months_ago(today: date, months: int) -> date:
+    """Return ``today`` minus ``months`` calendar months (day clamped)."""
+    month_index = today.year * 12 + today.month - 1 - months
+    year, month = divmod(month_index, 12)
+    day = today.day
+    while True:
+        try:
+            return date(year, month + 1, day)
+        except ValueError:
+            day -= 1
+
+
+@dataclass
+class _Segment:
+    """One immutable segment: embeddings plus the matching chunk records."""
+
+    name: str
+    embeddings: Any  # np.memmap of shape (rows, dimensions), unit-normalised
+    records: list[dict[str, Any]]
+    deleted: set[int]
+    alive: Any = None  # np.ndarray[bool]
+
+    def live_rows(self) -> Iterator[int]:
+        for row in range(len(self.records)):
+            if row not in self.deleted:
+                yield row
+
+
+@dataclass
+class _SourceState:
+    """A source as described by one version of its manifest."""
+
+    stamp: tuple[int, int]
+    dimensions: int
+    next_segment: int
+    segments: list[_Segment]
+    hnsw: Any = None
+    hnsw_positions: list[tuple[int, int]] = field(default_factory=list)
+
+    def chunk_count(self) -> int:
+        return sum(len(seg.records) - len(seg.deleted) for seg in self.segments)
+
+    def document_rows(self, filename: str) -> list[tuple[_Segment, int]]:
+        return [
+            (seg, row)
+            for seg in self.segments
+            for row in seg.live_rows()
+            if seg.records[row]["filename"] == filename
+        ]
+
+
+class LocalVectorStore(VectorStoreBackend):
+    """Vector store keeping memory-mapped float32 matrices on local disk.
+
+    Writes take a per-source file lock, so several processes (gunicorn
+    workers, the scheduler, scripts) can share one directory. Readers
+    reload a source whenever its manifest has been replaced.
+    """
+
+    def __init__(
+        self,
+        root_dir: str | Path = "",
+        dimensions: int = 768,
+        index: str = "exact",
+        metadata_columns: Optional[dict[str, str]] = None,
+    ):
+        if not isinstance(dimensions, int) or dimensions < 1:
+            raise ValueError(f"dimensions must be a positive integer, got {dimensions!r}")
+        if index not in VALID_LOCAL_INDEXES:
+            raise ValueError(f"index must be one of {VALID_LOCAL_INDEXES}, got {index!r}")
+        metadata_columns = dict(metadata_columns or {})
+        for key, col_type in metadata_columns.items():
+            if not METADATA_KEY_RE.match(key) or col_type not in VALID_METADATA_COLUMN_TYPES:
+                raise ValueError(f"Invalid metadata column {key!r}: {col_type!r}")
+        self._root = Path(root_dir) if root_dir else None
+        self._dimensions = dimensions
+        self._metadata_columns = metadata_columns
+        self._states: dict[str, _SourceState] = {}
+        self._lock = threading.RLock()
+        self.logger = get_logger("local_vectorstore")
+
+        self._hnswlib = None
+        if index == "hnsw":
+            self._hnswlib = _import_hnswlib()
+            if self._hnswlib is None:
+                self.logger.warning(
+                    "hnswlib is not installed; local vector store falls back to exact search"
+                )
+
+    @property
+    def name(self) -> str:
+        return "local"
+
+    @property
+    def metadata_columns(self) -> dict[str, str]:
+        """Metadata keys accepted by ``filters``, with their types."""
+        return dict(self._metadata_columns)
+
+    def is_configured(self) -> bool:
+        return self._root is not None
+
+    def test_connection(self) -> bool:
+        """Check that the storage directory exists (or can be created) and is writable."""
+        if not self.is_configured():
+            return False
+        try:
+            self.ensure_ready()
+            return os.access(self._root, os.W_OK)  # type: ignore[arg-type]
+        except (OSError, ValueError) as e:
+            self.logger.debug(f"Local vector store not usable: {e}")
+            return False
+
+    def ensure_ready(self) -> None:
+        """Create the storage directory and check stored dimensions.
+
+        Raises:
+            ValueError: If a source was written with other dimensions
+        """
+        if self._root is None:
+            raise ValueError("Local vector store has no root directory")
+        self._root.mkdir(parents=True, exist_ok=True)
+        for source in self._source_names():
+            state = self._load(source)
+            if state is not None and state.dimensions != self._dimensions:
+                raise ValueError(
+                    f"Source '{source}' stores {state.dimensions}-dim embeddings but "
+                    f"EMBEDDING_DIMENSIONS is {self._dimensions}. Delete "
+                    f"{self._source_dir(source)} and re-ingest."
+                )
+
+    def close(self) -> None:
+        """Drop cached segment maps and indexes."""
+        with self._lock:
+            self._states.clear()
+
+    # ── storage layout ──────────────────────────────────────────────
+
+    def _source_dir(self, source: str) -> Path:
+        if not _SOURCE_NAME_RE.match(source):
+            raise ValueError(
+                f"Invalid source name: {source!r}. "
+                "Only alphanumeric, underscore, and hyphen allowed."
+            )
+        if self._root is None:
+            raise ValueError("Local vector store has no root directory")
+        return self._root / source
+
+    def _source_names(self) -> list[str]:
+        if self._root is None or not self._root.is_dir():
+            return []
+        return sorted(
+            p.name for p in self._root.iterdir()
+            if _SOURCE_NAME_RE.match(p.name) and (p / _MANIFEST).is_file()
+        )
+
+    def _load(self, source: str) -> Optional[_SourceState]:
+        """Return the current state of ``source``, reloading if its manifest changed."""
+        import numpy as np
+
+        path = self._source_dir(source) / _MANIFEST
+        with self._lock:
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                self._states.pop(source, None)
+                return None
+            stamp = (st.st_ino, st.st_mtime_ns)
+            cached = self._states.get(source)
+            if cached is not None and cached.stamp == stamp:
+                return cached
+
+            manifest = json.loads(path.read_text(encoding="utf-8"))
+            segments = []
+            for entry in manifest["segments"]:
+                base = path.parent / entry["name"]
+                with open(f"{base}.jsonl", encoding="utf-8") as f:
+                    records = [json.loads(line) for line in f]
+                deleted = set(entry.get("deleted", []))
+                alive = np.ones(len(records), dtype=bool)
+                if deleted:
+                    alive[list(deleted)] = False
+                segments.append(_Segment(
+                    name=entry["name"],
+                    embeddings=np.load(f"{base}.npy", mmap_mode="r"),
+                    records=records,
+                    deleted=deleted,
+                    alive=alive,
+                ))
+            state = _SourceState(
+                stamp=stamp,
+                dimensions=manifest["dimensions"],
+                next_segment=manifest["next_segment"],
+                segments=segments,
+            )
+            self._states[source] = state
+            return state
+
+    @contextmanager
+    def _write_lock(self, source: str) -> Iterator[Path]:
+        """Serialise writers to ``source`` across threads and processes."""
+        directory = self._source_dir(source)
+        directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            with open(directory / _LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield directory
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Callable[[Any], None], mode: str = "wb") -> None:
+        """Write ``path`` via a temp file, fsync, then rename into place."""
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, mode) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _commit(
+        self,
+        source: str,
+        directory: Path,
+        state: Optional[_SourceState],
+        deletions: dict[str, set[int]],
+        records: list[dict[str, Any]],
+        embeddings: Any,
+    ) -> None:
+        """Publish deletions and appended rows as a new manifest.
+
+        Must be called under _write_lock(). New segment files are written
+        first; the manifest rename is the commit point. Sources with many
+        deleted rows or segments are compacted into a single segment.
+        """
+        import numpy as np
+
+        segments = state.segments if state else []
+        next_segment = state.next_segment if state else 1
+        total = sum(len(s.records) for s in segments) + len(records)
+        deleted = sum(len(s.deleted | deletions.get(s.name, set())) for s in segments)
+
+        if segments and (
+            deleted > total * _COMPACT_DELETED_RATIO or len(segments) >= _MAX_SEGMENTS
+        ):
+            kept_records: list[dict[str, Any]] = []
+            kept_vectors = []
+            for seg in segments:
+                gone = seg.deleted | deletions.get(seg.name, set())
+                rows = [r for r in range(len(seg.records)) if r not in gone]
+                kept_records.extend(seg.records[r] for r in rows)
+                if rows:
+                    kept_vectors.append(np.asarray(seg.embeddings[rows]))
+            records = kept_records + records
+            if len(embeddings):
+                kept_vectors.append(embeddings)
+            embeddings = (
+                np.concatenate(kept_vectors) if kept_vectors
+                else np.empty((0, self._dimensions), dtype=np.float32)
+            )
+            entries: list[dict[str, Any]] = []
+            self.logger.debug(f"Compacting local vector store source '{source}'")
+        else:
+            entries = []
+            for seg in segments:
+                gone = seg.deleted | deletions.get(seg.name, set())
+                if len(gone) < len(seg.records):
+                    entries.append({"name": seg.name, "deleted": sorted(gone)})
+
+        if records:
+            name = f"seg-{next_segment:06d}"
+            next_segment += 1
+            self._write_atomic(
+                directory / f"{name}.npy", lambda f: np.save(f, embeddings)
+            )
+            self._write_atomic(
+                directory / f"{name}.jsonl",
+                lambda f: f.writelines(json.dumps(r) + "\n" for r in records),
+                mode="w",
+            )
+            entries.append({"name": name, "deleted": []})
+
+        manifest = {
+            "dimensions": self._dimensions,
+            "next_segment": next_segment,
+            "segments": entries,
+        }
+        self._write_atomic(
+            directory / _MANIFEST, lambda f: json.dump(manifest, f), mode="w"
+        )
+
+        live = {e["name"] for e in entries}
+        for seg in segments:
+            if seg.name not in live:
+                for suffix in (".npy", ".jsonl"):
+                    (directory / f"{seg.name}{suffix}").unlink(missing_ok=True)
+        self._states.pop(source, None)
+
+    # ── writes ──────────────────────────────────────────────────────
+
+    def _prepare_rows(
+        self,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str],
+    ) -> tuple[list[dict[str, Any]], list[Any]]:
+        """Validate chunks and build (records, embeddings)."""
+        records = []
+        vectors = []
+        for i, chunk in enumerate(chunks):
+            missing = [f for f in ("content", "embedding") if f not in chunk]
+            if missing:
+                raise ValueError(
+                    f"Chunk {i} missing required field(s): {', '.join(missing)}"
+                )
+            if len(chunk["embedding"]) != self._dimensions:
+                raise ValueError(
+                    f"Chunk {i} embedding has {len(chunk['embedding'])} dimensions, "
+                    f"expected {self._dimensions}"
+                )
+            meta = dict(chunk.get("metadata", {}))
+            if document_id:
+                meta["document_id"] = document_id
+            records.append({
+                "filename": filename,
+                "chunk_index": chunk.get("chunk_index", i),
+                "content": chunk["content"],
+                "content_hash": chunk.get("content_hash") or chunk_content_hash(chunk["content"]),
+                "metadata": meta,
+            })
+            vectors.append(chunk["embedding"])
+        return records, vectors
+
+    @staticmethod
+    def _normalise(vectors: Any) -> Any:
+        """Return float32 unit vectors (zero vectors stay zero)."""
+        import numpy as np
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def _replace_documents(
+        self,
+        source: str,
+        documents: list[tuple[str, list[dict[str, Any]], list[Any]]],
+    ) -> None:
+        """Atomically replace the rows of each (filename, records, vectors)."""
+        import numpy as np
+
+        with self._write_lock(source) as directory:
+            state = self._load(source)
+            filenames = {filename for filename, _, _ in documents}
+            deletions: dict[str, set[int]] = {}
+            if state is not None:
+                for seg in state.segments:
+                    rows = {r for r in seg.live_rows() if seg.records[r]["filename"] in filenames}
+                    if rows:
+                        deletions[seg.name] = rows
+            records = [r for _, doc_records, _ in documents for r in doc_records]
+            vectors = [v for _, _, doc_vectors in documents for v in doc_vectors]
+            embeddings = (
+                self._normalise(vectors) if vectors
+                else np.empty((0, self._dimensions), dtype=np.float32)
+            )
+            self._commit(source, directory, state, deletions, records, embeddings)
+        self._invalidate_search_cache([source])
+
+    def store_chunks(
+        self,
+        source: str,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Store document chunks with embeddings (replacing the document).
+
+        Args:
+            source: Source name (one directory per source)
+            filename: Document filename
+            chunks: List of dicts with keys: content, embedding, metadata, chunk_index
+            document_id: Optional document ID to store in metadata
+
+        Returns:
+            Number of chunks stored
+        """
+        if not chunks:
+            return 0
+        count = self.store_documents([{
+            "source": source,
+            "filename": filename,
+            "chunks": chunks,
+            "document_id": document_id,
+        }])
+        self.logger.debug(f"Stored {count} chunks for {source}/{filename}")
+        return count
+
+    def store_documents(self, documents: list[dict[str, Any]]) -> int:
+        """Store chunks for many documents with one manifest commit per source.
+
+        Args:
+            documents: List of dicts with keys: source, filename, chunks,
+                and optionally document_id (same meaning as store_chunks)
+
+        Returns:
+            Total number of chunks stored
+        """
+        by_source: dict[str, list[tuple[str, list[dict[str, Any]], list[Any]]]] = {}
+        for doc in documents:
+            if not doc.get("chunks"):
+                continue
+            self._source_dir(doc["source"])
+            records, vectors = self._prepare_rows(
+                doc["filename"], doc["chunks"], doc.get("document_id")
+            )
+            by_source.setdefault(doc["source"], []).append((doc["filename"], records, vectors))
+
+        total = 0
+        for source, docs in by_source.items():
+            self._replace_documents(source, docs)
+            total += sum(len(records) for _, records, _ in docs)
+        return total
+
+    def sync_chunks(
+        self,
+        source: str,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Bring a stored document in line with ``chunks``.
+
+        Chunks without an ``embedding`` keep their stored vector; the whole
+        document is then rewritten in one commit.
+
+        Returns:
+            Number of chunks written with a new embedding
+
+        Raises:
+            ValueError: If a kept chunk has no stored row to reuse
+        """
+        written = sum(1 for c in chunks if "embedding" in c)
+        state = self._load(source)
+        stored: dict[int, Any] = {}
+        if state is not None:
+            for seg, row in state.document_rows(filename):
+                stored[seg.records[row]["chunk_index"]] = seg.embeddings[row]
+
+        complete = []
+        for chunk in chunks:
+            if "embedding" not in chunk:
+                index = chunk.get("chunk_index")
+                if index not in stored:
+                    raise ValueError(
+                        f"Chunk {index} of {source}/{filename} has no embedding and no stored row"
+                    )
+                chunk = {**chunk, "embedding": stored[index].tolist()}
+            complete.append(chunk)
+
+        if complete:
+            self.store_chunks(source, filename, complete, document_id=document_id)
+        else:
+            self.delete_document(source, filename)
+        return written
+
+    def delete_document(self, source: str, filename: str) -> int:
+        """Delete all chunks for a document.
+
+        Returns:
+            Number of chunks deleted
+        """
+        if self._load(source) is None:
+            return 0
+        with self._write_lock(source) as directory:
+            state = self._load(source)
+            if state is None:
+                return 0
+            deletions: dict[str, set[int]] = {}
+            for seg, row in state.document_rows(filename):
+                deletions.setdefault(seg.name, set()).add(row)
+            deleted = sum(len(rows) for rows in deletions.values())
+            if deleted:
+                import numpy as np
+
+                self._commit(
+                    source, directory, state, deletions, [],
+                    np.empty((0, self._dimensions), dtype=np.float32),
+                )
+        if deleted:
+            self._invalidate_search_cache([source])
+        self.logger.debug(f"Deleted {deleted} chunks for {source}/{filename}")
+        return deleted
+
+    def delete_by_source(self, source: str) -> int:
+        """Delete a source directory. Returns the number of chunks deleted."""
+        state = self._load(source)
+        if state is None:
+            return 0
+        deleted = state.chunk_count()
+        with self._write_lock(source) as directory:
+            shutil.rmtree(directory, ignore_errors=True)
+            self._states.pop(source, None)
+        self._invalidate_search_cache([source])
+        self.logger.info(f"Deleted {deleted} chunks for source '{source}'")
+        return deleted
+
+    def _invalidate_search_cache(self, sources: Any) -> None:
+        """Bump search-cache generations for sources whose chunks changed."""
+        from app.services.search_cache import invalidate_sources
+
+        invalidate_sources(sources)
+
+    # ── search ──────────────────────────────────────────────────────
+
+    def _filter_predicate(
+        self,
+        metadata_filter: Optional[dict[str, Any]],
+        filters: Optional[dict[str, Any]],
+    ) -> Optional[Callable[[dict[str, Any]], bool]]:
+        """Compile metadata and column filters into one predicate.
+
+        Column filters use the pgvector grammar: ``key: value`` (equality)
+        or ``key: {op: value}`` with op one of eq, gt, gte, lt, lte, in,
+        or — for date keys — within_months.
+
+        Raises:
+            ValueError: On an unknown key, operator or malformed value
+        """
+        checks: list[Callable[[dict[str, Any]], bool]] = []
+        if metadata_filter:
+            checks.append(lambda meta: _metadata_contains(meta, metadata_filter))
+
+        for key, spec in (filters or {}).items():
+            col_type = self._metadata_columns.get(key)
+            if col_type is None:
+                raise ValueError(
+                    f"Cannot filter on {key!r}; filterable keys: "
+                    f"{', '.join(sorted(self._metadata_columns)) or 'none'}"
+                )
+            ops = spec if isinstance(spec, dict) else {"eq": spec}
+            if not ops:
+                raise ValueError(f"Empty filter for {key!r}")
+            for op, value in ops.items():
+                if op in _COMPARATORS:
+                    target = coerce_filter_value(key, col_type, value)
+                    compare = _COMPARATORS[op]
+                elif op == "in":
+                    if not isinstance(value, list) or not value:
+                        raise ValueError(f"'in' filter for {key!r} needs a non-empty list")
+                    target = {coerce_filter_value(key, col_type, v) for v in value}
+                    compare = _is_member
+                elif op == "within_months" and col_type == "date":
+                    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                        raise ValueError(
+                            f"within_months for {key!r} must be a positive integer"
+                        )
+                    target = _months_ago(date.today(), value)
+                    compare = _COMPARATORS["gte"]
+                else:
+                    raise ValueError(f"Unsupported filter operator {op!r} for {key!r}")
+                checks.append(
+                    lambda meta, k=key, t=col_type, c=compare, v=target: (
+                        (actual := _column_value(t, meta.get(k))) is not None and c(actual, v)
+                    )
+                )
+
+        if not checks:
+            return None
+        return lambda meta: all(check(meta) for check in checks)
+
+    def validate_filters(self, filters: Optional[dict[str, Any]]) -> None:
+        """Raise ValueError if ``filters`` cannot be applied by search()."""
+        if filters:
+            self._filter_predicate(None, filters)
+
+    def _segment_mask(
+        self, seg: _Segment, predicate: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> Any:
+        import numpy as np
+
+        if predicate is None:
+            return seg.alive
+        matches = np.fromiter(
+            (predicate(r["metadata"]) for r in seg.records), dtype=bool, count=len(seg.records)
+        )
+        return seg.alive & matches
+
+    def _search_exact(
+        self, state: _SourceState, query: Any, masks: list[Any], limit: int
+    ) -> list[tuple[float, _Segment, int]]:
+        """Brute-force cosine top-``limit`` over every segment of a source."""
+        import numpy as np
+
+        hits: list[tuple[float, _Segment, int]] = []
+        for seg, mask in zip(state.segments, masks):
+            rows = np.flatnonzero(mask)
+            if not rows.size:
+                continue
+            scores = (seg.embeddings @ query)[rows]
+            if rows.size > limit:
+                best = np.argpartition(-scores, limit - 1)[:limit]
+                rows, scores = rows[best], scores[best]
+            hits.extend((float(s), seg, int(r)) for s, r in zip(scores, rows))
+        return hits
+
+    def _hnsw_index(self, state: _SourceState) -> Any:
+        """Build (once per manifest version) an hnswlib graph over live rows."""
+        import numpy as np
+
+        with self._lock:
+            if state.hnsw is None:
+                positions = [
+                    (i, row) for i, seg in enumerate(state.segments) for row in seg.live_rows()
+                ]
+                index = self._hnswlib.Index(space="cosine", dim=self._dimensions)  # type: ignore[union-attr]
+                index.init_index(
+                    max_elements=max(len(positions), 1),
+                    ef_construction=_HNSW_EF_CONSTRUCTION,
+                    M=_HNSW_M,
+                )
+                if positions:
+                    vectors = np.stack([
+                        state.segments[i].embeddings[row] for i, row in positions
+                    ])
+                    index.add_items(vectors, np.arange(len(positions)))
+                state.hnsw, state.hnsw_positions = index, positions
+            return state.hnsw
+
+    def _search_hnsw(
+        self,
+        state: _SourceState,
+        query: Any,
+        masks: list[Any],
+        limit: int,
+        preset: str,
+    ) -> list[tuple[float, _Segment, int]]:
+        """Approximate top-``limit`` with the source's hnswlib graph.
+
+        Falls back to exact search when the filtered graph walk cannot
+        produce enough neighbours.
+        """
+        index = self._hnsw_index(state)
+        allowed = [bool(masks[i][row]) for i, row in state.hnsw_positions]
+        k = min(limit, sum(allowed))
+        if not k:
+            return []
+        index.set_ef(max(_HNSW_EF_SEARCH[preset], k))
+        try:
+            labels, distances = index.knn_query(
+                query, k=k, filter=lambda label: allowed[label]
+            )
+        except RuntimeError:
+            return self._search_exact(state, query, masks, limit)
+        hits = []
+        for label, distance in zip(labels[0], distances[0]):
+            i, row = state.hnsw_positions[int(label)]
+            hits.append((1.0 - float(distance), state.segments[i], row))
+        return hits
+
+    def search(
+        self,
+        query_embedding: list[float],
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search for similar chunks using cosine similarity.
+
+        Args:
+            query_embedding: Query vector
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional JSON containment filter on metadata
+            limit: Maximum results to return
+            preset: Recall/latency preset; only affects the hnsw index
+            filters: Optional range/equality filters on metadata_columns keys
+            include_embeddings: Also return each chunk's (unit-normalised)
+                embedding under "embedding"
+
+        Returns:
+            List of dicts with: source, filename, chunk_index, content,
+            metadata, score
+        """
+        if preset is not None and preset not in SEARCH_PRESETS:
+            raise ValueError(f"preset must be one of {SEARCH_PRESETS}, got {preset!r}")
+        if limit < 1:
+            return []
+        predicate = self._filter_predicate(metadata_filter, filters)
+        query = self._normalise(query_embedding)
+        if query.shape != (self._dimensions,):
+            raise ValueError(
+                f"Query embedding has {query.size} dimensions, expected {self._dimensions}"
+            )
+
+        names = sources if sources else self._source_names()
+        hits: list[tuple[float, str, _Segment, int]] = []
+        for source in names:
+            if not _SOURCE_NAME_RE.match(source):
+                continue
+            state = self._load(source)
+            if state is None:
+                continue
+            masks = [self._segment_mask(seg, predicate) for seg in state.segments]
+            if self._hnswlib is not None:
+                found = self._search_hnsw(state, query, masks, limit, preset or "balanced")
+            else:
+                found = self._search_exact(state, query, masks, limit)
+            hits.extend((score, source, seg, row) for score, seg, row in found)
+
+        results = []
+        for score, source, seg, row in heapq.nlargest(limit, hits, key=lambda h: h[0]):
+            record = seg.records[row]
+            result = {
+                "source": source,
+                "filename": record["filename"],
+                "chunk_index": record["chunk_index"],
+                "content": record["content"],
+                "metadata": record["metadata"],
+                "score": score,
+            }
+            if include_embeddings:
+                result["embedding"] = seg.embeddings[row].tolist()
+            results.append(result)
+        return results
+
+    # ── reads ───────────────────────────────────────────────────────
+
+    def get_sources(self) -> list[dict[str, Any]]:
+        """List all sources with their chunk counts.
+
+        Returns:
+            List of dicts with: source, chunk_count
+        """
+        sources = []
+        for source in self._source_names():
+            state = self._load(source)
+            count = state.chunk_count() if state else 0
+            if count:
+                sources.append({"source": source, "chunk_count": count})
+        return sources
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get overall statistics.
+
+        Returns:
+            Dict with: total_chunks, total_documents, total_sources
+        """
+        total_chunks = total_documents = total_sources = 0
+        for source in self._source_names():
+            state = self._load(source)
+            if state is None or not state.chunk_count():
+                continue
+            total_sources += 1
+            total_chunks += state.chunk_count()
+            total_documents += len({
+                seg.records[row]["filename"]
+                for seg in state.segments
+                for row in seg.live_rows()
+            })
+        return {
+            "total_chunks": total_chunks,
+            "total_documents": total_documents,
+            "total_sources": total_sources,
+        }
+
+    def get_chunk_hashes(self, source: str, filename: str) -> dict[int, Optional[str]]:
+        """Get stored content hashes for a document, keyed by chunk_index.
+
+        Duplicated chunk indexes map to None, so they are always rewritten.
+        """
+        state = self._load(source)
+        hashes: dict[int, Optional[str]] = {}
+        for seg, row in state.document_rows(filename) if state else []:
+            record = seg.records[row]
+            index = record["chunk_index"]
+            hashes[index] = None if index in hashes else record.get("content_hash")
+        return hashes
+
+    def get_document_chunks(self, source: str, filename: str) -> list[dict[str, Any]]:
+        """Get all chunks for a specific document.
+
+        Returns:
+            List of dicts with: chunk_index, content, metadata
+        """
+        state = self._load(source)
+        chunks = [
+            {
+                "chunk_index": seg.records[row]["chunk_index"],
+                "content": seg.records[row]["content"],
+                "metadata": seg.records[row]["metadata"],
+            }
+            for seg, row in (state.document_rows(filename) if state else [])
+        ]
+        return sorted(chunks, key=lambda c: c["chunk_index"])
+
+    def iter_documents(
+        self,
+        source: Optional[str] = None,
+        after_filename: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Iterate stored documents ordered by (source, filename).
+
+        Each entry carries the metadata of the document's first chunk.
+
+        Yields:
+            Dicts with: source, filename, metadata
+        """
+        yielded = 0
+        for name in [source] if source else self._source_names():
+            state = self._load(name)
+            if state is None:
+                continue
+            first: dict[str, tuple[int, dict[str, Any]]] = {}
+            for seg in state.segments:
+                for row in seg.live_rows():
+                    record = seg.records[row]
+                    current = first.get(record["filename"])
+                    if current is None or record["chunk_index"] < current[0]:
+                        first[record["filename"]] = (record["chunk_index"], record["metadata"])
+            for filename in sorted(first):
+                if source and after_filename is not None and filename <= after_filename:
+                    continue
+                if limit is not None and yielded >= limit:
+                    return
+                yielded += 1
+                yield {"source": name, "filename": filename, "metadata": first[filename][1]}
@@ -9,15 +9,110 @@ from __future__ import annotations
 import json
 import re
 import threading
-from typing import Any, Optional
-
-from app.backends.vectorstores.base import VectorStoreBackend
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from app.backends.vectorstores.base import (
+    METADATA_KEY_RE,
+    SEARCH_PRESETS,
+    VALID_METADATA_COLUMN_TYPES,
+    VectorStoreBackend,
+    boilerplate_hash,
+    chunk_content_hash,
+    coerce_filter_value,
+)
+from app.backends.vectorstores.ranking import candidate_limit, mmr_select
 from app.utils import get_logger
 
 _SOURCE_NAME_RE = re.compile(r"^[a-zA-Z0-9_-]+$")
 
 ANYTHINGLLM_VIEW_NAME = "anythingllm_document_view"
 
+# Column order and PostgreSQL types for the binary COPY loader
+_COPY_COLUMNS = (
+    "source", "filename", "chunk_index", "content", "content_hash", "boilerplate_hash",
+    "embedding", "metadata",
+)
+_COPY_TYPES = ("text", "text", "int4", "text", "text", "text", "vector", "jsonb")
+
+# Text search configuration for the lexical leg of hybrid search. "simple"
+# does no stemming or stop-word removal, so identifiers such as rule
+# numbers and report codes are indexed verbatim.
+_TS_CONFIG = "simple"
+
+# Rows fetched per round trip by server-side (named) cursors
+_ITERSIZE = 500
+
+# Reciprocal rank fusion constant (standard value from Cormack et al.)
+_RRF_K = 60
+
+# HNSW index storage modes. "none" indexes the full-precision vector;
+# "halfvec" indexes a 16-bit float cast (2x smaller); "binary" indexes a
+# 1-bit-per-dimension quantization (32x smaller). The embedding column
+# always keeps full precision so quantized candidates can be reranked.
+VALID_INDEX_QUANTIZATIONS = ("none", "halfvec", "binary")
+
+# pgvector limits on indexable dimensions for the quantized types
+_MAX_INDEX_DIMS = {"halfvec": 4000, "binary": 64000}
+
+# hnsw.iterative_scan modes (pgvector >= 0.8). With an iterative scan the
+# index keeps walking the graph until enough rows pass the source/metadata
+# filters, instead of returning fewer than LIMIT rows.
+VALID_ITERATIVE_SCANS = ("off", "relaxed_order", "strict_order")
+
+# SEARCH_PRESETS mapped to (hnsw.ef_search, hnsw.iterative_scan)
+_SEARCH_PRESET_SETTINGS = {
+    "fast": (20, "relaxed_order"),
+    "balanced": (40, "relaxed_order"),
+    "accurate": (200, "strict_order"),
+}
+
+# pgvector's upper bound for hnsw.ef_search
+_MAX_EF_SEARCH = 1000
+
+# Largest vector(n) an HNSW index accepts without quantization
+_MAX_VECTOR_INDEX_DIMS = 2000
+
+# Comparison operators accepted by column filters
+_FILTER_OPERATORS = {"eq": "=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+# Immutable, never-failing casts used by the generated metadata columns.
+# A malformed value becomes NULL instead of failing the insert. Dates are
+# only read in ISO form, which parses the same under every DateStyle.
+_SAFE_CAST_FUNCTIONS = {
+    "date": r"""
+        CREATE OR REPLACE FUNCTION document_chunks_meta_date(value text)
+        RETURNS date LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            IF value !~ '^\d{4}-\d{2}-\d{2}' THEN
+                RETURN NULL;
+            END IF;
+            RETURN left(value, 10)::date;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+    """,
+    "numeric": """
+        CREATE OR REPLACE FUNCTION document_chunks_meta_numeric(value text)
+        RETURNS numeric LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            RETURN value::numeric;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+    """,
+}
+
+# Session settings for one-shot HNSW builds after a bulk load. The graph
+# build is far faster when it fits in maintenance_work_mem.
+_BULK_MAINTENANCE_WORK_MEM = "1GB"
+
+# Seconds between pg_stat_progress_create_index polls during a build
+_INDEX_PROGRESS_INTERVAL = 10.0
+
 
 class PgVectorVectorStore(VectorStoreBackend):
     """Vector store using PostgreSQL+pgvector for document chunk embeddings.
@@ -33,18 +128,53 @@ class PgVectorVectorStore(VectorStoreBackend):
         dimensions: int = 768,
         view_name: str = ANYTHINGLLM_VIEW_NAME,
         drop_on_dimension_mismatch: bool = False,
+        index_quantization: str = "none",
+        rerank_factor: int = 4,
+        search_preset: str = "balanced",
+        metadata_columns: Optional[dict[str, str]] = None,
+        boilerplate_dedup: bool = False,
     ):
         if not isinstance(dimensions, int) or dimensions < 1:
             raise ValueError(f"dimensions must be a positive integer, got {dimensions!r}")
+        if index_quantization not in VALID_INDEX_QUANTIZATIONS:
+            raise ValueError(
+                f"index_quantization must be one of {VALID_INDEX_QUANTIZATIONS}, "
+                f"got {index_quantization!r}"
+            )
+        if dimensions > _MAX_INDEX_DIMS.get(index_quantization, dimensions):
+            raise ValueError(
+                f"index_quantization={index_quantization!r} supports at most "
+                f"{_MAX_INDEX_DIMS[index_quantization]} dimensions, got {dimensions}"
+            )
+        if not isinstance(rerank_factor, int) or rerank_factor < 1:
+            raise ValueError(f"rerank_factor must be a positive integer, got {rerank_factor!r}")
+        if search_preset not in SEARCH_PRESETS:
+            raise ValueError(
+                f"search_preset must be one of {SEARCH_PRESETS}, got {search_preset!r}"
+            )
+        metadata_columns = dict(metadata_columns or {})
+        for key, col_type in metadata_columns.items():
+            if not METADATA_KEY_RE.match(key) or col_type not in VALID_METADATA_COLUMN_TYPES:
+                raise ValueError(f"Invalid metadata column {key!r}: {col_type!r}")
         self._database_url = database_url
         self._dimensions = dimensions
         self._view_name = view_name
         self._drop_on_mismatch = drop_on_dimension_mismatch
+        self._quantization = index_quantization
+        self._rerank_factor = rerank_factor
+        self._search_preset = search_preset
+        self._metadata_columns = metadata_columns
+        self._boilerplate_dedup = boilerplate_dedup
+        self._has_iterative_scan: Optional[bool] = None  # detected on first search
+        self._chunk_columns: Optional[frozenset[str]] = None  # detected on first use
         self._pool = None  # Lazy-initialized ConnectionPool
         self._pool_lock = threading.Lock()
         self._schema_lock = threading.Lock()
         self._partition_lock = threading.Lock()
         self._known_partitions: set[str] = set()
+        # Sources whose HNSW build is deferred while bulk_load() is active
+        self._deferred_index_sources: Optional[set[str]] = None
+        self._bulk_drop_existing = True
         self._schema_ensured = False
         self.logger = get_logger("pgvector")
 
@@ -152,9 +282,7 @@ class PgVectorVectorStore(VectorStoreBackend):
                 existing_dims,
                 self._dimensions,
             )
-            cur.execute("DROP TABLE document_chunks CASCADE")
-            conn.commit()
-            self._known_partitions.clear()
+            self._drop_chunk_tables(cur, conn)
             return
 
         # Table has data
@@ -167,9 +295,7 @@ class PgVectorVectorStore(VectorStoreBackend):
                 self._dimensions,
                 count,
             )
-            cur.execute("DROP TABLE document_chunks CASCADE")
-            conn.commit()
-            self._known_partitions.clear()
+            self._drop_chunk_tables(cur, conn)
             return
 
         raise ValueError(
@@ -180,6 +306,21 @@ class PgVectorVectorStore(VectorStoreBackend):
             f"PGVECTOR_DROP_ON_MISMATCH=true and restart."
         )
 
+    def _drop_chunk_tables(self, cur: Any, conn: Any) -> None:
+        """Drop document_chunks and the tables derived from it, in one transaction.
+
+        The stats and boilerplate tables have no foreign key to
+        document_chunks, so CASCADE leaves them alone; they are dropped too
+        so ensure_ready() recreates them empty and reseeds the counters.
+        """
+        cur.execute("DROP TABLE document_chunks CASCADE")
+        cur.execute("DROP TABLE IF EXISTS document_embeddings")
+        cur.execute("DROP TABLE IF EXISTS document_chunk_stats")
+        cur.execute("DROP TABLE IF EXISTS document_boilerplate")
+        cur.execute("DROP TABLE IF EXISTS boilerplate_chunks")
+        conn.commit()
+        self._known_partitions.clear()
+
     def ensure_ready(self) -> None:
         """Create the pgvector extension and parent table if they don't exist.
 
@@ -213,6 +354,10 @@ class PgVectorVectorStore(VectorStoreBackend):
                         f"filename TEXT NOT NULL, "
                         f"chunk_index INTEGER NOT NULL, "
                         f"content TEXT NOT NULL, "
+                        f"content_hash TEXT, "
+                        f"boilerplate_hash TEXT, "
+                        f"content_tsv tsvector GENERATED ALWAYS AS "
+                        f"(to_tsvector('{_TS_CONFIG}', content)) STORED, "
                         f"embedding vector({dims}), "
                         f"metadata JSONB DEFAULT '{{}}'::jsonb, "
                         f"created_at TIMESTAMPTZ DEFAULT NOW(), "
@@ -220,11 +365,44 @@ class PgVectorVectorStore(VectorStoreBackend):
                         f") PARTITION BY LIST (source)"
                     )
                     cur.execute(create_sql)  # type: ignore[arg-type]
+                    # Tables created before incremental re-ingest lack content_hash
+                    cur.execute(
+                        "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_hash TEXT"
+                    )
+                    # Generated columns missing from older tables are added
+                    # by migrate_columns(), never implicitly (table rewrite)
+                    self._chunk_columns = None
+                    # Per-document lookups (delete, diff, get_document_chunks)
+                    cur.execute("""
+                        CREATE INDEX IF NOT EXISTS idx_document_chunks_document
+                        ON document_chunks (source, filename, chunk_index)
+                    """)
                     # GIN index on metadata for filtered searches
                     cur.execute("""
                         CREATE INDEX IF NOT EXISTS idx_document_chunks_metadata
                         ON document_chunks USING GIN (metadata)
                     """)
+                    self._ensure_metadata_functions(cur)
+                    # Per-source counters maintained by the write paths so
+                    # get_sources()/get_stats() never scan document_chunks
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS document_chunk_stats (
+                            source TEXT PRIMARY KEY,
+                            chunk_count BIGINT NOT NULL DEFAULT 0,
+                            document_count BIGINT NOT NULL DEFAULT 0,
+                            updated_at TIMESTAMPTZ DEFAULT NOW()
+                        )
+                    """)
+                    # Seed counters once for tables that predate them
+                    cur.execute("""
+                        INSERT INTO document_chunk_stats (source, chunk_count, document_count)
+                        SELECT source, COUNT(*), COUNT(DISTINCT filename)
+                        FROM document_chunks
+                        WHERE NOT EXISTS (SELECT 1 FROM document_chunk_stats)
+                        GROUP BY source
+                    """)
+                    self._ensure_document_embeddings(cur)
+                    self._ensure_boilerplate(cur)
                     # AnythingLLM-compatible VIEW
                     if self._view_name:
                         from app.backends.vectorstores.pgvector_anythingllm_view import (
@@ -240,8 +418,346 @@ class PgVectorVectorStore(VectorStoreBackend):
     # Keep ensure_schema as an alias for backward compatibility during migration
     ensure_schema = ensure_ready
 
+    def _index_spec(self, quantization: Optional[str] = None) -> tuple[str, str, str]:
+        """Return (index name suffix, indexed expression, operator class).
+
+        Dimensions is a validated int — safe for SQL composition.
+        """
+        mode = quantization or self._quantization
+        dims = self._dimensions
+        if mode == "halfvec":
+            return (
+                "embedding_halfvec_hnsw",
+                f"(embedding::halfvec({dims}))",
+                "halfvec_cosine_ops",
+            )
+        if mode == "binary":
+            return (
+                "embedding_bit_hnsw",
+                f"(binary_quantize(embedding)::bit({dims}))",
+                "bit_hamming_ops",
+            )
+        return ("embedding_hnsw", "embedding", "vector_cosine_ops")
+
+    def _hnsw_index_sql(
+        self, safe_source: str, partition_name: str, quantization: Optional[str] = None
+    ) -> Any:
+        """CREATE INDEX IF NOT EXISTS statement for a partition's HNSW index."""
+        from psycopg import sql
+
+        index_suffix, index_expr, opclass = self._index_spec(quantization)
+        return sql.SQL(
+            "CREATE INDEX IF NOT EXISTS {} ON {} "
+            "USING hnsw ({} {}) "
+            "WITH (m = 16, ef_construction = 64)"
+        ).format(
+            sql.Identifier(f"idx_{safe_source}_{index_suffix}"),
+            sql.Identifier(partition_name),
+            sql.SQL(index_expr),
+            sql.SQL(opclass),
+        )
+
+    def _tsv_index_sql(self, safe_source: str, partition_name: str) -> Any:
+        """CREATE INDEX IF NOT EXISTS statement for a partition's content_tsv index."""
+        from psycopg import sql
+
+        return sql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} USING GIN (content_tsv)").format(
+            sql.Identifier(f"idx_{safe_source}_content_tsv"),
+            sql.Identifier(partition_name),
+        )
+
+    def _ann_order_sql(self, placeholder: str) -> str:
+        """ORDER BY expression that matches the partition HNSW index.
+
+        Args:
+            placeholder: SQL placeholder for the query vector (e.g. ``%s``)
+        """
+        dims = self._dimensions
+        if self._quantization == "halfvec":
+            return f"embedding::halfvec({dims}) <=> {placeholder}::halfvec({dims})"
+        if self._quantization == "binary":
+            return (
+                f"binary_quantize(embedding)::bit({dims}) "
+                f"<~> binary_quantize({placeholder}::vector)::bit({dims})"
+            )
+        return f"embedding <=> {placeholder}::vector"
+
+    def _candidate_limit(self, limit: int) -> int:
+        """Number of ANN candidates to fetch before full-precision rerank."""
+        if self._quantization == "none":
+            return limit
+        return min(limit * self._rerank_factor, 1000)
+
+    def _search_settings(
+        self,
+        ann_limit: int,
+        preset: Optional[str],
+        ef_search: Optional[int],
+        iterative_scan: Optional[str],
+    ) -> tuple[int, str]:
+        """Resolve (hnsw.ef_search, hnsw.iterative_scan) for one query.
+
+        Explicit values override the preset. ef_search is raised to at
+        least ``ann_limit`` because a plain HNSW scan returns no more than
+        ef_search rows.
+        """
+        name = preset or self._search_preset
+        if name not in _SEARCH_PRESET_SETTINGS:
+            raise ValueError(f"preset must be one of {SEARCH_PRESETS}, got {name!r}")
+        preset_ef, preset_scan = _SEARCH_PRESET_SETTINGS[name]
+
+        ef = preset_ef if ef_search is None else ef_search
+        if not isinstance(ef, int) or not 1 <= ef <= _MAX_EF_SEARCH:
+            raise ValueError(f"ef_search must be between 1 and {_MAX_EF_SEARCH}, got {ef!r}")
+        scan = iterative_scan or preset_scan
+        if scan not in VALID_ITERATIVE_SCANS:
+            raise ValueError(
+                f"iterative_scan must be one of {VALID_ITERATIVE_SCANS}, got {scan!r}"
+            )
+        return min(max(ef, ann_limit), _MAX_EF_SEARCH), scan
+
+    def _apply_search_settings(self, cur: Any, ef_search: int, iterative_scan: str) -> None:
+        """SET LOCAL the HNSW scan settings for the current transaction.
+
+        Both values are validated by _search_settings() — safe for SQL
+        composition. iterative_scan is skipped on pgvector < 0.8, which
+        rejects the setting.
+        """
+        cur.execute(f"SET LOCAL hnsw.ef_search = {int(ef_search)}")
+        if self._supports_iterative_scan(cur):
+            cur.execute(f"SET LOCAL hnsw.iterative_scan = {iterative_scan}")
+
+    def _has_chunk_column(self, cur: Any, column: str) -> bool:
+        """Whether document_chunks has ``column``."""
+        return column in self._get_chunk_columns(cur)
+
+    def _get_chunk_columns(self, cur: Any = None) -> frozenset[str]:
+        """Column names of document_chunks (cached).
+
+        Opens its own connection when no cursor is given.
+        """
+        if self._chunk_columns is None and cur is None:
+            with self._get_pool().connection() as conn:
+                with conn.cursor() as own_cur:
+                    return self._get_chunk_columns(own_cur)
+        if self._chunk_columns is None:
+            self._chunk_columns = self._read_chunk_columns(cur)
+            missing = sorted(set(self._generated_columns()) - self._chunk_columns)
+            if missing:
+                self.logger.warning(
+                    f"document_chunks lacks generated column(s) {', '.join(missing)}: "
+                    "hybrid search and filters evaluate them unindexed. Run "
+                    "scripts/migrate_vector_index.py --add-columns to add them."
+                )
+        return self._chunk_columns
+
+    def _read_chunk_columns(self, cur: Any) -> frozenset[str]:
+        """Query the column names of document_chunks."""
+        cur.execute("""
+            SELECT a.attname
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE c.relname = 'document_chunks'
+              AND n.nspname = current_schema()
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+        """)
+        return frozenset(row[0] for row in cur.fetchall())
+
+    def _supports_iterative_scan(self, cur: Any) -> bool:
+        """Whether the installed pgvector has hnsw.iterative_scan (cached)."""
+        if self._has_iterative_scan is None:
+            cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cur.fetchone()
+            try:
+                major, minor = (int(part) for part in str(row[0]).split(".")[:2])
+                self._has_iterative_scan = (major, minor) >= (0, 8)
+            except (TypeError, ValueError, IndexError):
+                self._has_iterative_scan = False
+            if not self._has_iterative_scan:
+                self.logger.info(
+                    "pgvector < 0.8: iterative index scans unavailable, "
+                    "filtered searches may return fewer rows than requested"
+                )
+        return self._has_iterative_scan
+
+    @property
+    def metadata_columns(self) -> dict[str, str]:
+        """Metadata keys promoted to indexed columns, with their types."""
+        return dict(self._metadata_columns)
+
+    def _ensure_metadata_functions(self, cur: Any) -> None:
+        """Create the safe cast functions used by promoted metadata keys.
+
+        The meta_* columns themselves are added by migrate_columns(); until
+        then filters evaluate the same expressions inline.
+        """
+        for col_type in sorted(set(self._metadata_columns.values()) - {"text"}):
+            cur.execute(_SAFE_CAST_FUNCTIONS[col_type])
+
+    def _metadata_expr(self, key: str, col_type: str, prefix: str = "") -> str:
+        """SQL expression a promoted metadata column is generated from.
+
+        Keys and types are validated — safe for SQL composition.
+        """
+        value = f"({prefix}metadata->>'{key}')"
+        return value if col_type == "text" else f"document_chunks_meta_{col_type}{value}"
+
+    def _generated_columns(self) -> dict[str, str]:
+        """Definitions of the generated document_chunks columns, by name."""
+        columns = {
+            "content_tsv": (
+                f"tsvector GENERATED ALWAYS AS (to_tsvector('{_TS_CONFIG}', content)) STORED"
+            ),
+        }
+        for key, col_type in self._metadata_columns.items():
+            columns[f"meta_{key}"] = (
+                f"{col_type} GENERATED ALWAYS AS ({self._metadata_expr(key, col_type)}) STORED"
+            )
+        return columns
+
+    def _ensure_document_embeddings(self, cur: Any) -> None:
+        """Create the document_embeddings table used by two-stage search.
+
+        Holds one mean-pooled vector per document. The table is not
+        partitioned (it has one row per document, not per chunk) and gets
+        a plain cosine HNSW index when the dimensions allow one.
+        """
+        cur.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS document_embeddings (
+                source TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                embedding vector({self._dimensions}) NOT NULL,
+                chunk_count INTEGER NOT NULL,
+                metadata JSONB DEFAULT '{{}}'::jsonb,
+                updated_at TIMESTAMPTZ DEFAULT NOW(),
+                PRIMARY KEY (source, filename)
+            )
+            """
+        )  # type: ignore[arg-type]
+        if self._dimensions <= _MAX_VECTOR_INDEX_DIMS:
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_document_embeddings_hnsw
+                ON document_embeddings USING hnsw (embedding vector_cosine_ops)
+            """)
+
+    def _ensure_boilerplate(self, cur: Any) -> None:
+        """Create the shared boilerplate tables used by ingest-time dedup.
+
+        boilerplate_chunks stores each repeated chunk once per source;
+        document_boilerplate records where documents contained it.
+        document_chunks.boilerplate_hash is a plain column written with
+        every chunk from base.boilerplate_hash(), so it never depends on
+        the database's lower() or regex whitespace rules; with dedup
+        enabled it is indexed so documents sharing a chunk can be counted.
+        """
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS boilerplate_chunks (
+                id BIGSERIAL PRIMARY KEY,
+                source TEXT NOT NULL,
+                boilerplate_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at TIMESTAMPTZ DEFAULT NOW(),
+                UNIQUE (source, boilerplate_hash)
+            )
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS document_boilerplate (
+                source TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                chunk_index INTEGER NOT NULL,
+                boilerplate_id BIGINT NOT NULL
+                    REFERENCES boilerplate_chunks (id) ON DELETE CASCADE,
+                PRIMARY KEY (source, filename, chunk_index)
+            )
+        """)
+        # Nullable column without a default: a catalog-only change
+        cur.execute(
+            "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS boilerplate_hash TEXT"
+        )
+        if self._boilerplate_dedup:
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_document_chunks_boilerplate
+                ON document_chunks (source, boilerplate_hash)
+            """)
+
+    def _column_filter_sql(
+        self,
+        filters: dict[str, Any],
+        bind: Callable[[Any], str],
+        prefix: str = "",
+        resolve_columns: bool = True,
+    ) -> list[str]:
+        """Compile column filters into SQL conditions.
+
+        Each filter is ``key: value`` (equality) or ``key: {op: value}``
+        with op one of eq, gt, gte, lt, lte, in, or — for date columns —
+        within_months (value within the last N months).
+
+        Args:
+            filters: Filters keyed by promoted metadata key
+            bind: Registers a parameter value and returns its placeholder
+            prefix: Table alias prefix for column references (e.g. ``c.``)
+            resolve_columns: Look up which meta_* columns exist; keys whose
+                column has not been migrated yet filter on the expression
+                it would be generated from
+
+        Returns:
+            List of SQL conditions
+
+        Raises:
+            ValueError: On an unknown key, operator or malformed value
+        """
+        columns = self._get_chunk_columns() if resolve_columns else None
+        conditions = []
+        for key, spec in filters.items():
+            col_type = self._metadata_columns.get(key)
+            if col_type is None:
+                raise ValueError(
+                    f"Cannot filter on {key!r}; filterable keys: "
+                    f"{', '.join(sorted(self._metadata_columns)) or 'none'}"
+                )
+            column = f"{prefix}meta_{key}"
+            if columns is not None and f"meta_{key}" not in columns:
+                column = self._metadata_expr(key, col_type, prefix)
+            ops = spec if isinstance(spec, dict) else {"eq": spec}
+            if not ops:
+                raise ValueError(f"Empty filter for {key!r}")
+            for op, value in ops.items():
+                if op in _FILTER_OPERATORS:
+                    placeholder = bind(coerce_filter_value(key, col_type, value))
+                    conditions.append(
+                        f"{column} {_FILTER_OPERATORS[op]} {placeholder}::{col_type}"
+                    )
+                elif op == "in":
+                    if not isinstance(value, list) or not value:
+                        raise ValueError(f"'in' filter for {key!r} needs a non-empty list")
+                    placeholder = bind([coerce_filter_value(key, col_type, v) for v in value])
+                    conditions.append(f"{column} = ANY({placeholder}::{col_type}[])")
+                elif op == "within_months" and col_type == "date":
+                    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                        raise ValueError(
+                            f"within_months for {key!r} must be a positive integer"
+                        )
+                    conditions.append(
+                        f"{column} >= current_date - make_interval(months => {bind(value)}::int)"
+                    )
+                else:
+                    raise ValueError(f"Unsupported filter operator {op!r} for {key!r}")
+        return conditions
+
+    def validate_filters(self, filters: Optional[dict[str, Any]]) -> None:
+        """Raise ValueError if ``filters`` cannot be applied by search()."""
+        if filters:
+            self._column_filter_sql(filters, lambda value: "%s", resolve_columns=False)
+
     def _ensure_partition(self, source: str, conn: Any) -> None:
-        """Create a partition and HNSW index for a source if not yet known.
+        """Create a partition with HNSW and full-text indexes if not yet known.
+
+        While bulk_load() is active the HNSW index is dropped (or, for a
+        new partition, never created) and built once when the load ends.
 
         Thread-safe — uses _partition_lock to prevent duplicate creation.
         """
@@ -263,7 +779,7 @@ class PgVectorVectorStore(VectorStoreBackend):
 
             safe_source = source.replace("-", "_")
             partition_name = f"document_chunks_{safe_source}"
-            index_name = f"idx_{safe_source}_embedding_hnsw"
+            index_name = f"idx_{safe_source}_{self._index_spec()[0]}"
 
             with conn.cursor() as cur:
                 # Check if partition already exists
@@ -271,7 +787,8 @@ class PgVectorVectorStore(VectorStoreBackend):
                     "SELECT 1 FROM pg_tables WHERE tablename = %s AND schemaname = current_schema()",
                     (partition_name,),
                 )
-                if not cur.fetchone():
+                created = not cur.fetchone()
+                if created:
                     cur.execute(
                         sql.SQL(
                             "CREATE TABLE {} PARTITION OF document_chunks "
@@ -283,21 +800,188 @@ class PgVectorVectorStore(VectorStoreBackend):
                     )
                     self.logger.info(f"Created partition for source '{source}'")
 
-                # Always ensure index exists (handles partial creation scenario)
-                cur.execute(
-                    sql.SQL(
-                        "CREATE INDEX IF NOT EXISTS {} ON {} "
-                        "USING hnsw (embedding vector_cosine_ops) "
-                        "WITH (m = 16, ef_construction = 64)"
-                    ).format(
-                        sql.Identifier(index_name),
-                        sql.Identifier(partition_name),
-                    )
+                defer = self._deferred_index_sources is not None and (
+                    created or self._bulk_drop_existing
                 )
+                if defer:
+                    cur.execute(
+                        sql.SQL("DROP INDEX IF EXISTS {}").format(sql.Identifier(index_name))
+                    )
+                    self._deferred_index_sources.add(source)
+                    self.logger.info(f"Deferred HNSW index build for source '{source}'")
+                else:
+                    # Always ensure index exists (handles partial creation scenario)
+                    cur.execute(self._hnsw_index_sql(safe_source, partition_name))
+                if self._has_chunk_column(cur, "content_tsv"):
+                    cur.execute(self._tsv_index_sql(safe_source, partition_name))
                 conn.commit()
 
             self._known_partitions.add(source)
 
+    @contextmanager
+    def bulk_load(
+        self,
+        maintenance_work_mem: str = _BULK_MAINTENANCE_WORK_MEM,
+        parallel_workers: Optional[int] = None,
+        drop_existing: bool = True,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> Iterator[None]:
+        """Defer HNSW index maintenance for the duration of a bulk load.
+
+        Inside the block, every partition written to has its HNSW index
+        dropped (new partitions are created without one), so COPY only
+        pays for heap and GIN inserts. On exit — including on error — the
+        index is built once per touched partition by build_hnsw_index().
+        Searches against those partitions fall back to sequential scans
+        until the build finishes.
+
+        Affects all writers sharing this store instance, so use a
+        dedicated instance (as backfill_vectors.py does).
+
+        Args:
+            maintenance_work_mem: Memory for each index build
+            parallel_workers: max_parallel_maintenance_workers for the
+                build (None keeps the server setting)
+            drop_existing: Also drop and rebuild indexes of partitions
+                that already exist. When False only new partitions defer
+                their build; existing ones keep incremental maintenance.
+            progress: Callback for progress messages (default: log info)
+
+        Raises:
+            RuntimeError: If a bulk load is already active, or if any
+                index build fails (the next normal write to that source
+                recreates the index)
+        """
+        with self._partition_lock:
+            if self._deferred_index_sources is not None:
+                raise RuntimeError("bulk_load() is already active on this store")
+            self._deferred_index_sources = set()
+            self._bulk_drop_existing = drop_existing
+            # Revisit every partition so existing ones get their index dropped
+            self._known_partitions.clear()
+
+        try:
+            yield
+        finally:
+            with self._partition_lock:
+                sources = sorted(self._deferred_index_sources or ())
+                self._deferred_index_sources = None
+                self._known_partitions.clear()
+
+            failed = []
+            for source in sources:
+                try:
+                    self.build_hnsw_index(
+                        source,
+                        maintenance_work_mem=maintenance_work_mem,
+                        parallel_workers=parallel_workers,
+                        progress=progress,
+                    )
+                except Exception as e:
+                    self.logger.error(f"HNSW index build failed for source '{source}': {e}")
+                    failed.append(source)
+            if failed:
+                raise RuntimeError(f"HNSW index build failed for: {', '.join(failed)}")
+
+    def build_hnsw_index(
+        self,
+        source: str,
+        maintenance_work_mem: str = _BULK_MAINTENANCE_WORK_MEM,
+        parallel_workers: Optional[int] = None,
+        progress: Optional[Callable[[str], None]] = None,
+    ) -> float:
+        """Build a partition's HNSW index in one pass.
+
+        Settings are applied with set_config(..., is_local => true) so they
+        end with the build transaction and never leak to pooled
+        connections. Progress is polled from pg_stat_progress_create_index
+        on a second connection.
+
+        Args:
+            source: Source/partition name
+            maintenance_work_mem: Memory for the build (e.g. "1GB")
+            parallel_workers: max_parallel_maintenance_workers (None = server default)
+            progress: Callback for progress messages (default: log info)
+
+        Returns:
+            Build duration in seconds
+        """
+        if not _SOURCE_NAME_RE.match(source):
+            raise ValueError(f"Invalid source name: {source!r}")
+        if parallel_workers is not None and (
+            not isinstance(parallel_workers, int) or parallel_workers < 0
+        ):
+            raise ValueError(
+                f"parallel_workers must be a non-negative integer, got {parallel_workers!r}"
+            )
+
+        report = progress or self.logger.info
+        safe_source = source.replace("-", "_")
+        partition_name = f"document_chunks_{safe_source}"
+
+        pool = self._get_pool()
+        start = time.perf_counter()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_backend_pid()")
+                pid = cur.fetchone()[0]
+                cur.execute(
+                    "SELECT set_config('maintenance_work_mem', %s, true)",
+                    (maintenance_work_mem,),
+                )
+                if parallel_workers is not None:
+                    cur.execute(
+                        "SELECT set_config('max_parallel_maintenance_workers', %s, true)",
+                        (str(parallel_workers),),
+                    )
+
+                report(f"Building HNSW index on {partition_name}...")
+                stop = threading.Event()
+                watcher = threading.Thread(
+                    target=self._watch_index_build,
+                    args=(pid, partition_name, report, stop),
+                    daemon=True,
+                )
+                watcher.start()
+                try:
+                    cur.execute(self._hnsw_index_sql(safe_source, partition_name))
+                finally:
+                    stop.set()
+                    watcher.join()
+            conn.commit()
+
+        elapsed = time.perf_counter() - start
+        report(f"Built HNSW index on {partition_name} in {elapsed:.1f}s")
+        return elapsed
+
+    def _watch_index_build(
+        self,
+        pid: int,
+        partition_name: str,
+        report: Callable[[str], None],
+        stop: threading.Event,
+        interval: float = _INDEX_PROGRESS_INTERVAL,
+    ) -> None:
+        """Report CREATE INDEX progress for backend ``pid`` until stopped."""
+        pool = self._get_pool()
+        while not stop.wait(interval):
+            try:
+                with pool.connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            "SELECT phase, tuples_done, tuples_total "
+                            "FROM pg_stat_progress_create_index WHERE pid = %s",
+                            (pid,),
+                        )
+                        row = cur.fetchone()
+            except Exception as e:
+                self.logger.debug(f"Index progress query failed: {e}")
+                return
+            if row:
+                phase, done, total = row
+                percent = f" ({done / total:.0%})" if total else ""
+                report(f"  {partition_name}: {phase}, {done}/{total} tuples{percent}")
+
     def store_chunks(
         self,
         source: str,
@@ -319,6 +1003,41 @@ class PgVectorVectorStore(VectorStoreBackend):
         if not chunks:
             return 0
 
+        count = self.store_documents([{
+            "source": source,
+            "filename": filename,
+            "chunks": chunks,
+            "document_id": document_id,
+        }])
+        self.logger.debug(f"Stored {count} chunks for {source}/{filename}")
+        return count
+
+    def store_documents(self, documents: list[dict[str, Any]]) -> int:
+        """Store chunks for many documents in a single transaction.
+
+        Each document is replaced (delete-then-insert) inside one savepoint,
+        and all rows are written with a single binary ``COPY`` so embeddings
+        and metadata skip text serialisation on the server side.
+
+        Args:
+            documents: List of dicts with keys: source, filename, chunks,
+                and optionally document_id (same meaning as store_chunks)
+
+        Returns:
+            Total number of chunks stored
+        """
+        documents = [d for d in documents if d.get("chunks")]
+        if not documents:
+            return 0
+
+        # Validate before touching the database so a bad chunk never
+        # leaves a half-written batch behind.
+        rows: list[tuple] = []
+        for doc in documents:
+            rows.extend(self._prepare_rows(
+                doc["source"], doc["filename"], doc["chunks"], doc.get("document_id"),
+            ))
+
         from pgvector.psycopg import register_vector
 
         self.ensure_ready()
@@ -326,46 +1045,25 @@ class PgVectorVectorStore(VectorStoreBackend):
 
         with pool.connection() as conn:
             register_vector(conn)
-            self._ensure_partition(source, conn)
+            for source in dict.fromkeys(d["source"] for d in documents):
+                self._ensure_partition(source, conn)
 
             with conn.cursor() as cur:
-                # Use savepoint for atomicity — if INSERT fails, DELETE is rolled back
+                # Use savepoint for atomicity — if COPY fails, DELETEs are rolled back
                 cur.execute("SAVEPOINT store_chunks_sp")
                 try:
-                    # Delete existing chunks for this document
-                    cur.execute(
-                        "DELETE FROM document_chunks WHERE source = %s AND filename = %s",
-                        (source, filename),
-                    )
-
-                    # Validate and prepare batch insert values
-                    values = []
-                    for i, chunk in enumerate(chunks):
-                        missing = [f for f in ("content", "embedding") if f not in chunk]
-                        if missing:
-                            raise ValueError(
-                                f"Chunk {i} missing required field(s): {', '.join(missing)}"
-                            )
-                        meta = dict(chunk.get("metadata", {}))
-                        if document_id:
-                            meta["document_id"] = document_id
-                        values.append((
-                            source,
-                            filename,
-                            chunk.get("chunk_index", i),
-                            chunk["content"],
-                            chunk["embedding"],
-                            json.dumps(meta),
-                        ))
-
-                    cur.executemany(
-                        """
-                        INSERT INTO document_chunks
-                            (source, filename, chunk_index, content, embedding, metadata)
-                        VALUES (%s, %s, %s, %s, %s::vector, %s::jsonb)
-                        """,
-                        values,
-                    )
+                    deltas: dict[str, list[int]] = {}
+                    for doc in documents:
+                        cur.execute(
+                            "DELETE FROM document_chunks WHERE source = %s AND filename = %s",
+                            (doc["source"], doc["filename"]),
+                        )
+                        delta = deltas.setdefault(doc["source"], [0, 0])
+                        delta[0] += len(doc["chunks"]) - cur.rowcount
+                        delta[1] += 0 if cur.rowcount else 1
+                    self._copy_rows(cur, rows)
+                    for source, (chunk_delta, doc_delta) in deltas.items():
+                        self._bump_stats(cur, source, chunk_delta, doc_delta)
                     cur.execute("RELEASE SAVEPOINT store_chunks_sp")
                 except Exception:
                     cur.execute("ROLLBACK TO SAVEPOINT store_chunks_sp")
@@ -373,77 +1071,363 @@ class PgVectorVectorStore(VectorStoreBackend):
 
             conn.commit()
 
-        self.logger.debug(f"Stored {len(chunks)} chunks for {source}/{filename}")
-        return len(chunks)
-
-    def delete_document(self, source: str, filename: str) -> int:
-        """Delete all chunks for a document.
+        self._invalidate_search_cache(d["source"] for d in documents)
+        if len(documents) > 1:
+            self.logger.debug(
+                f"Stored {len(rows)} chunks for {len(documents)} documents"
+            )
+        return len(rows)
 
-        Args:
-            source: Source/partition name
-            filename: Document filename
+    def get_chunk_hashes(self, source: str, filename: str) -> dict[int, Optional[str]]:
+        """Get stored content hashes for a document, keyed by chunk_index.
 
-        Returns:
-            Number of chunks deleted
+        Rows written before content hashing was added map to None, as do
+        duplicated chunk indexes, so they are always rewritten.
         """
         pool = self._get_pool()
         with pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
-                    "DELETE FROM document_chunks WHERE source = %s AND filename = %s",
+                    """
+                    SELECT chunk_index, content_hash
+                    FROM document_chunks
+                    WHERE source = %s AND filename = %s
+                    """,
                     (source, filename),
                 )
-                deleted = cur.rowcount
-            conn.commit()
-        self.logger.debug(f"Deleted {deleted} chunks for {source}/{filename}")
-        return deleted
+                rows = cur.fetchall()
 
-    def delete_by_source(self, source: str) -> int:
-        """Delete all chunks for a source partition.
+        hashes: dict[int, Optional[str]] = {}
+        for chunk_index, digest in rows:
+            hashes[chunk_index] = None if chunk_index in hashes else digest
+        return hashes
 
-        Args:
-            source: Source/partition name (e.g., scraper name)
+    def sync_chunks(
+        self,
+        source: str,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Incrementally update a stored document to match ``chunks``.
+
+        Only chunks carrying an ``embedding`` are written. Kept chunks
+        (no embedding) stay in place — their metadata is refreshed only if
+        it differs — and every other stored row for the document is deleted.
+        All of this happens inside one savepoint.
 
         Returns:
-            Number of chunks deleted
+            Number of chunks written
         """
+        written = [c for c in chunks if "embedding" in c]
+        kept = [c for c in chunks if "embedding" not in c]
+        rows = self._prepare_rows(source, filename, written, document_id)
+        kept_indexes = [c["chunk_index"] for c in kept]
+
+        from pgvector.psycopg import register_vector
+
+        self.ensure_ready()
         pool = self._get_pool()
+
         with pool.connection() as conn:
+            register_vector(conn)
+            self._ensure_partition(source, conn)
+
             with conn.cursor() as cur:
-                cur.execute(
-                    "DELETE FROM document_chunks WHERE source = %s",  # noqa: S608
-                    (source,),
-                )
-                deleted = cur.rowcount
+                cur.execute("SAVEPOINT store_chunks_sp")
+                try:
+                    # Orphans and chunks about to be rewritten
+                    cur.execute(
+                        """
+                        DELETE FROM document_chunks
+                        WHERE source = %s AND filename = %s
+                          AND NOT (chunk_index = ANY(%s))
+                        """,
+                        (source, filename, kept_indexes),
+                    )
+                    deleted = cur.rowcount
+
+                    if kept:
+                        updates = []
+                        for c in kept:
+                            meta = dict(c.get("metadata", {}))
+                            if document_id:
+                                meta["document_id"] = document_id
+                            meta_json = json.dumps(meta)
+                            updates.append(
+                                (meta_json, source, filename, c["chunk_index"], meta_json)
+                            )
+                        cur.executemany(
+                            """
+                            UPDATE document_chunks SET metadata = %s::jsonb
+                            WHERE source = %s AND filename = %s AND chunk_index = %s
+                              AND metadata IS DISTINCT FROM %s::jsonb
+                            """,
+                            updates,
+                        )
+
+                    if rows:
+                        self._copy_rows(cur, rows)
+                    existed = bool(deleted or kept)
+                    exists = bool(rows or kept)
+                    self._bump_stats(
+                        cur, source, len(rows) - deleted, int(exists) - int(existed),
+                    )
+                    cur.execute("RELEASE SAVEPOINT store_chunks_sp")
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT store_chunks_sp")
+                    raise
+
             conn.commit()
-        self.logger.info(f"Deleted {deleted} chunks for source '{source}'")
-        return deleted
 
-    def search(
+        self._invalidate_search_cache([source])
+        self.logger.debug(
+            f"Synced {source}/{filename}: {len(rows)} written, "
+            f"{len(kept)} unchanged, {deleted} stale rows removed"
+        )
+        return len(rows)
+
+    def store_chunk_stream(
         self,
-        query_embedding: list[float],
-        sources: Optional[list[str]] = None,
-        metadata_filter: Optional[dict[str, Any]] = None,
-        limit: int = 10,
-    ) -> list[dict[str, Any]]:
-        """Search for similar chunks using cosine similarity.
+        source: str,
+        filename: str,
+        batches: Iterable[list[dict[str, Any]]],
+        document_id: Optional[str] = None,
+    ) -> int:
+        """Replace a document with one ``COPY`` fed batch by batch.
 
-        Args:
-            query_embedding: Query vector
-            sources: Optional list of source names to filter by
-            metadata_filter: Optional JSONB containment filter
-            limit: Maximum results to return
+        The old rows are deleted and every batch is written to the same
+        binary ``COPY`` as soon as it arrives, inside one savepoint, so
+        only the current batch is held in memory and a failure while
+        producing batches rolls the whole document back.
 
         Returns:
-            List of result dicts with: source, filename, chunk_index,
-            content, metadata, score
+            Number of chunks stored
         """
-        if limit < 1 or limit > 1000:
-            raise ValueError(f"limit must be between 1 and 1000, got {limit}")
+        from pgvector.psycopg import register_vector
 
+        self.ensure_ready()
         pool = self._get_pool()
-        conditions = []
-        params: list[Any] = [query_embedding]
+        written = 0
+
+        def rows() -> Iterator[tuple]:
+            nonlocal written
+            for batch in batches:
+                for row in self._prepare_rows(
+                    source, filename, batch, document_id, start=written,
+                ):
+                    written += 1
+                    yield row
+
+        with pool.connection() as conn:
+            register_vector(conn)
+            self._ensure_partition(source, conn)
+
+            with conn.cursor() as cur:
+                cur.execute("SAVEPOINT store_chunks_sp")
+                try:
+                    cur.execute(
+                        "DELETE FROM document_chunks WHERE source = %s AND filename = %s",
+                        (source, filename),
+                    )
+                    deleted = cur.rowcount
+                    self._copy_rows(cur, rows())
+                    self._bump_stats(
+                        cur, source, written - deleted, int(bool(written)) - int(bool(deleted)),
+                    )
+                    cur.execute("RELEASE SAVEPOINT store_chunks_sp")
+                except Exception:
+                    cur.execute("ROLLBACK TO SAVEPOINT store_chunks_sp")
+                    raise
+
+            conn.commit()
+
+        self._invalidate_search_cache([source])
+        self.logger.debug(f"Streamed {written} chunks for {source}/{filename}")
+        return written
+
+    @staticmethod
+    def _prepare_rows(
+        source: str,
+        filename: str,
+        chunks: list[dict[str, Any]],
+        document_id: Optional[str],
+        start: int = 0,
+    ) -> list[tuple]:
+        """Validate chunks and build COPY rows in ``_COPY_COLUMNS`` order.
+
+        ``start`` is the position of the first chunk in the document, used
+        for the default chunk_index and error messages.
+        """
+        rows = []
+        for i, chunk in enumerate(chunks, start):
+            missing = [f for f in ("content", "embedding") if f not in chunk]
+            if missing:
+                raise ValueError(
+                    f"Chunk {i} missing required field(s): {', '.join(missing)}"
+                )
+            meta = dict(chunk.get("metadata", {}))
+            if document_id:
+                meta["document_id"] = document_id
+            rows.append((
+                source,
+                filename,
+                chunk.get("chunk_index", i),
+                chunk["content"],
+                chunk.get("content_hash") or chunk_content_hash(chunk["content"]),
+                boilerplate_hash(chunk["content"]),
+                chunk["embedding"],
+                meta,
+            ))
+        return rows
+
+    @staticmethod
+    def _copy_rows(cur: Any, rows: Iterable[tuple]) -> None:
+        """Write rows with ``COPY ... FROM STDIN (FORMAT BINARY)``.
+
+        Requires ``register_vector`` on the connection so the ``vector``
+        binary dumper is available to ``set_types``.
+        """
+        columns = ", ".join(_COPY_COLUMNS)
+        with cur.copy(
+            f"COPY document_chunks ({columns}) FROM STDIN (FORMAT BINARY)"
+        ) as copy:
+            copy.set_types(list(_COPY_TYPES))
+            for row in rows:
+                copy.write_row(row)
+
+    @staticmethod
+    def _bump_stats(cur: Any, source: str, chunk_delta: int, doc_delta: int) -> None:
+        """Apply count deltas to document_chunk_stats in the caller's transaction."""
+        if not chunk_delta and not doc_delta:
+            return
+        cur.execute(
+            """
+            INSERT INTO document_chunk_stats AS s (source, chunk_count, document_count)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (source) DO UPDATE SET
+                chunk_count = s.chunk_count + EXCLUDED.chunk_count,
+                document_count = s.document_count + EXCLUDED.document_count,
+                updated_at = NOW()
+            """,
+            (source, chunk_delta, doc_delta),
+        )
+
+    def _invalidate_search_cache(self, sources: Any) -> None:
+        """Bump search-cache generations for sources whose chunks changed."""
+        from app.services.search_cache import invalidate_sources
+
+        invalidate_sources(sources)
+
+    def delete_document(self, source: str, filename: str) -> int:
+        """Delete all chunks for a document.
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+
+        Returns:
+            Number of chunks deleted
+        """
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM document_chunks WHERE source = %s AND filename = %s",
+                    (source, filename),
+                )
+                deleted = cur.rowcount
+                cur.execute(
+                    "DELETE FROM document_embeddings WHERE source = %s AND filename = %s",
+                    (source, filename),
+                )
+                cur.execute(
+                    "DELETE FROM document_boilerplate WHERE source = %s AND filename = %s",
+                    (source, filename),
+                )
+                self._bump_stats(cur, source, -deleted, -1 if deleted else 0)
+            conn.commit()
+        if deleted:
+            self._invalidate_search_cache([source])
+        self.logger.debug(f"Deleted {deleted} chunks for {source}/{filename}")
+        return deleted
+
+    def delete_by_source(self, source: str) -> int:
+        """Delete all chunks for a source partition.
+
+        Args:
+            source: Source/partition name (e.g., scraper name)
+
+        Returns:
+            Number of chunks deleted
+        """
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM document_chunks WHERE source = %s",  # noqa: S608
+                    (source,),
+                )
+                deleted = cur.rowcount
+                cur.execute(
+                    "DELETE FROM document_chunk_stats WHERE source = %s", (source,)
+                )
+                cur.execute(
+                    "DELETE FROM document_embeddings WHERE source = %s", (source,)
+                )
+                # References go with their boilerplate rows (ON DELETE CASCADE)
+                cur.execute(
+                    "DELETE FROM boilerplate_chunks WHERE source = %s", (source,)
+                )
+            conn.commit()
+        self._invalidate_search_cache([source])
+        self.logger.info(f"Deleted {deleted} chunks for source '{source}'")
+        return deleted
+
+    def search(
+        self,
+        query_embedding: list[float],
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        preset: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search for similar chunks using cosine similarity.
+
+        HNSW settings are applied with SET LOCAL, so they only affect this
+        query's transaction.
+
+        Args:
+            query_embedding: Query vector
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional JSONB containment filter
+            limit: Maximum results to return
+            preset: Recall/latency preset (default: the store's search_preset)
+            ef_search: Override hnsw.ef_search for this query
+            iterative_scan: Override hnsw.iterative_scan for this query
+            filters: Range/equality filters on promoted metadata columns
+                (see _column_filter_sql)
+            include_embeddings: Also return each chunk's full-precision
+                vector under "embedding" (read from the same rows, so no
+                extra round trip)
+
+        Returns:
+            List of result dicts with: source, filename, chunk_index,
+            content, metadata, score
+        """
+        if limit < 1 or limit > 1000:
+            raise ValueError(f"limit must be between 1 and 1000, got {limit}")
+        ef, scan = self._search_settings(
+            self._candidate_limit(limit), preset, ef_search, iterative_scan
+        )
+
+        pool = self._get_pool()
+        conditions = []
+        params: list[Any] = [query_embedding]
 
         if sources:
             conditions.append("source = ANY(%s)")
@@ -453,27 +1437,207 @@ class PgVectorVectorStore(VectorStoreBackend):
             conditions.append("metadata @> %s::jsonb")
             params.append(json.dumps(metadata_filter))
 
+        if filters:
+            def bind(value: Any) -> str:
+                params.append(value)
+                return "%s"
+
+            conditions.extend(self._column_filter_sql(filters, bind))
+
         where_clause = ""
         if conditions:
             where_clause = "WHERE " + " AND ".join(conditions)
+        embedding_column = ", embedding" if include_embeddings else ""
+
+        if self._quantization == "none":
+            # Append second query_embedding (for ORDER BY) then limit
+            params.append(query_embedding)
+            params.append(limit)
+            query = f"""
+                SELECT source, filename, chunk_index, content, metadata,
+                       1 - (embedding <=> %s::vector) AS score{embedding_column}
+                FROM document_chunks
+                {where_clause}
+                ORDER BY embedding <=> %s::vector
+                LIMIT %s
+            """
+        else:
+            # Over-fetch from the quantized index, then rerank the candidates
+            # by full-precision distance. Score uses the first embedding param.
+            params.append(query_embedding)
+            params.append(self._candidate_limit(limit))
+            params.append(limit)
+            query = f"""
+                SELECT source, filename, chunk_index, content, metadata,
+                       1 - (embedding <=> %s::vector) AS score{embedding_column}
+                FROM (
+                    SELECT source, filename, chunk_index, content, metadata, embedding
+                    FROM document_chunks
+                    {where_clause}
+                    ORDER BY {self._ann_order_sql("%s")}
+                    LIMIT %s
+                ) candidates
+                ORDER BY score DESC
+                LIMIT %s
+            """
+
+        from pgvector.psycopg import register_vector
+
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                self._apply_search_settings(cur, ef, scan)
+                cur.execute(query, params)  # type: ignore[arg-type]
+                rows = cur.fetchall()
+
+        results = []
+        for row in rows:
+            result = {
+                "source": row[0],
+                "filename": row[1],
+                "chunk_index": row[2],
+                "content": row[3],
+                "metadata": row[4] if isinstance(row[4], dict) else json.loads(row[4] or "{}"),
+                "score": float(row[5]),
+            }
+            if include_embeddings:
+                result["embedding"] = [float(x) for x in row[6]]
+            results.append(result)
+
+        if scan == "relaxed_order":
+            # Relaxed iterative scans may return rows slightly out of order
+            results.sort(key=lambda r: r["score"], reverse=True)
+        return results
+
+    def search_hybrid(
+        self,
+        query_embedding: list[float],
+        query_text: str,
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        preset: Optional[str] = None,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search with vector + full-text ranking fused by reciprocal rank fusion.
+
+        Runs the ANN query and a ``websearch_to_tsquery`` match against the
+        ``content_tsv`` GIN index as two CTEs of a single statement, each
+        capped at a small candidate pool, and fuses the two rankings with
+        RRF inside PostgreSQL. Tables that predate content_tsv and have not
+        been migrated (see migrate_columns()) match against an unindexed
+        ``to_tsvector(content)`` instead.
+
+        Args:
+            query_embedding: Query vector
+            query_text: Raw query text for the lexical leg
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional JSONB containment filter
+            limit: Maximum results to return
+            preset: Recall/latency preset (default: the store's search_preset)
+            ef_search: Override hnsw.ef_search for this query
+            iterative_scan: Override hnsw.iterative_scan for this query
+            filters: Range/equality filters on promoted metadata columns
+            include_embeddings: Also return each chunk's vector under
+                "embedding"
+
+        Returns:
+            List of result dicts with: source, filename, chunk_index,
+            content, metadata, score (RRF), semantic_rank, lexical_rank
+        """
+        if limit < 1 or limit > 1000:
+            raise ValueError(f"limit must be between 1 and 1000, got {limit}")
 
-        # Append second query_embedding (for ORDER BY) then limit
-        params.append(query_embedding)
-        params.append(limit)
+        conditions = []
+        params: dict[str, Any] = {
+            "embedding": query_embedding,
+            "query_text": query_text,
+            "candidates": min(max(limit * 4, 40), 1000),
+            "rrf_k": _RRF_K,
+            "limit": limit,
+        }
+        if sources:
+            conditions.append("source = ANY(%(sources)s)")
+            params["sources"] = sources
+        if metadata_filter:
+            conditions.append("metadata @> %(metadata_filter)s::jsonb")
+            params["metadata_filter"] = json.dumps(metadata_filter)
+        if filters:
+            def bind(value: Any) -> str:
+                name = f"filter_{len(params)}"
+                params[name] = value
+                return f"%({name})s"
+
+            conditions.extend(self._column_filter_sql(filters, bind))
+
+        filter_sql = " AND ".join(conditions) if conditions else "TRUE"
+        embedding_column = ", d.embedding" if include_embeddings else ""
+        # Quantized indexes over-fetch; the semantic rank below is computed
+        # from full-precision distance, which reranks the candidates
+        params["ann_candidates"] = self._candidate_limit(params["candidates"])
+        ef, scan = self._search_settings(
+            params["ann_candidates"], preset, ef_search, iterative_scan
+        )
 
         from pgvector.psycopg import register_vector
 
+        pool = self._get_pool()
         with pool.connection() as conn:
             register_vector(conn)
             with conn.cursor() as cur:
+                self._apply_search_settings(cur, ef, scan)
+                tsv = (
+                    "content_tsv"
+                    if self._has_chunk_column(cur, "content_tsv")
+                    else f"to_tsvector('{_TS_CONFIG}', content)"
+                )
                 cur.execute(
                     f"""
-                    SELECT source, filename, chunk_index, content, metadata,
-                           1 - (embedding <=> %s::vector) AS score
-                    FROM document_chunks
-                    {where_clause}
-                    ORDER BY embedding <=> %s::vector
-                    LIMIT %s
+                    WITH semantic AS (
+                        SELECT source, id,
+                               ROW_NUMBER() OVER (ORDER BY distance) AS rank
+                        FROM (
+                            SELECT source, id, embedding <=> %(embedding)s::vector AS distance
+                            FROM document_chunks
+                            WHERE {filter_sql}
+                            ORDER BY {self._ann_order_sql("%(embedding)s")}
+                            LIMIT %(ann_candidates)s
+                        ) ann
+                        ORDER BY distance
+                        LIMIT %(candidates)s
+                    ),
+                    lexical AS (
+                        SELECT source, id,
+                               ROW_NUMBER() OVER (ORDER BY lex_score DESC) AS rank
+                        FROM (
+                            SELECT source, id, ts_rank_cd({tsv}, q) AS lex_score
+                            FROM document_chunks,
+                                 websearch_to_tsquery('{_TS_CONFIG}', %(query_text)s) q
+                            WHERE {tsv} @@ q AND {filter_sql}
+                            ORDER BY lex_score DESC
+                            LIMIT %(candidates)s
+                        ) fts
+                    ),
+                    fused AS (
+                        SELECT COALESCE(s.source, l.source) AS source,
+                               COALESCE(s.id, l.id) AS id,
+                               s.rank AS semantic_rank,
+                               l.rank AS lexical_rank,
+                               COALESCE(1.0 / (%(rrf_k)s + s.rank), 0)
+                                 + COALESCE(1.0 / (%(rrf_k)s + l.rank), 0) AS score
+                        FROM semantic s
+                        FULL OUTER JOIN lexical l ON s.source = l.source AND s.id = l.id
+                        ORDER BY score DESC
+                        LIMIT %(limit)s
+                    )
+                    SELECT d.source, d.filename, d.chunk_index, d.content, d.metadata,
+                           f.score, f.semantic_rank, f.lexical_rank{embedding_column}
+                    FROM fused f
+                    JOIN document_chunks d ON d.source = f.source AND d.id = f.id
+                    ORDER BY f.score DESC
                     """,
                     params,
                 )
@@ -481,20 +1645,595 @@ class PgVectorVectorStore(VectorStoreBackend):
 
         results = []
         for row in rows:
-            results.append({
+            result = {
                 "source": row[0],
                 "filename": row[1],
                 "chunk_index": row[2],
                 "content": row[3],
                 "metadata": row[4] if isinstance(row[4], dict) else json.loads(row[4] or "{}"),
                 "score": float(row[5]),
+                "semantic_rank": row[6],
+                "lexical_rank": row[7],
+            }
+            if include_embeddings:
+                result["embedding"] = [float(x) for x in row[8]]
+            results.append(result)
+        return results
+
+    def store_document_embeddings(self, documents: list[dict[str, Any]]) -> int:
+        """Upsert document-level embeddings for two-stage search.
+
+        Args:
+            documents: List of dicts with keys: source, filename, embedding,
+                chunk_count, and optionally metadata
+
+        Returns:
+            Number of document embeddings stored
+        """
+        if not documents:
+            return 0
+        rows = []
+        for doc in documents:
+            if len(doc["embedding"]) != self._dimensions:
+                raise ValueError(
+                    f"Document embedding for {doc['source']}/{doc['filename']} has "
+                    f"{len(doc['embedding'])} dimensions, expected {self._dimensions}"
+                )
+            rows.append((
+                doc["source"],
+                doc["filename"],
+                doc["embedding"],
+                doc["chunk_count"],
+                json.dumps(doc.get("metadata") or {}),
+            ))
+
+        from pgvector.psycopg import register_vector
+
+        self.ensure_ready()
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                cur.executemany(
+                    """
+                    INSERT INTO document_embeddings
+                        (source, filename, embedding, chunk_count, metadata)
+                    VALUES (%s, %s, %s::vector, %s, %s::jsonb)
+                    ON CONFLICT (source, filename) DO UPDATE SET
+                        embedding = EXCLUDED.embedding,
+                        chunk_count = EXCLUDED.chunk_count,
+                        metadata = EXCLUDED.metadata,
+                        updated_at = NOW()
+                    """,
+                    rows,
+                )
+            conn.commit()
+        return len(rows)
+
+    def get_chunk_embeddings(self, source: str, filename: str) -> dict[int, list[float]]:
+        """Get stored chunk embeddings for a document, keyed by chunk_index."""
+        from pgvector.psycopg import register_vector
+
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT chunk_index, embedding
+                    FROM document_chunks
+                    WHERE source = %s AND filename = %s
+                    """,
+                    (source, filename),
+                )
+                rows = cur.fetchall()
+        return {row[0]: [float(x) for x in row[1]] for row in rows}
+
+    def backfill_document_embeddings(self, source: Optional[str] = None) -> int:
+        """Create missing document embeddings from the stored chunks.
+
+        For documents ingested before document embeddings existed. Uses
+        pgvector's avg() of the chunk vectors; cosine ranking ignores the
+        missing normalisation.
+
+        Args:
+            source: Optional source to restrict to
+
+        Returns:
+            Number of document embeddings created
+        """
+        self.ensure_ready()
+        condition = "AND c.source = %s" if source else ""
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    INSERT INTO document_embeddings
+                        (source, filename, embedding, chunk_count, metadata)
+                    SELECT c.source, c.filename, avg(c.embedding), count(*),
+                           (array_agg(c.metadata ORDER BY c.chunk_index))[1]
+                    FROM document_chunks c
+                    WHERE c.embedding IS NOT NULL {condition}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM document_embeddings d
+                          WHERE d.source = c.source AND d.filename = c.filename
+                      )
+                    GROUP BY c.source, c.filename
+                    ON CONFLICT (source, filename) DO NOTHING
+                    """,  # type: ignore[arg-type]
+                    (source,) if source else (),
+                )
+                created = cur.rowcount
+            conn.commit()
+        self.logger.info(f"Backfilled {created} document embeddings")
+        return created
+
+    def backfill_boilerplate_hashes(self, batch_size: int = 1000) -> int:
+        """Fill boilerplate_hash for chunks written before the column existed.
+
+        Rows are read through a server-side cursor and updated in committed
+        batches.
+
+        Args:
+            batch_size: Rows updated per transaction
+
+        Returns:
+            Number of chunks updated
+        """
+        self.ensure_ready()
+        query = """
+            SELECT source, id, content FROM document_chunks
+            WHERE boilerplate_hash IS NULL
+        """
+        updated = 0
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            batch: list[tuple] = []
+            rows = self._iter_rows("boilerplate_hash_cur", query, [], _ITERSIZE)
+            for source, chunk_id, content in rows:
+                batch.append((boilerplate_hash(content), source, chunk_id))
+                if len(batch) >= batch_size:
+                    updated += self._write_boilerplate_hashes(conn, batch)
+                    batch = []
+            if batch:
+                updated += self._write_boilerplate_hashes(conn, batch)
+        self.logger.info(f"Backfilled boilerplate_hash on {updated} chunks")
+        return updated
+
+    @staticmethod
+    def _write_boilerplate_hashes(conn: Any, batch: list[tuple]) -> int:
+        """Apply (hash, source, id) updates and commit; returns the batch size."""
+        with conn.cursor() as cur:
+            cur.executemany(
+                "UPDATE document_chunks SET boilerplate_hash = %s WHERE source = %s AND id = %s",
+                batch,
+            )
+        conn.commit()
+        return len(batch)
+
+    def match_boilerplate(
+        self,
+        source: str,
+        filename: str,
+        chunks: dict[str, str],
+        min_documents: int,
+    ) -> dict[str, int]:
+        """Find and register chunks repeated across a source's documents.
+
+        Counts other documents carrying each hash through the indexed
+        boilerplate_hash column, so requires ``boilerplate_dedup=True``.
+        Hashes already in boilerplate_chunks match without counting.
+
+        Args:
+            source: Source (partition) name
+            filename: Document being ingested (excluded from the count)
+            chunks: boilerplate_hash() -> chunk content
+            min_documents: Other documents a chunk must appear in
+
+        Returns:
+            Dict of boilerplate_hash -> boilerplate_chunks.id
+        """
+        if not chunks or min_documents < 1 or not self._boilerplate_dedup:
+            return {}
+        hashes = list(chunks)
+        self.ensure_ready()
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT boilerplate_hash, id FROM boilerplate_chunks
+                    WHERE source = %s AND boilerplate_hash = ANY(%s)
+                    """,
+                    (source, hashes),
+                )
+                matched = {row[0]: row[1] for row in cur.fetchall()}
+                pending = [h for h in hashes if h not in matched]
+                if pending:
+                    cur.execute(
+                        """
+                        SELECT boilerplate_hash FROM document_chunks
+                        WHERE source = %s AND boilerplate_hash = ANY(%s) AND filename <> %s
+                        GROUP BY boilerplate_hash
+                        HAVING COUNT(DISTINCT filename) >= %s
+                        """,
+                        (source, pending, filename, min_documents),
+                    )
+                    repeated = [row[0] for row in cur.fetchall()]
+                    if repeated:
+                        # The no-op update makes RETURNING yield rows that a
+                        # concurrent ingest registered first
+                        cur.execute(
+                            """
+                            INSERT INTO boilerplate_chunks (source, boilerplate_hash, content)
+                            SELECT %s, h, c FROM unnest(%s::text[], %s::text[]) AS t(h, c)
+                            ON CONFLICT (source, boilerplate_hash)
+                                DO UPDATE SET boilerplate_hash = EXCLUDED.boilerplate_hash
+                            RETURNING boilerplate_hash, id
+                            """,
+                            (source, repeated, [chunks[h] for h in repeated]),
+                        )
+                        matched.update({row[0]: row[1] for row in cur.fetchall()})
+                        self.logger.info(
+                            f"Registered {len(repeated)} boilerplate chunk(s) for source '{source}'"
+                        )
+            conn.commit()
+        return matched
+
+    def set_document_boilerplate(
+        self, source: str, filename: str, references: dict[int, int]
+    ) -> None:
+        """Replace a document's boilerplate references (chunk_index -> ID)."""
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM document_boilerplate WHERE source = %s AND filename = %s",
+                    (source, filename),
+                )
+                if references:
+                    cur.executemany(
+                        """
+                        INSERT INTO document_boilerplate
+                            (source, filename, chunk_index, boilerplate_id)
+                        VALUES (%s, %s, %s, %s)
+                        """,
+                        [
+                            (source, filename, index, boilerplate_id)
+                            for index, boilerplate_id in sorted(references.items())
+                        ],
+                    )
+            conn.commit()
+
+    def get_boilerplate_report(self) -> list[dict[str, Any]]:
+        """Summarise deduplicated boilerplate and the space it saves, per source.
+
+        ``bytes_reclaimed`` estimates the chunk rows not written: content
+        plus a full-precision embedding per reference, less the single
+        copy kept in boilerplate_chunks. HNSW index and tsvector savings
+        come on top.
+
+        Returns:
+            List of dicts with: source, snippets, chunks_deduplicated,
+            embeddings_saved, bytes_reclaimed, pending_chunks (copies
+            stored before detection; removed by purge_boilerplate())
+        """
+        self.ensure_ready()
+        pending_sql = "0::bigint"
+        if self._boilerplate_dedup:
+            pending_sql = """(
+                SELECT COUNT(*) FROM document_chunks c
+                WHERE c.source = b.source AND c.boilerplate_hash = b.boilerplate_hash
+            )"""
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    WITH refs AS (
+                        SELECT boilerplate_id, COUNT(*) AS n
+                        FROM document_boilerplate
+                        GROUP BY boilerplate_id
+                    )
+                    SELECT b.source,
+                           COUNT(*),
+                           COALESCE(SUM(refs.n), 0),
+                           COALESCE(SUM(refs.n * octet_length(b.content)), 0),
+                           COALESCE(SUM(octet_length(b.content)), 0),
+                           COALESCE(SUM({pending_sql}), 0)
+                    FROM boilerplate_chunks b
+                    LEFT JOIN refs ON refs.boilerplate_id = b.id
+                    GROUP BY b.source
+                    ORDER BY b.source
+                    """  # type: ignore[arg-type]
+                )
+                rows = cur.fetchall()
+
+        embedding_bytes = self._dimensions * 4
+        report = []
+        for source, snippets, references, content_bytes, stored_bytes, pending in rows:
+            references = int(references)
+            report.append({
+                "source": source,
+                "snippets": int(snippets),
+                "chunks_deduplicated": references,
+                "embeddings_saved": references,
+                "bytes_reclaimed": max(
+                    int(content_bytes) + references * embedding_bytes - int(stored_bytes), 0
+                ),
+                "pending_chunks": int(pending),
             })
+        return report
+
+    def purge_boilerplate(self, source: Optional[str] = None) -> int:
+        """Delete stored copies of registered boilerplate chunks.
+
+        Documents ingested before a chunk crossed the repeat threshold
+        still hold their own copy. This moves those copies to references,
+        except in documents that would be left with no chunks at all.
+        Document embeddings are not recomputed.
+
+        Args:
+            source: Optional source to restrict to
+
+        Returns:
+            Number of chunks deleted
+        """
+        if not self._boilerplate_dedup:
+            raise ValueError("purge_boilerplate requires boilerplate_dedup=True")
+        self.ensure_ready()
+        condition = "AND c.source = %s" if source else ""
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    WITH purged AS (
+                        DELETE FROM document_chunks c
+                        USING boilerplate_chunks b
+                        WHERE c.source = b.source
+                          AND c.boilerplate_hash = b.boilerplate_hash {condition}
+                          AND EXISTS (
+                              SELECT 1 FROM document_chunks k
+                              WHERE k.source = c.source AND k.filename = c.filename
+                                AND NOT EXISTS (
+                                    SELECT 1 FROM boilerplate_chunks x
+                                    WHERE x.source = k.source
+                                      AND x.boilerplate_hash = k.boilerplate_hash
+                                )
+                          )
+                        RETURNING c.source, c.filename, c.chunk_index, b.id
+                    ),
+                    referenced AS (
+                        INSERT INTO document_boilerplate
+                            (source, filename, chunk_index, boilerplate_id)
+                        SELECT source, filename, chunk_index, id FROM purged
+                        ON CONFLICT (source, filename, chunk_index)
+                            DO UPDATE SET boilerplate_id = EXCLUDED.boilerplate_id
+                    )
+                    SELECT source, COUNT(*) FROM purged GROUP BY source
+                    """,  # type: ignore[arg-type]
+                    (source,) if source else (),
+                )
+                purged = {row[0]: int(row[1]) for row in cur.fetchall()}
+                for src, count in purged.items():
+                    self._bump_stats(cur, src, -count, 0)
+            conn.commit()
+        if purged:
+            self._invalidate_search_cache(list(purged))
+        total = sum(purged.values())
+        self.logger.info(f"Purged {total} boilerplate chunk copies")
+        return total
+
+    def _document_stage_sql(
+        self,
+        sources: Optional[list[str]],
+        metadata_filter: Optional[dict[str, Any]],
+        filters: Optional[dict[str, Any]],
+        bind: Callable[[Any], str],
+    ) -> str:
+        """WHERE clause selecting candidate documents from document_embeddings.
+
+        Chunk-level filters are checked with EXISTS against the document's
+        chunks, so a document qualifies when any of its chunks matches —
+        the same rows the chunk stage will then return.
+        """
+        conditions = []
+        if sources:
+            conditions.append(f"d.source = ANY({bind(sources)})")
+        chunk_conditions = []
+        if metadata_filter:
+            chunk_conditions.append(f"c.metadata @> {bind(json.dumps(metadata_filter))}::jsonb")
+        if filters:
+            chunk_conditions.extend(self._column_filter_sql(filters, bind, prefix="c."))
+        if chunk_conditions:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM document_chunks c "
+                "WHERE c.source = d.source AND c.filename = d.filename AND "
+                + " AND ".join(chunk_conditions) + ")"
+            )
+        return ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    def search_documents(
+        self,
+        query_embedding: list[float],
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+    ) -> list[dict[str, Any]]:
+        """Rank documents by the similarity of their pooled embeddings.
+
+        Returns:
+            List of dicts with: source, filename, chunk_count, metadata, score
+        """
+        if limit < 1 or limit > 1000:
+            raise ValueError(f"limit must be between 1 and 1000, got {limit}")
+        ef, scan = self._search_settings(limit, preset, None, None)
+        params: list[Any] = [query_embedding]
+
+        def bind(value: Any) -> str:
+            params.append(value)
+            return "%s"
+
+        where_clause = self._document_stage_sql(sources, metadata_filter, filters, bind)
+        params.extend([query_embedding, limit])
+        query = f"""
+            SELECT d.source, d.filename, d.chunk_count, d.metadata,
+                   1 - (d.embedding <=> %s::vector) AS score
+            FROM document_embeddings d
+            {where_clause}
+            ORDER BY d.embedding <=> %s::vector
+            LIMIT %s
+        """
+
+        from pgvector.psycopg import register_vector
+
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                self._apply_search_settings(cur, ef, scan)
+                cur.execute(query, params)  # type: ignore[arg-type]
+                rows = cur.fetchall()
+
+        results = [
+            {
+                "source": row[0],
+                "filename": row[1],
+                "chunk_count": row[2],
+                "metadata": row[3] if isinstance(row[3], dict) else json.loads(row[3] or "{}"),
+                "score": float(row[4]),
+            }
+            for row in rows
+        ]
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results
+
+    def search_two_stage(
+        self,
+        query_embedding: list[float],
+        sources: Optional[list[str]] = None,
+        metadata_filter: Optional[dict[str, Any]] = None,
+        limit: int = 10,
+        document_limit: int = 20,
+        mmr_lambda: Optional[float] = None,
+        preset: Optional[str] = None,
+        filters: Optional[dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Search the top documents first, then rank chunks within them.
 
+        Stage one walks the document_embeddings HNSW index for the
+        ``document_limit`` closest documents. Stage two scores only those
+        documents' chunks by exact full-precision distance — the candidate
+        set is small, so this beats an ANN scan filtered down to a few
+        documents on both latency and recall. Documents without a stored
+        document embedding are not searched.
+
+        Args:
+            query_embedding: Query vector
+            sources: Optional list of source names to filter by
+            metadata_filter: Optional JSONB containment filter (chunk level)
+            limit: Maximum results to return
+            document_limit: Documents retrieved in the first stage
+            mmr_lambda: Optional MMR trade-off in [0, 1]; when set, the
+                final results are picked by maximal marginal relevance
+                from ``limit * 4`` candidates
+            preset: Recall/latency preset for the document-level scan
+            filters: Range/equality filters on promoted metadata columns
+            include_embeddings: Also return each chunk's vector under
+                "embedding"
+
+        Returns:
+            List of result dicts (same keys as search())
+        """
+        if limit < 1 or limit > 1000:
+            raise ValueError(f"limit must be between 1 and 1000, got {limit}")
+        if document_limit < 1 or document_limit > 1000:
+            raise ValueError(f"document_limit must be between 1 and 1000, got {document_limit}")
+        if mmr_lambda is not None and not 0 <= mmr_lambda <= 1:
+            raise ValueError(f"mmr_lambda must be between 0 and 1, got {mmr_lambda}")
+        ef, scan = self._search_settings(document_limit, preset, None, None)
+        candidates = limit if mmr_lambda is None else candidate_limit(limit)
+
+        params: list[Any] = []
+
+        def bind(value: Any) -> str:
+            params.append(value)
+            return "%s"
+
+        doc_where = self._document_stage_sql(sources, metadata_filter, filters, bind)
+        params.extend([query_embedding, document_limit, query_embedding])
+        chunk_conditions = []
+        if metadata_filter:
+            chunk_conditions.append(f"metadata @> {bind(json.dumps(metadata_filter))}::jsonb")
+        if filters:
+            chunk_conditions.extend(self._column_filter_sql(filters, bind))
+        chunk_where = ("WHERE " + " AND ".join(chunk_conditions)) if chunk_conditions else ""
+        params.append(candidates)
+
+        # MATERIALIZED keeps the planner from answering the chunk stage
+        # with a partition HNSW scan filtered down to the chosen documents
+        query = f"""
+            WITH top_docs AS (
+                SELECT d.source, d.filename
+                FROM document_embeddings d
+                {doc_where}
+                ORDER BY d.embedding <=> %s::vector
+                LIMIT %s
+            ),
+            candidates AS MATERIALIZED (
+                SELECT source, filename, chunk_index, content, metadata, embedding,
+                       embedding <=> %s::vector AS distance
+                FROM document_chunks
+                JOIN top_docs USING (source, filename)
+                {chunk_where}
+            )
+            SELECT source, filename, chunk_index, content, metadata,
+                   1 - distance AS score, embedding
+            FROM candidates
+            ORDER BY distance
+            LIMIT %s
+        """
+
+        from pgvector.psycopg import register_vector
+
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.cursor() as cur:
+                self._apply_search_settings(cur, ef, scan)
+                cur.execute(query, params)  # type: ignore[arg-type]
+                rows = cur.fetchall()
+
+        if mmr_lambda is not None and rows:
+            order = mmr_select(query_embedding, [row[6] for row in rows], limit, mmr_lambda)
+            rows = [rows[i] for i in order]
+
+        results = []
+        for row in rows[:limit]:
+            result = {
+                "source": row[0],
+                "filename": row[1],
+                "chunk_index": row[2],
+                "content": row[3],
+                "metadata": row[4] if isinstance(row[4], dict) else json.loads(row[4] or "{}"),
+                "score": float(row[5]),
+            }
+            if include_embeddings:
+                result["embedding"] = [float(x) for x in row[6]]
+            results.append(result)
         return results
 
     def get_sources(self) -> list[dict[str, Any]]:
         """List all sources with their chunk counts.
 
+        Reads the maintained document_chunk_stats counters rather than
+        aggregating document_chunks.
+
         Returns:
             List of dicts with: source, chunk_count
         """
@@ -502,9 +2241,9 @@ class PgVectorVectorStore(VectorStoreBackend):
         with pool.connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("""
-                    SELECT source, COUNT(*) as chunk_count
-                    FROM document_chunks
-                    GROUP BY source
+                    SELECT source, chunk_count
+                    FROM document_chunk_stats
+                    WHERE chunk_count > 0
                     ORDER BY source
                 """)
                 rows = cur.fetchall()
@@ -512,62 +2251,376 @@ class PgVectorVectorStore(VectorStoreBackend):
         return [{"source": row[0], "chunk_count": row[1]} for row in rows]
 
     def get_stats(self) -> dict[str, Any]:
-        """Get overall statistics.
+        """Get overall statistics from the maintained counters.
 
         Returns:
-            Dict with: total_chunks, total_documents, sources
+            Dict with: total_chunks, total_documents, total_sources
         """
         pool = self._get_pool()
         with pool.connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT COUNT(*) FROM document_chunks")
-                total_chunks = cur.fetchone()[0]  # type: ignore[index]
-
-                cur.execute("SELECT COUNT(DISTINCT (source, filename)) FROM document_chunks")
-                total_documents = cur.fetchone()[0]  # type: ignore[index]
-
-                cur.execute("SELECT COUNT(DISTINCT source) FROM document_chunks")
-                total_sources = cur.fetchone()[0]  # type: ignore[index]
+                cur.execute("""
+                    SELECT COALESCE(SUM(chunk_count), 0),
+                           COALESCE(SUM(document_count), 0),
+                           COUNT(*) FILTER (WHERE chunk_count > 0)
+                    FROM document_chunk_stats
+                """)
+                total_chunks, total_documents, total_sources = cur.fetchone()  # type: ignore[misc]
 
         return {
-            "total_chunks": total_chunks,
-            "total_documents": total_documents,
-            "total_sources": total_sources,
+            "total_chunks": int(total_chunks),
+            "total_documents": int(total_documents),
+            "total_sources": int(total_sources),
         }
 
-    def get_document_chunks(self, source: str, filename: str) -> list[dict[str, Any]]:
-        """Get all chunks for a specific document.
+    def reconcile_stats(self) -> int:
+        """Recompute document_chunk_stats from document_chunks.
 
-        Args:
-            source: Source/partition name
-            filename: Document filename
+        Corrects any drift in the maintained counters (e.g. from rows
+        written outside this class). The full aggregate runs without
+        locking the stats table; each source that looks drifted is then
+        recounted under a lock on its own stats row, so writers to other
+        sources are never blocked and no delta is lost or double counted.
 
         Returns:
-            List of dicts with: chunk_index, content, metadata
+            Number of sources whose counters were corrected
         """
+        self.ensure_ready()
         pool = self._get_pool()
         with pool.connection() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT source, chunk_count, document_count FROM document_chunk_stats")
+                before = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+                cur.execute("""
+                    SELECT source, COUNT(*), COUNT(DISTINCT filename)
+                    FROM document_chunks
+                    GROUP BY source
+                """)
+                actual = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+            conn.commit()
+
+            suspects = sorted(
+                src for src in set(before) | set(actual)
+                if before.get(src, (0, 0)) != actual.get(src, (0, 0))
+            )
+            drifted = []
+            for src in suspects:
+                if self._reconcile_source(conn, src):
+                    drifted.append(src)
+
+        if drifted:
+            self.logger.warning(
+                f"Corrected chunk stats drift for {len(drifted)} source(s): {', '.join(drifted)}"
+            )
+        else:
+            self.logger.debug("Chunk stats reconciled, no drift")
+        return len(drifted)
+
+    @staticmethod
+    def _reconcile_source(conn: Any, source: str) -> bool:
+        """Recount one source under its stats row lock; True if corrected.
+
+        A writer that already bumped the row holds its lock until commit, so
+        the recount sees its chunks; one that bumps later applies its delta
+        on top of the corrected counters.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT chunk_count, document_count FROM document_chunk_stats
+                WHERE source = %s FOR UPDATE
+                """,
+                (source,),
+            )
+            row = cur.fetchone()
+            stored = (row[0], row[1]) if row else (0, 0)
+            cur.execute(
+                """
+                SELECT COUNT(*), COUNT(DISTINCT filename)
+                FROM document_chunks WHERE source = %s
+                """,
+                (source,),
+            )
+            counted = tuple(cur.fetchone())
+            if counted == stored:
+                conn.commit()
+                return False
+            if counted[0] == 0:
+                cur.execute("DELETE FROM document_chunk_stats WHERE source = %s", (source,))
+            else:
                 cur.execute(
                     """
-                    SELECT chunk_index, content, metadata
-                    FROM document_chunks
-                    WHERE source = %s AND filename = %s
-                    ORDER BY chunk_index
+                    INSERT INTO document_chunk_stats (source, chunk_count, document_count)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (source) DO UPDATE SET
+                        chunk_count = EXCLUDED.chunk_count,
+                        document_count = EXCLUDED.document_count,
+                        updated_at = NOW()
                     """,
-                    (source, filename),
+                    (source, counted[0], counted[1]),
                 )
-                rows = cur.fetchall()
+        conn.commit()
+        return True
 
-        return [
-            {
+    def get_document_chunks(self, source: str, filename: str) -> list[dict[str, Any]]:
+        """Get all chunks for a specific document.
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+
+        Returns:
+            List of dicts with: chunk_index, content, metadata
+        """
+        return list(self.iter_document_chunks(source, filename))
+
+    def iter_document_chunks(
+        self,
+        source: str,
+        filename: str,
+        after_index: int = -1,
+        limit: Optional[int] = None,
+        itersize: int = _ITERSIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream a document's chunks through a server-side cursor.
+
+        Rows are fetched ``itersize`` at a time, so memory stays flat
+        however large the document is. The pooled connection is held until
+        the generator is exhausted or closed.
+
+        Args:
+            source: Source/partition name
+            filename: Document filename
+            after_index: Keyset cursor — only chunks with a greater chunk_index
+            limit: Optional maximum number of chunks to yield
+            itersize: Rows fetched per network round trip
+
+        Yields:
+            Dicts with: chunk_index, content, metadata
+        """
+        query = """
+            SELECT chunk_index, content, metadata
+            FROM document_chunks
+            WHERE source = %s AND filename = %s AND chunk_index > %s
+            ORDER BY chunk_index
+        """
+        params: list[Any] = [source, filename, after_index]
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        for row in self._iter_rows("document_chunks_cur", query, params, itersize):
+            yield {
                 "chunk_index": row[0],
                 "content": row[1],
                 "metadata": row[2] if isinstance(row[2], dict) else json.loads(row[2] or "{}"),
             }
+
+    def iter_documents(
+        self,
+        source: Optional[str] = None,
+        after_filename: Optional[str] = None,
+        limit: Optional[int] = None,
+        itersize: int = _ITERSIZE,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream one entry per stored document through a server-side cursor.
+
+        Ordered by (source, filename), which the document index serves
+        directly. Each entry carries the metadata of the document's first
+        chunk.
+
+        Args:
+            source: Optional source to restrict to
+            after_filename: Keyset cursor within ``source`` — only documents
+                whose filename sorts after this
+            limit: Optional maximum number of documents to yield
+            itersize: Rows fetched per network round trip
+
+        Yields:
+            Dicts with: source, filename, metadata
+        """
+        conditions = []
+        params: list[Any] = []
+        if source:
+            conditions.append("source = %s")
+            params.append(source)
+            if after_filename is not None:
+                conditions.append("filename > %s")
+                params.append(after_filename)
+        where_clause = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        query = f"""
+            SELECT DISTINCT ON (source, filename) source, filename, metadata
+            FROM document_chunks
+            {where_clause}
+            ORDER BY source, filename, chunk_index
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        for row in self._iter_rows("documents_cur", query, params, itersize):
+            yield {
+                "source": row[0],
+                "filename": row[1],
+                "metadata": row[2] if isinstance(row[2], dict) else json.loads(row[2] or "{}"),
+            }
+
+    def _iter_rows(
+        self, name: str, query: str, params: list[Any], itersize: int
+    ) -> Iterator[tuple]:
+        """Yield rows from a named (server-side) cursor, ``itersize`` at a time."""
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor(name=name) as cur:
+                cur.itersize = itersize
+                cur.execute(query, params)  # type: ignore[arg-type]
+                yield from cur
+
+    def get_index_sizes(self) -> list[dict[str, Any]]:
+        """List HNSW indexes on document_chunks partitions with their sizes.
+
+        Returns:
+            List of dicts with: partition, index_name, size_bytes
+        """
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT c.relname, i.relname, pg_relation_size(i.oid)
+                    FROM pg_inherits inh
+                    JOIN pg_class p ON p.oid = inh.inhparent
+                    JOIN pg_class c ON c.oid = inh.inhrelid
+                    JOIN pg_index x ON x.indrelid = c.oid
+                    JOIN pg_class i ON i.oid = x.indexrelid
+                    JOIN pg_am am ON am.oid = i.relam
+                    WHERE p.relname = 'document_chunks' AND am.amname = 'hnsw'
+                    ORDER BY c.relname, i.relname
+                """)
+                rows = cur.fetchall()
+
+        return [
+            {"partition": row[0], "index_name": row[1], "size_bytes": row[2]}
             for row in rows
         ]
 
+    def migrate_index_quantization(self) -> list[str]:
+        """Rebuild every partition's HNSW index for the configured quantization.
+
+        Creates the index for the current mode on each existing partition,
+        then drops the indexes of the other modes. Each partition is
+        committed separately so an interrupted run can simply be re-run.
+        The embedding column itself is untouched.
+
+        Returns:
+            List of partition names that were processed
+        """
+        from psycopg import sql
+
+        self.ensure_ready()
+        stale_suffixes = [
+            self._index_spec(mode)[0]
+            for mode in VALID_INDEX_QUANTIZATIONS
+            if mode != self._quantization
+        ]
+        prefix = "document_chunks_"
+
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                partitions = self._partition_names(cur)
+
+            for partition_name in partitions:
+                if not partition_name.startswith(prefix):
+                    continue
+                safe_source = partition_name[len(prefix):]
+                with conn.cursor() as cur:
+                    cur.execute(self._hnsw_index_sql(safe_source, partition_name))
+                    for suffix in stale_suffixes:
+                        cur.execute(
+                            sql.SQL("DROP INDEX IF EXISTS {}").format(
+                                sql.Identifier(f"idx_{safe_source}_{suffix}")
+                            )
+                        )
+                conn.commit()
+                self.logger.info(
+                    f"Rebuilt HNSW index on {partition_name} "
+                    f"(quantization={self._quantization})"
+                )
+
+        return partitions
+
+    def _partition_names(self, cur: Any) -> list[str]:
+        """Names of the existing document_chunks partitions."""
+        cur.execute("""
+            SELECT c.relname
+            FROM pg_inherits inh
+            JOIN pg_class p ON p.oid = inh.inhparent
+            JOIN pg_class c ON c.oid = inh.inhrelid
+            WHERE p.relname = 'document_chunks'
+            ORDER BY c.relname
+        """)
+        return [row[0] for row in cur.fetchall()]
+
+    def migrate_columns(self) -> list[str]:
+        """Add the generated columns missing from an existing document_chunks.
+
+        Covers ``content_tsv`` (absent from tables created by older
+        releases) and a ``meta_*`` column per promoted metadata key. All
+        missing columns are added by one ``ALTER TABLE ... ADD COLUMN ...,
+        ADD COLUMN ...`` statement: it holds an ACCESS EXCLUSIVE lock on
+        document_chunks, blocking reads and writes, while it rewrites every
+        partition once. Run it in a maintenance window.
+
+        The indexes are built afterwards: a btree per meta_* column,
+        declared on the parent so later partitions inherit it, then the
+        content_tsv GIN index one partition at a time. Each build blocks
+        writes (not reads) to the partitions it covers.
+
+        Returns:
+            Names of the columns that were added
+        """
+        self.ensure_ready()
+        prefix = "document_chunks_"
+
+        pool = self._get_pool()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                existing = self._read_chunk_columns(cur)
+                missing = {
+                    name: definition
+                    for name, definition in self._generated_columns().items()
+                    if name not in existing
+                }
+                if missing:
+                    # Column names and definitions are fixed or validated
+                    cur.execute(
+                        "ALTER TABLE document_chunks "
+                        + ", ".join(
+                            f"ADD COLUMN IF NOT EXISTS {name} {definition}"
+                            for name, definition in missing.items()
+                        )
+                    )
+                    conn.commit()
+                    self.logger.info(f"Added columns to document_chunks: {', '.join(missing)}")
+                self._chunk_columns = None
+                for key in self._metadata_columns:
+                    cur.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_document_chunks_meta_{key} "
+                        f"ON document_chunks (meta_{key})"
+                    )
+                    conn.commit()
+                partitions = self._partition_names(cur)
+
+            for partition_name in partitions:
+                if not partition_name.startswith(prefix):
+                    continue
+                with conn.cursor() as cur:
+                    cur.execute(self._tsv_index_sql(partition_name[len(prefix):], partition_name))
+                conn.commit()
+
+        return list(missing)
+
     def close(self) -> None:
         """Close the connection pool (thread-safe).
 
@@ -580,5 +2633,6 @@ class PgVectorVectorStore(VectorStoreBackend):
                     self._pool.close()
                 self._pool = None
                 self._schema_ensured = False
+                self._chunk_columns = None
                 self._known_partitions.clear()
                 self.logger.debug("Connection pool closed")
@@ -0,0 +1,216 @@
+"""NumPy helpers for document-level vectors and result diversification."""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Protocol, Sequence
+
+import numpy as np
+
+# Candidates fetched per requested result when a post-retrieval stage
+# (MMR, per-document caps, reranking) picks the final set
+CANDIDATE_FACTOR = 4
+
+
+class Reranker(Protocol):
+    """Anything that scores (query, passage) pairs, e.g. a cross-encoder."""
+
+    def rerank(self, query: str, documents: list[str]) -> list[float]:
+        """Return one relevance score per document, in input order."""
+        ...
+
+
+def candidate_limit(limit: int, max_candidates: int = 1000) -> int:
+    """Number of candidates to fetch for a post-retrieval stage."""
+    return min(limit * CANDIDATE_FACTOR, max_candidates)
+
+
+def _unit_rows(vectors: Any) -> np.ndarray:
+    """Return ``vectors`` as float32 rows of unit length (zero rows stay zero)."""
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def mean_pool_embeddings(vectors: Sequence[Sequence[float]]) -> list[float]:
+    """Pool chunk embeddings into one unit-length document embedding.
+
+    Each chunk vector is normalised first so long chunks do not dominate
+    the mean.
+
+    Raises:
+        ValueError: If ``vectors`` is empty
+    """
+    if not len(vectors):
+        raise ValueError("Cannot pool an empty list of embeddings")
+    return _unit_rows(sum_unit_embeddings(vectors))[0].tolist()
+
+
+def sum_unit_embeddings(vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """Sum of the unit-normalised rows of ``vectors``.
+
+    Partial sums add up, so a document embedding can be pooled batch by
+    batch: ``mean_pool_embeddings([total])`` equals pooling every vector
+    at once.
+    """
+    return _unit_rows(vectors).sum(axis=0)
+
+
+def cap_per_group(groups: Any, max_per_group: int) -> np.ndarray:
+    """Positions of rows kept when each group may appear at most ``max_per_group`` times.
+
+    Rows are assumed to be in rank order already; the first
+    ``max_per_group`` rows of each group are kept.
+    """
+    groups = np.asarray(groups)
+    if not len(groups):
+        return np.empty(0, dtype=np.intp)
+    # Rank of each row within its group: stable-sort by group, then
+    # subtract the start offset of each run
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    run_lengths = np.diff(np.r_[starts, len(groups)])
+    rank_in_group = np.empty(len(groups), dtype=np.intp)
+    rank_in_group[order] = np.arange(len(groups)) - np.repeat(starts, run_lengths)
+    return np.flatnonzero(rank_in_group < max_per_group)
+
+
+def mmr_select(
+    query_embedding: Sequence[float],
+    embeddings: Any,
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Optional[Any] = None,
+    groups: Optional[Any] = None,
+    max_per_group: Optional[int] = None,
+) -> list[int]:
+    """Pick ``k`` candidates by maximal marginal relevance.
+
+    Each step takes the candidate maximising
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)``,
+    so ``lambda_mult=1`` is plain relevance order and lower values favour
+    diversity.
+
+    Args:
+        query_embedding: Query vector
+        embeddings: Candidate vectors, one row per candidate
+        k: Number of candidates to select
+        lambda_mult: Relevance/diversity trade-off in [0, 1]
+        relevance: Optional per-candidate relevance replacing the cosine
+            similarity to the query (e.g. normalised reranker scores)
+        groups: Optional group label per candidate (e.g. document)
+        max_per_group: Maximum candidates selected from one group
+
+    Returns:
+        Positions of the selected candidates, in selection order
+    """
+    if not 0 <= lambda_mult <= 1:
+        raise ValueError(f"lambda_mult must be between 0 and 1, got {lambda_mult}")
+    if not len(embeddings) or k < 1:
+        return []
+    matrix = _unit_rows(embeddings)
+    if relevance is None:
+        relevance = matrix @ _unit_rows(query_embedding)[0]
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+    redundancy = np.zeros(len(matrix), dtype=np.float32)
+    available = np.ones(len(matrix), dtype=bool)
+    if groups is not None and max_per_group is not None:
+        group_ids = np.unique(np.asarray(groups), return_inverse=True)[1].ravel()
+        group_counts = np.zeros(group_ids.max() + 1, dtype=np.intp)
+    else:
+        group_ids = None
+
+    selected: list[int] = []
+    while len(selected) < k and available.any():
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, matrix @ matrix[best])
+        if group_ids is not None:
+            group = group_ids[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available &= group_ids != group
+    return selected
+
+
+def _min_max(values: Sequence[float]) -> np.ndarray:
+    """Scale ``values`` to [0, 1] (all ones when they are equal)."""
+    array = np.asarray(values, dtype=np.float32)
+    spread = float(array.max() - array.min()) if len(array) else 0.0
+    if spread == 0:
+        return np.ones(len(array), dtype=np.float32)
+    return (array - array.min()) / spread
+
+
+def rank_results(
+    query_embedding: Sequence[float],
+    results: list[dict[str, Any]],
+    limit: int,
+    mmr_lambda: Optional[float] = None,
+    max_per_document: Optional[int] = None,
+    reranker: Optional[Reranker] = None,
+    query_text: str = "",
+    score_is_similarity: bool = True,
+) -> list[dict[str, Any]]:
+    """Post-retrieval stage: rerank, diversify and cap over-fetched results.
+
+    ``results`` are search results in rank order, ideally fetched with
+    ``include_embeddings=True`` and ``candidate_limit(limit)`` rows. Steps:
+
+    1. ``reranker`` (optional) rescores every candidate against
+       ``query_text``; the score is returned as ``rerank_score`` and
+       becomes the ranking order.
+    2. With ``mmr_lambda`` set, MMR picks the final results from the
+       candidate embeddings. Relevance is cosine similarity to the query,
+       or the min-max scaled scores when they are not similarities
+       (reranker or RRF scores, ``score_is_similarity=False``). MMR is
+       skipped when any candidate lacks an embedding.
+    3. ``max_per_document`` limits how many chunks of one document are
+       returned.
+
+    The "embedding" key is stripped from the returned dicts.
+    """
+    if mmr_lambda is not None and not 0 <= mmr_lambda <= 1:
+        raise ValueError(f"mmr_lambda must be between 0 and 1, got {mmr_lambda}")
+    if max_per_document is not None and max_per_document < 1:
+        raise ValueError(f"max_per_document must be positive, got {max_per_document}")
+    candidates = list(results)
+
+    if reranker is not None and candidates:
+        scores = reranker.rerank(query_text, [r["content"] for r in candidates])
+        if len(scores) != len(candidates):
+            raise ValueError(
+                f"Reranker returned {len(scores)} scores for {len(candidates)} candidates"
+            )
+        order = np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
+        candidates = [{**candidates[i], "rerank_score": float(scores[i])} for i in order]
+
+    documents = [f"{r['source']}/{r['filename']}" for r in candidates]
+    if mmr_lambda is not None and candidates and all("embedding" in r for r in candidates):
+        relevance = None
+        if reranker is not None:
+            relevance = _min_max([r["rerank_score"] for r in candidates])
+        elif not score_is_similarity:
+            relevance = _min_max([r["score"] for r in candidates])
+        picked = mmr_select(
+            query_embedding,
+            [r["embedding"] for r in candidates],
+            limit,
+            mmr_lambda,
+            relevance=relevance,
+            groups=documents if max_per_document else None,
+            max_per_group=max_per_document,
+        )
+    elif max_per_document:
+        picked = cap_per_group(documents, max_per_document)[:limit].tolist()
+    else:
+        picked = list(range(min(limit, len(candidates))))
+
+    return [
+        {key: value for key, value in candidates[i].items() if key != "embedding"}
+        for i in picked
+    ]
@@ -183,6 +183,11 @@ class Config:
         min_val=1,
         max_val=600,
     )
+    # Also fetch the DoclingDocument JSON so "hybrid"/"markdown" chunking
+    # works from the parsed structure instead of re-uploading markdown
+    DOCLING_SERVE_DOCUMENT_JSON = (
+        os.getenv("DOCLING_SERVE_DOCUMENT_JSON", "false").lower() == "true"
+    )
 
     # Gotenberg (document → PDF conversion)
     GOTENBERG_URL = os.getenv("GOTENBERG_URL", "")
@@ -212,6 +217,12 @@ class Config:
     LLM_TIMEOUT = _parse_timeout(
         os.getenv("LLM_TIMEOUT", "120"), "LLM_TIMEOUT", min_val=30, max_val=600
     )
+    # How long Ollama keeps the model loaded after a request ("30m", "-1" = always)
+    LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "30m").strip()
+    # Seconds between warm-up pings during pipeline runs (0 disables)
+    LLM_WARM_INTERVAL = _parse_int(
+        os.getenv("LLM_WARM_INTERVAL", "240"), "LLM_WARM_INTERVAL"
+    )
     LLM_ENRICHMENT_ENABLED = os.getenv("LLM_ENRICHMENT_ENABLED", "false").lower() == "true"
     LLM_ENRICHMENT_MAX_TOKENS = _parse_int(
         os.getenv("LLM_ENRICHMENT_MAX_TOKENS", "8000"), "LLM_ENRICHMENT_MAX_TOKENS"
@@ -220,6 +231,31 @@ class Config:
     CONTEXTUAL_ENRICHMENT_WINDOW = _parse_int(
         os.getenv("CONTEXTUAL_ENRICHMENT_WINDOW", "3"), "CONTEXTUAL_ENRICHMENT_WINDOW"
     )
+    # Chunk enrichment requests in flight at once (match the LLM server's
+    # parallel slots, e.g. OLLAMA_NUM_PARALLEL)
+    CONTEXTUAL_ENRICHMENT_CONCURRENCY = _parse_int(
+        os.getenv("CONTEXTUAL_ENRICHMENT_CONCURRENCY", "1"), "CONTEXTUAL_ENRICHMENT_CONCURRENCY"
+    )
+    # Chunks situated per enrichment request; the document context is
+    # sent once per batch instead of once per chunk (1 disables batching)
+    CONTEXTUAL_ENRICHMENT_BATCH_SIZE = _parse_int(
+        os.getenv("CONTEXTUAL_ENRICHMENT_BATCH_SIZE", "1"), "CONTEXTUAL_ENRICHMENT_BATCH_SIZE"
+    )
+    # Per-chunk request timeout in seconds (0 uses LLM_TIMEOUT)
+    CONTEXTUAL_ENRICHMENT_TIMEOUT = _parse_int(
+        os.getenv("CONTEXTUAL_ENRICHMENT_TIMEOUT", "0"), "CONTEXTUAL_ENRICHMENT_TIMEOUT"
+    )
+    # Persistent LLM response cache (repeated enrichment prompts are free)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    VALID_LLM_CACHE_BACKENDS = ("auto", "postgres", "sqlite")
+    LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "auto").strip().lower()
+    LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", DATA_DIR / "llm_cache.sqlite3"))
+    LLM_CACHE_MAX_ENTRIES = _parse_int(
+        os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"), "LLM_CACHE_MAX_ENTRIES"
+    )
+    LLM_CACHE_MAX_AGE_DAYS = _parse_int(
+        os.getenv("LLM_CACHE_MAX_AGE_DAYS", "90"), "LLM_CACHE_MAX_AGE_DAYS"
+    )
 
     # Embedding service
     VALID_EMBEDDING_BACKENDS = ("ollama", "openai", "api")
@@ -232,27 +268,83 @@ class Config:
         os.getenv("EMBEDDING_TIMEOUT", "60"), "EMBEDDING_TIMEOUT"
     )
 
+    # Reranker (cross-encoder for the optional search rerank stage)
+    VALID_RERANKER_BACKENDS = ("api",)
+    RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "api").strip().lower()
+    RERANKER_MODEL = os.getenv("RERANKER_MODEL", "")
+    RERANKER_URL = os.getenv("RERANKER_URL", "")
+    RERANKER_API_KEY = os.getenv("RERANKER_API_KEY", "")
+    RERANKER_TIMEOUT = _parse_timeout(
+        os.getenv("RERANKER_TIMEOUT", "30"), "RERANKER_TIMEOUT"
+    )
+
     # Chunking
-    VALID_CHUNKING_STRATEGIES = ("fixed", "hybrid")
+    VALID_CHUNKING_STRATEGIES = ("fixed", "hybrid", "token", "markdown")
     CHUNKING_STRATEGY = os.getenv("CHUNKING_STRATEGY", "hybrid").strip().lower()
     CHUNK_MAX_TOKENS = _parse_int(os.getenv("CHUNK_MAX_TOKENS", "512"), "CHUNK_MAX_TOKENS")
     CHUNK_OVERLAP_TOKENS = _parse_int(os.getenv("CHUNK_OVERLAP_TOKENS", "64"), "CHUNK_OVERLAP_TOKENS")
+    # Tokenizer for the "token" and "markdown" strategies (HF Hub name or
+    # tokenizer.json path); empty derives it from EMBEDDING_MODEL
+    CHUNK_TOKENIZER = os.getenv("CHUNK_TOKENIZER", "").strip()
+    # Chunks repeated in more than this many documents of a source are
+    # stored once as shared boilerplate (0 disables dedup)
+    BOILERPLATE_MIN_DOCUMENTS = _parse_int(
+        os.getenv("BOILERPLATE_MIN_DOCUMENTS", "0"), "BOILERPLATE_MIN_DOCUMENTS"
+    )
+    # New documents are chunked, embedded and written in windows of this
+    # many chunks so memory stays bounded (0 embeds the whole document at once)
+    INGEST_STREAM_BATCH = _parse_int(
+        os.getenv("INGEST_STREAM_BATCH", "64"), "INGEST_STREAM_BATCH"
+    )
+    # Re-embed every chunk on ingest even if its stored hash matches
+    INGEST_FORCE_REEMBED = os.getenv("INGEST_FORCE_REEMBED", "false").lower() == "true"
 
     # pgvector (PostgreSQL vector storage)
     DATABASE_URL = os.getenv("DATABASE_URL", "")
 
     # Redis / Valkey (job dispatch and real-time events)
     REDIS_URL = os.getenv("REDIS_URL", "")
+
+    # Search cache (query embeddings + results; shared via Redis when configured)
+    SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in (
+        "true", "1", "yes",
+    )
+    SEARCH_CACHE_EMBEDDING_TTL = _parse_int(
+        os.getenv("SEARCH_CACHE_EMBEDDING_TTL", "86400"), "SEARCH_CACHE_EMBEDDING_TTL"
+    )
+    SEARCH_CACHE_RESULT_TTL = _parse_int(
+        os.getenv("SEARCH_CACHE_RESULT_TTL", "300"), "SEARCH_CACHE_RESULT_TTL"
+    )
+    SEARCH_CACHE_MAX_ENTRIES = _parse_int(
+        os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"), "SEARCH_CACHE_MAX_ENTRIES"
+    )
     ANYTHINGLLM_VIEW_NAME = os.getenv("ANYTHINGLLM_VIEW_NAME", "anythingllm_document_view")
     PGVECTOR_DROP_ON_MISMATCH = os.getenv("PGVECTOR_DROP_ON_MISMATCH", "").lower() in (
         "true", "1", "yes",
     )
+    VALID_PGVECTOR_INDEX_QUANTIZATIONS = ("none", "halfvec", "binary")
+    PGVECTOR_INDEX_QUANTIZATION = (
+        os.getenv("PGVECTOR_INDEX_QUANTIZATION", "none").strip().lower()
+    )  # none, halfvec, binary
+    PGVECTOR_RERANK_FACTOR = _parse_int(
+        os.getenv("PGVECTOR_RERANK_FACTOR", "4"), "PGVECTOR_RERANK_FACTOR"
+    )
+    VALID_PGVECTOR_SEARCH_PRESETS = ("fast", "balanced", "accurate")
+    PGVECTOR_SEARCH_PRESET = (
+        os.getenv("PGVECTOR_SEARCH_PRESET", "balanced").strip().lower()
+    )  # HNSW ef_search / iterative scan preset for searches
+    PGVECTOR_METADATA_COLUMNS = os.getenv(
+        "PGVECTOR_METADATA_COLUMNS", ""
+    )  # key:type pairs promoted to indexed columns for search filters (opt-in)
+    PGVECTOR_STATS_RECONCILE_HOURS = _parse_int(
+        os.getenv("PGVECTOR_STATS_RECONCILE_HOURS", "24"), "PGVECTOR_STATS_RECONCILE_HOURS"
+    )  # 0 disables the periodic counter reconcile
 
     # Valid values for backends and strategies
     VALID_PARSER_BACKENDS = ("docling", "docling_serve", "mineru", "tika")
     VALID_ARCHIVE_BACKENDS = ("paperless", "s3", "local")
     VALID_RAG_BACKENDS = ("ragflow", "anythingllm", "pgvector")
-    VALID_VECTOR_BACKENDS = ("pgvector",)
+    VALID_VECTOR_BACKENDS = ("pgvector", "local")
     VALID_METADATA_MERGE_STRATEGIES = ("smart", "parser_wins", "scraper_wins")
 
     # Backend Selection
@@ -267,7 +359,11 @@ class Config:
     )  # ragflow, anythingllm, pgvector
     VECTOR_BACKEND = (
         os.getenv("VECTOR_BACKEND", "pgvector").strip().lower()
-    )  # pgvector
+    )  # pgvector, local
+    VALID_LOCAL_VECTOR_INDEXES = ("exact", "hnsw")
+    LOCAL_VECTOR_INDEX = (
+        os.getenv("LOCAL_VECTOR_INDEX", "exact").strip().lower()
+    )  # exact (NumPy brute force) or hnsw (needs hnswlib)
     METADATA_MERGE_STRATEGY = (
         os.getenv("METADATA_MERGE_STRATEGY", "smart").strip().lower()
     )  # smart, parser_wins, scraper_wins
@@ -295,6 +391,7 @@ class Config:
     METADATA_DIR = Path(os.getenv("METADATA_DIR", DATA_DIR / "metadata"))
     STATE_DIR = Path(os.getenv("STATE_DIR", DATA_DIR / "state"))
     LOG_DIR = Path(os.getenv("LOG_DIR", DATA_DIR / "logs"))
+    LOCAL_VECTOR_DIR = Path(os.getenv("LOCAL_VECTOR_DIR", DATA_DIR / "vectors"))
     SCRAPERS_CONFIG_DIR = CONFIG_DIR / "scrapers"
 
     # File size limits
@@ -438,6 +535,12 @@ class Config:
                 f"Must be one of: {', '.join(cls.VALID_VECTOR_BACKENDS)}"
             )
 
+        if cls.LOCAL_VECTOR_INDEX not in cls.VALID_LOCAL_VECTOR_INDEXES:
+            raise ValueError(
+                f"Invalid LOCAL_VECTOR_INDEX '{cls.LOCAL_VECTOR_INDEX}'. "
+                f"Must be one of: {', '.join(cls.VALID_LOCAL_VECTOR_INDEXES)}"
+            )
+
         if cls.METADATA_MERGE_STRATEGY not in cls.VALID_METADATA_MERGE_STRATEGIES:
             raise ValueError(
                 f"Invalid METADATA_MERGE_STRATEGY '{cls.METADATA_MERGE_STRATEGY}'. "
@@ -450,12 +553,54 @@ class Config:
                 f"Must be one of: {', '.join(cls.VALID_EMBEDDING_BACKENDS)}"
             )
 
+        if cls.RERANKER_BACKEND not in cls.VALID_RERANKER_BACKENDS:
+            raise ValueError(
+                f"Invalid RERANKER_BACKEND '{cls.RERANKER_BACKEND}'. "
+                f"Must be one of: {', '.join(cls.VALID_RERANKER_BACKENDS)}"
+            )
+
         if cls.CHUNKING_STRATEGY not in cls.VALID_CHUNKING_STRATEGIES:
             raise ValueError(
                 f"Invalid CHUNKING_STRATEGY '{cls.CHUNKING_STRATEGY}'. "
                 f"Must be one of: {', '.join(cls.VALID_CHUNKING_STRATEGIES)}"
             )
 
+        if cls.PGVECTOR_INDEX_QUANTIZATION not in cls.VALID_PGVECTOR_INDEX_QUANTIZATIONS:
+            raise ValueError(
+                f"Invalid PGVECTOR_INDEX_QUANTIZATION '{cls.PGVECTOR_INDEX_QUANTIZATION}'. "
+                f"Must be one of: {', '.join(cls.VALID_PGVECTOR_INDEX_QUANTIZATIONS)}"
+            )
+
+        if cls.PGVECTOR_RERANK_FACTOR < 1:
+            raise ValueError(
+                f"Invalid Config: PGVECTOR_RERANK_FACTOR ({cls.PGVECTOR_RERANK_FACTOR}) must be >= 1"
+            )
+
+        if cls.PGVECTOR_SEARCH_PRESET not in cls.VALID_PGVECTOR_SEARCH_PRESETS:
+            raise ValueError(
+                f"Invalid PGVECTOR_SEARCH_PRESET '{cls.PGVECTOR_SEARCH_PRESET}'. "
+                f"Must be one of: {', '.join(cls.VALID_PGVECTOR_SEARCH_PRESETS)}"
+            )
+
+        from app.backends.vectorstores.base import parse_metadata_columns
+
+        try:
+            parse_metadata_columns(cls.PGVECTOR_METADATA_COLUMNS)
+        except ValueError as e:
+            raise ValueError(f"Invalid PGVECTOR_METADATA_COLUMNS: {e}")
+
+        if cls.PGVECTOR_STATS_RECONCILE_HOURS < 0:
+            raise ValueError(
+                f"Invalid Config: PGVECTOR_STATS_RECONCILE_HOURS "
+                f"({cls.PGVECTOR_STATS_RECONCILE_HOURS}) must be >= 0"
+            )
+
+        for name in (
+            "SEARCH_CACHE_EMBEDDING_TTL", "SEARCH_CACHE_RESULT_TTL", "SEARCH_CACHE_MAX_ENTRIES",
+        ):
+            if getattr(cls, name) < 1:
+                raise ValueError(f"Invalid Config: {name} ({getattr(cls, name)}) must be >= 1")
+
         if cls.CHUNK_MAX_TOKENS < 1:
             raise ValueError(
                 f"Invalid Config: CHUNK_MAX_TOKENS ({cls.CHUNK_MAX_TOKENS}) must be >= 1"
@@ -466,6 +611,16 @@ class Config:
                 f"Invalid Config: CHUNK_OVERLAP_TOKENS ({cls.CHUNK_OVERLAP_TOKENS}) must be >= 0"
             )
 
+        if cls.BOILERPLATE_MIN_DOCUMENTS < 0:
+            raise ValueError(
+                f"Invalid Config: BOILERPLATE_MIN_DOCUMENTS ({cls.BOILERPLATE_MIN_DOCUMENTS}) must be >= 0"
+            )
+
+        if cls.INGEST_STREAM_BATCH < 0:
+            raise ValueError(
+                f"Invalid Config: INGEST_STREAM_BATCH ({cls.INGEST_STREAM_BATCH}) must be >= 0"
+            )
+
         if cls.CHUNK_OVERLAP_TOKENS >= cls.CHUNK_MAX_TOKENS:
             raise ValueError(
                 f"Invalid Config: CHUNK_OVERLAP_TOKENS ({cls.CHUNK_OVERLAP_TOKENS}) "
@@ -499,6 +654,39 @@ class Config:
                 f"Invalid Config: CONTEXTUAL_ENRICHMENT_WINDOW ({cls.CONTEXTUAL_ENRICHMENT_WINDOW}) must be >= 1"
             )
 
+        if cls.CONTEXTUAL_ENRICHMENT_CONCURRENCY < 1:
+            raise ValueError(
+                f"Invalid Config: CONTEXTUAL_ENRICHMENT_CONCURRENCY "
+                f"({cls.CONTEXTUAL_ENRICHMENT_CONCURRENCY}) must be >= 1"
+            )
+
+        if cls.CONTEXTUAL_ENRICHMENT_BATCH_SIZE < 1:
+            raise ValueError(
+                f"Invalid Config: CONTEXTUAL_ENRICHMENT_BATCH_SIZE "
+                f"({cls.CONTEXTUAL_ENRICHMENT_BATCH_SIZE}) must be >= 1"
+            )
+
+        if cls.LLM_CACHE_BACKEND not in cls.VALID_LLM_CACHE_BACKENDS:
+            raise ValueError(
+                f"Invalid LLM_CACHE_BACKEND '{cls.LLM_CACHE_BACKEND}'. "
+                f"Must be one of: {', '.join(cls.VALID_LLM_CACHE_BACKENDS)}"
+            )
+
+        for name in ("LLM_CACHE_MAX_ENTRIES", "LLM_CACHE_MAX_AGE_DAYS"):
+            if getattr(cls, name) < 1:
+                raise ValueError(f"Invalid Config: {name} ({getattr(cls, name)}) must be >= 1")
+
+        if cls.LLM_WARM_INTERVAL < 0:
+            raise ValueError(
+                f"Invalid Config: LLM_WARM_INTERVAL ({cls.LLM_WARM_INTERVAL}) must be >= 0"
+            )
+
+        if cls.CONTEXTUAL_ENRICHMENT_TIMEOUT < 0:
+            raise ValueError(
+                f"Invalid Config: CONTEXTUAL_ENRICHMENT_TIMEOUT "
+                f"({cls.CONTEXTUAL_ENRICHMENT_TIMEOUT}) must be >= 0"
+            )
+
         # Validate FILENAME_TEMPLATE (basic Jinja2 syntax check)
         # 1. This only checks for syntax errors, not missing runtime variables.
         # 2. Imports are local to avoid circular dependencies.
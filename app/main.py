@@ -72,6 +72,13 @@ def main():
                 )
                 for scraper_name in ScraperRegistry.get_scraper_names():
                     scheduler.run_now(scraper_name)
+
+        # Vector store counter reconcile runs whether or not scrapers are scheduled
+        if Config.DATABASE_URL and Config.PGVECTOR_STATS_RECONCILE_HOURS > 0:
+            scheduler = container.scheduler
+            scheduler.add_vector_stats_reconcile(Config.PGVECTOR_STATS_RECONCILE_HOURS)
+            if not scheduler.is_running:
+                scheduler.start()
     except Exception:  # Keep the app booting even if scheduler fails
         logger.exception("Failed to initialize scheduler")
 
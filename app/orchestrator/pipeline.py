@@ -11,6 +11,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from app.backends.parsers.base import docling_json_path
 from app.config import Config
 from app.container import get_container
 from app.scrapers import ScraperRegistry
@@ -129,6 +130,7 @@ class Pipeline:
             status="running",
             scraper_name=self.scraper_name,
         )
+        warmer = self._start_model_warmer()
 
         try:
             # Pre-flight reconciliation (self-healing state from Paperless)
@@ -211,9 +213,44 @@ class Pipeline:
             )
             result.status = "failed"
             result.errors.append(str(e))
+        finally:
+            if warmer is not None:
+                warmer.stop()
 
         return self._finalize_result(result, start_time)
 
+    def _start_model_warmer(self):
+        """Keep the Ollama enrichment model loaded for the duration of the run.
+
+        Returns:
+            A started ModelWarmer, or None when no LLM enrichment is enabled,
+            the backend is not Ollama, or LLM_WARM_INTERVAL is 0
+        """
+        try:
+            if Config.LLM_WARM_INTERVAL <= 0 or Config.LLM_BACKEND != "ollama":
+                return None
+
+            enabled = False
+            for key, default in (
+                ("pipeline.llm_enrichment_enabled", Config.LLM_ENRICHMENT_ENABLED),
+                ("pipeline.contextual_enrichment_enabled", Config.CONTEXTUAL_ENRICHMENT_ENABLED),
+            ):
+                override = self.container.settings.get(key, "")
+                enabled = enabled or (override.lower() == "true" if override != "" else default)
+            if not enabled:
+                return None
+
+            llm_client = self.container.llm_client
+            if not llm_client.is_configured():
+                return None
+
+            from app.services.llm_client import ModelWarmer
+
+            return ModelWarmer(llm_client, interval=Config.LLM_WARM_INTERVAL).start()
+        except Exception as e:
+            self.logger.warning(f"LLM model warm-up unavailable (non-fatal): {e}")
+            return None
+
     def _run_scraper(self):
         """Run the scraper (returns a generator)."""
         scraper = ScraperRegistry.get_scraper(
@@ -473,15 +510,15 @@ class Pipeline:
                     f"Tika not configured (TIKA_SERVER_URL required) "
                     f"for office format: {file_path.name}"
                 )
+            # Text and metadata from a single upload
             tika = self.container.tika_client
-            text = tika.extract_text(file_path)
+            text, tika_meta = tika.extract_text_and_metadata(file_path)
 
             if not text or not text.strip():
                 raise ParserBackendError(
                     f"Tika returned empty text for {file_path.name}"
                 )
 
-            tika_meta = tika.extract_metadata(file_path)
             parse_metadata = tika_meta
 
             # Convert to markdown
@@ -721,6 +758,9 @@ class Pipeline:
                 file_path.unlink()
             if content_path and content_path.exists() and content_path != file_path:
                 content_path.unlink()
+            # Delete DoclingDocument JSON written by the parser
+            if content_path:
+                docling_json_path(content_path).unlink(missing_ok=True)
             # Delete metadata JSON if exists
             metadata_path = file_path.with_suffix(".json")
             if metadata_path.exists():
@@ -31,6 +31,7 @@ class Scheduler:
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._jobs: dict[str, schedule.Job] = {}
+        self._maintenance_jobs: dict[str, schedule.Job] = {}
 
     def load_schedules(self):
         """Load schedules from scraper configuration files."""
@@ -148,6 +149,47 @@ class Scheduler:
             self.logger.error(f"Failed to parse cron '{cron}': {e}")
             return None
 
+    def add_vector_stats_reconcile(self, interval_hours: int):
+        """Periodically recompute the vector store's chunk/document counters.
+
+        Args:
+            interval_hours: Hours between runs (replaces any existing job)
+        """
+        existing = self._maintenance_jobs.pop("vector_stats_reconcile", None)
+        if existing:
+            schedule.cancel_job(existing)
+        self._maintenance_jobs["vector_stats_reconcile"] = (
+            schedule.every(interval_hours).hours.do(self._reconcile_vector_stats)
+        )
+        log_event(
+            self.logger,
+            "info",
+            "scheduler.maintenance.scheduled",
+            job="vector_stats_reconcile",
+            interval_hours=interval_hours,
+        )
+
+    def _reconcile_vector_stats(self):
+        """Reconcile vector store counters (called by scheduler)."""
+        try:
+            from app.container import get_container
+
+            corrected = get_container().vector_store.reconcile_stats()
+            log_event(
+                self.logger,
+                "info",
+                "scheduler.maintenance.complete",
+                job="vector_stats_reconcile",
+                corrected=corrected,
+            )
+        except Exception as e:
+            log_exception(
+                self.logger,
+                e,
+                "scheduler.maintenance.failed",
+                job="vector_stats_reconcile",
+            )
+
     def _run_scraper(self, scraper_name: str):
         """Run a scraper (called by scheduler)."""
         log_event(self.logger, "info", "scheduler.run.start", scraper=scraper_name)
@@ -201,8 +243,14 @@ class Scheduler:
         """Clear all schedules."""
         schedule.clear()
         self._jobs.clear()
+        self._maintenance_jobs.clear()
         self.logger.info("Cleared all schedules")
 
+    @property
+    def is_running(self) -> bool:
+        """Whether the background loop is running."""
+        return self._running
+
     def start(self):
         """Start the scheduler in a background thread."""
         if self._running:
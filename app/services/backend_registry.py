@@ -88,6 +88,7 @@ def _create_local_archive(container: ServiceContainer) -> Any:
 # --- Vector store factories ---
 
 def _create_pgvector_vector_store(container: "ServiceContainer") -> Any:
+    from app.backends.vectorstores.base import parse_metadata_columns
     from app.backends.vectorstores.pgvector_store import PgVectorVectorStore
     from app.config import Config
 
@@ -97,11 +98,36 @@ def _create_pgvector_vector_store(container: "ServiceContainer") -> Any:
     dims = container._safe_int(container._get_config_attr("EMBEDDING_DIMENSIONS", "768"), 768)
     view_name = container._get_config_attr("ANYTHINGLLM_VIEW_NAME", "anythingllm_document_view")
     drop_on_mismatch = getattr(Config, "PGVECTOR_DROP_ON_MISMATCH", False)
+    quantization = getattr(Config, "PGVECTOR_INDEX_QUANTIZATION", "none")
+    rerank_factor = container._safe_int(getattr(Config, "PGVECTOR_RERANK_FACTOR", 4), 4)
+    search_preset = getattr(Config, "PGVECTOR_SEARCH_PRESET", "balanced")
+    metadata_columns = parse_metadata_columns(getattr(Config, "PGVECTOR_METADATA_COLUMNS", ""))
+    boilerplate_min_documents = container._safe_int(
+        getattr(Config, "BOILERPLATE_MIN_DOCUMENTS", 0), 0
+    )
     return PgVectorVectorStore(
         database_url=db_url,
         dimensions=dims,
         view_name=view_name,
         drop_on_dimension_mismatch=bool(drop_on_mismatch),
+        index_quantization=quantization,
+        rerank_factor=rerank_factor,
+        search_preset=search_preset,
+        metadata_columns=metadata_columns,
+        boilerplate_dedup=boilerplate_min_documents > 0,
+    )
+
+
+def _create_local_vector_store(container: "ServiceContainer") -> Any:
+    from app.backends.vectorstores.base import parse_metadata_columns
+    from app.backends.vectorstores.local_store import LocalVectorStore
+    from app.config import Config
+
+    return LocalVectorStore(
+        root_dir=getattr(Config, "LOCAL_VECTOR_DIR", ""),
+        dimensions=container._safe_int(container._get_config_attr("EMBEDDING_DIMENSIONS", "768"), 768),
+        index=getattr(Config, "LOCAL_VECTOR_INDEX", "exact"),
+        metadata_columns=parse_metadata_columns(getattr(Config, "PGVECTOR_METADATA_COLUMNS", "")),
     )
 
 
@@ -148,6 +174,8 @@ def _create_vector_rag(container: "ServiceContainer") -> Any:
     except (ValueError, TypeError) as e:
         raise ValueError(f"Invalid chunking configuration: {e}") from e
     from app.backends.rag.vector_adapter import VectorRAGBackend
+    from app.config import Config
+    from app.services.chunking import resolve_tokenizer_name
     return VectorRAGBackend(
         vector_store=vector_store,
         embedding_client=embedding_client,
@@ -156,6 +184,17 @@ def _create_vector_rag(container: "ServiceContainer") -> Any:
         chunk_overlap_tokens=chunk_overlap_tokens,
         docling_serve_url=container._get_effective_url("docling_serve", "DOCLING_SERVE_URL"),
         docling_serve_timeout=container._get_effective_timeout("docling_serve", "DOCLING_SERVE_TIMEOUT"),
+        boilerplate_min_documents=container._safe_int(
+            container._get_config_attr("BOILERPLATE_MIN_DOCUMENTS", "0"), 0
+        ),
+        ingest_stream_batch=container._safe_int(
+            container._get_config_attr("INGEST_STREAM_BATCH", "64"), 64
+        ),
+        force_reembed=bool(getattr(Config, "INGEST_FORCE_REEMBED", False)),
+        chunk_tokenizer=resolve_tokenizer_name(
+            container._get_config_attr("CHUNK_TOKENIZER", ""),
+            container._get_config_attr("EMBEDDING_MODEL", "nomic-embed-text"),
+        ),
     )
 
 
@@ -176,6 +215,7 @@ _default_registry.register("archive", "local", _create_local_archive)
 
 # Vector stores
 _default_registry.register("vectorstore", "pgvector", _create_pgvector_vector_store)
+_default_registry.register("vectorstore", "local", _create_local_vector_store)
 
 # RAG — "vector" and "pgvector" both point to the generic vector adapter
 _default_registry.register("rag", "ragflow", _create_ragflow_rag)
@@ -6,14 +6,48 @@ Splits documents into overlapping chunks suitable for embedding and retrieval.
 
 from __future__ import annotations
 
+import re
+import threading
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import Optional
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterator, Optional
 
 import requests
 
 from app.utils import get_logger
 
+# Same word boundaries as str.split(); \S is the complement of str.isspace()
+_WORD_RE = re.compile(r"\S+")
+# Lines whose first non-blank character is "#"
+_HEADING_RE = re.compile(r"^[^\S\n]*(#[^\n]*)", re.MULTILINE)
+
+# Hugging Face tokenizers for embedding models served under short names
+# (Ollama tags); other model names are used as the tokenizer name as-is
+EMBEDDING_MODEL_TOKENIZERS = {
+    "nomic-embed-text": "nomic-ai/nomic-embed-text-v1.5",
+    "mxbai-embed-large": "mixedbread-ai/mxbai-embed-large-v1",
+    "bge-m3": "BAAI/bge-m3",
+    "bge-large": "BAAI/bge-large-en-v1.5",
+    "all-minilm": "sentence-transformers/all-MiniLM-L6-v2",
+    "snowflake-arctic-embed": "Snowflake/snowflake-arctic-embed-l",
+    "granite-embedding": "ibm-granite/granite-embedding-278m-multilingual",
+}
+
+# Markdown block syntax for MarkdownChunker
+_ATX_HEADING_RE = re.compile(r"^ {0,3}(#{1,6})[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*$")
+_SETEXT_RE = re.compile(r"^ {0,3}(=+|-+)[ \t]*$")
+_FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_LIST_ITEM_RE = re.compile(r"^[ \t]*(?:[-*+]|\d{1,9}[.)])[ \t]+\S")
+_TABLE_SEPARATOR_RE = re.compile(r"^[ \t]*\|?[ \t]*:?-+:?[ \t]*(\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+_tokenizer_cache: dict[str, Any] = {}
+_tokenizer_failures: dict[str, Exception] = {}
+_tokenizer_lock = threading.Lock()
+
 
 @dataclass
 class Chunk:
@@ -46,6 +80,27 @@ class ChunkingStrategy(ABC):
         """Strategy name for logging."""
         raise NotImplementedError
 
+    def iter_chunks(self, text: str, metadata: Optional[dict] = None) -> Iterator[Chunk]:
+        """Yield chunks of ``text`` one at a time.
+
+        Default: yields from chunk(). Override in strategies that can
+        produce chunks lazily.
+        """
+        yield from self.chunk(text, metadata)
+
+    def chunk_docling_document(
+        self, document: dict, metadata: Optional[dict] = None
+    ) -> Optional[list[Chunk]]:
+        """Chunk a DoclingDocument (JSON dict) produced by the parser.
+
+        Default: structured input is not supported, so callers chunk the
+        Markdown instead. Override in structure-aware strategies.
+
+        Returns:
+            List of Chunk objects, or None when unsupported
+        """
+        return None
+
 
 class FixedChunker(ChunkingStrategy):
     """Fixed-size word-boundary chunker with overlap.
@@ -71,94 +126,641 @@ class FixedChunker(ChunkingStrategy):
         return "fixed"
 
     def chunk(self, text: str, metadata: Optional[dict] = None) -> list[Chunk]:
+        return list(self.iter_chunks(text, metadata))
+
+    def iter_chunks(self, text: str, metadata: Optional[dict] = None) -> Iterator[Chunk]:
+        """Lazily yield the chunks ``chunk()`` returns.
+
+        Words are scanned with a regex iterator and only the current
+        window is held, so memory stays proportional to ``max_tokens``
+        rather than the document length.
+        """
         if not text or not text.strip():
-            return []
+            return
 
         base_metadata = dict(metadata or {})
-        words = text.split()
+        heading_offsets, headings = self._find_headings(text)
+        step = self._max_tokens - self._overlap_tokens
+
+        words = _WORD_RE.finditer(text)
+        window = list(islice(words, self._max_tokens))
+        word_start = 0
+        chunk_index = 0
+
+        while window:
+            chunk_meta = dict(base_metadata)
+            chunk_meta["chunk_index"] = chunk_index
+            chunk_meta["word_start"] = word_start
+            chunk_meta["word_end"] = word_start + len(window)
+
+            # Attach the most recent heading at or before the first word
+            pos = bisect_right(heading_offsets, window[0].start())
+            if pos:
+                chunk_meta["heading_context"] = headings[pos - 1]
+
+            yield Chunk(
+                content=" ".join([match.group() for match in window]),
+                index=chunk_index,
+                metadata=chunk_meta,
+            )
+            chunk_index += 1
+
+            # Advance by (max_tokens - overlap_tokens); a short window
+            # means all words have been consumed
+            if len(window) < self._max_tokens:
+                break
+            following = list(islice(words, step))
+            if not following:
+                break
+            window = window[step:] + following
+            word_start += step
+
+    @staticmethod
+    def _find_headings(text: str) -> tuple[list[int], list[str]]:
+        """Find Markdown heading lines.
+
+        Returns:
+            Tuple of (sorted character offsets of each heading's ``#``,
+            heading text), for bisecting on a chunk's first-word offset
+        """
+        offsets: list[int] = []
+        headings: list[str] = []
+        for match in _HEADING_RE.finditer(text):
+            heading = match.group(1).strip().lstrip("#").strip()
+            if heading:
+                offsets.append(match.start(1))
+                headings.append(heading)
+        return offsets, headings
+
+
+def resolve_tokenizer_name(tokenizer: str = "", embedding_model: str = "") -> str:
+    """Tokenizer to count chunk tokens with.
+
+    An explicit ``tokenizer`` wins; otherwise the embedding model's known
+    tokenizer, or the model name itself (ignoring an Ollama ``:tag``).
+    """
+    if tokenizer:
+        return tokenizer
+    model = embedding_model.split(":", 1)[0]
+    return EMBEDDING_MODEL_TOKENIZERS.get(model, model)
+
+
+def _import_tokenizers() -> Any:
+    """Return the tokenizers module, or None when it is not installed."""
+    try:
+        import tokenizers
+    except ImportError:
+        return None
+    return tokenizers
+
+
+def load_tokenizer(name: str) -> Any:
+    """Load a Hugging Face tokenizer once per process.
+
+    ``name`` is a tokenizer.json path or a Hugging Face Hub repo. Truncation
+    and padding are disabled so whole documents encode in one pass. A
+    failed load is remembered as well: later calls for the same name raise
+    the same error without another file read or Hub request.
+
+    Raises:
+        ImportError: If the tokenizers package is not installed
+    """
+    with _tokenizer_lock:
+        if name in _tokenizer_cache:
+            return _tokenizer_cache[name]
+        if name in _tokenizer_failures:
+            raise _tokenizer_failures[name].with_traceback(None)
+        try:
+            tokenizers = _import_tokenizers()
+            if tokenizers is None:
+                raise ImportError("Token chunking requires the 'tokenizers' package")
+            if Path(name).is_file():
+                tokenizer = tokenizers.Tokenizer.from_file(name)
+            else:
+                tokenizer = tokenizers.Tokenizer.from_pretrained(name)
+        except Exception as e:
+            _tokenizer_failures[name] = e
+            raise
+        tokenizer.no_truncation()
+        tokenizer.no_padding()
+        _tokenizer_cache[name] = tokenizer
+        return tokenizer
+
+
+class TokenChunker(ChunkingStrategy):
+    """Model-token chunker with overlap.
+
+    Encodes the document once with the embedding model's tokenizer and
+    cuts chunks from the token offset mapping, so ``max_tokens`` is the
+    model's real context (less its special tokens) and overlapping
+    windows are never re-tokenised. Chunk boundaries are moved back to
+    the start of a word when one would split it. Falls back to
+    FixedChunker when the tokenizer cannot be loaded.
+    """
+
+    def __init__(self, max_tokens: int = 512, overlap_tokens: int = 64, tokenizer: str = ""):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be >= 1")
+        if overlap_tokens < 0:
+            raise ValueError("overlap_tokens must be >= 0")
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be < max_tokens")
+        if not tokenizer:
+            raise ValueError("tokenizer is required for token chunking")
+        self._max_tokens = max_tokens
+        self._overlap_tokens = overlap_tokens
+        self._tokenizer_name = tokenizer
+        self._tokenizer_failed = False
+        self._fallback = FixedChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        self.logger = get_logger("chunking.token")
+
+    @property
+    def name(self) -> str:
+        return "token"
+
+    def chunk(self, text: str, metadata: Optional[dict] = None) -> list[Chunk]:
+        if not text or not text.strip():
+            return []
 
-        if not words:
+        if self._tokenizer_failed:
+            return self._fallback.chunk(text, metadata)
+        try:
+            tokenizer = load_tokenizer(self._tokenizer_name)
+        except Exception as e:
+            # Chunk by words from now on rather than retry per document
+            self.logger.warning(
+                f"Tokenizer '{self._tokenizer_name}' unavailable, using word chunking: {e}"
+            )
+            self._tokenizer_failed = True
+            return self._fallback.chunk(text, metadata)
+
+        encoding = tokenizer.encode(text, add_special_tokens=False)
+        offsets = encoding.offsets
+        word_ids = encoding.word_ids
+        total = len(offsets)
+        if not total:
             return []
 
-        # Pre-compute heading context for each word position.
-        # Walk through words and track the most recent heading line.
-        heading_context = self._build_heading_map(text)
+        # [CLS]/[SEP] and friends are added by the embedding model too
+        budget = max(self._max_tokens - tokenizer.num_special_tokens_to_add(False), 1)
+        overlap = min(self._overlap_tokens, budget - 1)
+        base_metadata = dict(metadata or {})
+        heading_offsets, headings = FixedChunker._find_headings(text)
+
+        def word_start(pos: int, floor: int) -> int:
+            """Move ``pos`` back to the first token of its word, staying above ``floor``."""
+            word = word_ids[pos]
+            if word is None:
+                return pos
+            back = pos
+            while back > floor + 1 and word_ids[back - 1] == word:
+                back -= 1
+            return back if word_ids[back - 1] != word else pos
 
         chunks: list[Chunk] = []
         start = 0
-        chunk_index = 0
-
-        while start < len(words):
-            end = min(start + self._max_tokens, len(words))
-            chunk_words = words[start:end]
-            content = " ".join(chunk_words)
+        while start < total:
+            end = min(start + budget, total)
+            if end < total:
+                end = word_start(end, start)
 
+            char_start = offsets[start][0]
+            char_end = offsets[end - 1][1]
             chunk_meta = dict(base_metadata)
-            chunk_meta["chunk_index"] = chunk_index
-            chunk_meta["word_start"] = start
-            chunk_meta["word_end"] = end
+            chunk_meta["chunk_index"] = len(chunks)
+            chunk_meta["token_start"] = start
+            chunk_meta["token_end"] = end
+            chunk_meta["char_start"] = char_start
+            chunk_meta["char_end"] = char_end
+
+            pos = bisect_right(heading_offsets, char_start)
+            if pos:
+                chunk_meta["heading_context"] = headings[pos - 1]
+
+            chunks.append(Chunk(
+                content=text[char_start:char_end],
+                index=len(chunks),
+                metadata=chunk_meta,
+            ))
+
+            if end >= total:
+                break
+            start = word_start(max(end - overlap, start + 1), start)
 
-            # Attach heading context from the start position
-            if start in heading_context:
-                chunk_meta["heading_context"] = heading_context[start]
+        return chunks
 
-            chunks.append(Chunk(content=content, index=chunk_index, metadata=chunk_meta))
-            chunk_index += 1
 
-            # Advance by (max_tokens - overlap_tokens)
-            step = self._max_tokens - self._overlap_tokens
-            start += step
+@dataclass
+class _Block:
+    """A Markdown block: paragraph, list, table or code, under its headings."""
 
-            # If we've consumed all words, stop
-            if end >= len(words):
-                break
+    kind: str
+    lines: list[str]
+    headings: tuple[str, ...]
+    # DoclingDocument provenance: page numbers and item refs ("#/tables/0")
+    pages: tuple[int, ...] = ()
+    refs: tuple[str, ...] = ()
 
-        return chunks
 
-    def _build_heading_map(self, text: str) -> dict[int, str]:
-        """Build a mapping from word index to the current heading context.
+def parse_markdown_blocks(text: str) -> list[_Block]:
+    """Split Markdown into blocks, each tagged with its heading breadcrumb.
 
-        Only records entries at positions where a heading starts, so lookup
-        should find the most recent heading at or before a given word index.
-        """
-        heading_map: dict[int, str] = {}
-        current_heading: Optional[str] = None
-        word_pos = 0
+    Recognises ATX and setext headings, fenced code, pipe tables and
+    lists; everything else is a paragraph. Heading lines themselves are
+    not emitted as blocks.
+    """
+    blocks: list[_Block] = []
+    stack: list[tuple[int, str]] = []
+    current: Optional[_Block] = None
+    fence = ""
+
+    def headings() -> tuple[str, ...]:
+        return tuple(title for _, title in stack)
+
+    def close() -> None:
+        nonlocal current
+        if current is not None:
+            blocks.append(current)
+            current = None
+
+    def open_block(kind: str, line: str) -> None:
+        nonlocal current
+        close()
+        current = _Block(kind, [line], headings())
+
+    def set_heading(level: int, title: str) -> None:
+        close()
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, title))
+
+    for line in text.splitlines():
+        if fence:
+            current.lines.append(line)  # type: ignore[union-attr]
+            if line.strip().startswith(fence):
+                fence = ""
+                close()
+            continue
+
+        stripped = line.strip()
+        if not stripped:
+            # Blank lines end paragraphs and tables; lists may continue
+            if current is not None and current.kind != "list":
+                close()
+            elif current is not None:
+                current.lines.append(line)
+            continue
+
+        fence_match = _FENCE_RE.match(line)
+        heading_match = _ATX_HEADING_RE.match(line)
+        if fence_match:
+            open_block("code", line)
+            fence = fence_match.group(1)
+        elif heading_match:
+            set_heading(len(heading_match.group(1)), heading_match.group(2).strip())
+        elif (
+            current is not None and current.kind == "paragraph"
+            and _SETEXT_RE.match(line)
+        ):
+            title = " ".join(part.strip() for part in current.lines)
+            current = None
+            set_heading(1 if stripped.startswith("=") else 2, title)
+        elif stripped.startswith("|"):
+            if current is None or current.kind != "table":
+                open_block("table", line)
+            else:
+                current.lines.append(line)
+        elif _LIST_ITEM_RE.match(line):
+            if current is None or current.kind != "list":
+                open_block("list", line)
+            else:
+                current.lines.append(line)
+        elif current is not None and current.kind == "list" and (
+            line[:1] in (" ", "\t") or current.lines[-1].strip()
+        ):
+            # Indented or lazy continuation of the previous item
+            current.lines.append(line)
+        elif current is not None and current.kind == "paragraph":
+            current.lines.append(line)
+        else:
+            open_block("paragraph", line)
+
+    close()
+    for block in blocks:
+        while block.lines and not block.lines[-1].strip():
+            block.lines.pop()
+    return [block for block in blocks if block.lines]
+
+
+def _docling_cell(text: Any) -> str:
+    """Table cell text safe for a single Markdown table row."""
+    return " ".join(str(text or "").split()).replace("|", "\\|")
+
+
+def _docling_table_lines(table: dict) -> list[str]:
+    """Render a DoclingDocument table as Markdown table rows."""
+    data = table.get("data") or {}
+    grid = data.get("grid")
+    if not grid:
+        # Older exports only carry the cell list
+        rows, cols = data.get("num_rows", 0), data.get("num_cols", 0)
+        grid = [[{} for _ in range(cols)] for _ in range(rows)]
+        for cell in data.get("table_cells") or []:
+            row, col = cell.get("start_row_offset_idx", 0), cell.get("start_col_offset_idx", 0)
+            if row < rows and col < cols:
+                grid[row][col] = cell
+    rows_text = [[_docling_cell(cell.get("text")) for cell in row] for row in grid if row]
+    if not rows_text:
+        return []
+    lines = ["| " + " | ".join(row) + " |" for row in rows_text]
+    lines.insert(1, "|" + "---|" * len(rows_text[0]))
+    return lines
+
+
+def parse_docling_blocks(document: dict) -> list[_Block]:
+    """Split a DoclingDocument (JSON dict) into blocks in reading order.
+
+    Walks the body tree, so page headers and footers (furniture) are left
+    out. Each block keeps its heading breadcrumb plus the page numbers and
+    item refs it came from.
+    """
+    blocks: list[_Block] = []
+    stack: list[tuple[int, str]] = []
+
+    def resolve(ref: Any) -> Optional[dict]:
+        path = (ref or {}).get("$ref", "") if isinstance(ref, dict) else ""
+        parts = path.lstrip("#/").split("/")
+        try:
+            if len(parts) == 1:
+                return document[parts[0]]
+            return document[parts[0]][int(parts[1])]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return None
+
+    def provenance(item: dict) -> tuple[tuple[int, ...], tuple[str, ...]]:
+        pages = tuple(sorted({p["page_no"] for p in item.get("prov") or [] if "page_no" in p}))
+        ref = item.get("self_ref")
+        return pages, (ref,) if ref else ()
+
+    def add(kind: str, lines: list[str], item: dict) -> None:
+        pages, refs = provenance(item)
+        blocks.append(_Block(kind, lines, tuple(t for _, t in stack), pages, refs))
+
+    def add_list(group: dict, depth: int, block: Optional[_Block]) -> _Block:
+        if block is None:
+            block = _Block("list", [], tuple(t for _, t in stack))
+            blocks.append(block)
+        for child in map(resolve, group.get("children") or []):
+            if child is None:
+                continue
+            if child.get("label") == "list_item":
+                marker = child.get("marker") or "-"
+                block.lines.append(f"{'  ' * depth}{marker} {child.get('text', '').strip()}")
+                pages, refs = provenance(child)
+                block.pages = tuple(sorted(set(block.pages) | set(pages)))
+                block.refs += refs
+                for grandchild in map(resolve, child.get("children") or []):
+                    if grandchild is not None and grandchild.get("label") in ("list", "ordered_list"):
+                        add_list(grandchild, depth + 1, block)
+            elif child.get("label") in ("list", "ordered_list"):
+                add_list(child, depth + 1, block)
+        return block
+
+    def walk(item: dict) -> None:
+        label = item.get("label", "")
+        ref = item.get("self_ref", "")
+        if label in ("list", "ordered_list"):
+            add_list(item, 0, None)
+            return
+        if ref.startswith("#/tables/"):
+            for caption in map(resolve, item.get("captions") or []):
+                if caption is not None and caption.get("text", "").strip():
+                    add("paragraph", [caption["text"].strip()], caption)
+            lines = _docling_table_lines(item)
+            if lines:
+                add("table", lines, item)
+            return
+        if ref.startswith("#/pictures/"):
+            for caption in map(resolve, item.get("captions") or []):
+                if caption is not None and caption.get("text", "").strip():
+                    add("paragraph", [caption["text"].strip()], caption)
+            return
+        if ref.startswith("#/texts/"):
+            text = (item.get("text") or "").strip()
+            if label in ("page_header", "page_footer", "caption") or not text:
+                pass
+            elif label in ("title", "section_header"):
+                level = 0 if label == "title" else int(item.get("level") or 1)
+                while stack and stack[-1][0] >= level:
+                    stack.pop()
+                stack.append((level, text))
+            elif label == "code":
+                add("code", ["```", *text.splitlines(), "```"], item)
+            else:
+                add("paragraph", [text], item)
+        for child in map(resolve, item.get("children") or []):
+            if child is not None:
+                walk(child)
+
+    body = document.get("body")
+    if isinstance(body, dict):
+        walk(body)
+    return [block for block in blocks if block.lines]
+
+
+class MarkdownChunker(ChunkingStrategy):
+    """In-process structure-aware Markdown chunker.
+
+    Local counterpart of docling's HybridChunker: blocks under the same
+    heading breadcrumb are packed together up to ``max_tokens``; blocks
+    never share a chunk across headings. Oversized blocks are split at
+    natural boundaries (table rows with the header repeated, list items,
+    code lines, sentences) and finally by tokens. Chunks carry the same
+    ``headings``/``heading_context`` metadata as the docling chunker.
+
+    Tokens are words unless ``tokenizer`` names a Hugging Face tokenizer,
+    as for TokenChunker.
+    """
+
+    def __init__(self, max_tokens: int = 512, overlap_tokens: int = 64, tokenizer: str = ""):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be >= 1")
+        self._max_tokens = max_tokens
+        self._tokenizer_name = tokenizer
+        # Splits single blocks larger than the budget; overlap only
+        # applies within such a block
+        overlap_tokens = min(overlap_tokens, max_tokens - 1)
+        self._word_splitter = FixedChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        self._splitter: ChunkingStrategy = self._word_splitter
+        if tokenizer:
+            self._splitter = TokenChunker(
+                max_tokens=max_tokens, overlap_tokens=overlap_tokens, tokenizer=tokenizer
+            )
+        self.logger = get_logger("chunking.markdown")
+
+    @property
+    def name(self) -> str:
+        return "markdown"
 
-        for line in text.split("\n"):
-            stripped = line.strip()
-            line_words = line.split()
+    def _token_counter(self) -> tuple[Any, int]:
+        """Return (count function, budget), falling back to word counts."""
+        if self._tokenizer_name:
+            try:
+                tokenizer = load_tokenizer(self._tokenizer_name)
+            except Exception as e:
+                # Count words from now on rather than retry per document
+                self.logger.warning(
+                    f"Tokenizer '{self._tokenizer_name}' unavailable, counting words: {e}"
+                )
+                self._tokenizer_name = ""
+                self._splitter = self._word_splitter
+            else:
+                budget = self._max_tokens - tokenizer.num_special_tokens_to_add(False)
+                return (
+                    lambda text: len(tokenizer.encode(text, add_special_tokens=False).offsets),
+                    max(budget, 1),
+                )
+        return (lambda text: len(text.split())), self._max_tokens
 
-            if stripped.startswith("#"):
-                # Extract heading text (remove # prefix)
-                current_heading = stripped.lstrip("#").strip()
-                if current_heading and line_words:
-                    heading_map[word_pos] = current_heading
+    def chunk(self, text: str, metadata: Optional[dict] = None) -> list[Chunk]:
+        if not text or not text.strip():
+            return []
 
-            word_pos += len(line_words)
+        return self._chunk_blocks(parse_markdown_blocks(text), metadata, "markdown")
 
-        # Propagate headings forward: for each chunk start position,
-        # we want the most recent heading.
-        if heading_map:
-            sorted_positions = sorted(heading_map.keys())
-            full_map: dict[int, str] = {}
-            total_words = len(text.split())
-            heading_idx = 0
+    def chunk_docling_document(
+        self, document: dict, metadata: Optional[dict] = None
+    ) -> Optional[list[Chunk]]:
+        """Chunk a DoclingDocument directly, keeping page and item provenance.
 
-            for pos in range(total_words):
-                # Advance to the right heading
-                while (
-                    heading_idx < len(sorted_positions) - 1
-                    and sorted_positions[heading_idx + 1] <= pos
-                ):
-                    heading_idx += 1
+        Chunks additionally carry ``page_numbers`` and ``doc_items`` (refs
+        such as "#/tables/2") for the items they were built from.
+        """
+        return self._chunk_blocks(parse_docling_blocks(document), metadata, "docling_document")
 
-                if sorted_positions[heading_idx] <= pos:
-                    full_map[pos] = heading_map[sorted_positions[heading_idx]]
+    def _chunk_blocks(
+        self, blocks: list[_Block], metadata: Optional[dict], chunker: str
+    ) -> list[Chunk]:
+        """Pack blocks into chunks of at most ``max_tokens`` tokens."""
+        count, budget = self._token_counter()
+        base_metadata = dict(metadata or {})
+        chunks: list[Chunk] = []
 
-            return full_map
+        # Pieces of consecutive blocks under the same headings are merged
+        pending: list[str] = []
+        pending_tokens = 0
+        pending_headings: tuple[str, ...] = ()
+        pending_pages: set[int] = set()
+        pending_refs: list[str] = []
 
-        return heading_map
+        def emit() -> None:
+            nonlocal pending, pending_tokens, pending_pages, pending_refs
+            chunk_meta = dict(base_metadata)
+            chunk_meta["chunk_index"] = len(chunks)
+            chunk_meta["num_tokens"] = pending_tokens
+            chunk_meta["chunker"] = chunker
+            if pending_headings:
+                chunk_meta["heading_context"] = pending_headings[-1]
+                chunk_meta["headings"] = list(pending_headings)
+            if pending_pages:
+                chunk_meta["page_numbers"] = sorted(pending_pages)
+            if pending_refs:
+                chunk_meta["doc_items"] = list(dict.fromkeys(pending_refs))
+            chunks.append(Chunk(
+                content="\n\n".join(pending), index=len(chunks), metadata=chunk_meta,
+            ))
+            pending, pending_tokens, pending_pages, pending_refs = [], 0, set(), []
+
+        for block in blocks:
+            if block.headings != pending_headings and pending:
+                emit()
+            pending_headings = block.headings
+            for piece, tokens in self._split_block(block, count, budget):
+                if pending and pending_tokens + tokens > budget:
+                    emit()
+                pending.append(piece)
+                pending_tokens += tokens
+                pending_pages.update(block.pages)
+                pending_refs.extend(block.refs)
+        if pending:
+            emit()
+        return chunks
+
+    def _split_block(self, block: _Block, count: Any, budget: int) -> list[tuple[str, int]]:
+        """Split a block into (text, tokens) pieces that each fit ``budget``."""
+        content = "\n".join(block.lines)
+        tokens = count(content)
+        if tokens <= budget:
+            return [(content, tokens)]
+
+        if block.kind == "table":
+            header = block.lines[:2] if (
+                len(block.lines) > 2 and _TABLE_SEPARATOR_RE.match(block.lines[1])
+            ) else []
+            return self._pack(block.lines[len(header):], "\n", count, budget, header)
+        if block.kind == "list":
+            items: list[list[str]] = []
+            for line in block.lines:
+                if _LIST_ITEM_RE.match(line) or not items:
+                    items.append([line])
+                else:
+                    items[-1].append(line)
+            return self._pack(["\n".join(item).rstrip() for item in items], "\n", count, budget)
+        if block.kind == "code" and len(block.lines) > 2:
+            # Keep every piece fenced (the closing fence may be missing at EOF)
+            closed = _FENCE_RE.match(block.lines[-1]) is not None
+            body = block.lines[1:-1] if closed else block.lines[1:]
+            return self._pack(
+                body, "\n", count, budget, [block.lines[0]], block.lines[-1] if closed else ""
+            )
+        return self._pack(_SENTENCE_END_RE.split(content), " ", count, budget)
+
+    def _pack(
+        self,
+        units: list[str],
+        joiner: str,
+        count: Any,
+        budget: int,
+        header: Optional[list[str]] = None,
+        footer: str = "",
+    ) -> list[tuple[str, int]]:
+        """Pack units into pieces of at most ``budget`` tokens.
+
+        Each piece is wrapped in ``header`` lines and ``footer``, which are
+        dropped when they would take more than half the budget.
+        """
+        prefix = "\n".join(header or [])
+        prefix_tokens = (count(prefix) if prefix else 0) + (count(footer) if footer else 0)
+        if prefix_tokens * 2 > budget:
+            prefix, footer, prefix_tokens = "", "", 0
+
+        pieces: list[tuple[str, int]] = []
+        current: list[str] = []
+        current_tokens = prefix_tokens
+
+        def flush() -> None:
+            nonlocal current, current_tokens
+            if current:
+                piece = "\n".join(part for part in (prefix, joiner.join(current), footer) if part)
+                pieces.append((piece, current_tokens))
+            current, current_tokens = [], prefix_tokens
+
+        for unit in units:
+            if not unit.strip():
+                continue
+            tokens = count(unit)
+            if prefix_tokens + tokens > budget:
+                # A single unit over budget: split it by tokens
+                flush()
+                for part in self._splitter.chunk(unit):
+                    pieces.append((part.content, count(part.content)))
+                continue
+            if current and current_tokens + tokens > budget:
+                flush()
+            current.append(unit)
+            current_tokens += tokens
+        flush()
+        return pieces
 
 
 class HybridDoclingChunker(ChunkingStrategy):
@@ -175,17 +777,27 @@ class HybridDoclingChunker(ChunkingStrategy):
         overlap_tokens: int = 64,
         docling_serve_url: str = "",
         docling_serve_timeout: int = 120,
+        tokenizer: str = "",
     ):
         self._max_tokens = max_tokens
         self._docling_url = docling_serve_url.rstrip("/") if docling_serve_url else ""
         self._timeout = docling_serve_timeout
         self._fallback = FixedChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+        # Chunks parser-supplied DoclingDocuments without a docling-serve call
+        self._structured = MarkdownChunker(
+            max_tokens=max_tokens, overlap_tokens=overlap_tokens, tokenizer=tokenizer
+        )
         self.logger = get_logger("chunking.hybrid")
 
     @property
     def name(self) -> str:
         return "hybrid"
 
+    def chunk_docling_document(
+        self, document: dict, metadata: Optional[dict] = None
+    ) -> Optional[list[Chunk]]:
+        return self._structured.chunk_docling_document(document, metadata)
+
     def chunk(self, text: str, metadata: Optional[dict] = None) -> list[Chunk]:
         if not text or not text.strip():
             return []
@@ -294,15 +906,19 @@ def create_chunker(
     overlap_tokens: int = 64,
     docling_serve_url: str = "",
     docling_serve_timeout: int = 120,
+    tokenizer: str = "",
 ) -> ChunkingStrategy:
     """Factory function to create a chunking strategy.
 
     Args:
-        strategy: Strategy name ("fixed" or "hybrid")
-        max_tokens: Maximum tokens (words) per chunk
+        strategy: Strategy name ("fixed", "hybrid", "token" or "markdown")
+        max_tokens: Maximum tokens per chunk (words, except for "token")
         overlap_tokens: Number of overlapping tokens between chunks
         docling_serve_url: URL for docling-serve (hybrid strategy)
         docling_serve_timeout: Request timeout for docling-serve
+        tokenizer: Tokenizer name or tokenizer.json path (token strategy;
+            optional for markdown and for hybrid's DoclingDocument
+            chunking, which otherwise count words)
 
     Returns:
         ChunkingStrategy instance
@@ -318,6 +934,19 @@ def create_chunker(
             overlap_tokens=overlap_tokens,
             docling_serve_url=docling_serve_url,
             docling_serve_timeout=docling_serve_timeout,
+            tokenizer=tokenizer,
+        )
+    elif strategy == "token":
+        return TokenChunker(
+            max_tokens=max_tokens,
+            overlap_tokens=overlap_tokens,
+            tokenizer=tokenizer,
+        )
+    elif strategy == "markdown":
+        return MarkdownChunker(
+            max_tokens=max_tokens,
+            overlap_tokens=overlap_tokens,
+            tokenizer=tokenizer,
         )
     else:
         raise ValueError(f"Unknown chunking strategy: {strategy}")
@@ -23,6 +23,7 @@ if TYPE_CHECKING:
     from app.services.gotenberg_client import GotenbergClient
     from app.services.tika_client import TikaClient
     from app.services.embedding_client import EmbeddingClient
+    from app.services.reranker_client import RerankerClient
     from app.services.llm_client import LLMClient
     from app.services.state_store import StateStore
 
@@ -68,6 +69,7 @@ class ServiceContainer:
         self._gotenberg_client: Optional[GotenbergClient] = None
         self._tika_client: Optional[TikaClient] = None
         self._embedding_client: Optional[EmbeddingClient] = None
+        self._reranker_client: Optional[RerankerClient] = None
         self._llm_client: Optional[LLMClient] = None
 
         # State store (PostgreSQL, lazy-loaded)
@@ -240,6 +242,7 @@ class ServiceContainer:
         self._ragflow_client = None
         self._flaresolverr_client = None
         self._embedding_client = None
+        self._reranker_client = None
         self._llm_client = None
         self._state_store = None
         self.logger.debug("Service/backend instances reset (settings preserved)")
@@ -414,6 +417,27 @@ class ServiceContainer:
             self.logger.debug("Initialized EmbeddingClient")
         return self._embedding_client
 
+    @property
+    def reranker_client(self) -> "RerankerClient":
+        """
+        Get reranker client (lazy-loaded singleton).
+
+        Returns:
+            RerankerClient instance (check is_configured() before use)
+        """
+        if self._reranker_client is None:
+            from app.services.reranker_client import create_reranker_client
+
+            self._reranker_client = create_reranker_client(
+                backend=self._get_config_attr("RERANKER_BACKEND", "api"),
+                model=self._get_config_attr("RERANKER_MODEL", ""),
+                url=self._get_effective_url("reranker", "RERANKER_URL"),
+                api_key=self._get_config_attr("RERANKER_API_KEY", ""),
+                timeout=self._get_effective_timeout("reranker", "RERANKER_TIMEOUT"),
+            )
+            self.logger.debug("Initialized RerankerClient")
+        return self._reranker_client
+
     @property
     def llm_client(self) -> "LLMClient":
         """
@@ -438,7 +462,29 @@ class ServiceContainer:
                 url=llm_url,
                 api_key=self._get_config_attr("LLM_API_KEY", ""),
                 timeout=self._get_effective_timeout("llm", "LLM_TIMEOUT"),
+                keep_alive=self._get_config_attr("LLM_KEEP_ALIVE", ""),
+                # Enough pooled connections for every concurrent enrichment request
+                pool_size=max(
+                    10,
+                    self._safe_int(
+                        self._get_config_attr("CONTEXTUAL_ENRICHMENT_CONCURRENCY", 1), 1
+                    ),
+                ),
             )
+            if self._get_config_attr("LLM_CACHE_ENABLED", False):
+                from app.services.llm_cache import with_llm_cache
+
+                self._llm_client = with_llm_cache(
+                    self._llm_client,
+                    backend=self._get_config_attr("LLM_CACHE_BACKEND", "auto"),
+                    path=self._get_config_attr("LLM_CACHE_PATH", None),
+                    max_entries=self._safe_int(
+                        self._get_config_attr("LLM_CACHE_MAX_ENTRIES", 50000), 50000
+                    ),
+                    max_age_days=self._safe_int(
+                        self._get_config_attr("LLM_CACHE_MAX_AGE_DAYS", 90), 90
+                    ),
+                )
             self.logger.debug("Initialized LLMClient")
         return self._llm_client
 
@@ -466,6 +512,7 @@ class ServiceContainer:
         self._gotenberg_client = None
         self._tika_client = None
         self._embedding_client = None
+        self._reranker_client = None
         self._llm_client = None
         self._state_store = None
         self.logger.debug("Service container reset")
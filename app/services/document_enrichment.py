@@ -8,8 +8,10 @@ Tier 2: Chunk-level contextual descriptions for improved retrieval.
 from __future__ import annotations
 
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Callable, Optional
 
 if TYPE_CHECKING:
     from app.services.llm_client import LLMClient
@@ -43,15 +45,55 @@ to improve search retrieval.
 
 Respond with ONLY the situating paragraph in plain text, no markdown formatting."""
 
+# Tier 2 batched system prompt — one request situates several numbered chunks
+_TIER2_BATCH_SYSTEM_PROMPT = """\
+You are a document analysis assistant. Given context about a larger document and \
+a numbered list of chunks from it, write a short 2-3 sentence paragraph for EACH \
+chunk that situates it within the document.
+
+Explain what section each chunk belongs to, what the document is about, and how the \
+chunk relates to the broader content. These descriptions will be prepended to the \
+chunks to improve search retrieval.
+
+Respond with ONLY valid JSON of the form {"contexts": ["...", "..."]}: one plain-text \
+paragraph per chunk, in the same order as the chunks, and exactly as many paragraphs \
+as there are chunks."""
+
 
 class DocumentEnrichmentService:
     """Service for enriching documents and chunks with LLM-generated metadata."""
 
-    def __init__(self, llm_client: "LLMClient", max_tokens: int = 8000):
+    def __init__(
+        self,
+        llm_client: "LLMClient",
+        max_tokens: int = 8000,
+        concurrency: int = 1,
+        chunk_timeout: Optional[float] = None,
+        batch_size: int = 1,
+    ):
+        """
+        Args:
+            llm_client: Client used for all LLM calls
+            max_tokens: Approximate context budget for document text
+            concurrency: Tier 2 requests in flight at once; match the LLM
+                server's parallel slots (e.g. OLLAMA_NUM_PARALLEL)
+            chunk_timeout: Per-request timeout in seconds for Tier 2 calls
+                (None uses the client's default)
+            batch_size: Chunks situated per Tier 2 request; the shared
+                document context is sent once per batch (1 = one request
+                per chunk)
+        """
         from app.utils import get_logger
 
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
         self._llm = llm_client
         self._max_tokens = max_tokens
+        self._concurrency = concurrency
+        self._chunk_timeout = chunk_timeout
+        self._batch_size = batch_size
         self.logger = get_logger("services.document_enrichment")
 
     def enrich_metadata(self, content_path: Path) -> Optional[dict]:
@@ -136,64 +178,187 @@ class DocumentEnrichmentService:
         parts.append(f"\nCurrent chunk ({chunk_idx}):\n{chunk_content}")
         return "\n\n".join(parts)
 
+    def _build_batch_context(
+        self,
+        group: list[int],
+        all_chunks: list["Chunk"],
+        document_context: str,
+        window: int,
+    ) -> str:
+        """Build one context string for a batch of chunks.
+
+        The document context (full text or outline) is included once,
+        followed by neighbours of the batch and the numbered chunks.
+        """
+        parts = [document_context]
+
+        members = set(group)
+        start = max(0, group[0] - window)
+        end = min(len(all_chunks), group[-1] + window + 1)
+        for i in range(start, end):
+            if i in members:
+                continue
+            neighbor = all_chunks[i].content[:200]
+            label = "preceding" if i < group[0] else "following" if i > group[-1] else "nearby"
+            parts.append(f"[{label} chunk {i}]: {neighbor}")
+
+        numbered = "\n\n".join(
+            f"Chunk {n} (document chunk {i}):\n{all_chunks[i].content}"
+            for n, i in enumerate(group, 1)
+        )
+        parts.append(f"\n{len(group)} chunks to situate:\n\n{numbered}")
+        return "\n\n".join(parts)
+
+    def _situate_batch(
+        self,
+        group: list[int],
+        chunks: list["Chunk"],
+        build_context: Callable[[list[int]], str],
+    ) -> Optional[list[str]]:
+        """Situate a batch of chunks in one request.
+
+        Returns:
+            Enriched text per chunk, or None when the request fails or the
+            response is not one non-empty paragraph per chunk
+        """
+        try:
+            messages = [
+                {"role": "system", "content": _TIER2_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": build_context(group)},
+            ]
+            kwargs = {"timeout": self._chunk_timeout} if self._chunk_timeout else {}
+            result = self._llm.chat(messages, response_format="json", **kwargs)
+            parsed = json.loads(result.content)
+            if isinstance(parsed, dict):
+                parsed = parsed.get("contexts")
+            if (
+                not isinstance(parsed, list)
+                or len(parsed) != len(group)
+                or not all(isinstance(p, str) and p.strip() for p in parsed)
+            ):
+                got = len(parsed) if isinstance(parsed, list) else type(parsed).__name__
+                self.logger.debug(
+                    f"Batch of {len(group)} chunks got {got} contexts, "
+                    "falling back to per-chunk requests"
+                )
+                return None
+            return [
+                f"{situating.strip()}\n\n{chunks[i].content}"
+                for i, situating in zip(group, parsed)
+            ]
+        except Exception as e:
+            self.logger.debug(
+                f"Batch enrichment of chunks {group[0]}-{group[-1]} failed, "
+                f"falling back to per-chunk requests: {e}"
+            )
+            return None
+
+    def _situate_chunk(
+        self, i: int, chunk: "Chunk", build_context: Callable[[int], str]
+    ) -> str:
+        """Ask the LLM to situate one chunk; raw content on any failure."""
+        try:
+            context = build_context(i)
+            messages = [
+                {"role": "system", "content": _TIER2_SYSTEM_PROMPT},
+                {"role": "user", "content": context},
+            ]
+            kwargs = {"timeout": self._chunk_timeout} if self._chunk_timeout else {}
+            result = self._llm.chat(messages, **kwargs)
+            situating_text = result.content.strip()
+            return f"{situating_text}\n\n{chunk.content}"
+        except Exception as e:
+            self.logger.warning(
+                f"Chunk {i} enrichment failed, using raw content: {e}"
+            )
+            return chunk.content
+
     def enrich_chunks(
         self,
         chunks: list["Chunk"],
         full_text: str,
         window: int = 3,
+        positions: Optional[list[int]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
     ) -> list[str]:
         """Add contextual descriptions to chunks for improved retrieval.
 
         For short documents (under max_tokens), passes full text as context.
-        For long documents, passes outline + surrounding chunks.
+        For long documents, passes outline + surrounding chunks. With
+        ``batch_size`` > 1, consecutive targets are situated ``batch_size``
+        at a time so that context is sent once per batch; a batch whose
+        response does not validate is retried one chunk at a time. Up to
+        ``concurrency`` requests run at once; results keep input order and
+        a failed chunk falls back to its raw content.
 
         Args:
             chunks: List of Chunk objects
             full_text: Full document text
             window: Number of surrounding chunks to include as context
+            positions: Optional list positions to enrich (default: all).
+                Neighbour context still comes from the full chunk list.
+            progress: Optional callback, called with (completed, total)
+                as each chunk finishes
 
         Returns:
-            List of enriched text strings (description prepended to chunk content)
+            List of enriched text strings (description prepended to chunk
+            content), one per enriched position
         """
         if not chunks:
             return []
 
+        targets = list(range(len(chunks))) if positions is None else positions
+
         try:
             outline = self._extract_outline(full_text)
             char_limit = self._max_tokens * 4
             is_short = len(full_text) <= char_limit
 
-            enriched: list[str] = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    if is_short:
-                        # Leave room for chunk content and system prompt overhead
-                        max_doc_chars = char_limit - len(chunk.content) - 500
-                        doc_text = full_text[:max_doc_chars] if len(full_text) > max_doc_chars else full_text
-                        context = f"Full document:\n{doc_text}\n\nCurrent chunk ({i}):\n{chunk.content}"
-                    else:
-                        context = self._build_chunk_context(
-                            i, chunk.content, chunks, outline, window
-                        )
-
-                    messages = [
-                        {"role": "system", "content": _TIER2_SYSTEM_PROMPT},
-                        {"role": "user", "content": context},
-                    ]
-
-                    result = self._llm.chat(messages)
-                    situating_text = result.content.strip()
-                    enriched.append(f"{situating_text}\n\n{chunk.content}")
-                except Exception as e:
-                    self.logger.warning(
-                        f"Chunk {i} enrichment failed, using raw content: {e}"
-                    )
-                    enriched.append(chunk.content)
-
-            return enriched
+            def context_for(i: int) -> str:
+                chunk = chunks[i]
+                if is_short:
+                    # Leave room for chunk content and system prompt overhead
+                    max_doc_chars = char_limit - len(chunk.content) - 500
+                    doc_text = full_text[:max_doc_chars] if len(full_text) > max_doc_chars else full_text
+                    return f"Full document:\n{doc_text}\n\nCurrent chunk ({i}):\n{chunk.content}"
+                return self._build_chunk_context(i, chunk.content, chunks, outline, window)
+
+            def batch_context_for(group: list[int]) -> str:
+                if is_short:
+                    contents = sum(len(chunks[i].content) for i in group)
+                    max_doc_chars = max(char_limit - contents - 500, 0)
+                    document_context = f"Full document:\n{full_text[:max_doc_chars]}"
+                    return self._build_batch_context(group, chunks, document_context, 0)
+                return self._build_batch_context(
+                    group, chunks, f"Document outline:\n{outline}\n", window
+                )
+
+            completed = 0
+            progress_lock = threading.Lock()
+
+            def enrich(group: list[int]) -> list[str]:
+                nonlocal completed
+                texts = None
+                if len(group) > 1:
+                    texts = self._situate_batch(group, chunks, batch_context_for)
+                if texts is None:
+                    texts = [self._situate_chunk(i, chunks[i], context_for) for i in group]
+                if progress is not None:
+                    with progress_lock:
+                        completed += len(group)
+                        progress(completed, len(targets))
+                return texts
+
+            size = self._batch_size
+            groups = [targets[k:k + size] for k in range(0, len(targets), size)]
+            if self._concurrency == 1 or len(groups) < 2:
+                return [text for group in groups for text in enrich(group)]
+            workers = min(self._concurrency, len(groups))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as pool:
+                return [text for texts in pool.map(enrich, groups) for text in texts]
 
         except Exception as e:
             self.logger.warning(
                 f"Chunk enrichment failed entirely, using raw content: {e}"
             )
-            return [c.content for c in chunks]
+            return [chunks[i].content for i in targets]
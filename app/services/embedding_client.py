@@ -1,11 +1,14 @@
 """
 Embedding client for generating vector embeddings via HTTP APIs.
 
-Supports Ollama (native) and OpenAI-compatible (API) backends.
+Supports Ollama (native) and OpenAI-compatible (API) backends, plus an
+offline stub for tests and benchmarks.
 """
 
 from __future__ import annotations
 
+import hashlib
+import re
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
@@ -79,6 +82,11 @@ class EmbeddingClient(ABC):
         """Backend name for logging."""
         raise NotImplementedError
 
+    @property
+    def model(self) -> str:
+        """Embedding model name (used in cache keys)."""
+        return getattr(self, "_model", "")
+
 
 class OllamaEmbeddingClient(EmbeddingClient):
     """Embedding client for Ollama's native API.
@@ -248,6 +256,60 @@ class APIEmbeddingClient(EmbeddingClient):
         )
 
 
+class StubEmbeddingClient(EmbeddingClient):
+    """Deterministic offline embedder for tests and benchmarks.
+
+    Each token maps to a fixed pseudo-random unit vector seeded by its
+    hash; a text embeds as the normalised sum of its token vectors. Texts
+    that share vocabulary therefore land close together, which gives
+    synthetic corpora realistic cluster structure. Makes no network calls.
+    """
+
+    _TOKEN_RE = re.compile(r"\w+")
+
+    def __init__(self, model: str = "stub", dimensions: int = 768):
+        if dimensions < 1:
+            raise ValueError(f"dimensions must be positive, got {dimensions}")
+        self._model = model
+        self._dimensions = dimensions
+        self._token_vectors: dict[str, object] = {}
+
+    @property
+    def name(self) -> str:
+        return "stub"
+
+    def is_configured(self) -> bool:
+        return True
+
+    def test_connection(self) -> bool:
+        return True
+
+    def _token_vector(self, token: str):
+        vector = self._token_vectors.get(token)
+        if vector is None:
+            import numpy as np
+
+            seed = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vector = np.random.default_rng(seed).standard_normal(self._dimensions)
+            self._token_vectors[token] = vector
+        return vector
+
+    def embed(self, texts: list[str]) -> EmbeddingResult:
+        import numpy as np
+
+        embeddings = []
+        for text in texts:
+            tokens = self._TOKEN_RE.findall(text.lower()) or [""]
+            total = np.sum([self._token_vector(t) for t in tokens], axis=0)
+            norm = np.linalg.norm(total)
+            embeddings.append((total / norm if norm else total).tolist())
+        return EmbeddingResult(
+            embeddings=embeddings,
+            model=self._model,
+            dimensions=self._dimensions,
+        )
+
+
 def create_embedding_client(
     backend: str = "ollama",
     model: str = "nomic-embed-text",
@@ -259,7 +321,8 @@ def create_embedding_client(
     """Factory function to create an embedding client.
 
     Args:
-        backend: Backend type ("ollama", "openai", or "api")
+        backend: Backend type ("ollama", "openai", "api", or "stub" for
+            the offline test/benchmark embedder)
         model: Model name
         url: Service URL
         api_key: API key (for API/OpenAI backends)
@@ -287,5 +350,7 @@ def create_embedding_client(
             dimensions=dimensions,
             timeout=timeout,
         )
+    elif backend == "stub":
+        return StubEmbeddingClient(model=model, dimensions=dimensions)
     else:
         raise ValueError(f"Unknown embedding backend: {backend}")
@@ -0,0 +1,384 @@
+"""
+Persistent cache for LLM chat responses.
+
+CachingLLMClient wraps any LLMClient so identical requests — the Tier 1
+metadata and Tier 2 chunk prompts repeated when the pipeline or a
+backfill re-processes unchanged documents — are answered from the cache
+instead of the LLM.
+
+Entries are keyed by model, a hash of the system prompt, a hash of the
+remaining messages, the response format and max_tokens. They are stored
+in PostgreSQL (``llm_response_cache``) or a local SQLite file. Entries
+older than ``max_age_days`` are never served and are deleted, and beyond
+``max_entries`` the least recently used entries are evicted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.services.llm_client import LLMClient, LLMResult
+from app.utils import get_logger
+
+# Writes between eviction passes
+EVICT_EVERY = 100
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def llm_cache_key(
+    model: str,
+    messages: list[dict[str, str]],
+    response_format: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """Cache key for a chat request.
+
+    Args:
+        model: Backend-qualified model name (e.g. "ollama:llama3.1:8b")
+        messages: Chat messages; system messages form the prompt hash and
+            every other message the content hash
+        response_format: Format hint passed to chat()
+        max_tokens: Response token limit passed to chat()
+    """
+    system = [m.get("content", "") for m in messages if m.get("role") == "system"]
+    content = [[m.get("role"), m.get("content", "")] for m in messages if m.get("role") != "system"]
+    parts = [
+        model,
+        _sha256(json.dumps(system)),
+        _sha256(json.dumps(content)),
+        response_format,
+        max_tokens,
+    ]
+    return _sha256(json.dumps(parts))
+
+
+class _SqliteBackend:
+    """Cache table in a local SQLite file, shared by threads of one process."""
+
+    def __init__(self, path: Path, max_entries: int, max_age_days: int):
+        self._max_entries = max_entries
+        self._max_age = max_age_days * 86400
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    key             TEXT PRIMARY KEY,
+                    model           TEXT NOT NULL,
+                    content         TEXT NOT NULL,
+                    finish_reason   TEXT NOT NULL,
+                    created_at      REAL NOT NULL,
+                    last_used_at    REAL NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used "
+                "ON llm_response_cache (last_used_at)"
+            )
+
+    @property
+    def name(self) -> str:
+        return "sqlite"
+
+    def get(self, key: str) -> Optional[tuple[str, str, str]]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT model, content, finish_reason FROM llm_response_cache "
+                "WHERE key = ? AND created_at >= ?",
+                (key, now - self._max_age),
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE llm_response_cache SET last_used_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        return row
+
+    def set(self, key: str, model: str, content: str, finish_reason: str) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache "
+                "(key, model, content, finish_reason, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, finish_reason, now, now),
+            )
+
+    def evict(self) -> int:
+        with self._lock, self._conn:
+            expired = self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?",
+                (time.time() - self._max_age,),
+            ).rowcount
+            overflow = self._conn.execute(
+                "DELETE FROM llm_response_cache WHERE key IN ("
+                "SELECT key FROM llm_response_cache ORDER BY last_used_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self._max_entries,),
+            ).rowcount
+        return expired + overflow
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_response_cache")
+
+
+class _PostgresBackend:
+    """Cache table in PostgreSQL, shared by every worker and the backfill."""
+
+    def __init__(self, pool: Any, max_entries: int, max_age_days: int):
+        self._pool = pool
+        self._max_entries = max_entries
+        self._max_age_days = max_age_days
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS llm_response_cache (
+                        key             TEXT PRIMARY KEY,
+                        model           TEXT NOT NULL,
+                        content         TEXT NOT NULL,
+                        finish_reason   TEXT NOT NULL,
+                        created_at      TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                        last_used_at    TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                    )
+                """)
+                cur.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used "
+                    "ON llm_response_cache (last_used_at)"
+                )
+            conn.commit()
+
+    @property
+    def name(self) -> str:
+        return "postgres"
+
+    def get(self, key: str) -> Optional[tuple[str, str, str]]:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    UPDATE llm_response_cache SET last_used_at = NOW()
+                    WHERE key = %s AND created_at >= NOW() - make_interval(days => %s)
+                    RETURNING model, content, finish_reason
+                    """,
+                    (key, self._max_age_days),
+                )
+                row = cur.fetchone()
+            conn.commit()
+        return tuple(row) if row else None
+
+    def set(self, key: str, model: str, content: str, finish_reason: str) -> None:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO llm_response_cache (key, model, content, finish_reason)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (key) DO UPDATE SET
+                        model = EXCLUDED.model,
+                        content = EXCLUDED.content,
+                        finish_reason = EXCLUDED.finish_reason,
+                        created_at = NOW(),
+                        last_used_at = NOW()
+                    """,
+                    (key, model, content, finish_reason),
+                )
+            conn.commit()
+
+    def evict(self) -> int:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "DELETE FROM llm_response_cache "
+                    "WHERE created_at < NOW() - make_interval(days => %s)",
+                    (self._max_age_days,),
+                )
+                expired = cur.rowcount
+                cur.execute(
+                    """
+                    DELETE FROM llm_response_cache WHERE key IN (
+                        SELECT key FROM llm_response_cache
+                        ORDER BY last_used_at DESC OFFSET %s
+                    )
+                    """,
+                    (self._max_entries,),
+                )
+                overflow = cur.rowcount
+            conn.commit()
+        return expired + overflow
+
+    def count(self) -> int:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT COUNT(*) FROM llm_response_cache")
+                return cur.fetchone()[0]
+
+    def clear(self) -> None:
+        with self._pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+
+
+class CachingLLMClient(LLMClient):
+    """LLMClient wrapper that answers repeated requests from a persistent cache.
+
+    Cache failures never propagate: a backend error is logged and the
+    request goes to the wrapped client. Empty responses and errors are
+    not cached.
+    """
+
+    def __init__(self, client: LLMClient, backend: Any):
+        self._client = client
+        self._backend = backend
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._counter_lock = threading.Lock()
+        self.logger = get_logger("services.llm_cache")
+
+    @property
+    def name(self) -> str:
+        return self._client.name
+
+    @property
+    def model(self) -> str:
+        return getattr(self._client, "model", "")
+
+    def is_configured(self) -> bool:
+        return self._client.is_configured()
+
+    def test_connection(self) -> bool:
+        return self._client.test_connection()
+
+    def warm(self) -> bool:
+        return self._client.warm()
+
+    def chat(
+        self,
+        messages: list[dict[str, str]],
+        response_format: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> LLMResult:
+        key = llm_cache_key(
+            f"{self.name}:{self.model}", messages, response_format, max_tokens
+        )
+        try:
+            row = self._backend.get(key)
+        except Exception as e:
+            self.logger.debug(f"LLM cache read failed: {e}")
+            row = None
+        if row is not None:
+            with self._counter_lock:
+                self._hits += 1
+            model, content, finish_reason = row
+            return LLMResult(content=content, model=model, finish_reason=finish_reason)
+
+        with self._counter_lock:
+            self._misses += 1
+        result = self._client.chat(
+            messages, response_format=response_format, max_tokens=max_tokens, timeout=timeout
+        )
+        if result.content.strip():
+            self._store(key, result)
+        return result
+
+    def _store(self, key: str, result: LLMResult) -> None:
+        """Write a response and run an eviction pass every EVICT_EVERY writes."""
+        try:
+            self._backend.set(key, result.model, result.content, result.finish_reason)
+            with self._counter_lock:
+                self._writes += 1
+                evict = self._writes % EVICT_EVERY == 0
+            if evict:
+                removed = self._backend.evict()
+                if removed:
+                    self.logger.debug(f"LLM cache evicted {removed} entries")
+        except Exception as e:
+            self.logger.debug(f"LLM cache write failed: {e}")
+
+    def get_metrics(self) -> dict[str, Any]:
+        """Hit/miss counters for this process and the cache size."""
+        with self._counter_lock:
+            hits, misses = self._hits, self._misses
+        try:
+            entries: Optional[int] = self._backend.count()
+        except Exception as e:
+            self.logger.debug(f"LLM cache count failed: {e}")
+            entries = None
+        total = hits + misses
+        return {
+            "enabled": True,
+            "backend": self._backend.name,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": entries,
+        }
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        try:
+            self._backend.clear()
+        except Exception as e:
+            self.logger.warning(f"LLM cache clear failed: {e}")
+
+
+def with_llm_cache(
+    client: LLMClient,
+    backend: str = "auto",
+    path: Optional[Path] = None,
+    max_entries: int = 50000,
+    max_age_days: int = 90,
+) -> LLMClient:
+    """Wrap ``client`` in a CachingLLMClient.
+
+    Args:
+        client: LLM client to wrap
+        backend: "postgres", "sqlite", or "auto" (PostgreSQL when
+            DATABASE_URL is set, else SQLite)
+        path: SQLite file (default: DATA_DIR/llm_cache.sqlite3)
+        max_entries: Entries kept before least recently used are evicted
+        max_age_days: Age after which entries are no longer served
+
+    Returns:
+        The caching client, or ``client`` unchanged if the cache store
+        cannot be opened
+
+    Raises:
+        ValueError: If backend type is unknown
+    """
+    if backend not in ("auto", "postgres", "sqlite"):
+        raise ValueError(f"Unknown LLM cache backend: {backend}")
+    from app.services import db_pool
+
+    try:
+        if backend == "postgres" or (backend == "auto" and db_pool.is_configured()):
+            store: Any = _PostgresBackend(db_pool.get_pool(), max_entries, max_age_days)
+        else:
+            from app.config import DATA_DIR
+
+            store = _SqliteBackend(path or DATA_DIR / "llm_cache.sqlite3", max_entries, max_age_days)
+    except Exception as e:
+        get_logger("services.llm_cache").warning(
+            f"LLM response cache unavailable, calling the LLM directly: {e}"
+        )
+        return client
+    return CachingLLMClient(client, store)
@@ -3,18 +3,92 @@ LLM client for text generation via HTTP APIs.
 
 Supports Ollama (native) and OpenAI-compatible (API) backends.
 Used for document enrichment and contextual chunk descriptions.
+
+Clients reuse connections through a pooled requests.Session and record
+per-model request latency (see llm_latency_metrics()). ModelWarmer keeps
+an Ollama model loaded while a pipeline runs.
 """
 
 from __future__ import annotations
 
+import bisect
+import threading
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.utils import get_logger
 
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket histogram of request durations."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self._bounds = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, seconds)] += 1
+            self._sum += seconds
+            self._max = max(self._max, seconds)
+            if error:
+                self._errors += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """Counts per bucket (keyed by upper bound), totals and mean."""
+        with self._lock:
+            counts = list(self._counts)
+            total, elapsed, slowest, errors = sum(counts), self._sum, self._max, self._errors
+        buckets = {f"le_{bound:g}": n for bound, n in zip(self._bounds, counts)}
+        buckets["le_inf"] = counts[-1]
+        return {
+            "count": total,
+            "errors": errors,
+            "mean_seconds": round(elapsed / total, 3) if total else 0.0,
+            "max_seconds": round(slowest, 3),
+            "buckets": buckets,
+        }
+
+
+_latency: dict[str, LatencyHistogram] = {}
+_latency_lock = threading.Lock()
+
+
+def _latency_histogram(backend: str, model: str) -> LatencyHistogram:
+    key = f"{backend}:{model}"
+    with _latency_lock:
+        if key not in _latency:
+            _latency[key] = LatencyHistogram()
+        return _latency[key]
+
+
+def llm_latency_metrics() -> dict[str, dict[str, Any]]:
+    """Chat latency histograms for this process, keyed by "backend:model"."""
+    with _latency_lock:
+        histograms = dict(_latency)
+    return {key: hist.snapshot() for key, hist in sorted(histograms.items())}
+
+
+def _pooled_session(pool_size: int) -> requests.Session:
+    """Session whose connection pool holds ``pool_size`` keep-alive connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 @dataclass
 class LLMResult:
@@ -34,6 +108,7 @@ class LLMClient(ABC):
         messages: list[dict[str, str]],
         response_format: Optional[str] = None,
         max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> LLMResult:
         """Send a chat completion request.
 
@@ -41,6 +116,8 @@ class LLMClient(ABC):
             messages: List of message dicts with 'role' and 'content'
             response_format: Optional format hint ('json' for JSON output)
             max_tokens: Optional max tokens for response
+            timeout: Optional request timeout in seconds, overriding the
+                client's default
 
         Returns:
             LLMResult with generated content
@@ -71,11 +148,22 @@ class LLMClient(ABC):
         """Backend name for logging."""
         raise NotImplementedError
 
+    def warm(self) -> bool:
+        """Load the model on the server ahead of the next request.
+
+        Returns:
+            True if the model was loaded (backends that do not manage
+            model residency return False)
+        """
+        return False
+
 
 class OllamaLLMClient(LLMClient):
     """LLM client for Ollama's native API.
 
     Uses POST {url}/api/chat with {"model": ..., "messages": ..., "stream": false}.
+    ``keep_alive`` (e.g. "30m", or "-1" to never unload) is sent with every request
+    so Ollama keeps the model loaded between enrichment calls.
     """
 
     def __init__(
@@ -83,16 +171,28 @@ class OllamaLLMClient(LLMClient):
         url: str = "",
         model: str = "llama3.1:8b",
         timeout: int = 120,
+        keep_alive: str = "",
+        pool_size: int = 10,
     ):
         self._url = url.rstrip("/") if url else ""
         self._model = model
         self._timeout = timeout
+        # Ollama reads a bare number as seconds; strings must carry a unit
+        self._keep_alive: Any = (
+            int(keep_alive) if keep_alive.lstrip("-").isdigit() else keep_alive
+        )
+        self._session = _pooled_session(pool_size)
+        self._latency = _latency_histogram(self.name, model)
         self.logger = get_logger("llm.ollama")
 
     @property
     def name(self) -> str:
         return "ollama"
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def is_configured(self) -> bool:
         return bool(self._url and self._model)
 
@@ -100,17 +200,34 @@ class OllamaLLMClient(LLMClient):
         if not self.is_configured():
             return False
         try:
-            resp = requests.get(f"{self._url}/api/tags", timeout=10)
+            resp = self._session.get(f"{self._url}/api/tags", timeout=10)
             return resp.ok
         except Exception as e:
             self.logger.debug(f"Connection test failed: {e}")
             return False
 
+    def warm(self) -> bool:
+        """Load the model (a chat request with no messages) and reset its keep-alive."""
+        if not self.is_configured():
+            return False
+        payload: dict[str, Any] = {"model": self._model, "messages": [], "stream": False}
+        if self._keep_alive != "":
+            payload["keep_alive"] = self._keep_alive
+        try:
+            resp = self._session.post(
+                f"{self._url}/api/chat", json=payload, timeout=self._timeout
+            )
+            return resp.ok
+        except Exception as e:
+            self.logger.debug(f"Model warm-up failed: {e}")
+            return False
+
     def chat(
         self,
         messages: list[dict[str, str]],
         response_format: Optional[str] = None,
         max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> LLMResult:
         if not self.is_configured():
             raise ValueError("Ollama LLM client not configured")
@@ -124,13 +241,21 @@ class OllamaLLMClient(LLMClient):
             payload["format"] = "json"
         if max_tokens:
             payload["options"] = {"num_predict": max_tokens}
+        if self._keep_alive != "":
+            payload["keep_alive"] = self._keep_alive
 
-        resp = requests.post(
-            f"{self._url}/api/chat",
-            json=payload,
-            timeout=self._timeout,
-        )
-        resp.raise_for_status()
+        start = time.perf_counter()
+        try:
+            resp = self._session.post(
+                f"{self._url}/api/chat",
+                json=payload,
+                timeout=timeout or self._timeout,
+            )
+            resp.raise_for_status()
+        except Exception:
+            self._latency.observe(time.perf_counter() - start, error=True)
+            raise
+        self._latency.observe(time.perf_counter() - start)
         data = resp.json()
 
         message = data.get("message", {})
@@ -156,17 +281,24 @@ class APILLMClient(LLMClient):
         model: str = "",
         api_key: str = "",
         timeout: int = 120,
+        pool_size: int = 10,
     ):
         self._url = url.rstrip("/") if url else ""
         self._model = model
         self._api_key = api_key
         self._timeout = timeout
+        self._session = _pooled_session(pool_size)
+        self._latency = _latency_histogram(self.name, model)
         self.logger = get_logger("llm.api")
 
     @property
     def name(self) -> str:
         return "api"
 
+    @property
+    def model(self) -> str:
+        return self._model
+
     def is_configured(self) -> bool:
         return bool(self._url and self._model)
 
@@ -180,7 +312,7 @@ class APILLMClient(LLMClient):
         if not self.is_configured():
             return False
         try:
-            resp = requests.post(
+            resp = self._session.post(
                 f"{self._url}/v1/chat/completions",
                 json={
                     "model": self._model,
@@ -200,6 +332,7 @@ class APILLMClient(LLMClient):
         messages: list[dict[str, str]],
         response_format: Optional[str] = None,
         max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> LLMResult:
         if not self.is_configured():
             raise ValueError("API LLM client not configured")
@@ -213,13 +346,19 @@ class APILLMClient(LLMClient):
         if max_tokens:
             payload["max_tokens"] = max_tokens
 
-        resp = requests.post(
-            f"{self._url}/v1/chat/completions",
-            json=payload,
-            headers=self._headers(),
-            timeout=self._timeout,
-        )
-        resp.raise_for_status()
+        start = time.perf_counter()
+        try:
+            resp = self._session.post(
+                f"{self._url}/v1/chat/completions",
+                json=payload,
+                headers=self._headers(),
+                timeout=timeout or self._timeout,
+            )
+            resp.raise_for_status()
+        except Exception:
+            self._latency.observe(time.perf_counter() - start, error=True)
+            raise
+        self._latency.observe(time.perf_counter() - start)
         data = resp.json()
 
         choices = data.get("choices", [])
@@ -240,12 +379,60 @@ class APILLMClient(LLMClient):
         )
 
 
+class ModelWarmer:
+    """Background thread that keeps the LLM's model loaded.
+
+    Calls ``client.warm()`` once on start — so the model loads while the
+    scraper fetches the first document — and then every ``interval``
+    seconds until stopped. Use as a context manager around a pipeline run.
+    """
+
+    def __init__(self, client: LLMClient, interval: float = 240):
+        self._client = client
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = get_logger("llm.warmer")
+
+    def start(self) -> "ModelWarmer":
+        if self._thread is None:
+            self._stop.clear()  # allow a restart after stop()
+            self._thread = threading.Thread(
+                target=self._run, name="llm-model-warmer", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            if self._client.warm():
+                self.logger.debug(
+                    f"Model warm ping took {time.perf_counter() - start:.2f}s"
+                )
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "ModelWarmer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
 def create_llm_client(
     backend: str = "ollama",
     model: str = "llama3.1:8b",
     url: str = "",
     api_key: str = "",
     timeout: int = 120,
+    keep_alive: str = "",
+    pool_size: int = 10,
 ) -> LLMClient:
     """Factory function to create an LLM client.
 
@@ -255,6 +442,9 @@ def create_llm_client(
         url: Service URL
         api_key: API key (for API/OpenAI backends)
         timeout: Request timeout in seconds
+        keep_alive: How long Ollama keeps the model loaded after a
+            request (Ollama only; empty uses the server default)
+        pool_size: Pooled HTTP connections (match the enrichment concurrency)
 
     Returns:
         LLMClient instance
@@ -267,6 +457,8 @@ def create_llm_client(
             url=url,
             model=model,
             timeout=timeout,
+            keep_alive=keep_alive,
+            pool_size=pool_size,
         )
     elif backend in ("openai", "api"):
         return APILLMClient(
@@ -274,6 +466,7 @@ def create_llm_client(
             model=model,
             api_key=api_key,
             timeout=timeout,
+            pool_size=pool_size,
         )
     else:
         raise ValueError(f"Unknown LLM backend: {backend}")
@@ -191,9 +191,9 @@ class ReconciliationService:
             rag = self.container.rag_backend
             dataset_id = Config.RAGFLOW_DATASET_ID
             if dataset_id:
-                rag_docs = rag.list_documents(collection_id=dataset_id)
-                report.rag_document_count = len(rag_docs)
-                for doc in rag_docs:
+                # Stream so only the URL set is held, not every document
+                for doc in rag.iter_documents(collection_id=dataset_id):
+                    report.rag_document_count += 1
                     # Try to extract source URL from metadata
                     meta = doc.get("metadata", {}) or {}
                     source_url = meta.get("source_url") or meta.get("url")
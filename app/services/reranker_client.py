@@ -0,0 +1,160 @@
+"""
+Reranker client for scoring search candidates with a cross-encoder.
+
+Supports rerank APIs in the Cohere/Jina format (POST {url}/v1/rerank),
+which llama.cpp server, vLLM, Infinity and LocalAI all expose.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+import requests
+
+from app.utils import get_logger
+
+
+class RerankerClient(ABC):
+    """Abstract base class for reranker clients."""
+
+    @abstractmethod
+    def rerank(self, query: str, documents: list[str]) -> list[float]:
+        """Score each document's relevance to the query.
+
+        Args:
+            query: Search query text
+            documents: Candidate passages
+
+        Returns:
+            One relevance score per document, in input order
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def test_connection(self) -> bool:
+        """Test connectivity to the reranker service.
+
+        Returns:
+            True if service is reachable
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_configured(self) -> bool:
+        """Check if the client has valid configuration.
+
+        Returns:
+            True if URL and model are set
+        """
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Backend name for logging."""
+        raise NotImplementedError
+
+
+class APIRerankerClient(RerankerClient):
+    """Reranker client for Cohere/Jina-compatible rerank APIs.
+
+    Uses POST {url}/v1/rerank with {"model", "query", "documents"} and
+    reads {"results": [{"index": ..., "relevance_score": ...}, ...]}.
+    """
+
+    def __init__(
+        self,
+        url: str = "",
+        model: str = "",
+        api_key: str = "",
+        timeout: int = 30,
+    ):
+        self._url = url.rstrip("/") if url else ""
+        self._model = model
+        self._api_key = api_key
+        self._timeout = timeout
+        self.logger = get_logger("reranker.api")
+
+    @property
+    def name(self) -> str:
+        return "api"
+
+    def is_configured(self) -> bool:
+        return bool(self._url and self._model)
+
+    def _headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {"Content-Type": "application/json"}
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        return headers
+
+    def test_connection(self) -> bool:
+        if not self.is_configured():
+            return False
+        try:
+            return len(self.rerank("test", ["test"])) == 1
+        except Exception as e:
+            self.logger.debug(f"Connection test failed: {e}")
+            return False
+
+    def rerank(self, query: str, documents: list[str]) -> list[float]:
+        if not self.is_configured():
+            raise ValueError("API reranker client not configured")
+        if not documents:
+            return []
+
+        resp = requests.post(
+            f"{self._url}/v1/rerank",
+            json={"model": self._model, "query": query, "documents": documents},
+            headers=self._headers(),
+            timeout=self._timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if "results" not in data:
+            raise ValueError(
+                f"Unexpected rerank response format: missing 'results' key. "
+                f"Response keys: {list(data.keys()) if isinstance(data, dict) else type(data).__name__}"
+            )
+
+        scores: list = [None] * len(documents)
+        for item in data["results"]:
+            if "index" not in item or "relevance_score" not in item:
+                raise ValueError(
+                    f"Malformed rerank response item: missing 'index' or 'relevance_score' key. "
+                    f"Item keys: {list(item.keys()) if isinstance(item, dict) else type(item).__name__}"
+                )
+            scores[item["index"]] = float(item["relevance_score"])
+        if any(score is None for score in scores):
+            raise ValueError(
+                f"Rerank response scored {sum(s is not None for s in scores)} "
+                f"of {len(documents)} documents"
+            )
+        return scores
+
+
+def create_reranker_client(
+    backend: str = "api",
+    model: str = "",
+    url: str = "",
+    api_key: str = "",
+    timeout: int = 30,
+) -> RerankerClient:
+    """Factory function to create a reranker client.
+
+    Args:
+        backend: Backend type ("api")
+        model: Reranker model name
+        url: Service URL
+        api_key: Optional API key
+        timeout: Request timeout in seconds
+
+    Returns:
+        RerankerClient instance
+
+    Raises:
+        ValueError: If backend type is unknown
+    """
+    if backend == "api":
+        return APIRerankerClient(url=url, model=model, api_key=api_key, timeout=timeout)
+    raise ValueError(f"Unknown reranker backend: {backend}")
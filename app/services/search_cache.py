@@ -0,0 +1,322 @@
+"""
+Query-embedding and search-result cache.
+
+Embeddings are keyed by model and normalised query text. Results are keyed
+by a hash of the query vector and search parameters, combined with the
+current ingest generation of every source the search covers. Vector store
+writes bump the generation of the affected sources (and a global
+generation used by unfiltered searches), so a cached result is never
+served after an ingest or delete — superseded entries simply age out.
+
+Backed by Redis/Valkey when REDIS_URL is configured so all gunicorn
+workers (and the MCP server) share entries and generations. Otherwise an
+in-process LRU with TTL caches query embeddings only: generations bumped
+by an ingest in one process are invisible to the others, so results are
+not cached without a shared backend.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Iterable, Optional
+
+from app.utils import get_logger
+
+KEY_PREFIX = "search_cache:"
+GLOBAL_GENERATION = "*"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Normalise query text for cache keys (NFKC, collapsed whitespace)."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _digest(value: Any) -> str:
+    """Stable SHA-256 of a JSON-serialisable value."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _MemoryBackend:
+    """In-process LRU with per-entry TTL. Generation counters never expire."""
+
+    shared = False
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_counters(self, keys: list[str]) -> list[int]:
+        with self._lock:
+            return [self._counters.get(k, 0) for k in keys]
+
+    def incr(self, key: str) -> None:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class _RedisBackend:
+    """Redis/Valkey-backed store shared across processes."""
+
+    shared = True
+
+    def __init__(self, client: Any):
+        self._redis = client
+
+    def get(self, key: str) -> Optional[str]:
+        return self._redis.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._redis.setex(key, ttl, value)
+
+    def get_counters(self, keys: list[str]) -> list[int]:
+        return [int(v or 0) for v in self._redis.mget(keys)]
+
+    def incr(self, key: str) -> None:
+        self._redis.incr(key)
+
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(match=f"{KEY_PREFIX}*"):
+            self._redis.delete(key)
+
+
+class SearchCache:
+    """Cache for query embeddings and search results.
+
+    Cache failures never propagate: a backend error is logged and treated
+    as a miss (or a no-op for writes). With ``cache_results`` off only
+    query embeddings are cached.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        embedding_ttl: int = 3600,
+        result_ttl: int = 300,
+        enabled: bool = True,
+        cache_results: bool = True,
+    ):
+        self._backend = backend
+        self._embedding_ttl = embedding_ttl
+        self._result_ttl = result_ttl
+        self._enabled = enabled
+        self._cache_results = cache_results
+        self.logger = get_logger("services.search_cache")
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def caches_results(self) -> bool:
+        return self._enabled and self._cache_results
+
+    # ── query embeddings ────────────────────────────────────────────
+
+    def _embedding_key(self, model: str, text: str) -> str:
+        return f"{KEY_PREFIX}emb:{_digest([model, normalize_query(text)])}"
+
+    def get_query_embedding(self, model: str, text: str) -> Optional[list[float]]:
+        """Return a cached query embedding, or None on miss."""
+        if not self._enabled:
+            return None
+        try:
+            value = self._backend.get(self._embedding_key(model, text))
+            return json.loads(value) if value else None
+        except Exception as e:
+            self.logger.debug(f"Embedding cache read failed: {e}")
+            return None
+
+    def set_query_embedding(self, model: str, text: str, embedding: list[float]) -> None:
+        """Store a query embedding."""
+        if not self._enabled:
+            return
+        try:
+            self._backend.set(
+                self._embedding_key(model, text), json.dumps(embedding), self._embedding_ttl
+            )
+        except Exception as e:
+            self.logger.debug(f"Embedding cache write failed: {e}")
+
+    def embed_query(self, embedder: Any, text: str) -> list[float]:
+        """Embed a query string, reusing a cached vector when available.
+
+        Args:
+            embedder: EmbeddingClient used on a cache miss
+            text: Query text
+
+        Returns:
+            Query embedding vector
+        """
+        model = f"{embedder.name}:{getattr(embedder, 'model', '')}"
+        cached = self.get_query_embedding(model, text)
+        if cached is not None:
+            return cached
+        embedding = embedder.embed_single(text)
+        self.set_query_embedding(model, text, embedding)
+        return embedding
+
+    # ── search results ──────────────────────────────────────────────
+
+    def _generation_keys(self, sources: Optional[list[str]]) -> list[str]:
+        names = sorted(set(sources)) if sources else [GLOBAL_GENERATION]
+        return [f"{KEY_PREFIX}gen:{name}" for name in names]
+
+    def result_key(
+        self,
+        embedding: list[float],
+        sources: Optional[list[str]],
+        params: dict[str, Any],
+    ) -> Optional[str]:
+        """Build the result cache key under the current source generations.
+
+        Call this *before* running the search and pass the key to both
+        get_results() and set_results(), so results computed concurrently
+        with an ingest are filed under the pre-ingest generation.
+
+        Args:
+            embedding: Query vector
+            sources: Source filter (None = all sources)
+            params: Every other parameter that affects the result set
+                (filters, limit, mode, ...)
+
+        Returns:
+            Cache key, or None when result caching is disabled or unavailable
+        """
+        if not self.caches_results:
+            return None
+        try:
+            generations = self._backend.get_counters(self._generation_keys(sources))
+        except Exception as e:
+            self.logger.debug(f"Result cache generation read failed: {e}")
+            return None
+        key_parts = [
+            _digest(embedding),
+            sorted(set(sources)) if sources else None,
+            params,
+            generations,
+        ]
+        return f"{KEY_PREFIX}res:{_digest(key_parts)}"
+
+    def get_results(self, key: Optional[str]) -> Optional[list[dict[str, Any]]]:
+        """Return cached search results for ``key``, or None on miss."""
+        if key is None:
+            return None
+        try:
+            value = self._backend.get(key)
+            return json.loads(value) if value else None
+        except Exception as e:
+            self.logger.debug(f"Result cache read failed: {e}")
+            return None
+
+    def set_results(self, key: Optional[str], results: list[dict[str, Any]]) -> None:
+        """Store search results under ``key`` (from result_key())."""
+        if key is None:
+            return
+        try:
+            self._backend.set(key, json.dumps(results, default=str), self._result_ttl)
+        except Exception as e:
+            self.logger.debug(f"Result cache write failed: {e}")
+
+    def bump_generation(self, sources: Iterable[str]) -> None:
+        """Invalidate cached results covering any of ``sources``.
+
+        Also bumps the global generation used by unfiltered searches.
+        """
+        names = set(sources)
+        if not self._enabled or not names:
+            return
+        try:
+            for name in sorted(names) + [GLOBAL_GENERATION]:
+                self._backend.incr(f"{KEY_PREFIX}gen:{name}")
+        except Exception as e:
+            self.logger.warning(f"Search cache invalidation failed for {sorted(names)}: {e}")
+
+    def clear(self) -> None:
+        """Drop every cached entry and generation counter."""
+        try:
+            self._backend.clear()
+        except Exception as e:
+            self.logger.warning(f"Search cache clear failed: {e}")
+
+
+_cache: Optional[SearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Get or create the shared search cache (lazy, thread-safe)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from app.config import Config
+                from app.services import redis_pool
+
+                backend: Any = None
+                if redis_pool.is_configured():
+                    try:
+                        backend = _RedisBackend(redis_pool.get_redis())
+                    except Exception as e:
+                        get_logger("services.search_cache").warning(
+                            f"Redis unavailable for search cache, using in-process cache: {e}"
+                        )
+                if backend is None:
+                    backend = _MemoryBackend(Config.SEARCH_CACHE_MAX_ENTRIES)
+                _cache = SearchCache(
+                    backend,
+                    embedding_ttl=Config.SEARCH_CACHE_EMBEDDING_TTL,
+                    result_ttl=Config.SEARCH_CACHE_RESULT_TTL,
+                    enabled=Config.SEARCH_CACHE_ENABLED,
+                    cache_results=backend.shared,
+                )
+    return _cache
+
+
+def invalidate_sources(sources: Iterable[str]) -> None:
+    """Bump the generation of ``sources``; never raises."""
+    try:
+        get_search_cache().bump_generation(sources)
+    except Exception as e:
+        get_logger("services.search_cache").warning(f"Search cache unavailable: {e}")
+
+
+def reset_search_cache() -> None:
+    """Discard the shared instance (tests, config reload)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
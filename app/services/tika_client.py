@@ -4,7 +4,11 @@ Apache Tika client for text and metadata extraction.
 Provides HTTP client for interacting with Apache Tika server:
 - Text extraction from any supported document format
 - Metadata extraction (Dublin Core normalized)
+- Combined text + metadata extraction from a single upload (/rmeta)
 - MIME type detection
+
+Files are streamed from disk as the request body rather than read into
+memory first.
 """
 
 from __future__ import annotations
@@ -37,6 +41,9 @@ _METADATA_KEY_MAP = {
     "Content-Type": "content_type",
 }
 
+# Key holding the extracted text in /rmeta responses
+_RMETA_CONTENT_KEY = "X-TIKA:content"
+
 
 class TikaClient:
     """Client for Apache Tika server API."""
@@ -81,7 +88,7 @@ class TikaClient:
         """
         Extract plain text from a document.
 
-        Uses PUT /tika with file bytes in request body.
+        Uses PUT /tika with the file streamed as the request body.
 
         Args:
             file_path: Path to document
@@ -94,24 +101,14 @@ class TikaClient:
             requests.HTTPError: On non-2xx response
             requests.RequestException: On connection failure
         """
-        self._check_file_size(file_path)
-        with open(file_path, "rb") as f:
-            data = f.read()
-
-        resp = requests.put(
-            f"{self.url}/tika",
-            data=data,
-            headers={"Accept": "text/plain"},
-            timeout=self.timeout,
-        )
-        resp.raise_for_status()
+        resp = self._put_file("/tika", file_path, accept="text/plain")
         return resp.text
 
     def extract_metadata(self, file_path: Path) -> dict:
         """
         Extract and normalize metadata from a document.
 
-        Uses PUT /meta with file bytes in request body.
+        Uses PUT /meta with the file streamed as the request body.
         Normalizes Dublin Core keys to standard names.
 
         Args:
@@ -120,21 +117,42 @@ class TikaClient:
         Returns:
             Normalized metadata dict
         """
-        self._check_file_size(file_path)
-        with open(file_path, "rb") as f:
-            data = f.read()
-
-        resp = requests.put(
-            f"{self.url}/meta",
-            data=data,
-            headers={"Accept": "application/json"},
-            timeout=self.timeout,
-        )
-        resp.raise_for_status()
+        resp = self._put_file("/meta", file_path, accept="application/json")
         raw = resp.json()
 
         return self._normalize_metadata(raw)
 
+    def extract_text_and_metadata(self, file_path: Path) -> tuple[str, dict]:
+        """
+        Extract plain text and normalized metadata from one upload.
+
+        Uses PUT /rmeta/text, which returns a JSON list with one metadata
+        dict per document — the file itself first, then any embedded
+        documents — each carrying its text under "X-TIKA:content".
+        Metadata comes from the first entry; text from all entries, in
+        order, so embedded content is kept as /tika would include it.
+
+        Args:
+            file_path: Path to document
+
+        Returns:
+            Tuple of (extracted text, normalized metadata dict)
+
+        Raises:
+            ValueError: If file exceeds MAX_UPLOAD_FILE_SIZE
+            requests.HTTPError: On non-2xx response
+            requests.RequestException: On connection failure
+        """
+        resp = self._put_file("/rmeta/text", file_path, accept="application/json")
+        entries = resp.json() or [{}]
+
+        text = "\n\n".join(
+            content.strip()
+            for entry in entries
+            if (content := entry.get(_RMETA_CONTENT_KEY) or "").strip()
+        )
+        return text, self._normalize_metadata(entries[0])
+
     def detect_mime_type(self, file_path: Path) -> str:
         """
         Detect MIME type of a file.
@@ -147,18 +165,31 @@ class TikaClient:
         Returns:
             MIME type string (e.g. "application/pdf")
         """
+        resp = self._put_file("/detect/stream", file_path, accept="text/plain")
+        return resp.text.strip()
+
+    def _put_file(self, endpoint: str, file_path: Path, accept: str) -> requests.Response:
+        """
+        PUT a file to a Tika endpoint, streaming it from disk.
+
+        The open file handle is the request body, so requests sends it in
+        blocks with a Content-Length taken from the file size instead of
+        holding the whole document in memory.
+
+        Raises:
+            ValueError: If file exceeds MAX_UPLOAD_FILE_SIZE
+            requests.HTTPError: On non-2xx response
+        """
         self._check_file_size(file_path)
         with open(file_path, "rb") as f:
-            data = f.read()
-
-        resp = requests.put(
-            f"{self.url}/detect/stream",
-            data=data,
-            headers={"Accept": "text/plain"},
-            timeout=self.timeout,
-        )
+            resp = requests.put(
+                f"{self.url}{endpoint}",
+                data=f,
+                headers={"Accept": accept},
+                timeout=self.timeout,
+            )
         resp.raise_for_status()
-        return resp.text.strip()
+        return resp
 
     def _normalize_metadata(self, raw: dict) -> dict:
         """
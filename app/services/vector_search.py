@@ -0,0 +1,115 @@
+"""
+Shared search flow for the web search API and the MCP server.
+
+Embeds the query, serves or fills the search-result cache, dispatches to
+the store's vector, hybrid or two-stage search and applies the optional
+post-retrieval stage (rerank, MMR, per-document cap). Callers validate
+their own inputs and shape their own responses.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from app.backends.vectorstores.ranking import candidate_limit, rank_results
+
+SEARCH_MODES = ("vector", "hybrid", "two_stage")
+
+
+def run_search(
+    store: Any,
+    embedder: Any,
+    reranker: Any,
+    query: str,
+    sources: Optional[list[str]] = None,
+    limit: int = 10,
+    metadata_filter: Optional[dict[str, Any]] = None,
+    mode: str = "vector",
+    preset: Optional[str] = None,
+    filters: Optional[dict[str, Any]] = None,
+    mmr_lambda: Optional[float] = None,
+    max_per_document: Optional[int] = None,
+) -> list[dict[str, Any]]:
+    """Run one search, using the search-result cache.
+
+    Args:
+        store: Vector store (search, search_hybrid, search_two_stage)
+        embedder: Embedding client for the query
+        reranker: Cross-encoder to rescore candidates, or None
+        query: Search text
+        sources: Optional list of source names to filter by
+        limit: Number of results to return
+        metadata_filter: Optional JSONB containment filter
+        mode: One of SEARCH_MODES
+        preset: Optional recall/latency preset
+        filters: Optional filters on promoted metadata columns
+        mmr_lambda: Optional MMR relevance/diversity trade-off in [0, 1]
+        max_per_document: Optional cap on chunks returned per document
+
+    Returns:
+        Result dicts in rank order
+    """
+    from app.services.search_cache import get_search_cache
+
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {SEARCH_MODES}, got {mode!r}")
+    sources = sources or None
+    rerank = reranker is not None
+
+    cache = get_search_cache()
+    # Embed the query (cached by model + normalised text)
+    query_embedding = cache.embed_query(embedder, query)
+
+    # Results are cached per source generation, so ingests invalidate them
+    cache_key = cache.result_key(
+        query_embedding,
+        sources,
+        {
+            "query": query if mode == "hybrid" else None,
+            "metadata_filter": metadata_filter,
+            "limit": limit,
+            "mode": mode,
+            "preset": preset,
+            "filters": filters,
+            "mmr_lambda": mmr_lambda,
+            "max_per_document": max_per_document,
+            "rerank": rerank,
+        },
+    )
+    cached = cache.get_results(cache_key)
+    if cached is not None:
+        return cached
+
+    # Post-retrieval stage: over-fetch, then rerank/diversify/cap in one pass
+    post_stage = mmr_lambda is not None or max_per_document is not None or rerank
+    options: dict[str, Any] = {
+        "query_embedding": query_embedding,
+        "sources": sources,
+        "metadata_filter": metadata_filter,
+        "limit": candidate_limit(limit) if post_stage else limit,
+        "preset": preset,
+        "filters": filters,
+    }
+    if mmr_lambda is not None:
+        options["include_embeddings"] = True
+
+    if mode == "two_stage":
+        results = store.search_two_stage(**options)
+    elif mode == "hybrid":
+        results = store.search_hybrid(query_text=query, **options)
+    else:
+        results = store.search(**options)
+
+    if post_stage:
+        results = rank_results(
+            query_embedding,
+            results,
+            limit,
+            mmr_lambda=mmr_lambda,
+            max_per_document=max_per_document,
+            reranker=reranker,
+            query_text=query,
+            score_is_similarity=mode != "hybrid",
+        )
+    cache.set_results(cache_key, results)
+    return results
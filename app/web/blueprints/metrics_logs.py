@@ -9,6 +9,7 @@ from markupsafe import escape
 
 from app.config import Config
 from app.scrapers import ScraperRegistry
+from app.services.llm_client import llm_latency_metrics
 from app.utils.logging_config import log_event, log_exception
 from app.utils import get_logger
 from app.web.runtime import container
@@ -127,6 +128,38 @@ def flaresolverr_metrics():
         return jsonify({"success": 0, "failure": 0, "timeout": 0, "total": 0, "success_rate": 0.0})
 
 
+@bp.route("/metrics/boilerplate")
+def boilerplate_metrics():
+    """Shared boilerplate per source and the storage/embedding work it saved."""
+    try:
+        sources = container.vector_store.get_boilerplate_report()
+        return jsonify({
+            "enabled": Config.BOILERPLATE_MIN_DOCUMENTS > 0,
+            "min_documents": Config.BOILERPLATE_MIN_DOCUMENTS,
+            "sources": sources,
+            "total_chunks_deduplicated": sum(s["chunks_deduplicated"] for s in sources),
+            "total_bytes_reclaimed": sum(s["bytes_reclaimed"] for s in sources),
+        })
+    except Exception as exc:
+        log_exception(logger, exc, "metrics.boilerplate.error")
+        return jsonify({"error": "Failed to build boilerplate report"}), 500
+
+
+def _llm_cache_metrics() -> dict:
+    """Hit rate and size of the LLM response cache (counters are per process)."""
+    if not Config.LLM_CACHE_ENABLED:
+        return {"enabled": False}
+    try:
+        from app.services.llm_cache import CachingLLMClient
+
+        llm_client = container.llm_client
+        if isinstance(llm_client, CachingLLMClient):
+            return llm_client.get_metrics()
+    except Exception as exc:
+        log_exception(logger, exc, "metrics.llm_cache.error")
+    return {"enabled": False}
+
+
 @bp.route("/metrics/pipeline")
 def pipeline_metrics():
     metrics: list[dict] = []
@@ -182,4 +215,6 @@ def pipeline_metrics():
             "processed": total_processed,
             "failed": total_failed,
         },
+        "llm_cache": _llm_cache_metrics(),
+        "llm_latency": llm_latency_metrics(),
     })
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import json
 import re
+from typing import Iterator
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, Response, render_template, request, jsonify, stream_with_context
 
+from app.backends.vectorstores.base import SEARCH_PRESETS
+from app.services.vector_search import SEARCH_MODES, run_search
 from app.utils import get_logger
 from app.utils.logging_config import log_exception
 from app.web.limiter import limiter
@@ -15,6 +19,8 @@ bp = Blueprint("search", __name__)
 logger = get_logger("web.search")
 
 _SAFE_NAME_RE = re.compile(r"^[a-zA-Z0-9_.@-]+$")
+_NDJSON_MIMETYPE = "application/x-ndjson"
+_MAX_PAGE_SIZE = 1000
 
 
 @bp.route("/search")
@@ -41,6 +47,17 @@ def search():
         sources: list[str] - optional source filter
         limit: int - max results (default 10, max 50)
         metadata_filter: dict - optional JSONB containment filter
+        mode: str - "vector" (default), "hybrid" (vector + full-text, RRF fused)
+            or "two_stage" (best documents first, then chunks within them)
+        mmr_lambda: float - optional MMR relevance/diversity trade-off in
+            [0, 1] (lower = more diverse)
+        max_per_document: int - optional cap on chunks returned per document
+        rerank: bool - rescore candidates with the configured cross-encoder
+        preset: str - optional recall/latency preset ("fast", "balanced", "accurate")
+        filters: dict - optional filters on indexed metadata keys, e.g.
+            {"publication_date": {"gte": "2024-01-01"}, "organization": "AEMO",
+             "document_type": {"in": ["report", "policy"]}};
+            date keys also accept {"within_months": N}
     """
     data = request.get_json(silent=True) or {}
     query = data.get("query", "").strip()
@@ -63,6 +80,28 @@ def search():
     metadata_filter = data.get("metadata_filter", None)
     if metadata_filter is not None and not isinstance(metadata_filter, dict):
         return jsonify({"error": "metadata_filter must be an object"}), 400
+    mode = data.get("mode", "vector")
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+    preset = data.get("preset") or None
+    if preset is not None and preset not in SEARCH_PRESETS:
+        return jsonify({"error": f"preset must be one of: {', '.join(SEARCH_PRESETS)}"}), 400
+    filters = data.get("filters") or None
+    if filters is not None and not isinstance(filters, dict):
+        return jsonify({"error": "filters must be an object"}), 400
+    mmr_lambda = data.get("mmr_lambda")
+    if mmr_lambda is not None:
+        if isinstance(mmr_lambda, bool) or not isinstance(mmr_lambda, (int, float)) \
+                or not 0 <= mmr_lambda <= 1:
+            return jsonify({"error": "mmr_lambda must be a number between 0 and 1"}), 400
+    max_per_document = data.get("max_per_document")
+    if max_per_document is not None:
+        if isinstance(max_per_document, bool) or not isinstance(max_per_document, int) \
+                or max_per_document < 1:
+            return jsonify({"error": "max_per_document must be a positive integer"}), 400
+    rerank = data.get("rerank", False)
+    if not isinstance(rerank, bool):
+        return jsonify({"error": "rerank must be a boolean"}), 400
 
     try:
         embedder = container.embedding_client
@@ -72,20 +111,34 @@ def search():
         pgvector = container.pgvector_client
         if not pgvector.is_configured():
             return jsonify({"error": "pgvector not configured"}), 503
+        reranker = None
+        if rerank:
+            reranker = container.reranker_client
+            if not reranker.is_configured():
+                return jsonify({"error": "Reranker not configured"}), 503
+        try:
+            pgvector.validate_filters(filters)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
 
-        # Embed the query
-        query_embedding = embedder.embed_single(query)
-
-        # Search
-        results = pgvector.search(
-            query_embedding=query_embedding,
-            sources=sources if sources else None,
-            metadata_filter=metadata_filter,
+        results = run_search(
+            pgvector,
+            embedder,
+            reranker,
+            query,
+            sources=sources,
             limit=limit,
+            metadata_filter=metadata_filter,
+            mode=mode,
+            preset=preset,
+            filters=filters,
+            mmr_lambda=mmr_lambda,
+            max_per_document=max_per_document,
         )
 
         return jsonify({
             "query": query,
+            "mode": mode,
             "count": len(results),
             "results": results,
         })
@@ -114,27 +167,143 @@ def list_sources():
         return jsonify({"error": "Failed to list sources"}), 500
 
 
+def _wants_ndjson() -> bool:
+    """True when the client asked for an NDJSON stream."""
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == _NDJSON_MIMETYPE
+
+
+def _page_limit(default: int) -> int:
+    """Parse the ``limit`` query parameter, clamped to 1.._MAX_PAGE_SIZE."""
+    try:
+        limit = int(request.args.get("limit", default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, _MAX_PAGE_SIZE))
+
+
+def _ndjson_response(rows: Iterator[dict], event: str) -> Response:
+    """Stream ``rows`` as newline-delimited JSON.
+
+    The status line is already sent when rows start flowing, so a
+    mid-stream failure is logged and ends the stream early.
+    """
+
+    def _stream():
+        try:
+            for row in rows:
+                yield json.dumps(row) + "\n"
+        except Exception as exc:
+            log_exception(logger, exc, event)
+        finally:
+            close = getattr(rows, "close", None)
+            if close:
+                close()
+
+    return Response(
+        stream_with_context(_stream()),
+        mimetype=_NDJSON_MIMETYPE,
+        headers={"X-Accel-Buffering": "no"},
+    )
+
+
 @bp.route("/api/search/document/<source>/<path:filename>")
 def get_document_chunks(source: str, filename: str):
-    """Get all chunks for a specific document."""
+    """Get chunks for a specific document.
+
+    Without ``after`` or ``limit`` the whole document is returned, as
+    before pagination existed. Either parameter switches to keyset pages
+    by chunk_index.
+
+    Query params:
+        after: int - return chunks with chunk_index greater than this (default -1)
+        limit: int - page size (default and max 1000)
+        format: "ndjson" - stream every chunk after ``after`` as NDJSON
+            (one chunk per line) instead of a JSON page; ``limit`` is
+            ignored unless given explicitly
+    """
     if not source or ".." in source or not _SAFE_NAME_RE.match(source):
         return jsonify({"error": "Invalid source"}), 400
     if not filename or ".." in filename:
         return jsonify({"error": "Invalid filename"}), 400
+    try:
+        after = int(request.args.get("after", -1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "after must be an integer"}), 400
 
     try:
         client = container.pgvector_client
         if not client.is_configured():
             return jsonify({"error": "pgvector not configured"}), 503
 
-        chunks = client.get_document_chunks(source, filename)
+        if _wants_ndjson():
+            limit = _page_limit(_MAX_PAGE_SIZE) if "limit" in request.args else None
+            return _ndjson_response(
+                client.iter_document_chunks(source, filename, after_index=after, limit=limit),
+                "search.document.stream.error",
+            )
+
+        if "after" in request.args or "limit" in request.args:
+            limit = _page_limit(_MAX_PAGE_SIZE)
+            # Fetch one extra row to learn whether another page follows
+            chunks = list(
+                client.iter_document_chunks(source, filename, after_index=after, limit=limit + 1)
+            )
+            has_more = len(chunks) > limit
+            chunks = chunks[:limit]
+        else:
+            chunks = list(client.iter_document_chunks(source, filename, after_index=after, limit=None))
+            has_more = False
 
         return jsonify({
             "source": source,
             "filename": filename,
             "chunk_count": len(chunks),
             "chunks": chunks,
+            "next_after": chunks[-1]["chunk_index"] if has_more else None,
         })
     except Exception as exc:
         log_exception(logger, exc, "search.document.error")
         return jsonify({"error": "Failed to get document chunks"}), 500
+
+
+@bp.route("/api/search/documents/<source>")
+def list_documents(source: str):
+    """List (or export) the documents stored for a source.
+
+    Keyset paginated by filename; same ``after``/``limit``/``format``
+    parameters as the document chunks endpoint, with ``after`` a filename.
+    """
+    if not source or ".." in source or not _SAFE_NAME_RE.match(source):
+        return jsonify({"error": "Invalid source"}), 400
+    after = request.args.get("after") or None
+
+    try:
+        client = container.pgvector_client
+        if not client.is_configured():
+            return jsonify({"error": "pgvector not configured"}), 503
+
+        if _wants_ndjson():
+            limit = _page_limit(_MAX_PAGE_SIZE) if "limit" in request.args else None
+            return _ndjson_response(
+                client.iter_documents(source=source, after_filename=after, limit=limit),
+                "search.documents.stream.error",
+            )
+
+        limit = _page_limit(_MAX_PAGE_SIZE)
+        documents = list(
+            client.iter_documents(source=source, after_filename=after, limit=limit + 1)
+        )
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+
+        return jsonify({
+            "source": source,
+            "document_count": len(documents),
+            "documents": documents,
+            "next_after": documents[-1]["filename"] if has_more else None,
+        })
+    except Exception as exc:
+        log_exception(logger, exc, "search.documents.error")
+        return jsonify({"error": "Failed to list documents"}), 500
@@ -15,12 +15,14 @@ Environment:
     EMBEDDING_BACKEND - Backend type (ollama, openai, api)
     EMBEDDING_MODEL - Model name (default: nomic-embed-text)
     EMBEDDING_DIMENSIONS - Vector dimensions (default: 768)
+    REDIS_URL - Shared search cache; without it search results are not cached
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
+from contextlib import asynccontextmanager
 import os
 import sys
 from pathlib import Path, PurePosixPath
@@ -33,16 +35,38 @@ load_dotenv(os.getenv("DOTENV_PATH", ".env"))
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import Any, Optional
+from typing import Any, Literal, Optional
 
+from app.backends.vectorstores.base import SEARCH_PRESETS
+from app.services.vector_search import SEARCH_MODES
 from mcp_server.tools import search_documents, list_sources, get_document
 
 logger = logging.getLogger(__name__)
 
+# Request schema enums follow the shared constants
+SearchMode = Literal[SEARCH_MODES]
+SearchPreset = Literal[SEARCH_PRESETS]
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """Warn at startup when search results cannot share the web app's cache."""
+    from app.services.search_cache import get_search_cache
+
+    cache = get_search_cache()
+    if cache.enabled and not cache.caches_results:
+        logger.warning(
+            "Search result caching disabled: no shared cache backend (set REDIS_URL). "
+            "Ingests in the web app could not invalidate results cached in this process."
+        )
+    yield
+
+
 app = FastAPI(
     title="Document Search MCP Server",
     description="Semantic search across indexed documents via pgvector",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -51,10 +75,35 @@ class SearchRequest(BaseModel):
     sources: Optional[list[str]] = Field(None, description="Filter by source names")
     limit: int = Field(10, ge=1, le=50, description="Maximum results")
     metadata_filter: Optional[dict[str, Any]] = Field(None, description="JSONB containment filter")
+    mode: SearchMode = Field(
+        "vector",
+        description=(
+            "vector, hybrid (vector + full-text, RRF fused) or two_stage "
+            "(best documents first, then chunks within them)"
+        ),
+    )
+    preset: Optional[SearchPreset] = Field(
+        None, description="Recall/latency preset (default: server setting)"
+    )
+    filters: Optional[dict[str, Any]] = Field(
+        None,
+        description=(
+            "Range/equality filters on indexed metadata keys, e.g. "
+            '{"publication_date": {"within_months": 6}, "organization": "AEMO"}'
+        ),
+    )
+    mmr_lambda: Optional[float] = Field(
+        None, ge=0, le=1, description="MMR relevance/diversity trade-off (lower = more diverse)"
+    )
+    max_per_document: Optional[int] = Field(
+        None, ge=1, description="Maximum chunks returned per document"
+    )
+    rerank: bool = Field(False, description="Rescore candidates with the configured reranker")
 
 
 class SearchResponse(BaseModel):
     query: str
+    mode: str = "vector"
     count: int
     results: list[dict[str, Any]]
 
@@ -81,8 +130,16 @@ async def api_search_documents(req: SearchRequest):
             sources=req.sources,
             limit=req.limit,
             metadata_filter=req.metadata_filter,
+            mode=req.mode,
+            preset=req.preset,
+            filters=req.filters,
+            mmr_lambda=req.mmr_lambda,
+            max_per_document=req.max_per_document,
+            rerank=req.rerank,
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Search failed")
         raise HTTPException(status_code=500, detail="Internal server error")
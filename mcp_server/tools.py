@@ -25,6 +25,7 @@ def _parse_int_env(name: str, default: int) -> int:
 
 def _get_pgvector_client():
     """Create a PgVectorVectorStore from environment."""
+    from app.backends.vectorstores.base import parse_metadata_columns
     from app.backends.vectorstores.pgvector_store import PgVectorVectorStore
 
     database_url = os.environ.get("DATABASE_URL")
@@ -34,6 +35,12 @@ def _get_pgvector_client():
     return PgVectorVectorStore(
         database_url=database_url,
         dimensions=_parse_int_env("EMBEDDING_DIMENSIONS", 768),
+        index_quantization=os.environ.get("PGVECTOR_INDEX_QUANTIZATION", "none"),
+        rerank_factor=_parse_int_env("PGVECTOR_RERANK_FACTOR", 4),
+        search_preset=os.environ.get("PGVECTOR_SEARCH_PRESET", "balanced"),
+        metadata_columns=parse_metadata_columns(
+            os.environ.get("PGVECTOR_METADATA_COLUMNS", "")
+        ),
     )
 
 
@@ -58,11 +65,35 @@ def _get_embedding_client():
     )
 
 
+def _get_reranker_client():
+    """Create a RerankerClient from environment."""
+    from app.services.reranker_client import create_reranker_client
+
+    url = os.environ.get("RERANKER_URL", "")
+    model = os.environ.get("RERANKER_MODEL", "")
+    if not url or not model:
+        raise ValueError("RERANKER_URL and RERANKER_MODEL environment variables are required for rerank")
+
+    return create_reranker_client(
+        backend=os.environ.get("RERANKER_BACKEND", "api"),
+        model=model,
+        url=url,
+        api_key=os.environ.get("RERANKER_API_KEY", ""),
+        timeout=_parse_int_env("RERANKER_TIMEOUT", 30),
+    )
+
+
 def search_documents(
     query: str,
     sources: Optional[list[str]] = None,
     limit: int = 10,
     metadata_filter: Optional[dict[str, Any]] = None,
+    mode: str = "vector",
+    preset: Optional[str] = None,
+    filters: Optional[dict[str, Any]] = None,
+    mmr_lambda: Optional[float] = None,
+    max_per_document: Optional[int] = None,
+    rerank: bool = False,
 ) -> dict[str, Any]:
     """Search documents by semantic similarity.
 
@@ -71,15 +102,35 @@ def search_documents(
         sources: Optional list of source names to filter by
         limit: Maximum number of results (default 10, max 50)
         metadata_filter: Optional metadata containment filter
+        mode: "vector" (default), "hybrid" (vector + full-text, RRF fused) or
+            "two_stage" (best documents first, then chunks within them)
+        preset: Optional recall/latency preset (one of SEARCH_PRESETS)
+        filters: Optional range/equality filters on indexed metadata keys,
+            e.g. {"publication_date": {"within_months": 6}}
+        mmr_lambda: Optional MMR relevance/diversity trade-off in [0, 1]
+            (lower = more diverse)
+        max_per_document: Optional cap on chunks returned per document
+        rerank: Rescore candidates with the configured cross-encoder
 
     Returns:
         Dict with query, count, and results list
     """
+    from app.backends.vectorstores.base import SEARCH_PRESETS
+    from app.services.vector_search import SEARCH_MODES, run_search
+
     query = query.strip() if query else ""
     if not query:
         raise ValueError("query cannot be empty")
     if limit < 1:
         raise ValueError("limit must be a positive integer")
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {SEARCH_MODES}, got: {mode!r}")
+    if mmr_lambda is not None and not 0 <= mmr_lambda <= 1:
+        raise ValueError("mmr_lambda must be between 0 and 1")
+    if max_per_document is not None and max_per_document < 1:
+        raise ValueError("max_per_document must be a positive integer")
+    if preset is not None and preset not in SEARCH_PRESETS:
+        raise ValueError(f"preset must be one of {SEARCH_PRESETS}, got: {preset!r}")
 
     embedder = None
     pgvector = None
@@ -87,16 +138,26 @@ def search_documents(
     try:
         embedder = _get_embedding_client()
         pgvector = _get_pgvector_client()
-
-        query_embedding = embedder.embed_single(query)
-        results = pgvector.search(
-            query_embedding=query_embedding,
+        pgvector.validate_filters(filters)
+        reranker = _get_reranker_client() if rerank else None
+
+        results = run_search(
+            pgvector,
+            embedder,
+            reranker,
+            query,
             sources=sources,
-            metadata_filter=metadata_filter,
             limit=min(limit, 50),
+            metadata_filter=metadata_filter,
+            mode=mode,
+            preset=preset,
+            filters=filters,
+            mmr_lambda=mmr_lambda,
+            max_per_document=max_per_document,
         )
         return {
             "query": query,
+            "mode": mode,
             "count": len(results),
             "results": results,
         }
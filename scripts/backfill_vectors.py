@@ -6,6 +6,18 @@ chunks, embeds, and stores in pgvector.
 
 Usage:
     python scripts/backfill_vectors.py [--source SOURCE] [--dry-run] [--skip-existing]
+                                       [--batch-size N] [--no-defer-index]
+                                       [--keep-existing-indexes]
+                                       [--maintenance-work-mem SIZE] [--index-workers N]
+
+HNSW indexes of the partitions being written are dropped for the duration
+of the load and rebuilt once at the end (also after a failure), which is
+much faster than maintaining the graph row by row. Each stored document
+also gets its mean-pooled document embedding for two-stage search.
+
+Every document is re-embedded in full unless --skip-existing is given.
+Stored chunk hashes include the embedding model and enrichment mode, so
+later pipeline re-ingests only re-embed chunks that actually changed.
 
 Environment:
     Reads from .env or .env.stack (set DOTENV_PATH to override).
@@ -14,6 +26,7 @@ Environment:
 from __future__ import annotations
 
 import argparse
+import contextlib
 import os
 import re
 import sys
@@ -32,8 +45,10 @@ import requests
 
 from app.config import Config
 from app.services.embedding_client import create_embedding_client
-from app.services.chunking import create_chunker
+from app.services.chunking import create_chunker, resolve_tokenizer_name
+from app.backends.vectorstores.base import chunk_content_hash, embedding_fingerprint
 from app.backends.vectorstores.pgvector_store import PgVectorVectorStore
+from app.backends.vectorstores.ranking import mean_pool_embeddings
 
 
 def _mask_database_url(url: str) -> str:
@@ -140,14 +155,8 @@ def _get_existing_filenames(pgvector: PgVectorVectorStore) -> set[str]:
     """Query pgvector for all existing (source, filename) pairs."""
     existing: set[str] = set()
     try:
-        pool = pgvector._get_pool()
-        with pool.connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT DISTINCT source || '/' || filename FROM document_chunks"
-                )
-                for row in cur.fetchall():
-                    existing.add(row[0])
+        for doc in pgvector.iter_documents():
+            existing.add(f"{doc['source']}/{doc['filename']}")
     except Exception as e:
         print(f"  WARNING: Could not query existing documents: {e}", file=sys.stderr)
     return existing
@@ -166,11 +175,27 @@ def _apply_contextual_enrichment_backfill(chunks: list, content: str) -> list[st
             api_key=Config.LLM_API_KEY,
             timeout=Config.LLM_TIMEOUT,
         )
+        if Config.LLM_CACHE_ENABLED:
+            from app.services.llm_cache import with_llm_cache
+
+            llm = with_llm_cache(
+                llm,
+                backend=Config.LLM_CACHE_BACKEND,
+                path=Config.LLM_CACHE_PATH,
+                max_entries=Config.LLM_CACHE_MAX_ENTRIES,
+                max_age_days=Config.LLM_CACHE_MAX_AGE_DAYS,
+            )
         if not llm.is_configured():
             print("  WARNING: LLM not configured, skipping enrichment")
             return [c.content for c in chunks]
 
-        service = DocumentEnrichmentService(llm, max_tokens=Config.LLM_ENRICHMENT_MAX_TOKENS)
+        service = DocumentEnrichmentService(
+            llm,
+            max_tokens=Config.LLM_ENRICHMENT_MAX_TOKENS,
+            concurrency=Config.CONTEXTUAL_ENRICHMENT_CONCURRENCY,
+            chunk_timeout=Config.CONTEXTUAL_ENRICHMENT_TIMEOUT or None,
+            batch_size=Config.CONTEXTUAL_ENRICHMENT_BATCH_SIZE,
+        )
         return service.enrich_chunks(
             chunks, content, window=Config.CONTEXTUAL_ENRICHMENT_WINDOW
         )
@@ -179,14 +204,79 @@ def _apply_contextual_enrichment_backfill(chunks: list, content: str) -> list[st
         return [c.content for c in chunks]
 
 
+def _store_document_embeddings(pgvector: PgVectorVectorStore, docs: list[dict]) -> None:
+    """Store mean-pooled document embeddings for stored documents."""
+    try:
+        pgvector.store_document_embeddings([
+            {
+                "source": doc["source"],
+                "filename": doc["filename"],
+                "embedding": mean_pool_embeddings([c["embedding"] for c in doc["chunks"]]),
+                "chunk_count": len(doc["chunks"]),
+                "metadata": doc["chunks"][0].get("metadata", {}),
+            }
+            for doc in docs
+        ])
+    except Exception as e:
+        print(f"  WARNING: Document embeddings not stored: {e}")
+
+
+def _flush_batch(pgvector: PgVectorVectorStore, batch: list[dict]) -> tuple[int, int]:
+    """Store a batch of documents in one transaction.
+
+    If the bulk write fails, retries each document on its own so a single
+    bad document does not discard the rest of the batch.
+
+    Returns:
+        (documents stored, documents failed)
+    """
+    if not batch:
+        return 0, 0
+    try:
+        count = pgvector.store_documents(batch)
+        print(f"  BATCH OK: {count} chunks stored for {len(batch)} documents")
+        _store_document_embeddings(pgvector, batch)
+        return len(batch), 0
+    except Exception as e:
+        print(f"  WARNING: Batch store failed ({e}), retrying documents individually")
+
+    stored = failed = 0
+    for doc in batch:
+        try:
+            pgvector.store_chunks(
+                source=doc["source"],
+                filename=doc["filename"],
+                chunks=doc["chunks"],
+                document_id=doc.get("document_id"),
+            )
+            _store_document_embeddings(pgvector, [doc])
+            stored += 1
+        except Exception as e:
+            print(f"  ERROR: {doc['source']}/{doc['filename']}: {e}")
+            failed += 1
+    return stored, failed
+
+
 def main():
     parser = argparse.ArgumentParser(description="Backfill pgvector from Paperless-ngx")
     parser.add_argument("--source", default=None, help="Source name for pgvector partition (default: correspondent name or 'paperless')")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done without storing")
     parser.add_argument("--skip-existing", action="store_true", help="Skip documents already in pgvector")
     parser.add_argument("--enrich", action="store_true", help="Enable contextual chunk enrichment via LLM")
+    parser.add_argument("--batch-size", type=int, default=20, help="Documents per bulk COPY transaction (default: 20)")
+    parser.add_argument("--no-defer-index", action="store_true", help="Maintain HNSW indexes row by row instead of building them once after the load")
+    parser.add_argument("--keep-existing-indexes", action="store_true", help="Only defer index builds for new partitions; existing partitions keep their index")
+    parser.add_argument("--maintenance-work-mem", default="1GB", help="maintenance_work_mem for deferred index builds (default: 1GB)")
+    parser.add_argument("--index-workers", type=int, default=None, help="Parallel maintenance workers for deferred index builds (default: server setting)")
     args = parser.parse_args()
 
+    if args.batch_size < 1:
+        print("ERROR: --batch-size must be >= 1")
+        sys.exit(1)
+    if args.index_workers is not None and args.index_workers < 0:
+        print("ERROR: --index-workers must be >= 0")
+        sys.exit(1)
+
     # Configuration — validate before using string methods
     if not Config.PAPERLESS_API_URL:
         print("ERROR: PAPERLESS_API_URL not configured")
@@ -227,10 +317,13 @@ def main():
         strategy=Config.CHUNKING_STRATEGY,
         max_tokens=Config.CHUNK_MAX_TOKENS,
         overlap_tokens=Config.CHUNK_OVERLAP_TOKENS,
+        tokenizer=resolve_tokenizer_name(Config.CHUNK_TOKENIZER, Config.EMBEDDING_MODEL),
     )
     pgvector = PgVectorVectorStore(
         database_url=database_url,
         dimensions=Config.EMBEDDING_DIMENSIONS,
+        index_quantization=Config.PGVECTOR_INDEX_QUANTIZATION,
+        rerank_factor=Config.PGVECTOR_RERANK_FACTOR,
     )
 
     try:
@@ -243,6 +336,7 @@ def main():
             print("ERROR: Cannot connect to PostgreSQL")
             sys.exit(1)
         print("Connections OK\n")
+        fingerprint = embedding_fingerprint(Config.EMBEDDING_MODEL, contextual=args.enrich)
 
         # Ensure schema
         if not args.dry_run:
@@ -272,97 +366,120 @@ def main():
         processed = 0
         skipped = 0
         errors = 0
-
-        for i, doc in enumerate(documents, 1):
-            doc_id = doc.get("id")
-            if doc_id is None:
-                print(f"[{i}/{len(documents)}] SKIP: Document missing 'id' field")
-                skipped += 1
-                continue
-            title = doc.get("title", f"document_{doc_id}")
-            correspondent_id = doc.get("correspondent")
-            source = args.source or (
-                correspondents.get(correspondent_id, "paperless")
-                if correspondent_id
-                else "paperless"
+        batch: list[dict] = []
+
+        # Build HNSW indexes once after the load instead of per row
+        if args.dry_run or args.no_defer_index:
+            index_mode = contextlib.nullcontext()
+        else:
+            index_mode = pgvector.bulk_load(
+                maintenance_work_mem=args.maintenance_work_mem,
+                parallel_workers=args.index_workers,
+                drop_existing=not args.keep_existing_indexes,
+                progress=print,
             )
-            filename = f"{_sanitize_filename(title)}.md"
-
-            print(f"[{i}/{len(documents)}] {source}/{filename}")
 
-            # Skip if already exists
-            if args.skip_existing and f"{source}/{filename}" in existing_files:
-                print("  SKIP: Already exists in pgvector")
-                skipped += 1
-                continue
-
-            if args.dry_run:
-                print(f"  DRY RUN: Would process document {doc_id}")
-                processed += 1
-                continue
-
-            try:
-                # Get document content
-                content = get_document_content(paperless_url, paperless_token, doc_id)
-                if not content or not content.strip():
-                    print("  SKIP: No text content")
+        with index_mode:
+            for i, doc in enumerate(documents, 1):
+                doc_id = doc.get("id")
+                if doc_id is None:
+                    print(f"[{i}/{len(documents)}] SKIP: Document missing 'id' field")
                     skipped += 1
                     continue
+                title = doc.get("title", f"document_{doc_id}")
+                correspondent_id = doc.get("correspondent")
+                source = args.source or (
+                    correspondents.get(correspondent_id, "paperless")
+                    if correspondent_id
+                    else "paperless"
+                )
+                filename = f"{_sanitize_filename(title)}.md"
+
+                print(f"[{i}/{len(documents)}] {source}/{filename}")
 
-                # Chunk
-                metadata = {
-                    "title": title,
-                    "source": source,
-                    "document_id": str(doc_id),
-                    "paperless_id": doc_id,
-                }
-                chunks = chunker.chunk(content, metadata)
-                if not chunks:
-                    print("  SKIP: No chunks produced")
+                # Skip if already exists
+                if args.skip_existing and f"{source}/{filename}" in existing_files:
+                    print("  SKIP: Already exists in pgvector")
                     skipped += 1
                     continue
 
-                # Optional contextual enrichment
-                if args.enrich:
-                    texts = _apply_contextual_enrichment_backfill(chunks, content)
-                else:
-                    texts = [c.content for c in chunks]
-
-                # Embed
-                embedding_result = embedder.embed(texts)
-
-                if len(embedding_result.embeddings) != len(chunks):
-                    print(
-                        f"  ERROR: Embedding count mismatch: "
-                        f"got {len(embedding_result.embeddings)}, expected {len(chunks)}"
-                    )
-                    errors += 1
+                if args.dry_run:
+                    print(f"  DRY RUN: Would process document {doc_id}")
+                    processed += 1
                     continue
 
-                # Prepare storage chunks
-                storage_chunks = [
-                    {
-                        "content": chunk.content,
-                        "embedding": emb,
-                        "chunk_index": chunk.index,
-                        "metadata": chunk.metadata,
+                try:
+                    # Get document content
+                    content = get_document_content(paperless_url, paperless_token, doc_id)
+                    if not content or not content.strip():
+                        print("  SKIP: No text content")
+                        skipped += 1
+                        continue
+
+                    # Chunk
+                    metadata = {
+                        "title": title,
+                        "source": source,
+                        "document_id": str(doc_id),
+                        "paperless_id": doc_id,
                     }
-                    for chunk, emb in zip(chunks, embedding_result.embeddings)
-                ]
-
-                # Store
-                count = pgvector.store_chunks(
-                    source=source,
-                    filename=filename,
-                    chunks=storage_chunks,
-                    document_id=str(doc_id),
-                )
-                print(f"  OK: {count} chunks stored")
-                processed += 1
+                    chunks = chunker.chunk(content, metadata)
+                    if not chunks:
+                        print("  SKIP: No chunks produced")
+                        skipped += 1
+                        continue
+
+                    # Optional contextual enrichment
+                    if args.enrich:
+                        texts = _apply_contextual_enrichment_backfill(chunks, content)
+                    else:
+                        texts = [c.content for c in chunks]
+
+                    # Embed
+                    embedding_result = embedder.embed(texts)
+
+                    if len(embedding_result.embeddings) != len(chunks):
+                        print(
+                            f"  ERROR: Embedding count mismatch: "
+                            f"got {len(embedding_result.embeddings)}, expected {len(chunks)}"
+                        )
+                        errors += 1
+                        continue
+
+                    # Prepare storage chunks
+                    storage_chunks = [
+                        {
+                            "content": chunk.content,
+                            "content_hash": chunk_content_hash(chunk.content, fingerprint),
+                            "embedding": emb,
+                            "chunk_index": chunk.index,
+                            "metadata": chunk.metadata,
+                        }
+                        for chunk, emb in zip(chunks, embedding_result.embeddings)
+                    ]
+
+                    # Queue for bulk store
+                    batch.append({
+                        "source": source,
+                        "filename": filename,
+                        "chunks": storage_chunks,
+                        "document_id": str(doc_id),
+                    })
+                    print(f"  OK: {len(storage_chunks)} chunks queued")
+
+                except Exception as e:
+                    print(f"  ERROR: {e}")
+                    errors += 1
+
+                if len(batch) >= args.batch_size:
+                    stored, failed = _flush_batch(pgvector, batch)
+                    processed += stored
+                    errors += failed
+                    batch = []
 
-            except Exception as e:
-                print(f"  ERROR: {e}")
-                errors += 1
+            stored, failed = _flush_batch(pgvector, batch)
+            processed += stored
+            errors += failed
 
         print(f"\nDone. Processed: {processed}, Skipped: {skipped}, Errors: {errors}")
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Micro-benchmark chunker time and peak memory on large documents.
+
+Generates a synthetic Markdown document (headings every --section-words
+words, with a table and a list in each section) and chunks it with
+FixedChunker, reporting wall time and the tracemalloc peak. The document
+itself is allocated before tracing starts, so the peak is the chunker's
+own working memory. Time is taken from a separate untraced run, since
+tracing slows allocation.
+
+With --compare, the previous FixedChunker implementation (per-word
+heading dict and a materialised word list) is run on the same document
+for reference; --markdown adds the in-process MarkdownChunker.
+
+With --docling-url, a throughput comparison runs instead: --docs
+documents of --doc-words words are chunked by MarkdownChunker and by
+docling-serve's hybrid chunker (HybridDoclingChunker), reporting
+documents per second for each.
+
+Usage:
+    python scripts/benchmark_chunker.py [--words N] [--max-tokens N]
+        [--overlap N] [--section-words N] [--stream] [--compare] [--markdown]
+    python scripts/benchmark_chunker.py --docling-url URL [--docs N] [--doc-words N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+# Ensure project root is on sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("BASIC_AUTH_ENABLED", "false")
+
+from app.services.chunking import FixedChunker, HybridDoclingChunker, MarkdownChunker
+
+
+def generate_document(words: int, section_words: int, seed: int = 0) -> str:
+    """Markdown with a heading, a table and a list every ``section_words`` words."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(3))
+        for _ in range(2000)
+    ]
+    lines = []
+    written = 0
+    while written < words:
+        lines.append(f"## Section {written // section_words}")
+        written += 3
+        section_end = min(written + section_words, words)
+        # A 3x4 table and a 3-item list open each section
+        if section_end - written > 60:
+            lines += ["", "| " + " | ".join(rng.choices(vocabulary, k=3)) + " |", "|---|---|---|"]
+            lines += ["| " + " | ".join(rng.choices(vocabulary, k=3)) + " |" for _ in range(4)]
+            lines += [""] + [f"- {' '.join(rng.choices(vocabulary, k=5))}" for _ in range(3)]
+            lines.append("")
+            written += 15 + 15 + 12
+        while written < section_end:
+            line_len = min(rng.randint(8, 16), section_end - written)
+            lines.append(" ".join(rng.choices(vocabulary, k=line_len)))
+            written += line_len
+    return "\n".join(lines)
+
+
+def legacy_chunk(text: str, max_tokens: int, overlap_tokens: int) -> list[tuple[str, Optional[str]]]:
+    """The pre-streaming FixedChunker algorithm, for comparison."""
+    words = text.split()
+    heading_map: dict[int, str] = {}
+    word_pos = 0
+    for line in text.split("\n"):
+        stripped = line.strip()
+        line_words = line.split()
+        if stripped.startswith("#"):
+            heading = stripped.lstrip("#").strip()
+            if heading and line_words:
+                heading_map[word_pos] = heading
+        word_pos += len(line_words)
+    full_map: dict[int, str] = {}
+    if heading_map:
+        positions = sorted(heading_map)
+        idx = 0
+        for pos in range(len(text.split())):
+            while idx < len(positions) - 1 and positions[idx + 1] <= pos:
+                idx += 1
+            if positions[idx] <= pos:
+                full_map[pos] = heading_map[positions[idx]]
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        end = min(start + max_tokens, len(words))
+        chunks.append((" ".join(words[start:end]), full_map.get(start)))
+        if end >= len(words):
+            break
+        start += max_tokens - overlap_tokens
+    return chunks
+
+
+def measure(label: str, run: Callable[[], int]) -> None:
+    """Print wall time (untraced run) and tracemalloc peak (second run) of ``run``."""
+    started = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {elapsed:>8.2f}s {peak / 1024 / 1024:>10.1f} MiB {count:>10,} chunks")
+
+
+def throughput(label: str, chunker, documents: list[str]) -> None:
+    """Chunk every document once and print documents per second."""
+    started = time.perf_counter()
+    chunks = sum(len(chunker.chunk(doc, {"filename": f"doc{i}.md"})) for i, doc in enumerate(documents))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<22} {elapsed:>8.2f}s {len(documents) / elapsed:>10.1f} docs/s "
+        f"{chunks / len(documents):>8.1f} chunks/doc"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark chunkers")
+    parser.add_argument("--words", type=int, default=1_000_000, help="Document length in words")
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--section-words", type=int, default=400,
+                        help="Words between headings")
+    parser.add_argument("--stream", action="store_true",
+                        help="Also consume iter_chunks() without keeping chunks")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also run the previous FixedChunker implementation")
+    parser.add_argument("--markdown", action="store_true",
+                        help="Also run MarkdownChunker")
+    parser.add_argument("--docling-url", default="",
+                        help="Compare MarkdownChunker throughput with docling-serve")
+    parser.add_argument("--docs", type=int, default=50, help="Documents for --docling-url")
+    parser.add_argument("--doc-words", type=int, default=5000, help="Words per document for --docling-url")
+    args = parser.parse_args()
+
+    if args.docling_url:
+        documents = [
+            generate_document(args.doc_words, args.section_words, seed=i) for i in range(args.docs)
+        ]
+        print(f"Documents: {args.docs} x {args.doc_words:,} words")
+        print(f"{'implementation':<22} {'time':>9} {'throughput':>17} {'output':>19}")
+        throughput("markdown", MarkdownChunker(args.max_tokens, args.overlap), documents)
+        throughput("docling-serve", HybridDoclingChunker(
+            args.max_tokens, args.overlap, docling_serve_url=args.docling_url
+        ), documents)
+        return 0
+
+    text = generate_document(args.words, args.section_words)
+    chunker = FixedChunker(max_tokens=args.max_tokens, overlap_tokens=args.overlap)
+    print(f"Document: {len(text.split()):,} words, {len(text) / 1024 / 1024:.1f} MiB")
+    print(f"{'implementation':<22} {'time':>9} {'peak':>14} {'output':>17}")
+
+    measure("chunk()", lambda: len(chunker.chunk(text)))
+    if args.stream:
+        measure("iter_chunks()", lambda: sum(1 for _ in chunker.iter_chunks(text)))
+    if args.compare:
+        measure("legacy", lambda: len(legacy_chunk(text, args.max_tokens, args.overlap)))
+    if args.markdown:
+        markdown = MarkdownChunker(max_tokens=args.max_tokens, overlap_tokens=args.overlap)
+        measure("markdown", lambda: len(markdown.chunk(text)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
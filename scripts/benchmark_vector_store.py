@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""Benchmark PgVectorVectorStore recall, latency and throughput.
+
+Generates (or loads) a synthetic corpus, embeds it with the offline stub
+embedder, ingests it through PgVectorVectorStore.store_chunks() into a
+throwaway schema, and measures search quality and speed:
+
+- recall@k against exact top-k computed with NumPy (same filters applied)
+- p50/p95/p99 latency and QPS at each concurrency level
+- one row per filter mix: none, source, metadata (jsonb containment),
+  column (publication_date range on the promoted column)
+
+No model server is needed. Point --database-url at a local PostgreSQL
+with pgvector; everything is written to the --schema schema, which is
+dropped afterwards unless --keep is given.
+
+Usage:
+    python scripts/benchmark_vector_store.py [--docs N] [--chunks-per-doc N]
+        [--dims N] [--queries N] [--k K] [--concurrency 1,4,8]
+        [--filters none,source,metadata,column] [--quantization MODE]
+        [--preset PRESET] [--bulk-load] [--corpus PATH] [--json PATH]
+
+Environment:
+    Reads from .env or .env.stack (set DOTENV_PATH to override).
+    BENCHMARK_DATABASE_URL overrides DATABASE_URL.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+# Ensure project root is on sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv(os.getenv("DOTENV_PATH", ".env"))
+os.environ.setdefault("BASIC_AUTH_ENABLED", "true")
+
+from app.config import Config
+from app.backends.vectorstores.pgvector_store import PgVectorVectorStore
+from app.services.embedding_client import StubEmbeddingClient
+
+FILTER_MIXES = ("none", "source", "metadata", "column")
+ORGANIZATIONS = ("AEMO", "AER", "ENA", "ECA", "DCCEEW", "CSIRO")
+DOCUMENT_TYPES = ("report", "policy", "guideline", "regulation", "submission")
+# Dates span ~3 years; the column filter keeps the most recent 6 months
+DATE_SPAN_DAYS = 3 * 365
+RECENT_DAYS = 182
+
+
+# ── corpus ──────────────────────────────────────────────────────────────
+
+
+def _pseudo_word(rng: random.Random) -> str:
+    """Pronounceable nonsense word, so tokens never collide with real text."""
+    consonants, vowels = "bcdfghjklmnprstvz", "aeiou"
+    return "".join(
+        rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 4))
+    )
+
+
+def generate_corpus(
+    docs: int, chunks_per_doc: int, sources: int, topics: int, seed: int
+) -> list[dict]:
+    """Generate a clustered synthetic corpus.
+
+    Each document belongs to one topic; its chunks draw most words from
+    the topic vocabulary and the rest from a shared background
+    vocabulary, so stub embeddings form topic clusters.
+    """
+    rng = random.Random(seed)
+    background = [_pseudo_word(rng) for _ in range(2000)]
+    vocabularies = [[_pseudo_word(rng) for _ in range(40)] for _ in range(topics)]
+    today = date.today()
+
+    corpus = []
+    for i in range(docs):
+        topic = rng.randrange(topics)
+        chunks = []
+        for _ in range(chunks_per_doc):
+            words = [
+                rng.choice(vocabularies[topic]) if rng.random() < 0.6 else rng.choice(background)
+                for _ in range(rng.randint(30, 60))
+            ]
+            chunks.append(" ".join(words))
+        corpus.append({
+            "source": f"bench_{i % sources}",
+            "filename": f"doc_{i:06d}.md",
+            "topic": topic,
+            "metadata": {
+                "organization": rng.choice(ORGANIZATIONS),
+                "document_type": rng.choice(DOCUMENT_TYPES),
+                "publication_date": (
+                    today - timedelta(days=rng.randrange(DATE_SPAN_DAYS))
+                ).isoformat(),
+            },
+            "chunks": chunks,
+        })
+    return corpus
+
+
+def generate_queries(corpus: list[dict], count: int, seed: int) -> list[str]:
+    """Build queries from words of randomly chosen corpus chunks."""
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        words = rng.choice(rng.choice(corpus)["chunks"]).split()
+        queries.append(" ".join(rng.sample(words, min(8, len(words)))))
+    return queries
+
+
+def load_or_generate_corpus(args: argparse.Namespace) -> list[dict]:
+    """Load --corpus if it exists, otherwise generate (and save if given)."""
+    path = Path(args.corpus) if args.corpus else None
+    if path and path.exists():
+        with path.open(encoding="utf-8") as f:
+            corpus = [json.loads(line) for line in f if line.strip()]
+        print(f"Loaded {len(corpus)} documents from {path}")
+        return corpus
+
+    corpus = generate_corpus(
+        args.docs, args.chunks_per_doc, args.sources, args.topics, args.seed
+    )
+    if path:
+        with path.open("w", encoding="utf-8") as f:
+            for doc in corpus:
+                f.write(json.dumps(doc) + "\n")
+        print(f"Saved generated corpus to {path}")
+    return corpus
+
+
+# ── ground truth ────────────────────────────────────────────────────────
+
+
+class GroundTruth:
+    """Exact cosine top-k over the embedded corpus with NumPy."""
+
+    def __init__(self, corpus: list[dict], embeddings: np.ndarray):
+        self.embeddings = embeddings  # rows are unit vectors
+        self.ids: list[tuple[str, str, int]] = []
+        sources, organizations, dates = [], [], []
+        for doc in corpus:
+            for index in range(len(doc["chunks"])):
+                self.ids.append((doc["source"], doc["filename"], index))
+                sources.append(doc["source"])
+                organizations.append(doc["metadata"]["organization"])
+                dates.append(doc["metadata"]["publication_date"])
+        self.sources = np.array(sources)
+        self.organizations = np.array(organizations)
+        self.dates = np.array(dates)
+
+    def top_k(self, query: np.ndarray, k: int, mask: np.ndarray | None) -> set:
+        scores = self.embeddings @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        count = min(k, int(mask.sum()) if mask is not None else len(scores))
+        if count == 0:
+            return set()
+        best = np.argpartition(-scores, count - 1)[:count]
+        return {self.ids[i] for i in best}
+
+
+def build_filter_case(
+    mix: str, truth: GroundTruth, rng: random.Random
+) -> tuple[dict, np.ndarray | None]:
+    """Return (search kwargs, ground-truth row mask) for a filter mix."""
+    if mix == "source":
+        source = rng.choice(sorted(set(truth.sources.tolist())))
+        return {"sources": [source]}, truth.sources == source
+    if mix == "metadata":
+        organization = rng.choice(ORGANIZATIONS)
+        return {"metadata_filter": {"organization": organization}}, (
+            truth.organizations == organization
+        )
+    if mix == "column":
+        cutoff = (date.today() - timedelta(days=RECENT_DAYS)).isoformat()
+        return {"filters": {"publication_date": {"gte": cutoff}}}, truth.dates >= cutoff
+    return {}, None
+
+
+# ── measurement ─────────────────────────────────────────────────────────
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (pct in 0..100)."""
+    ordered = sorted(values)
+    rank = max(1, int(np.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def run_case(
+    store: PgVectorVectorStore,
+    query_vectors: np.ndarray,
+    cases: list[tuple[dict, np.ndarray | None]],
+    truth: GroundTruth,
+    k: int,
+    concurrency: int,
+    preset: str | None,
+) -> dict:
+    """Run every query once at ``concurrency`` and summarise the results."""
+
+    def one(i: int) -> tuple[float, float]:
+        kwargs, mask = cases[i]
+        start = time.perf_counter()
+        results = store.search(query_vectors[i].tolist(), limit=k, preset=preset, **kwargs)
+        latency = time.perf_counter() - start
+        exact = truth.top_k(query_vectors[i], k, mask)
+        found = {(r["source"], r["filename"], r["chunk_index"]) for r in results}
+        recall = len(exact & found) / len(exact) if exact else 1.0
+        return latency, recall
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one, range(len(cases))))
+    wall = time.perf_counter() - wall_start
+
+    latencies = [o[0] * 1000 for o in outcomes]
+    return {
+        "concurrency": concurrency,
+        "queries": len(outcomes),
+        "recall": statistics.fmean(o[1] for o in outcomes),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "qps": len(outcomes) / wall if wall else 0.0,
+    }
+
+
+# ── database setup ──────────────────────────────────────────────────────
+
+
+def schema_url(database_url: str, schema: str) -> str:
+    """Add a search_path option so every statement lands in ``schema``."""
+    options = quote(f"-c search_path={schema},public")
+    separator = "&" if "?" in database_url else "?"
+    return f"{database_url}{separator}options={options}"
+
+
+def reset_schema(database_url: str, schema: str, create: bool) -> None:
+    """Drop (and optionally recreate) the benchmark schema."""
+    import psycopg
+    from psycopg import sql
+
+    with psycopg.connect(database_url, autocommit=True) as conn:
+        conn.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(sql.Identifier(schema)))
+        if create:
+            conn.execute(sql.SQL("CREATE SCHEMA {}").format(sql.Identifier(schema)))
+
+
+def ingest(store: PgVectorVectorStore, corpus: list[dict], embeddings: np.ndarray) -> float:
+    """Store every document via store_chunks(); returns elapsed seconds."""
+    start = time.perf_counter()
+    row = 0
+    for n, doc in enumerate(corpus, 1):
+        chunks = []
+        for index, content in enumerate(doc["chunks"]):
+            chunks.append({
+                "content": content,
+                "embedding": embeddings[row].tolist(),
+                "chunk_index": index,
+                "metadata": doc["metadata"],
+            })
+            row += 1
+        store.store_chunks(doc["source"], doc["filename"], chunks)
+        if n % 500 == 0:
+            print(f"  ingested {n}/{len(corpus)} documents")
+    return time.perf_counter() - start
+
+
+# ── main ────────────────────────────────────────────────────────────────
+
+
+def _csv(value: str) -> list[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pgvector store")
+    parser.add_argument("--database-url", default=os.getenv("BENCHMARK_DATABASE_URL", Config.DATABASE_URL))
+    parser.add_argument("--schema", default="vector_bench", help="Scratch schema (default: vector_bench)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema afterwards")
+    parser.add_argument("--corpus", default=None, help="JSONL corpus to load, or to save the generated one to")
+    parser.add_argument("--docs", type=int, default=1000, help="Documents to generate (default: 1000)")
+    parser.add_argument("--chunks-per-doc", type=int, default=10, help="Chunks per document (default: 10)")
+    parser.add_argument("--sources", type=int, default=4, help="Source partitions (default: 4)")
+    parser.add_argument("--topics", type=int, default=50, help="Topic clusters (default: 50)")
+    parser.add_argument("--dims", type=int, default=384, help="Embedding dimensions (default: 384)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per run (default: 200)")
+    parser.add_argument("--k", type=int, default=10, help="k for recall@k (default: 10)")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated levels (pool max is 10)")
+    parser.add_argument("--filters", default=",".join(FILTER_MIXES), help="Filter mixes to run")
+    parser.add_argument("--quantization", default="none", help="Index quantization: none, halfvec, binary")
+    parser.add_argument("--preset", default=None, help="Search preset: fast, balanced, accurate")
+    parser.add_argument("--bulk-load", action="store_true", help="Ingest inside bulk_load() (deferred HNSW build)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", default=None, help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("ERROR: set --database-url, BENCHMARK_DATABASE_URL or DATABASE_URL")
+        sys.exit(1)
+    mixes = _csv(args.filters)
+    unknown = set(mixes) - set(FILTER_MIXES)
+    if unknown:
+        parser.error(f"unknown filter mix(es): {', '.join(sorted(unknown))}")
+    try:
+        levels = [int(c) for c in _csv(args.concurrency)]
+    except ValueError:
+        parser.error("--concurrency must be comma-separated integers")
+    if min(levels, default=0) < 1 or args.k < 1 or args.queries < 1:
+        parser.error("--concurrency levels, --k and --queries must be >= 1")
+
+    corpus = load_or_generate_corpus(args)
+    queries = generate_queries(corpus, args.queries, args.seed)
+    embedder = StubEmbeddingClient(dimensions=args.dims)
+
+    print(f"Embedding {sum(len(d['chunks']) for d in corpus)} chunks (stub, {args.dims} dims)...")
+    texts = [chunk for doc in corpus for chunk in doc["chunks"]]
+    embeddings = np.asarray(embedder.embed(texts).embeddings, dtype=np.float32)
+    query_vectors = np.asarray(embedder.embed(queries).embeddings, dtype=np.float32)
+    truth = GroundTruth(corpus, embeddings)
+
+    reset_schema(args.database_url, args.schema, create=True)
+    store = PgVectorVectorStore(
+        database_url=schema_url(args.database_url, args.schema),
+        dimensions=args.dims,
+        view_name="",
+        index_quantization=args.quantization,
+        metadata_columns={"publication_date": "date", "organization": "text"},
+    )
+    report: dict = {
+        "corpus": {"documents": len(corpus), "chunks": len(texts), "dims": args.dims},
+        "quantization": args.quantization,
+        "preset": args.preset,
+        "k": args.k,
+        "runs": [],
+    }
+
+    try:
+        store.ensure_ready()
+        print(f"Ingesting into schema '{args.schema}'...")
+        if args.bulk_load:
+            with store.bulk_load(progress=print):
+                elapsed = ingest(store, corpus, embeddings)
+        else:
+            elapsed = ingest(store, corpus, embeddings)
+        report["ingest_seconds"] = elapsed
+        print(f"Ingested {len(texts)} chunks in {elapsed:.1f}s ({len(texts) / elapsed:.0f} chunks/s)")
+        report["index_bytes"] = sum(s["size_bytes"] for s in store.get_index_sizes())
+
+        print(
+            f"\n{'filter':<10}{'conc':>5}{'recall@' + str(args.k):>11}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'QPS':>9}"
+        )
+        for mix in mixes:
+            rng = random.Random(args.seed + 2)
+            cases = [build_filter_case(mix, truth, rng) for _ in queries]
+            for level in levels:
+                result = run_case(
+                    store, query_vectors, cases, truth, args.k, level, args.preset
+                )
+                result["filter"] = mix
+                report["runs"].append(result)
+                print(
+                    f"{mix:<10}{level:>5}{result['recall']:>11.4f}"
+                    f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}"
+                    f"{result['p99_ms']:>9.1f}{result['qps']:>9.1f}"
+                )
+    finally:
+        store.close()
+        if not args.keep:
+            reset_schema(args.database_url, args.schema, create=False)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
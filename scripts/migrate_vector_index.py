@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Rebuild pgvector HNSW indexes for the configured quantization mode.
+
+Switching PGVECTOR_INDEX_QUANTIZATION only affects partitions created
+afterwards. This script rebuilds the HNSW index on every existing
+partition for the configured mode, drops the indexes of the other modes,
+and reports index sizes before and after. With --measure-recall it also
+samples stored embeddings as queries and reports recall@k of search()
+against an exact (sequential scan) ranking. With --document-embeddings it
+creates the document-level embeddings used by two-stage search for
+documents stored before they existed. With --purge-boilerplate it backfills
+missing boilerplate hashes, removes stored copies of chunks registered as
+shared boilerplate (requires BOILERPLATE_MIN_DOCUMENTS > 0) and prints the
+space-reclaimed report.
+With --add-columns it first adds the generated columns that tables from
+older releases lack (content_tsv for hybrid search) and a meta_* column
+per PGVECTOR_METADATA_COLUMNS key, then indexes them. That is a single
+ALTER TABLE which takes an ACCESS EXCLUSIVE lock on document_chunks and
+rewrites the whole table, so run it in a maintenance window.
+
+Usage:
+    python scripts/migrate_vector_index.py [--dry-run] [--measure-recall N] [--k K]
+                                           [--document-embeddings] [--purge-boilerplate]
+                                           [--add-columns]
+
+Environment:
+    Reads from .env or .env.stack (set DOTENV_PATH to override).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root is on sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv(os.getenv("DOTENV_PATH", ".env"))
+os.environ.setdefault("BASIC_AUTH_ENABLED", "true")
+
+from app.config import Config
+from app.backends.vectorstores.base import parse_metadata_columns
+from app.backends.vectorstores.pgvector_store import PgVectorVectorStore
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024  # type: ignore[assignment]
+    return f"{size:.1f} TB"
+
+
+def print_index_sizes(store: PgVectorVectorStore, label: str) -> None:
+    """Print HNSW index sizes per partition."""
+    sizes = store.get_index_sizes()
+    total = sum(s["size_bytes"] for s in sizes)
+    print(f"\n{label} ({len(sizes)} indexes, {_format_bytes(total)} total):")
+    for entry in sizes:
+        print(f"  {entry['index_name']}: {_format_bytes(entry['size_bytes'])}")
+
+
+def measure_recall(store: PgVectorVectorStore, samples: int, k: int) -> float:
+    """Measure mean recall@k of store.search() against exact ranking.
+
+    Uses randomly sampled stored embeddings as queries. The exact ranking
+    disables index scans for its transaction so it is a true brute-force
+    ordering by full-precision cosine distance.
+    """
+    from pgvector.psycopg import register_vector
+
+    pool = store._get_pool()
+    with pool.connection() as conn:
+        register_vector(conn)
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT embedding FROM document_chunks ORDER BY random() LIMIT %s",
+                (samples,),
+            )
+            queries = [row[0] for row in cur.fetchall()]
+
+    if not queries:
+        print("  No embeddings stored — nothing to measure")
+        return 0.0
+
+    recalls = []
+    approx_time = 0.0
+    for query in queries:
+        with pool.connection() as conn:
+            register_vector(conn)
+            with conn.transaction():
+                with conn.cursor() as cur:
+                    cur.execute("SET LOCAL enable_indexscan = off")
+                    cur.execute(
+                        "SELECT source, filename, chunk_index FROM document_chunks "
+                        "ORDER BY embedding <=> %s::vector LIMIT %s",
+                        (query, k),
+                    )
+                    exact = {tuple(row) for row in cur.fetchall()}
+
+        start = time.perf_counter()
+        results = store.search(list(query), limit=k)
+        approx_time += time.perf_counter() - start
+        approx = {(r["source"], r["filename"], r["chunk_index"]) for r in results}
+        recalls.append(len(exact & approx) / len(exact) if exact else 1.0)
+
+    mean_recall = sum(recalls) / len(recalls)
+    print(
+        f"  recall@{k}: {mean_recall:.4f} over {len(recalls)} queries "
+        f"(mean search latency {approx_time / len(recalls) * 1000:.1f} ms)"
+    )
+    return mean_recall
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild pgvector HNSW indexes for PGVECTOR_INDEX_QUANTIZATION"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Show current index sizes without rebuilding"
+    )
+    parser.add_argument(
+        "--measure-recall", type=int, default=0, metavar="N",
+        help="Sample N stored embeddings and report recall@k after migrating"
+    )
+    parser.add_argument(
+        "--k", type=int, default=10,
+        help="k for recall@k (default: 10)"
+    )
+    parser.add_argument(
+        "--document-embeddings", action="store_true",
+        help="Also create missing document embeddings for two-stage search"
+    )
+    parser.add_argument(
+        "--purge-boilerplate", action="store_true",
+        help="Also delete stored copies of chunks registered as shared boilerplate"
+    )
+    parser.add_argument(
+        "--add-columns", action="store_true",
+        help="Add missing generated columns first (locks and rewrites document_chunks)"
+    )
+    args = parser.parse_args()
+
+    if args.measure_recall < 0 or args.k < 1:
+        parser.error("--measure-recall must be >= 0 and --k must be >= 1")
+
+    if not Config.DATABASE_URL:
+        print("ERROR: DATABASE_URL not configured")
+        sys.exit(1)
+    if args.purge_boilerplate and Config.BOILERPLATE_MIN_DOCUMENTS < 1:
+        parser.error("--purge-boilerplate requires BOILERPLATE_MIN_DOCUMENTS > 0")
+
+    store = PgVectorVectorStore(
+        database_url=Config.DATABASE_URL,
+        dimensions=Config.EMBEDDING_DIMENSIONS,
+        view_name=Config.ANYTHINGLLM_VIEW_NAME,
+        index_quantization=Config.PGVECTOR_INDEX_QUANTIZATION,
+        rerank_factor=Config.PGVECTOR_RERANK_FACTOR,
+        metadata_columns=parse_metadata_columns(Config.PGVECTOR_METADATA_COLUMNS),
+        boilerplate_dedup=Config.BOILERPLATE_MIN_DOCUMENTS > 0,
+    )
+    print(f"Quantization: {Config.PGVECTOR_INDEX_QUANTIZATION}")
+    print(f"Rerank factor: {Config.PGVECTOR_RERANK_FACTOR}")
+
+    try:
+        print_index_sizes(store, "Current HNSW indexes")
+        if args.dry_run:
+            print("\nDRY RUN: no indexes rebuilt")
+            return
+
+        if args.add_columns:
+            start = time.perf_counter()
+            added = store.migrate_columns()
+            print(
+                f"\nAdded {len(added)} column(s) {', '.join(added)} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+
+        start = time.perf_counter()
+        partitions = store.migrate_index_quantization()
+        print(
+            f"\nRebuilt {len(partitions)} partition(s) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        print_index_sizes(store, "HNSW indexes after migration")
+
+        if args.document_embeddings:
+            created = store.backfill_document_embeddings()
+            print(f"\nCreated {created} missing document embedding(s)")
+
+        if args.purge_boilerplate:
+            hashed = store.backfill_boilerplate_hashes()
+            print(f"\nBackfilled boilerplate hashes on {hashed} chunk(s)")
+            purged = store.purge_boilerplate()
+            print(f"\nPurged {purged} boilerplate chunk copies")
+            for row in store.get_boilerplate_report():
+                print(
+                    f"  {row['source']:<24} {row['snippets']:>6} snippets "
+                    f"{row['chunks_deduplicated']:>8} chunks "
+                    f"{row['bytes_reclaimed'] / 1024 / 1024:>9.1f} MiB reclaimed"
+                )
+
+        if args.measure_recall:
+            print("\nMeasuring recall...")
+            measure_recall(store, args.measure_recall, args.k)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -560,8 +560,10 @@ class TestE2EPipelineFormatRouting:
 
         # Mock Tika client
         mock_tika = Mock()
-        mock_tika.extract_text.return_value = "Extracted office text."
-        mock_tika.extract_metadata.return_value = {"title": "Office Doc"}
+        mock_tika.extract_text_and_metadata.return_value = (
+            "Extracted office text.",
+            {"title": "Office Doc"},
+        )
         mock_container.tika_client = mock_tika
 
         # Mock Gotenberg
@@ -598,8 +600,7 @@ class TestE2EPipelineFormatRouting:
             result = pipeline.run()
 
         # Tika should have been used for extraction
-        mock_tika.extract_text.assert_called_once()
-        mock_tika.extract_metadata.assert_called_once()
+        mock_tika.extract_text_and_metadata.assert_called_once()
 
         # Parser backend should NOT have been called
         mock_container.parser_backend.parse_document.assert_not_called()
@@ -55,6 +55,10 @@ def app():
         # `from app.web.runtime import container` creates a separate reference.
         patch("app.web.blueprints.search.container", mock_container),
     ]
+    # Shared-backend cache, so results are cached as with REDIS_URL set
+    from app.services.search_cache import SearchCache, _MemoryBackend, reset_search_cache
+    patches.append(patch("app.services.search_cache._cache", SearchCache(_MemoryBackend(100))))
+
     for p in patches:
         p.start()
 
@@ -72,6 +76,7 @@ def app():
     finally:
         for p in patches:
             p.stop()
+        reset_search_cache()
 
 
 @pytest.fixture
@@ -129,6 +134,190 @@ class TestSearchAPI:
         )
         assert resp.status_code == 200
 
+    def test_search_hybrid_mode(self, client, app):
+        from app.web.blueprints.search import container
+        container.pgvector_client.search_hybrid.return_value = [
+            {"source": "aemo", "filename": "doc.md", "chunk_index": 0,
+             "content": "x", "metadata": {}, "score": 0.03,
+             "semantic_rank": 1, "lexical_rank": 1},
+        ]
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "rule 5.3.4", "mode": "hybrid"}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["mode"] == "hybrid"
+        assert data["results"][0]["lexical_rank"] == 1
+        kwargs = container.pgvector_client.search_hybrid.call_args.kwargs
+        assert kwargs["query_text"] == "rule 5.3.4"
+        container.pgvector_client.search.assert_not_called()
+
+    def test_search_two_stage_mode(self, client):
+        from app.web.blueprints.search import container
+        container.pgvector_client.search_two_stage.return_value = [
+            {"source": "aemo", "filename": "doc.md", "chunk_index": 0,
+             "content": "x", "metadata": {}, "score": 0.9},
+        ]
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "mode": "two_stage", "mmr_lambda": 0.5}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        assert resp.get_json()["mode"] == "two_stage"
+        kwargs = container.pgvector_client.search_two_stage.call_args.kwargs
+        # MMR runs in the post-retrieval stage over over-fetched candidates
+        assert kwargs["limit"] == 40
+        assert kwargs["include_embeddings"] is True
+        container.pgvector_client.search.assert_not_called()
+
+    def test_search_post_stage_diversifies_and_caps(self, client):
+        from app.web.blueprints.search import container
+        container.pgvector_client.search.return_value = [
+            {"source": "aemo", "filename": name, "chunk_index": i, "content": "x",
+             "metadata": {}, "score": 0.9 - i / 10, "embedding": vector}
+            for i, (name, vector) in enumerate([
+                ("a.md", [0.1, 0.2, 0.3]), ("a.md", [0.1, 0.2, 0.31]), ("b.md", [0.3, 0.1, 0.0]),
+            ])
+        ]
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "limit": 2, "mmr_lambda": 0.7,
+                             "max_per_document": 1}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        results = resp.get_json()["results"]
+        assert [r["filename"] for r in results] == ["a.md", "b.md"]
+        assert "embedding" not in results[0]
+        assert container.pgvector_client.search.call_args.kwargs["limit"] == 8
+
+    def test_search_rerank(self, client):
+        from app.web.blueprints.search import container
+        container.reranker_client.is_configured.return_value = True
+        container.reranker_client.rerank.return_value = [0.5]
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "energy", "rerank": True}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        assert resp.get_json()["results"][0]["rerank_score"] == 0.5
+        container.reranker_client.rerank.assert_called_once_with(
+            "energy", ["Energy policy content"]
+        )
+
+    def test_search_rerank_not_configured(self, client):
+        from app.web.blueprints.search import container
+        container.reranker_client.is_configured.return_value = False
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "energy", "rerank": True}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 503
+
+    @pytest.mark.parametrize("payload", [
+        {"query": "test", "mmr_lambda": 2},
+        {"query": "test", "mmr_lambda": "high"},
+        {"query": "test", "max_per_document": 0},
+        {"query": "test", "rerank": "yes"},
+    ])
+    def test_search_invalid_post_stage_options(self, client, payload):
+        resp = client.post(
+            "/api/search",
+            data=json.dumps(payload),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+
+    def test_repeated_search_served_from_cache(self, client):
+        from app.web.blueprints.search import container
+        payload = json.dumps({"query": "energy policy", "limit": 5})
+
+        for _ in range(2):
+            resp = client.post("/api/search", data=payload, content_type="application/json")
+            assert resp.status_code == 200
+            assert resp.get_json()["count"] == 1
+
+        container.embedding_client.embed_single.assert_called_once()
+        container.pgvector_client.search.assert_called_once()
+
+    def test_ingest_invalidates_cached_results(self, client):
+        from app.services.search_cache import invalidate_sources
+        from app.web.blueprints.search import container
+        payload = json.dumps({"query": "energy policy", "sources": ["aemo"]})
+
+        client.post("/api/search", data=payload, content_type="application/json")
+        invalidate_sources(["aemo"])
+        client.post("/api/search", data=payload, content_type="application/json")
+
+        # Query embedding is still cached; results are recomputed
+        container.embedding_client.embed_single.assert_called_once()
+        assert container.pgvector_client.search.call_count == 2
+
+    def test_search_preset_forwarded(self, client):
+        from app.web.blueprints.search import container
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "preset": "accurate"}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        assert container.pgvector_client.search.call_args.kwargs["preset"] == "accurate"
+
+    def test_search_invalid_preset(self, client):
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "preset": "exhaustive"}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+
+    def test_search_column_filters_forwarded(self, client):
+        from app.web.blueprints.search import container
+        filters = {"publication_date": {"within_months": 6}, "organization": "AEMO"}
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "filters": filters}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 200
+        container.pgvector_client.validate_filters.assert_called_with(filters)
+        assert container.pgvector_client.search.call_args.kwargs["filters"] == filters
+
+    def test_search_rejected_filters(self, client):
+        from app.web.blueprints.search import container
+        container.pgvector_client.validate_filters.side_effect = ValueError(
+            "Cannot filter on 'colour'"
+        )
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "filters": {"colour": "red"}}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+        assert "colour" in resp.get_json()["error"]
+        container.pgvector_client.search.assert_not_called()
+
+    def test_search_filters_must_be_object(self, client):
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "filters": ["x"]}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+
+    def test_search_invalid_mode(self, client):
+        resp = client.post(
+            "/api/search",
+            data=json.dumps({"query": "test", "mode": "keyword"}),
+            content_type="application/json",
+        )
+        assert resp.status_code == 400
+
 
 class TestSourcesAPI:
     """Test GET /api/sources."""
@@ -192,10 +381,10 @@ class TestDocumentChunksAPI:
         # Access the mock pgvector_client through the app's patched container
         with app.app_context():
             from app.web.blueprints.search import container as search_container
-            search_container.pgvector_client.get_document_chunks.return_value = [
+            search_container.pgvector_client.iter_document_chunks.return_value = iter([
                 {"chunk_index": 0, "content": "chunk one"},
                 {"chunk_index": 1, "content": "chunk two"},
-            ]
+            ])
 
         resp = client.get("/api/search/document/aemo/report.md")
         assert resp.status_code == 200
@@ -203,6 +392,79 @@ class TestDocumentChunksAPI:
         assert data["source"] == "aemo"
         assert data["filename"] == "report.md"
         assert data["chunk_count"] == 2
+        assert data["next_after"] is None
+
+    def test_unpaginated_request_returns_whole_document(self, client, app):
+        """Callers that predate pagination still get every chunk."""
+        from app.web.blueprints.search import container as search_container
+        store = search_container.pgvector_client
+        store.iter_document_chunks.return_value = iter(
+            {"chunk_index": i, "content": f"chunk {i}"} for i in range(1500)
+        )
+
+        resp = client.get("/api/search/document/aemo/report.md")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["chunk_count"] == 1500
+        assert [c["chunk_index"] for c in data["chunks"]] == list(range(1500))
+        assert data["next_after"] is None
+        store.iter_document_chunks.assert_called_with(
+            "aemo", "report.md", after_index=-1, limit=None
+        )
+
+    def test_keyset_pagination(self, client, app):
+        """A page one row short of the fetch returns a next_after cursor."""
+        from app.web.blueprints.search import container as search_container
+        store = search_container.pgvector_client
+        store.iter_document_chunks.return_value = iter([
+            {"chunk_index": 5, "content": "a"},
+            {"chunk_index": 6, "content": "b"},
+            {"chunk_index": 7, "content": "c"},
+        ])
+
+        resp = client.get("/api/search/document/aemo/report.md?after=4&limit=2")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert [c["chunk_index"] for c in data["chunks"]] == [5, 6]
+        assert data["next_after"] == 6
+        store.iter_document_chunks.assert_called_with(
+            "aemo", "report.md", after_index=4, limit=3
+        )
+
+    def test_invalid_after(self, client):
+        resp = client.get("/api/search/document/aemo/report.md?after=abc")
+        assert resp.status_code == 400
+
+    def test_ndjson_stream(self, client, app):
+        """format=ndjson streams one chunk per line without a page cap."""
+        from app.web.blueprints.search import container as search_container
+        store = search_container.pgvector_client
+        store.iter_document_chunks.return_value = iter([
+            {"chunk_index": 0, "content": "one"},
+            {"chunk_index": 1, "content": "two"},
+        ])
+
+        resp = client.get("/api/search/document/aemo/report.md?format=ndjson")
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/x-ndjson"
+        lines = resp.get_data(as_text=True).splitlines()
+        assert [json.loads(line)["content"] for line in lines] == ["one", "two"]
+        store.iter_document_chunks.assert_called_with(
+            "aemo", "report.md", after_index=-1, limit=None
+        )
+
+    def test_list_documents_page(self, client, app):
+        from app.web.blueprints.search import container as search_container
+        search_container.pgvector_client.iter_documents.return_value = iter([
+            {"source": "aemo", "filename": "a.md", "metadata": {}},
+            {"source": "aemo", "filename": "b.md", "metadata": {}},
+        ])
+
+        resp = client.get("/api/search/documents/aemo?limit=1")
+        assert resp.status_code == 200
+        data = resp.get_json()
+        assert data["document_count"] == 1
+        assert data["next_after"] == "a.md"
 
     def test_invalid_source_with_traversal(self, client):
         """Source containing '..' should be rejected."""
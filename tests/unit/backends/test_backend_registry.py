@@ -1,7 +1,7 @@
 """Tests for BackendRegistry."""
 
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from app.services.backend_registry import BackendRegistry, get_backend_registry
 
@@ -67,7 +67,7 @@ class TestDefaultRegistry:
     def test_vectorstore_names(self):
         registry = get_backend_registry()
         names = sorted(registry.names("vectorstore"))
-        assert names == ["pgvector"]
+        assert names == ["local", "pgvector"]
 
     def test_unimplemented_mineru_raises(self):
         registry = get_backend_registry()
@@ -181,3 +181,17 @@ class TestDefaultRegistryFactories:
 
         with pytest.raises(ValueError, match="AnythingLLM configuration missing"):
             registry.create("rag", "anythingllm", mock_container)
+
+    def test_local_vector_store_factory(self, tmp_path):
+        """local vector store factory should build a LocalVectorStore from Config."""
+        from app.backends.vectorstores.local_store import LocalVectorStore
+
+        registry = get_backend_registry()
+        mock_container = MagicMock()
+        mock_container._safe_int.return_value = 8
+
+        with patch("app.config.Config.LOCAL_VECTOR_DIR", tmp_path / "vectors"):
+            store = registry.create("vectorstore", "local", mock_container)
+
+        assert isinstance(store, LocalVectorStore)
+        assert store.is_available() is True
@@ -2,9 +2,16 @@
 
 import pytest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from app.backends.rag.vector_adapter import VectorRAGBackend
+from app.backends.vectorstores.base import chunk_content_hash, embedding_fingerprint
+from app.backends.vectorstores.ranking import mean_pool_embeddings
+
+
+def _hash(content, model="test-model", contextual=False):
+    """Stored hash of a chunk embedded by the mock embedder."""
+    return chunk_content_hash(content, embedding_fingerprint(model, contextual))
 
 
 @pytest.fixture
@@ -13,6 +20,7 @@ def mock_vector_store():
     store.is_configured.return_value = True
     store.test_connection.return_value = True
     store.store_chunks.return_value = 3
+    store.get_chunk_hashes.return_value = {}  # new document by default
     store.name = "pgvector"
     return store
 
@@ -22,6 +30,7 @@ def mock_embedder():
     client = MagicMock()
     client.is_configured.return_value = True
     client.test_connection.return_value = True
+    client.model = "test-model"
 
     def _embed(texts):
         """Return one embedding per input text."""
@@ -196,3 +205,346 @@ class TestVectorRAGBackendIngest:
 
         assert mock_vector_store.store_chunks.call_args is not None
         assert mock_vector_store.store_chunks.call_args.kwargs.get("document_id") == "42"
+
+
+    def test_ingest_chunks_docling_sidecar(self, backend, mock_vector_store, tmp_path):
+        from app.services.chunking import Chunk
+
+        md_file = tmp_path / "report.md"
+        md_file.write_text("# Report\n\nBody")
+        (tmp_path / "report.docling.json").write_text('{"body": {}}')
+        structured = [Chunk(content="Body", index=0, metadata={"page_numbers": [1]})]
+
+        with patch.object(
+            backend._chunker, "chunk_docling_document", return_value=structured
+        ) as chunk_document, patch.object(backend._chunker, "chunk") as chunk_markdown:
+            result = backend.ingest_document(md_file, {"source": "aemo"})
+
+        assert result.success is True
+        assert chunk_document.call_args[0][0] == {"body": {}}
+        chunk_markdown.assert_not_called()
+        stored = mock_vector_store.store_chunks.call_args.kwargs["chunks"]
+        assert stored[0]["metadata"] == {"page_numbers": [1]}
+
+    def test_unreadable_sidecar_falls_back_to_markdown(self, backend, mock_vector_store, tmp_path):
+        md_file = tmp_path / "report.md"
+        md_file.write_text("Body text")
+        (tmp_path / "report.docling.json").write_text("{not json")
+
+        result = backend.ingest_document(md_file, {"source": "aemo"})
+
+        assert result.success is True
+        stored = mock_vector_store.store_chunks.call_args.kwargs["chunks"]
+        assert stored[0]["content"] == "Body text"
+
+
+class TestVectorRAGBackendIncrementalIngest:
+    """Test that re-ingests only embed and write changed chunks."""
+
+    def _ingest_with_existing(self, backend, tmp_path, contents, existing):
+        from app.services.chunking import Chunk
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("\n\n".join(contents))
+        backend._store.get_chunk_hashes.return_value = existing
+        chunks = [Chunk(content=c, index=i) for i, c in enumerate(contents)]
+        with patch.object(backend._chunker, "chunk", return_value=chunks):
+            return backend.ingest_document(md_file, {"source": "aemo"})
+
+    def test_only_changed_chunks_embedded(self, backend, mock_vector_store, mock_embedder, tmp_path):
+        existing = {0: _hash("same"), 1: _hash("old footer")}
+
+        result = self._ingest_with_existing(
+            backend, tmp_path, ["same", "new footer"], existing
+        )
+
+        assert result.success is True
+        mock_embedder.embed.assert_called_once_with(["new footer"])
+        mock_vector_store.store_chunks.assert_not_called()
+        stored = mock_vector_store.sync_chunks.call_args.kwargs["chunks"]
+        assert "embedding" not in stored[0]
+        assert stored[1]["embedding"] == [0.1, 0.2]
+        assert stored[1]["content_hash"] == _hash("new footer")
+
+    def test_unchanged_document_skips_embedding(self, backend, mock_vector_store, mock_embedder, tmp_path):
+        existing = {0: _hash("a"), 1: _hash("b"), 2: "orphan"}
+
+        result = self._ingest_with_existing(backend, tmp_path, ["a", "b"], existing)
+
+        assert result.success is True
+        mock_embedder.embed.assert_not_called()
+        # sync still runs so the orphaned chunk 2 is removed
+        mock_vector_store.sync_chunks.assert_called_once()
+        stored = mock_vector_store.sync_chunks.call_args.kwargs["chunks"]
+        assert [c["chunk_index"] for c in stored] == [0, 1]
+
+    @pytest.mark.parametrize("stored_hash", [
+        _hash("a", model="old-model"),
+        _hash("a", contextual=True),
+        chunk_content_hash("a"),
+    ], ids=["model-changed", "enrichment-toggled", "pre-fingerprint"])
+    def test_embedding_change_reembeds(self, backend, mock_embedder, tmp_path, stored_hash):
+        self._ingest_with_existing(backend, tmp_path, ["a"], {0: stored_hash})
+
+        mock_embedder.embed.assert_called_once_with(["a"])
+
+    def test_shifted_chunks_reuse_stored_vectors(
+        self, backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        """Inserting a chunk at the top re-embeds only that chunk."""
+        existing = {0: _hash("a"), 1: _hash("b")}
+        mock_vector_store.get_chunk_embeddings.return_value = {0: [1.0, 0.0], 1: [0.0, 1.0]}
+
+        self._ingest_with_existing(backend, tmp_path, ["intro", "a", "b"], existing)
+
+        mock_embedder.embed.assert_called_once_with(["intro"])
+        stored = mock_vector_store.sync_chunks.call_args.kwargs["chunks"]
+        assert [c["embedding"] for c in stored] == [[0.1, 0.2], [1.0, 0.0], [0.0, 1.0]]
+
+    def test_shifted_chunks_without_stored_vectors_are_embedded(
+        self, backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        mock_vector_store.get_chunk_embeddings.return_value = {}
+
+        self._ingest_with_existing(backend, tmp_path, ["intro", "a"], {0: _hash("a")})
+
+        mock_embedder.embed.assert_called_once_with(["intro", "a"])
+
+    def test_force_reembed(self, mock_vector_store, mock_embedder, tmp_path):
+        backend = VectorRAGBackend(
+            vector_store=mock_vector_store,
+            embedding_client=mock_embedder,
+            chunking_strategy="fixed",
+            force_reembed=True,
+        )
+
+        self._ingest_with_existing(backend, tmp_path, ["a", "b"], {0: _hash("a"), 1: _hash("b")})
+
+        mock_embedder.embed.assert_called_once_with(["a", "b"])
+        mock_vector_store.sync_chunks.assert_called_once()
+
+    def test_hash_lookup_failure_falls_back_to_full_store(
+        self, backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("content")
+        mock_vector_store.get_chunk_hashes.side_effect = Exception("DB down")
+
+        result = backend.ingest_document(md_file, {"source": "aemo"})
+
+        assert result.success is True
+        mock_embedder.embed.assert_called_once()
+        mock_vector_store.store_chunks.assert_called_once()
+
+    def test_document_embedding_reuses_stored_vectors(
+        self, backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        existing = {0: _hash("same"), 1: _hash("old")}
+        mock_vector_store.get_chunk_embeddings.return_value = {0: [0.0, 1.0], 1: [9.0, 9.0]}
+        mock_embedder.embed.side_effect = lambda texts: MagicMock(embeddings=[[1.0, 0.0]])
+
+        self._ingest_with_existing(backend, tmp_path, ["same", "new"], existing)
+
+        [doc] = mock_vector_store.store_document_embeddings.call_args[0][0]
+        assert (doc["source"], doc["filename"], doc["chunk_count"]) == ("aemo", "doc.md", 2)
+        # Mean of the stored chunk 0 vector and the fresh chunk 1 vector
+        assert doc["embedding"] == pytest.approx([0.7071, 0.7071], abs=1e-4)
+
+    def test_unchanged_document_keeps_document_embedding(
+        self, backend, mock_vector_store, tmp_path
+    ):
+        existing = {0: _hash("a")}
+
+        self._ingest_with_existing(backend, tmp_path, ["a"], existing)
+
+        mock_vector_store.store_document_embeddings.assert_not_called()
+
+    def test_document_embedding_failure_does_not_fail_ingest(
+        self, backend, mock_vector_store, tmp_path
+    ):
+        mock_vector_store.store_document_embeddings.side_effect = Exception("DB down")
+
+        result = self._ingest_with_existing(backend, tmp_path, ["a"], {})
+
+        assert result.success is True
+
+
+class TestVectorRAGBackendBoilerplate:
+    """Test that chunks repeated across documents are stored once."""
+
+    @pytest.fixture
+    def dedup_backend(self, mock_vector_store, mock_embedder):
+        return VectorRAGBackend(
+            vector_store=mock_vector_store,
+            embedding_client=mock_embedder,
+            chunking_strategy="fixed",
+            boilerplate_min_documents=3,
+        )
+
+    def _ingest(self, backend, tmp_path, contents):
+        from app.services.chunking import Chunk
+
+        md_file = tmp_path / "doc.md"
+        md_file.write_text("\n\n".join(contents))
+        chunks = [Chunk(content=c, index=i) for i, c in enumerate(contents)]
+        with patch.object(backend._chunker, "chunk", return_value=chunks):
+            return backend.ingest_document(md_file, {"source": "guardian"})
+
+    def test_boilerplate_chunks_skipped(
+        self, dedup_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        mock_vector_store.match_boilerplate.side_effect = (
+            lambda source, filename, chunks, min_documents: {
+                digest: 8 for digest, content in chunks.items() if content == "Subscribe now"
+            }
+        )
+
+        result = self._ingest(dedup_backend, tmp_path, ["Story", "Subscribe now"])
+
+        assert result.success is True
+        mock_embedder.embed.assert_called_once_with(["Story"])
+        stored = mock_vector_store.store_chunks.call_args.kwargs["chunks"]
+        assert [c["chunk_index"] for c in stored] == [0]
+        mock_vector_store.set_document_boilerplate.assert_called_once_with(
+            "guardian", "doc.md", {1: 8}
+        )
+
+    def test_all_boilerplate_document_kept(
+        self, dedup_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        mock_vector_store.match_boilerplate.side_effect = (
+            lambda source, filename, chunks, min_documents: dict.fromkeys(chunks, 8)
+        )
+
+        self._ingest(dedup_backend, tmp_path, ["Subscribe now"])
+
+        mock_embedder.embed.assert_called_once_with(["Subscribe now"])
+        mock_vector_store.set_document_boilerplate.assert_called_once_with(
+            "guardian", "doc.md", {}
+        )
+
+    def test_lookup_failure_stores_all_chunks(
+        self, dedup_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        mock_vector_store.match_boilerplate.side_effect = Exception("DB down")
+
+        result = self._ingest(dedup_backend, tmp_path, ["Story", "Subscribe now"])
+
+        assert result.success is True
+        assert len(mock_vector_store.store_chunks.call_args.kwargs["chunks"]) == 2
+
+    def test_disabled_by_default(self, backend, mock_vector_store, tmp_path):
+        self._ingest(backend, tmp_path, ["Story"])
+
+        mock_vector_store.match_boilerplate.assert_not_called()
+        mock_vector_store.set_document_boilerplate.assert_not_called()
+
+
+class TestVectorRAGBackendStreamingIngest:
+    """Test the windowed chunk -> embed -> store path for new documents."""
+
+    @pytest.fixture
+    def stream_backend(self, mock_vector_store, mock_embedder):
+        stored = []
+
+        def _store_stream(source, filename, batches, document_id=None):
+            stored.extend(batches)
+            return sum(len(b) for b in stored)
+
+        mock_vector_store.store_chunk_stream.side_effect = _store_stream
+        mock_vector_store.stored_batches = stored
+        return VectorRAGBackend(
+            vector_store=mock_vector_store,
+            embedding_client=mock_embedder,
+            chunking_strategy="fixed",
+            chunk_max_tokens=100,
+            chunk_overlap_tokens=0,
+            ingest_stream_batch=2,
+        )
+
+    def _doc(self, tmp_path, words=250):
+        md_file = tmp_path / "doc.md"
+        md_file.write_text(" ".join(f"w{i}" for i in range(words)))
+        return md_file
+
+    def test_new_document_streamed_in_windows(
+        self, stream_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        result = stream_backend.ingest_document(
+            self._doc(tmp_path), {"source": "aemo", "document_id": 5}
+        )
+
+        assert result.success is True
+        assert [len(c[0][0]) for c in mock_embedder.embed.call_args_list] == [2, 1]
+        mock_vector_store.store_chunks.assert_not_called()
+        batches = mock_vector_store.stored_batches
+        assert [[c["chunk_index"] for c in b] for b in batches] == [[0, 1], [2]]
+        assert batches[0][0]["embedding"] == [0.1, 0.2]
+        assert mock_vector_store.store_chunk_stream.call_args.kwargs["document_id"] == "5"
+
+        doc = mock_vector_store.store_document_embeddings.call_args[0][0][0]
+        assert doc["chunk_count"] == 3
+        assert doc["embedding"] == pytest.approx(mean_pool_embeddings([[0.1, 0.2]] * 3))
+
+    def test_store_waits_for_every_window_to_embed(
+        self, stream_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        """No connection or transaction is held while embeddings are pending."""
+        embed_calls_at_store = []
+
+        def _store_stream(source, filename, batches, document_id=None):
+            embed_calls_at_store.append(mock_embedder.embed.call_count)
+            return sum(len(b) for b in batches)
+
+        mock_vector_store.store_chunk_stream.side_effect = _store_stream
+
+        result = stream_backend.ingest_document(self._doc(tmp_path), {})
+
+        assert result.success is True
+        assert embed_calls_at_store == [2]
+
+    def test_embedding_failure_never_opens_store(
+        self, stream_backend, mock_vector_store, mock_embedder, tmp_path
+    ):
+        mock_embedder.embed.side_effect = [MagicMock(embeddings=[[0.1, 0.2]] * 2), RuntimeError("down")]
+
+        result = stream_backend.ingest_document(self._doc(tmp_path), {})
+
+        assert result.success is False
+        mock_vector_store.store_chunk_stream.assert_not_called()
+
+    def test_existing_document_uses_sync(
+        self, stream_backend, mock_vector_store, tmp_path
+    ):
+        mock_vector_store.get_chunk_hashes.return_value = {0: "stale"}
+
+        assert stream_backend.ingest_document(self._doc(tmp_path), {}).success is True
+
+        mock_vector_store.store_chunk_stream.assert_not_called()
+        mock_vector_store.sync_chunks.assert_called_once()
+        mock_vector_store.get_chunk_hashes.assert_called_once()
+
+    def test_embedding_mismatch_fails_ingest(
+        self, stream_backend, mock_embedder, tmp_path
+    ):
+        mock_embedder.embed.side_effect = lambda texts: MagicMock(embeddings=[[0.1]])
+
+        result = stream_backend.ingest_document(self._doc(tmp_path), {})
+
+        assert result.success is False
+        assert "Embedding count mismatch" in result.error
+
+    def test_enrichment_disables_streaming(
+        self, stream_backend, mock_vector_store, tmp_path
+    ):
+        with patch.object(
+            VectorRAGBackend, "_contextual_enrichment_enabled", return_value=True
+        ), patch.object(
+            VectorRAGBackend,
+            "_apply_contextual_enrichment",
+            side_effect=lambda chunks, text, positions: [chunks[i].content for i in positions],
+        ):
+            stream_backend.ingest_document(self._doc(tmp_path), {})
+
+        mock_vector_store.store_chunk_stream.assert_not_called()
+        mock_vector_store.store_chunks.assert_called_once()
@@ -7,6 +7,7 @@ from app.services.embedding_client import (
     EmbeddingResult,
     OllamaEmbeddingClient,
     APIEmbeddingClient,
+    StubEmbeddingClient,
     create_embedding_client,
 )
 
@@ -231,3 +232,39 @@ class TestCreateEmbeddingClient:
     def test_unknown_backend(self):
         with pytest.raises(ValueError, match="Unknown embedding backend"):
             create_embedding_client(backend="unknown")
+
+    def test_create_stub(self):
+        client = create_embedding_client(backend="stub", dimensions=16)
+        assert isinstance(client, StubEmbeddingClient)
+
+
+class TestStubEmbeddingClient:
+    """Test the offline stub embedder."""
+
+    def test_deterministic_unit_vectors(self):
+        client = StubEmbeddingClient(dimensions=32)
+        first = client.embed(["grid reliability report"]).embeddings[0]
+        again = StubEmbeddingClient(dimensions=32).embed_single("Grid reliability report")
+
+        assert len(first) == 32
+        assert first == pytest.approx(again)
+        assert sum(v * v for v in first) == pytest.approx(1.0)
+
+    def test_shared_vocabulary_is_closer(self):
+        client = StubEmbeddingClient(dimensions=256)
+        base, near, far = client.embed([
+            "wholesale electricity market rules",
+            "electricity market rules amendment",
+            "coastal erosion survey photographs",
+        ]).embeddings
+
+        def dot(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        assert dot(base, near) > dot(base, far)
+
+    def test_always_available(self):
+        client = StubEmbeddingClient()
+        assert client.is_configured()
+        assert client.test_connection()
+        assert client.name == "stub"
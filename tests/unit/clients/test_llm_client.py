@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 from app.services.llm_client import (
+    LatencyHistogram,
     LLMResult,
+    ModelWarmer,
     OllamaLLMClient,
     APILLMClient,
     create_llm_client,
+    llm_latency_metrics,
 )
 
 
@@ -34,20 +38,20 @@ class TestOllamaLLMClient:
         client = OllamaLLMClient(url="http://localhost:11434", model="")
         assert client.is_configured() is False
 
-    @patch("app.services.llm_client.requests.get")
+    @patch("app.services.llm_client.requests.Session.get")
     def test_test_connection_success(self, mock_get):
         mock_get.return_value = MagicMock(ok=True)
         client = OllamaLLMClient(url="http://localhost:11434", model="llama3.1:8b")
         assert client.test_connection() is True
         mock_get.assert_called_once_with("http://localhost:11434/api/tags", timeout=10)
 
-    @patch("app.services.llm_client.requests.get")
+    @patch("app.services.llm_client.requests.Session.get")
     def test_test_connection_failure(self, mock_get):
         mock_get.return_value = MagicMock(ok=False)
         client = OllamaLLMClient(url="http://localhost:11434", model="llama3.1:8b")
         assert client.test_connection() is False
 
-    @patch("app.services.llm_client.requests.get")
+    @patch("app.services.llm_client.requests.Session.get")
     def test_test_connection_exception(self, mock_get):
         mock_get.side_effect = ConnectionError("refused")
         client = OllamaLLMClient(url="http://localhost:11434", model="llama3.1:8b")
@@ -57,7 +61,7 @@ class TestOllamaLLMClient:
         client = OllamaLLMClient(url="", model="")
         assert client.test_connection() is False
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_success(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -76,7 +80,7 @@ class TestOllamaLLMClient:
         assert result.model == "llama3.1:8b"
         assert result.finish_reason == "stop"
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_json_format(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -96,7 +100,7 @@ class TestOllamaLLMClient:
         call_payload = mock_post.call_args[1]["json"]
         assert call_payload["format"] == "json"
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_with_max_tokens(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -116,12 +120,24 @@ class TestOllamaLLMClient:
         call_payload = mock_post.call_args[1]["json"]
         assert call_payload["options"]["num_predict"] == 500
 
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_chat_timeout_override(self, mock_post):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"message": {"content": "ok"}}
+        mock_post.return_value = mock_resp
+
+        client = OllamaLLMClient(url="http://localhost:11434", model="llama3.1:8b", timeout=120)
+        client.chat([{"role": "user", "content": "test"}], timeout=15)
+        assert mock_post.call_args[1]["timeout"] == 15
+        client.chat([{"role": "user", "content": "test"}])
+        assert mock_post.call_args[1]["timeout"] == 120
+
     def test_chat_not_configured(self):
         client = OllamaLLMClient(url="", model="")
         with pytest.raises(ValueError, match="not configured"):
             client.chat([{"role": "user", "content": "Hi"}])
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_http_error(self, mock_post):
         import requests
 
@@ -134,6 +150,55 @@ class TestOllamaLLMClient:
         client = OllamaLLMClient(url="http://localhost:11434/", model="test")
         assert client._url == "http://localhost:11434"
 
+    def test_session_pool_size(self):
+        client = OllamaLLMClient(url="http://localhost:11434", model="test", pool_size=16)
+        assert client._session.get_adapter("http://localhost:11434")._pool_maxsize == 16
+
+    @pytest.mark.parametrize("keep_alive,expected", [("30m", "30m"), ("-1", -1), ("600", 600)])
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_chat_sends_keep_alive(self, mock_post, keep_alive, expected):
+        mock_post.return_value.json.return_value = {"message": {"content": "ok"}}
+        client = OllamaLLMClient(url="http://localhost:11434", model="test", keep_alive=keep_alive)
+        client.chat([{"role": "user", "content": "test"}])
+        assert mock_post.call_args[1]["json"]["keep_alive"] == expected
+
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_chat_omits_keep_alive_by_default(self, mock_post):
+        mock_post.return_value.json.return_value = {"message": {"content": "ok"}}
+        OllamaLLMClient(url="http://localhost:11434", model="test").chat([{"role": "user", "content": "x"}])
+        assert "keep_alive" not in mock_post.call_args[1]["json"]
+
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_warm_loads_model_without_messages(self, mock_post):
+        mock_post.return_value = MagicMock(ok=True)
+        client = OllamaLLMClient(url="http://localhost:11434", model="test", keep_alive="1h")
+        assert client.warm() is True
+        assert mock_post.call_args[0][0] == "http://localhost:11434/api/chat"
+        assert mock_post.call_args[1]["json"] == {
+            "model": "test", "messages": [], "stream": False, "keep_alive": "1h",
+        }
+
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_warm_failure_is_swallowed(self, mock_post):
+        mock_post.side_effect = ConnectionError("refused")
+        client = OllamaLLMClient(url="http://localhost:11434", model="test")
+        assert client.warm() is False
+
+    @patch("app.services.llm_client.requests.Session.post")
+    def test_chat_latency_recorded_per_model(self, mock_post):
+        import requests
+
+        mock_post.return_value.json.return_value = {"message": {"content": "ok"}}
+        client = OllamaLLMClient(url="http://localhost:11434", model="latency-test")
+        client.chat([{"role": "user", "content": "x"}])
+        mock_post.side_effect = requests.ConnectionError("refused")
+        with pytest.raises(requests.ConnectionError):
+            client.chat([{"role": "user", "content": "x"}])
+
+        metrics = llm_latency_metrics()["ollama:latency-test"]
+        assert metrics["count"] == 2
+        assert metrics["errors"] == 1
+
 
 # --------------- APILLMClient ---------------
 
@@ -168,19 +233,19 @@ class TestAPILLMClient:
         headers = client._headers()
         assert "Authorization" not in headers
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_test_connection_success(self, mock_post):
         mock_post.return_value = MagicMock(ok=True)
         client = APILLMClient(url="http://localhost:8080", model="gpt-4")
         assert client.test_connection() is True
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_test_connection_failure(self, mock_post):
         mock_post.return_value = MagicMock(ok=False)
         client = APILLMClient(url="http://localhost:8080", model="gpt-4")
         assert client.test_connection() is False
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_test_connection_exception(self, mock_post):
         mock_post.side_effect = ConnectionError("refused")
         client = APILLMClient(url="http://localhost:8080", model="gpt-4")
@@ -190,7 +255,7 @@ class TestAPILLMClient:
         client = APILLMClient(url="", model="")
         assert client.test_connection() is False
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_success(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -215,7 +280,7 @@ class TestAPILLMClient:
         assert result.model == "gpt-4"
         assert result.finish_reason == "stop"
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_json_format(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -234,7 +299,7 @@ class TestAPILLMClient:
         call_payload = mock_post.call_args[1]["json"]
         assert call_payload["response_format"] == {"type": "json_object"}
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_with_max_tokens(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {
@@ -250,7 +315,7 @@ class TestAPILLMClient:
         call_payload = mock_post.call_args[1]["json"]
         assert call_payload["max_tokens"] == 500
 
-    @patch("app.services.llm_client.requests.post")
+    @patch("app.services.llm_client.requests.Session.post")
     def test_chat_no_choices(self, mock_post):
         mock_resp = MagicMock()
         mock_resp.json.return_value = {"choices": []}
@@ -267,6 +332,69 @@ class TestAPILLMClient:
             client.chat([{"role": "user", "content": "Hi"}])
 
 
+# --------------- Latency / warm-keeping ---------------
+
+
+class TestLatencyHistogram:
+    def test_buckets_by_upper_bound(self):
+        hist = LatencyHistogram(buckets=(1.0, 5.0))
+        for seconds in (0.2, 1.0, 3.0, 9.0):
+            hist.observe(seconds)
+
+        snap = hist.snapshot()
+        assert snap["buckets"] == {"le_1": 2, "le_5": 1, "le_inf": 1}
+        assert snap["count"] == 4
+        assert snap["mean_seconds"] == 3.3
+        assert snap["max_seconds"] == 9.0
+
+    def test_empty(self):
+        assert LatencyHistogram().snapshot()["mean_seconds"] == 0.0
+
+
+class TestModelWarmer:
+    def test_pings_on_start_until_stopped(self):
+        client = MagicMock()
+        pinged = threading.Event()
+        client.warm.side_effect = lambda: pinged.set() or True
+
+        with ModelWarmer(client, interval=60):
+            assert pinged.wait(2)
+
+        assert client.warm.call_count == 1
+
+    def test_pings_every_interval(self):
+        client = MagicMock()
+        pings = threading.Semaphore(0)
+        client.warm.side_effect = lambda: pings.release() or True
+
+        warmer = ModelWarmer(client, interval=0.01).start()
+        try:
+            for _ in range(3):
+                assert pings.acquire(timeout=2)
+        finally:
+            warmer.stop()
+
+    def test_restarts_after_stop(self):
+        client = MagicMock()
+        pings = threading.Semaphore(0)
+        client.warm.side_effect = lambda: pings.release() or True
+
+        warmer = ModelWarmer(client, interval=60)
+        warmer.start()
+        assert pings.acquire(timeout=2)
+        warmer.stop()
+
+        warmer.start()
+        try:
+            assert pings.acquire(timeout=2)
+        finally:
+            warmer.stop()
+        assert client.warm.call_count == 2
+
+    def test_api_client_does_not_warm(self):
+        assert APILLMClient(url="http://localhost:8080", model="gpt-4").warm() is False
+
+
 # --------------- Factory ---------------
 
 
@@ -295,3 +423,8 @@ class TestCreateLLMClient:
     def test_custom_timeout(self):
         client = create_llm_client(url="http://localhost:11434", timeout=300)
         assert client._timeout == 300
+
+    def test_keep_alive_and_pool_size(self):
+        client = create_llm_client(url="http://localhost:11434", keep_alive="1h", pool_size=4)
+        assert client._keep_alive == "1h"
+        assert client._session.get_adapter("http://localhost:11434")._pool_maxsize == 4
@@ -0,0 +1,76 @@
+"""Tests for RerankerClient implementations."""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+from app.services.reranker_client import APIRerankerClient, create_reranker_client
+
+
+class TestAPIRerankerClient:
+    """Test APIRerankerClient."""
+
+    def test_is_configured(self):
+        assert APIRerankerClient(url="http://localhost:8080", model="bge").is_configured() is True
+        assert APIRerankerClient(url="http://localhost:8080", model="").is_configured() is False
+        assert APIRerankerClient(url="", model="bge").is_configured() is False
+
+    def test_name(self):
+        assert APIRerankerClient().name == "api"
+
+    @patch("app.services.reranker_client.requests.post")
+    def test_rerank_returns_scores_in_input_order(self, mock_post):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"results": [
+            {"index": 1, "relevance_score": 0.9},
+            {"index": 0, "relevance_score": 0.2},
+        ]}
+        mock_post.return_value = mock_resp
+        client = APIRerankerClient(url="http://localhost:8080/", model="bge", api_key="k")
+
+        assert client.rerank("query", ["a", "b"]) == [0.2, 0.9]
+        args, kwargs = mock_post.call_args
+        assert args[0] == "http://localhost:8080/v1/rerank"
+        assert kwargs["json"] == {"model": "bge", "query": "query", "documents": ["a", "b"]}
+        assert kwargs["headers"]["Authorization"] == "Bearer k"
+
+    @patch("app.services.reranker_client.requests.post")
+    def test_rerank_empty_list(self, mock_post):
+        client = APIRerankerClient(url="http://localhost:8080", model="bge")
+        assert client.rerank("query", []) == []
+        mock_post.assert_not_called()
+
+    @patch("app.services.reranker_client.requests.post")
+    def test_rerank_missing_scores_raises(self, mock_post):
+        mock_post.return_value.json.return_value = {"results": [{"index": 0, "relevance_score": 1}]}
+        client = APIRerankerClient(url="http://localhost:8080", model="bge")
+        with pytest.raises(ValueError, match="scored 1 of 2"):
+            client.rerank("query", ["a", "b"])
+
+    @patch("app.services.reranker_client.requests.post")
+    def test_rerank_malformed_response(self, mock_post):
+        mock_post.return_value.json.return_value = {"data": []}
+        client = APIRerankerClient(url="http://localhost:8080", model="bge")
+        with pytest.raises(ValueError, match="missing 'results'"):
+            client.rerank("query", ["a"])
+
+    def test_rerank_not_configured(self):
+        with pytest.raises(ValueError, match="not configured"):
+            APIRerankerClient().rerank("query", ["a"])
+
+    @patch("app.services.reranker_client.requests.post")
+    def test_test_connection_failure(self, mock_post):
+        mock_post.side_effect = Exception("refused")
+        client = APIRerankerClient(url="http://localhost:8080", model="bge")
+        assert client.test_connection() is False
+
+
+class TestCreateRerankerClient:
+    """Test create_reranker_client factory."""
+
+    def test_create_api(self):
+        client = create_reranker_client(backend="api", url="http://x", model="bge")
+        assert isinstance(client, APIRerankerClient)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown reranker backend"):
+            create_reranker_client(backend="local")
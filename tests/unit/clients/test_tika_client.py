@@ -169,6 +169,78 @@ class TestExtractMetadata:
         assert result["author"] == "First Author"
 
 
+class TestExtractTextAndMetadata:
+    @patch("app.services.tika_client.requests.put")
+    def test_single_rmeta_upload(self, mock_put, client, tmp_path):
+        mock_resp = Mock()
+        mock_resp.raise_for_status = Mock()
+        mock_resp.json.return_value = [
+            {
+                "dc:title": "Workbook",
+                "xmpTPg:NPages": "2",
+                "X-TIKA:content": "\n  Sheet one text.  \n",
+            },
+            {"dc:title": "Embedded image", "X-TIKA:content": "Embedded text."},
+            {"X-TIKA:content": "   "},
+        ]
+        mock_put.return_value = mock_resp
+
+        test_file = tmp_path / "book.xlsx"
+        test_file.write_bytes(b"PK fake xlsx")
+
+        text, metadata = client.extract_text_and_metadata(test_file)
+
+        assert text == "Sheet one text.\n\nEmbedded text."
+        assert metadata == {"title": "Workbook", "page_count": 2}
+        mock_put.assert_called_once()
+        call_args = mock_put.call_args
+        assert call_args[0][0] == "http://test-tika:9998/rmeta/text"
+        assert call_args[1]["headers"]["Accept"] == "application/json"
+
+    @patch("app.services.tika_client.requests.put")
+    def test_empty_response(self, mock_put, client, tmp_path):
+        mock_put.return_value = Mock(raise_for_status=Mock(), json=Mock(return_value=[]))
+        test_file = tmp_path / "empty.docx"
+        test_file.write_bytes(b"x")
+
+        assert client.extract_text_and_metadata(test_file) == ("", {})
+
+    @patch("app.services.tika_client.requests.put")
+    def test_http_error(self, mock_put, client, tmp_path):
+        mock_resp = Mock()
+        mock_resp.raise_for_status.side_effect = requests.HTTPError("422")
+        mock_put.return_value = mock_resp
+        test_file = tmp_path / "bad.docx"
+        test_file.write_bytes(b"x")
+
+        with pytest.raises(requests.HTTPError):
+            client.extract_text_and_metadata(test_file)
+
+
+class TestStreamingUpload:
+    @pytest.mark.parametrize("method", [
+        "extract_text", "extract_metadata", "extract_text_and_metadata", "detect_mime_type",
+    ])
+    @patch("app.services.tika_client.requests.put")
+    def test_file_handle_is_request_body(self, mock_put, method, client, tmp_path):
+        """The open file is passed as the body, not its bytes."""
+        bodies = []
+
+        def fake_put(url, data, headers, timeout):
+            bodies.append((data.name, data.closed))
+            resp = Mock(text="ok")
+            resp.json.return_value = [{}] if "/rmeta" in url else {}
+            return resp
+
+        mock_put.side_effect = fake_put
+        test_file = tmp_path / "doc.docx"
+        test_file.write_bytes(b"x" * 100)
+
+        getattr(client, method)(test_file)
+
+        assert bodies == [(str(test_file), False)]
+
+
 class TestDetectMimeType:
     @patch("app.services.tika_client.requests.put")
     def test_detect_mime_type(self, mock_put, client, tmp_path):
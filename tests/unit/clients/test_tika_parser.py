@@ -56,24 +56,22 @@ class TestIsAvailable:
 class TestParseDocument:
     def test_parse_document_success(self, parser, test_pdf, dummy_metadata):
         """Should extract text, metadata, and write markdown file."""
-        with (
-            patch.object(
-                parser.client,
-                "extract_text",
-                return_value="This is extracted text.\n\nSecond paragraph.",
-            ),
-            patch.object(
-                parser.client,
-                "extract_metadata",
-                return_value={
+        with patch.object(
+            parser.client,
+            "extract_text_and_metadata",
+            return_value=(
+                "This is extracted text.\n\nSecond paragraph.",
+                {
                     "title": "Parsed Title",
                     "author": "Test Author",
                     "page_count": 3,
                 },
             ),
-        ):
+        ) as mock_extract:
             result = parser.parse_document(test_pdf, dummy_metadata)
 
+        mock_extract.assert_called_once_with(test_pdf)
+
         assert result.success is True
         assert result.parser_name == "tika"
         assert result.markdown_path is not None
@@ -90,11 +88,8 @@ class TestParseDocument:
 
     def test_parse_document_empty_text(self, parser, test_pdf, dummy_metadata):
         """Should return failure on empty text."""
-        with (
-            patch.object(parser.client, "extract_text", return_value=""),
-            patch.object(
-                parser.client, "extract_metadata", return_value={}
-            ),
+        with patch.object(
+            parser.client, "extract_text_and_metadata", return_value=("", {})
         ):
             result = parser.parse_document(test_pdf, dummy_metadata)
 
@@ -103,13 +98,8 @@ class TestParseDocument:
 
     def test_parse_document_whitespace_only(self, parser, test_pdf, dummy_metadata):
         """Should return failure when text is whitespace only."""
-        with (
-            patch.object(
-                parser.client, "extract_text", return_value="   \n\n  "
-            ),
-            patch.object(
-                parser.client, "extract_metadata", return_value={}
-            ),
+        with patch.object(
+            parser.client, "extract_text_and_metadata", return_value=("   \n\n  ", {})
         ):
             result = parser.parse_document(test_pdf, dummy_metadata)
 
@@ -139,7 +129,7 @@ class TestParseDocument:
         """Should handle unexpected exceptions gracefully."""
         with patch.object(
             parser.client,
-            "extract_text",
+            "extract_text_and_metadata",
             side_effect=Exception("unexpected error"),
         ):
             result = parser.parse_document(test_pdf, dummy_metadata)
@@ -150,17 +140,10 @@ class TestParseDocument:
     def test_parse_uses_context_title_fallback(self, parser, test_pdf, dummy_metadata):
         """When Tika metadata and text both lack title, use context metadata title."""
         # Tika text is very short lines (< 4 chars) so no title extracted from text
-        with (
-            patch.object(
-                parser.client,
-                "extract_text",
-                return_value="OK\n\nHi",
-            ),
-            patch.object(
-                parser.client,
-                "extract_metadata",
-                return_value={},
-            ),
+        with patch.object(
+            parser.client,
+            "extract_text_and_metadata",
+            return_value=("OK\n\nHi", {}),
         ):
             result = parser.parse_document(test_pdf, dummy_metadata)
 
@@ -31,7 +31,7 @@ def mock_container():
 
     # Mock RAG backend
     mock_rag = Mock()
-    mock_rag.list_documents.return_value = []
+    mock_rag.iter_documents.return_value = []
     mock_rag.ingest_document.return_value = Mock(success=True, document_id="rag-1", error=None)
     container.rag_backend = mock_rag
 
@@ -176,6 +176,25 @@ class TestGetReport:
         assert "https://example.com/b.pdf" in report.urls_only_in_state
         assert "https://example.com/c.pdf" in report.urls_only_in_paperless
 
+    def test_report_streams_rag_documents(self, service, mock_container):
+        """Should count streamed RAG documents and match their source URLs."""
+        mock_container.archive_backend.client.get_scraper_document_urls.return_value = {
+            "https://example.com/a.pdf": 1,
+            "https://example.com/b.pdf": 2,
+        }
+        mock_container.rag_backend.iter_documents.return_value = iter([
+            {"id": "1", "name": "", "metadata": {"source_url": "https://example.com/a.pdf"}},
+            {"id": "2", "name": "", "metadata": None},
+        ])
+
+        with patch("app.services.reconciliation.Config") as mock_config:
+            mock_config.RAGFLOW_DATASET_ID = "ds-1"
+            report = service.get_report("aemo")
+
+        assert report.rag_document_count == 2
+        assert report.urls_in_paperless_not_rag == ["https://example.com/b.pdf"]
+        mock_container.rag_backend.iter_documents.assert_called_once_with(collection_id="ds-1")
+
     def test_report_with_paperless_error(self, mock_container):
         """Should include error when Paperless is unavailable."""
         mock_container.archive_backend.client.is_configured = False
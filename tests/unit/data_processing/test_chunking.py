@@ -7,7 +7,12 @@ from app.services.chunking import (
     Chunk,
     FixedChunker,
     HybridDoclingChunker,
+    MarkdownChunker,
+    TokenChunker,
     create_chunker,
+    parse_docling_blocks,
+    parse_markdown_blocks,
+    resolve_tokenizer_name,
 )
 
 
@@ -147,6 +152,25 @@ class TestFixedChunker:
         chunks[0].metadata["extra"] = "modified"
         assert "extra" not in chunks[1].metadata
 
+    def test_iter_chunks_is_lazy(self):
+        chunker = FixedChunker(max_tokens=2, overlap_tokens=0)
+        chunks = chunker.iter_chunks("a b c d e")
+        assert next(chunks).content == "a b"
+        assert [c.content for c in chunks] == ["c d", "e"]
+
+    def test_no_trailing_overlap_only_chunk(self):
+        chunker = FixedChunker(max_tokens=4, overlap_tokens=1)
+        chunks = chunker.chunk(" ".join(str(i) for i in range(10)))
+        assert [c.content for c in chunks] == ["0 1 2 3", "3 4 5 6", "6 7 8 9"]
+
+    def test_heading_context_before_first_heading(self):
+        chunker = FixedChunker(max_tokens=2, overlap_tokens=0)
+        chunks = chunker.chunk("intro text\n  ## Later  \nbody words\n#\nmore")
+        assert "heading_context" not in chunks[0].metadata
+        assert chunks[1].metadata["heading_context"] == "Later"
+        # Empty headings do not replace the current one
+        assert chunks[3].metadata["heading_context"] == "Later"
+
 
 class TestHybridDoclingChunker:
     """Test HybridDoclingChunker (falls back to FixedChunker)."""
@@ -406,6 +430,256 @@ class TestHybridDoclingChunker:
         assert "headings" not in chunks[0].metadata
 
 
+class _FakeTokenizer:
+    """Splits words into 3-character pieces and adds two special tokens."""
+
+    def __init__(self):
+        self.encode_calls = 0
+
+    def num_special_tokens_to_add(self, is_pair):
+        return 2
+
+    def encode(self, text, add_special_tokens=True):
+        import re
+
+        self.encode_calls += 1
+        offsets, word_ids = [], []
+        for word_id, match in enumerate(re.finditer(r"\S+", text)):
+            for start in range(match.start(), match.end(), 3):
+                offsets.append((start, min(start + 3, match.end())))
+                word_ids.append(word_id)
+        return MagicMock(offsets=offsets, word_ids=word_ids)
+
+
+class TestTokenChunker:
+    """Test TokenChunker."""
+
+    @pytest.fixture
+    def tokenizer(self):
+        tokenizer = _FakeTokenizer()
+        with patch("app.services.chunking.load_tokenizer", return_value=tokenizer):
+            yield tokenizer
+
+    def test_name(self):
+        assert TokenChunker(tokenizer="bert-base-uncased").name == "token"
+
+    def test_requires_tokenizer(self):
+        with pytest.raises(ValueError, match="tokenizer is required"):
+            TokenChunker()
+
+    def test_budget_excludes_special_tokens(self, tokenizer):
+        chunker = TokenChunker(max_tokens=4, overlap_tokens=0, tokenizer="t")
+        chunks = chunker.chunk("ab cd ef gh ij")
+
+        assert [c.content for c in chunks] == ["ab cd", "ef gh", "ij"]
+        assert chunks[1].metadata["token_start"] == 2
+        assert chunks[1].metadata["token_end"] == 4
+        assert (chunks[1].metadata["char_start"], chunks[1].metadata["char_end"]) == (6, 11)
+
+    def test_boundaries_do_not_split_words(self, tokenizer):
+        # "abcdefg" is three tokens; a 3-token window would end inside it
+        chunker = TokenChunker(max_tokens=5, overlap_tokens=0, tokenizer="t")
+        chunks = chunker.chunk("xy abcdefg z")
+        assert [c.content for c in chunks] == ["xy", "abcdefg", "z"]
+
+    def test_overlap_reuses_single_encoding(self, tokenizer):
+        chunker = TokenChunker(max_tokens=5, overlap_tokens=1, tokenizer="t")
+        chunks = chunker.chunk("a b c d e f g")
+
+        assert [c.content for c in chunks] == ["a b c", "c d e", "e f g"]
+        assert tokenizer.encode_calls == 1
+
+    def test_preserves_original_text_and_headings(self, tokenizer):
+        chunker = TokenChunker(max_tokens=100, overlap_tokens=0, tokenizer="t")
+        [chunk] = chunker.chunk("# Title\n\nline one\nline two", {"source": "s"})
+        assert chunk.content == "# Title\n\nline one\nline two"
+        assert chunk.metadata["heading_context"] == "Title"
+        assert chunk.metadata["source"] == "s"
+
+    def test_falls_back_without_tokenizer(self):
+        chunker = TokenChunker(max_tokens=2, overlap_tokens=0, tokenizer="t")
+        with patch("app.services.chunking.load_tokenizer", side_effect=ImportError("no")) as load:
+            chunks = chunker.chunk("a b c")
+            assert [c.content for c in chunker.chunk("d e")] == ["d e"]
+        assert [c.content for c in chunks] == ["a b", "c"]
+        assert load.call_count == 1
+
+    def test_failed_load_is_cached_per_name(self):
+        import app.services.chunking as chunking
+
+        tokenizers = MagicMock()
+        tokenizers.Tokenizer.from_pretrained.side_effect = OSError("hub unreachable")
+        with patch.dict(chunking._tokenizer_failures, clear=True), \
+                patch.object(chunking, "_import_tokenizers", return_value=tokenizers):
+            for _ in range(2):
+                with pytest.raises(OSError, match="hub unreachable"):
+                    chunking.load_tokenizer("missing/tokenizer")
+            assert tokenizers.Tokenizer.from_pretrained.call_count == 1
+
+    def test_resolve_tokenizer_name(self):
+        assert resolve_tokenizer_name("custom/tok", "bge-m3") == "custom/tok"
+        assert resolve_tokenizer_name("", "nomic-embed-text:latest") == "nomic-ai/nomic-embed-text-v1.5"
+        assert resolve_tokenizer_name("", "BAAI/bge-small-en") == "BAAI/bge-small-en"
+
+
+class TestMarkdownChunker:
+    """Test the in-process structure-aware MarkdownChunker."""
+
+    DOC = (
+        "Preamble text.\n\n"
+        "# Report\n\n"
+        "Summary paragraph.\n\n"
+        "## Tables\n\n"
+        "| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+        "- item one\n  continued\n- item two\n\n"
+        "Setext\n------\n\n"
+        "```python\n# not a heading\nx = 1\n```\n"
+    )
+
+    def test_parse_blocks_with_breadcrumbs(self):
+        blocks = parse_markdown_blocks(self.DOC)
+        assert [(b.kind, b.headings) for b in blocks] == [
+            ("paragraph", ()),
+            ("paragraph", ("Report",)),
+            ("table", ("Report", "Tables")),
+            ("list", ("Report", "Tables")),
+            ("code", ("Report", "Setext")),
+        ]
+        assert blocks[3].lines == ["- item one", "  continued", "- item two"]
+
+    def test_merges_blocks_under_same_headings(self):
+        chunks = MarkdownChunker(max_tokens=100).chunk(self.DOC, {"source": "s"})
+
+        assert [c.metadata.get("headings") for c in chunks] == [
+            None, ["Report"], ["Report", "Tables"], ["Report", "Setext"],
+        ]
+        assert chunks[2].content == (
+            "| a | b |\n|---|---|\n| 1 | 2 |\n\n- item one\n  continued\n- item two"
+        )
+        assert chunks[2].metadata["heading_context"] == "Tables"
+        assert chunks[2].metadata["chunker"] == "markdown"
+        assert chunks[2].metadata["source"] == "s"
+        assert [c.index for c in chunks] == [0, 1, 2, 3]
+
+    def test_splits_table_repeating_header(self):
+        rows = "\n".join(f"| r{i} | v{i} |" for i in range(6))
+        chunks = MarkdownChunker(max_tokens=20).chunk(f"| a | b |\n|---|---|\n{rows}")
+
+        # 6 header tokens + 2 rows of 5 per chunk
+        assert len(chunks) == 3
+        assert all(c.content.startswith("| a | b |\n|---|---|\n") for c in chunks)
+        assert all(c.metadata["num_tokens"] <= 20 for c in chunks)
+
+    def test_splits_paragraph_at_sentences(self):
+        text = "One two three. Four five six. Seven eight nine."
+        chunks = MarkdownChunker(max_tokens=6).chunk(text)
+        assert [c.content for c in chunks] == ["One two three. Four five six.", "Seven eight nine."]
+
+    def test_oversized_sentence_split_by_words(self):
+        chunks = MarkdownChunker(max_tokens=3, overlap_tokens=0).chunk("a b c d e f g")
+        assert [c.content for c in chunks] == ["a b c", "d e f", "g"]
+
+    def test_splits_code_keeping_fences(self):
+        code = "```\n" + "\n".join(f"line {i}" for i in range(6)) + "\n```"
+        chunks = MarkdownChunker(max_tokens=8).chunk(code)
+        assert len(chunks) == 2
+        assert all(c.content.startswith("```\n") and c.content.endswith("\n```") for c in chunks)
+
+    def test_counts_model_tokens_with_tokenizer(self):
+        chunker = MarkdownChunker(max_tokens=6, tokenizer="t")
+        with patch("app.services.chunking.load_tokenizer", return_value=_FakeTokenizer()):
+            chunks = chunker.chunk("abcdef gh. ij kl.")
+        # 4 token budget: "abcdef gh." is 2+2 tokens, "ij kl." is 1+1
+        assert [c.content for c in chunks] == ["abcdef gh.", "ij kl."]
+
+    def test_tokenizer_failure_counts_words(self):
+        chunker = MarkdownChunker(max_tokens=100, tokenizer="t")
+        with patch("app.services.chunking.load_tokenizer", side_effect=ImportError("no")) as load:
+            chunker.chunk("a b")
+            chunker.chunk("c d")
+        assert load.call_count == 1
+
+
+def _docling_document():
+    """Minimal DoclingDocument: title, section, paragraph, list, captioned table."""
+
+    def text(i, label, value, page, **extra):
+        return {
+            "self_ref": f"#/texts/{i}", "label": label, "text": value, "children": [],
+            "prov": [{"page_no": page}], **extra,
+        }
+
+    def cell(value):
+        return {"text": value}
+
+    return {
+        "schema_name": "DoclingDocument",
+        "body": {"self_ref": "#/body", "children": [
+            {"$ref": "#/texts/0"}, {"$ref": "#/texts/1"}, {"$ref": "#/texts/2"},
+            {"$ref": "#/groups/0"}, {"$ref": "#/tables/0"},
+        ]},
+        "furniture": {"self_ref": "#/furniture", "children": [{"$ref": "#/texts/6"}]},
+        "texts": [
+            text(0, "title", "Annual Report", 1),
+            text(1, "section_header", "Prices", 2, level=1),
+            text(2, "text", "Prices rose.", 2),
+            text(3, "list_item", "Wholesale", 2, marker="-"),
+            text(4, "list_item", "Retail", 3, marker="-"),
+            text(5, "caption", "Table 1: Prices", 3),
+            text(6, "page_header", "Confidential", 1),
+        ],
+        "groups": [{
+            "self_ref": "#/groups/0", "label": "list",
+            "children": [{"$ref": "#/texts/3"}, {"$ref": "#/texts/4"}],
+        }],
+        "tables": [{
+            "self_ref": "#/tables/0", "label": "table", "prov": [{"page_no": 4}],
+            "captions": [{"$ref": "#/texts/5"}], "children": [{"$ref": "#/texts/5"}],
+            "data": {"grid": [[cell("Region"), cell("Price")], [cell("NSW"), cell("$1|2")]]},
+        }],
+    }
+
+
+class TestDoclingDocumentChunking:
+    """Test chunking a DoclingDocument without re-parsing markdown."""
+
+    def test_parse_blocks_in_reading_order(self):
+        blocks = parse_docling_blocks(_docling_document())
+
+        assert [(b.kind, b.headings, b.pages) for b in blocks] == [
+            ("paragraph", ("Annual Report", "Prices"), (2,)),
+            ("list", ("Annual Report", "Prices"), (2, 3)),
+            ("paragraph", ("Annual Report", "Prices"), (3,)),
+            ("table", ("Annual Report", "Prices"), (4,)),
+        ]
+        assert blocks[1].lines == ["- Wholesale", "- Retail"]
+        assert blocks[3].lines == ["| Region | Price |", "|---|---|", "| NSW | $1\\|2 |"]
+
+    def test_chunks_keep_page_and_table_provenance(self):
+        chunks = MarkdownChunker(max_tokens=100).chunk_docling_document(
+            _docling_document(), {"source": "aemo"}
+        )
+
+        [chunk] = chunks
+        assert chunk.metadata["headings"] == ["Annual Report", "Prices"]
+        assert chunk.metadata["page_numbers"] == [2, 3, 4]
+        assert "#/tables/0" in chunk.metadata["doc_items"]
+        assert chunk.metadata["chunker"] == "docling_document"
+        assert chunk.metadata["source"] == "aemo"
+        assert "Confidential" not in chunk.content
+        assert "Table 1: Prices\n\n| Region | Price |" in chunk.content
+
+    def test_hybrid_chunks_locally(self):
+        chunker = HybridDoclingChunker(docling_serve_url="http://docling:5001")
+        with patch("app.services.chunking.requests.post") as mock_post:
+            chunks = chunker.chunk_docling_document(_docling_document())
+        mock_post.assert_not_called()
+        assert chunks and chunks[0].metadata["page_numbers"] == [2, 3, 4]
+
+    def test_unsupported_by_word_chunkers(self):
+        assert FixedChunker().chunk_docling_document(_docling_document()) is None
+
+
 class TestCreateChunker:
     """Test factory function."""
 
@@ -428,6 +702,14 @@ class TestCreateChunker:
         assert chunker._docling_url == "http://localhost:4949"
         assert chunker._timeout == 60
 
+    def test_create_token(self):
+        chunker = create_chunker("token", max_tokens=256, tokenizer="BAAI/bge-m3")
+        assert isinstance(chunker, TokenChunker)
+        assert chunker._tokenizer_name == "BAAI/bge-m3"
+
+    def test_create_markdown(self):
+        assert isinstance(create_chunker("markdown", max_tokens=256), MarkdownChunker)
+
     def test_unknown_strategy(self):
         with pytest.raises(ValueError, match="Unknown chunking strategy"):
             create_chunker("unknown")
@@ -12,7 +12,9 @@ from app.scrapers.models import DocumentMetadata
 @pytest.fixture
 def parser():
     """Create a parser with test URL."""
-    return DoclingServeParser(url="http://test-docling:4949", timeout=60)
+    return DoclingServeParser(
+        url="http://test-docling:4949", timeout=60, include_document_json=False
+    )
 
 
 @pytest.fixture
@@ -165,6 +167,44 @@ class TestParseDocument:
             assert "not configured" in result.error.lower()
 
 
+class TestDocumentJson:
+    """Test the optional DoclingDocument JSON sidecar."""
+
+    @staticmethod
+    def _response(document):
+        mock_response = Mock()
+        mock_response.raise_for_status = Mock()
+        mock_response.json.return_value = {"document": document, "status": "success"}
+        return mock_response
+
+    @patch("app.backends.parsers.docling_serve_parser.requests.post")
+    def test_writes_sidecar_from_same_request(self, mock_post, test_pdf, dummy_metadata):
+        parser = DoclingServeParser(url="http://test-docling:4949", include_document_json=True)
+        mock_post.return_value = self._response({
+            "md_content": "# Title\n",
+            "json_content": {"schema_name": "DoclingDocument", "body": {}},
+        })
+
+        result = parser.parse_document(test_pdf, dummy_metadata)
+
+        assert mock_post.call_count == 1
+        assert mock_post.call_args.kwargs["params"] == {"to_formats": ["md", "json"]}
+        assert result.document_json_path == test_pdf.with_suffix(".docling.json")
+        assert '"DoclingDocument"' in result.document_json_path.read_text()
+
+    @patch("app.backends.parsers.docling_serve_parser.requests.post")
+    def test_disabled_removes_stale_sidecar(self, mock_post, parser, test_pdf, dummy_metadata):
+        stale = test_pdf.with_suffix(".docling.json")
+        stale.write_text("{}")
+        mock_post.return_value = self._response({"md_content": "# Title\n"})
+
+        result = parser.parse_document(test_pdf, dummy_metadata)
+
+        assert mock_post.call_args.kwargs["params"] == {"to_formats": "md"}
+        assert result.document_json_path is None
+        assert not stale.exists()
+
+
 class TestExtractMetadata:
     """Test _extract_metadata() method."""
 
@@ -0,0 +1,275 @@
+"""Tests for LocalVectorStore."""
+
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.backends.vectorstores.base import chunk_content_hash
+from app.backends.vectorstores.local_store import LocalVectorStore, _months_ago
+
+
+def _chunk(index, embedding, content=None, **metadata):
+    return {
+        "content": content or f"chunk {index}",
+        "embedding": embedding,
+        "chunk_index": index,
+        "metadata": metadata,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _no_search_cache():
+    with patch("app.services.search_cache.invalidate_sources"):
+        yield
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalVectorStore(
+        root_dir=tmp_path / "vectors",
+        dimensions=3,
+        metadata_columns={"publication_date": "date", "organization": "text", "pages": "numeric"},
+    )
+
+
+class TestLocalVectorStoreConfig:
+    """Test configuration and readiness."""
+
+    def test_not_configured_without_root(self):
+        store = LocalVectorStore()
+        assert store.is_configured() is False
+        assert store.test_connection() is False
+
+    def test_test_connection_creates_directory(self, store, tmp_path):
+        assert store.test_connection() is True
+        assert (tmp_path / "vectors").is_dir()
+
+    def test_name(self, store):
+        assert store.name == "local"
+
+    def test_invalid_index_raises(self, tmp_path):
+        with pytest.raises(ValueError, match="index must be one of"):
+            LocalVectorStore(root_dir=tmp_path, index="ivf")
+
+    def test_invalid_source_name_raises(self, store):
+        with pytest.raises(ValueError, match="Invalid source name"):
+            store.store_chunks("../etc", "a.md", [_chunk(0, [1, 0, 0])])
+
+    def test_wrong_dimensions_raises(self, store):
+        with pytest.raises(ValueError, match="expected 3"):
+            store.store_chunks("src", "a.md", [_chunk(0, [1, 0])])
+
+    def test_dimension_mismatch_on_ensure_ready(self, store, tmp_path):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0])])
+        other = LocalVectorStore(root_dir=tmp_path / "vectors", dimensions=4)
+        with pytest.raises(ValueError, match="stores 3-dim embeddings"):
+            other.ensure_ready()
+
+
+class TestLocalVectorStoreWrites:
+    """Test storing, replacing and deleting documents."""
+
+    def test_store_and_search_ranks_by_cosine(self, store):
+        store.store_chunks("src", "a.md", [
+            _chunk(0, [1, 0, 0]),
+            _chunk(1, [0, 1, 0]),
+            _chunk(2, [0.9, 0.1, 0]),
+        ])
+        results = store.search([1, 0, 0], limit=2)
+
+        assert [r["chunk_index"] for r in results] == [0, 2]
+        assert results[0]["score"] == pytest.approx(1.0)
+        assert results[0]["source"] == "src"
+        assert results[0]["filename"] == "a.md"
+        assert results[0]["content"] == "chunk 0"
+
+    def test_store_replaces_document(self, store):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0]), _chunk(1, [0, 1, 0])])
+        store.store_chunks("src", "a.md", [_chunk(0, [0, 0, 1], content="new")])
+
+        chunks = store.get_document_chunks("src", "a.md")
+        assert [(c["chunk_index"], c["content"]) for c in chunks] == [(0, "new")]
+        assert store.get_stats()["total_chunks"] == 1
+
+    def test_document_id_stored_in_metadata(self, store):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0])], document_id="42")
+        assert store.get_document_chunks("src", "a.md")[0]["metadata"]["document_id"] == "42"
+
+    def test_delete_document(self, store):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0]), _chunk(1, [0, 1, 0])])
+        store.store_chunks("src", "b.md", [_chunk(0, [0, 0, 1])])
+
+        assert store.delete_document("src", "a.md") == 2
+        assert store.delete_document("src", "a.md") == 0
+        assert [r["filename"] for r in store.search([1, 0, 0])] == ["b.md"]
+
+    def test_delete_by_source(self, store, tmp_path):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0])])
+        assert store.delete_by_source("src") == 1
+        assert not (tmp_path / "vectors" / "src").exists()
+        assert store.get_sources() == []
+
+    def test_persists_across_instances(self, store, tmp_path):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0], organization="AEMO")])
+        reopened = LocalVectorStore(root_dir=tmp_path / "vectors", dimensions=3)
+
+        results = reopened.search([1, 0, 0])
+        assert results[0]["metadata"] == {"organization": "AEMO"}
+
+    def test_sees_writes_from_other_instance(self, store, tmp_path):
+        other = LocalVectorStore(root_dir=tmp_path / "vectors", dimensions=3)
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0])])
+        assert len(other.search([1, 0, 0])) == 1
+
+        store.store_chunks("src", "b.md", [_chunk(0, [0, 1, 0])])
+        assert len(other.search([1, 0, 0])) == 2
+
+    def test_compaction_keeps_live_rows(self, store, tmp_path):
+        for i in range(20):
+            store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0], content=f"v{i}")])
+        store.store_chunks("src", "b.md", [_chunk(0, [0, 1, 0])])
+
+        segments = list((tmp_path / "vectors" / "src").glob("seg-*.npy"))
+        assert len(segments) < 5
+        assert store.get_document_chunks("src", "a.md")[0]["content"] == "v19"
+        assert store.get_stats() == {"total_chunks": 2, "total_documents": 2, "total_sources": 1}
+
+    def test_store_documents_batches_per_source(self, store):
+        count = store.store_documents([
+            {"source": "a", "filename": "1.md", "chunks": [_chunk(0, [1, 0, 0])]},
+            {"source": "b", "filename": "2.md", "chunks": [_chunk(0, [0, 1, 0])]},
+            {"source": "a", "filename": "3.md", "chunks": []},
+        ])
+        assert count == 2
+        assert store.get_sources() == [
+            {"source": "a", "chunk_count": 1},
+            {"source": "b", "chunk_count": 1},
+        ]
+
+    def test_chunk_hashes_and_sync(self, store):
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0], "keep"), _chunk(1, [0, 1, 0], "old")])
+        assert store.get_chunk_hashes("src", "a.md") == {
+            0: chunk_content_hash("keep"),
+            1: chunk_content_hash("old"),
+        }
+
+        written = store.sync_chunks("src", "a.md", [
+            {"content": "keep", "chunk_index": 0, "metadata": {"v": 2}},
+            _chunk(2, [0, 0, 1], "added"),
+        ])
+
+        assert written == 1
+        chunks = store.get_document_chunks("src", "a.md")
+        assert [(c["chunk_index"], c["content"]) for c in chunks] == [(0, "keep"), (2, "added")]
+        assert chunks[0]["metadata"] == {"v": 2}
+        assert store.search([1, 0, 0], limit=1)[0]["chunk_index"] == 0
+
+    def test_iter_documents_keyset(self, store):
+        for name in ("c.md", "a.md", "b.md"):
+            store.store_chunks("src", name, [_chunk(1, [1, 0, 0], part=2), _chunk(0, [0, 1, 0], part=1)])
+
+        docs = list(store.iter_documents(source="src", after_filename="a.md", limit=1))
+        assert docs == [{"source": "src", "filename": "b.md", "metadata": {"part": 1}}]
+
+
+class TestLocalVectorStoreFilters:
+    """Test source, metadata and column filters."""
+
+    @pytest.fixture
+    def filled(self, store):
+        today = date.today()
+        store.store_chunks("aemo", "a.md", [_chunk(
+            0, [1, 0, 0], organization="AEMO", publication_date=today.isoformat(), pages=10,
+        )])
+        store.store_chunks("aer", "b.md", [_chunk(
+            0, [0.9, 0.1, 0], organization="AER",
+            publication_date=(today - timedelta(days=800)).isoformat(), pages="n/a",
+        )])
+        return store
+
+    def test_sources_filter(self, filled):
+        assert [r["source"] for r in filled.search([1, 0, 0], sources=["aer"])] == ["aer"]
+        assert filled.search([1, 0, 0], sources=["missing", "../x"]) == []
+
+    def test_metadata_containment(self, filled):
+        results = filled.search([1, 0, 0], metadata_filter={"organization": "AER"})
+        assert [r["filename"] for r in results] == ["b.md"]
+
+    def test_column_filters(self, filled):
+        cutoff = (date.today() - timedelta(days=30)).isoformat()
+        assert [r["filename"] for r in filled.search(
+            [1, 0, 0], filters={"publication_date": {"gte": cutoff}}
+        )] == ["a.md"]
+        assert [r["filename"] for r in filled.search(
+            [1, 0, 0], filters={"publication_date": {"within_months": 12}}
+        )] == ["a.md"]
+        assert [r["filename"] for r in filled.search(
+            [1, 0, 0], filters={"organization": {"in": ["AER", "ENA"]}}
+        )] == ["b.md"]
+        # Unparseable values never match, like NULL columns
+        assert [r["filename"] for r in filled.search(
+            [1, 0, 0], filters={"pages": {"lt": 100}}
+        )] == ["a.md"]
+
+    def test_validate_filters(self, filled):
+        filled.validate_filters({"organization": "AER"})
+        with pytest.raises(ValueError, match="Cannot filter on 'title'"):
+            filled.validate_filters({"title": "x"})
+        with pytest.raises(ValueError, match="Unsupported filter operator"):
+            filled.validate_filters({"organization": {"within_months": 3}})
+        with pytest.raises(ValueError, match="needs an ISO date"):
+            filled.validate_filters({"publication_date": "soon"})
+
+    def test_months_ago_clamps_day(self):
+        assert _months_ago(date(2024, 3, 31), 1) == date(2024, 2, 29)
+        assert _months_ago(date(2024, 1, 15), 13) == date(2022, 12, 15)
+
+
+class _FakeIndex:
+    """Brute-force stand-in for hnswlib.Index."""
+
+    def __init__(self, space, dim):
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.ef = None
+
+    def init_index(self, max_elements, ef_construction, M):
+        pass
+
+    def add_items(self, vectors, labels):
+        self.vectors = np.asarray(vectors)
+
+    def set_ef(self, ef):
+        self.ef = ef
+
+    def knn_query(self, query, k, filter):
+        scores = self.vectors @ query
+        labels = [i for i in np.argsort(-scores) if filter(int(i))][:k]
+        return np.array([labels]), np.array([[1 - scores[i] for i in labels]])
+
+
+class TestLocalVectorStoreHnsw:
+    """Test the optional hnswlib index."""
+
+    def test_falls_back_without_hnswlib(self, tmp_path):
+        with patch("app.backends.vectorstores.local_store._import_hnswlib", return_value=None):
+            store = LocalVectorStore(root_dir=tmp_path, dimensions=3, index="hnsw")
+        store.store_chunks("src", "a.md", [_chunk(0, [1, 0, 0])])
+        assert len(store.search([1, 0, 0])) == 1
+
+    def test_hnsw_search_uses_index_and_filters(self, tmp_path):
+        fake = type("hnswlib", (), {"Index": _FakeIndex})
+        with patch("app.backends.vectorstores.local_store._import_hnswlib", return_value=fake):
+            store = LocalVectorStore(root_dir=tmp_path, dimensions=3, index="hnsw")
+        store.store_chunks("src", "a.md", [
+            _chunk(0, [1, 0, 0], organization="AEMO"),
+            _chunk(1, [0.9, 0.1, 0], organization="AER"),
+        ])
+
+        results = store.search(
+            [1, 0, 0], metadata_filter={"organization": "AER"}, preset="accurate"
+        )
+
+        assert [r["chunk_index"] for r in results] == [1]
+        assert store._load("src").hnsw.ef == 200
@@ -3,7 +3,15 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
-from app.backends.vectorstores.pgvector_store import ANYTHINGLLM_VIEW_NAME, PgVectorVectorStore
+from app.backends.vectorstores.base import (
+    boilerplate_hash,
+    chunk_content_hash,
+    parse_metadata_columns,
+)
+from app.backends.vectorstores.pgvector_store import (
+    ANYTHINGLLM_VIEW_NAME,
+    PgVectorVectorStore,
+)
 
 
 class TestPgVectorVectorStoreConfig:
@@ -166,12 +174,118 @@ class TestPgVectorVectorStorePartitions:
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
 
         store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store._chunk_columns = frozenset({"content_tsv"})
         store._ensure_partition("aemo", mock_conn)
 
-        # Should check pg_tables + ensure index exists (CREATE INDEX IF NOT EXISTS)
-        assert mock_cursor.execute.call_count == 2
+        # Should check pg_tables + ensure HNSW and tsvector indexes exist
+        assert mock_cursor.execute.call_count == 3
         assert "aemo" in store._known_partitions
 
+    def test_ensure_partition_skips_tsv_index_without_column(self):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_cursor.fetchall.return_value = [("content",), ("embedding",)]
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store._ensure_partition("aemo", mock_conn)
+
+        # pg_tables + HNSW index + column lookup, no GIN index
+        statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        assert len(statements) == 3
+        assert "pg_attribute" in statements[2]
+        assert not any("content_tsv" in s for s in statements)
+
+
+class TestBulkLoad:
+    """Test deferred HNSW index builds for bulk loads."""
+
+    def _mock_conn(self, partition_exists=True):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1,) if partition_exists else None
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        return mock_conn, mock_cursor
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.build_hnsw_index")
+    def test_drops_index_and_builds_once_on_exit(self, mock_build):
+        mock_conn, mock_cursor = self._mock_conn()
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store._known_partitions.add("aemo")
+
+        with store.bulk_load(maintenance_work_mem="2GB", parallel_workers=4):
+            store._ensure_partition("aemo", mock_conn)
+            statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list]
+            assert any("DROP INDEX" in sql for sql in statements)
+            assert not any("USING hnsw" in sql for sql in statements)
+            mock_build.assert_not_called()
+
+        mock_build.assert_called_once_with(
+            "aemo", maintenance_work_mem="2GB", parallel_workers=4, progress=None
+        )
+        # Normal writes re-ensure the partition (and its index) afterwards
+        assert store._known_partitions == set()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.build_hnsw_index")
+    def test_keep_existing_indexes(self, mock_build):
+        mock_conn, mock_cursor = self._mock_conn(partition_exists=True)
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        with store.bulk_load(drop_existing=False):
+            store._ensure_partition("aemo", mock_conn)
+
+        statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        assert not any("DROP INDEX" in sql for sql in statements)
+        mock_build.assert_not_called()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.build_hnsw_index")
+    def test_builds_index_when_load_fails(self, mock_build):
+        mock_conn, _ = self._mock_conn(partition_exists=False)
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        with pytest.raises(ValueError, match="boom"):
+            with store.bulk_load():
+                store._ensure_partition("aemo", mock_conn)
+                raise ValueError("boom")
+
+        mock_build.assert_called_once()
+
+    def test_nested_bulk_load_rejected(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with store.bulk_load():
+            with pytest.raises(RuntimeError, match="already active"):
+                with store.bulk_load():
+                    pass
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_build_hnsw_index_settings(self, mock_get_pool):
+        mock_conn, mock_cursor = self._mock_conn()
+        mock_cursor.fetchone.return_value = (4242,)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        messages = []
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store.build_hnsw_index(
+            "aemo", maintenance_work_mem="2GB", parallel_workers=3, progress=messages.append
+        )
+
+        calls = mock_cursor.execute.call_args_list
+        assert calls[1][0] == ("SELECT set_config('maintenance_work_mem', %s, true)", ("2GB",))
+        assert calls[2][0][1] == ("3",)
+        assert "USING hnsw" in repr(calls[3][0][0])
+        mock_conn.commit.assert_called_once()
+        assert messages[-1].startswith("Built HNSW index on document_chunks_aemo")
+
+    def test_build_hnsw_index_rejects_negative_workers(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with pytest.raises(ValueError, match="parallel_workers"):
+            store.build_hnsw_index("aemo", parallel_workers=-1)
+
 
 class TestPgVectorVectorStoreStore:
     """Test chunk storage."""
@@ -181,6 +295,7 @@ class TestPgVectorVectorStoreStore:
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
     def test_store_chunks(self, mock_get_pool, mock_ensure_ready, mock_ensure_partition):
         mock_cursor = MagicMock()
+        mock_cursor.rowcount = 0  # new document
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
@@ -202,9 +317,126 @@ class TestPgVectorVectorStoreStore:
             count = store.store_chunks("aemo", "test.md", chunks)
 
         assert count == 2
-        # SAVEPOINT + DELETE + RELEASE SAVEPOINT (execute calls) + batch INSERT (executemany)
-        assert mock_cursor.execute.call_count == 3  # SAVEPOINT, DELETE, RELEASE
-        mock_cursor.executemany.assert_called_once()  # batch INSERT
+        # SAVEPOINT + DELETE + stats upsert + RELEASE SAVEPOINT + binary COPY
+        assert mock_cursor.execute.call_count == 4
+        stats_call = mock_cursor.execute.call_args_list[2][0]
+        assert "document_chunk_stats" in stats_call[0]
+        assert stats_call[1] == ("aemo", 2, 1)
+        mock_cursor.executemany.assert_not_called()
+        mock_cursor.copy.assert_called_once()
+        copy_sql = mock_cursor.copy.call_args[0][0]
+        assert "FROM STDIN (FORMAT BINARY)" in copy_sql
+
+        copy = mock_cursor.copy.return_value.__enter__.return_value
+        copy.set_types.assert_called_once_with(
+            ["text", "text", "int4", "text", "text", "text", "vector", "jsonb"]
+        )
+        assert copy.write_row.call_count == 2
+        first_row = copy.write_row.call_args_list[0][0][0]
+        assert first_row == (
+            "aemo", "test.md", 0, "hello", chunk_content_hash("hello"),
+            boilerplate_hash("hello"), [0.1, 0.2], {},
+        )
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_store_chunks_adds_document_id(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        chunks = [{"content": "a", "embedding": [0.1], "metadata": {"k": "v"}}]
+
+        with patch("pgvector.psycopg.register_vector"):
+            store.store_chunks("aemo", "test.md", chunks, document_id="42")
+
+        copy = mock_cursor.copy.return_value.__enter__.return_value
+        row = copy.write_row.call_args[0][0]
+        assert row[7] == {"k": "v", "document_id": "42"}
+        # Caller's metadata dict must not be mutated
+        assert chunks[0]["metadata"] == {"k": "v"}
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_store_chunks_copy_failure_rolls_back(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_cursor.copy.side_effect = Exception("copy failed")
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        chunks = [{"content": "a", "embedding": [0.1]}]
+
+        with patch("pgvector.psycopg.register_vector"):
+            with pytest.raises(Exception, match="copy failed"):
+                store.store_chunks("aemo", "test.md", chunks)
+
+        executed = [str(c) for c in mock_cursor.execute.call_args_list]
+        assert "ROLLBACK TO SAVEPOINT store_chunks_sp" in executed[-1]
+        mock_conn.commit.assert_not_called()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_store_chunks_missing_field_raises_before_db(self, mock_get_pool):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with pytest.raises(ValueError, match="missing required field"):
+            store.store_chunks("aemo", "test.md", [{"content": "no embedding"}])
+        mock_get_pool.assert_not_called()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_store_documents_single_transaction(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        documents = [
+            {"source": "aemo", "filename": "a.md",
+             "chunks": [{"content": "x", "embedding": [0.1]}]},
+            {"source": "aer", "filename": "b.md", "document_id": "7",
+             "chunks": [{"content": "y", "embedding": [0.2]},
+                        {"content": "z", "embedding": [0.3]}]},
+            {"source": "aer", "filename": "empty.md", "chunks": []},
+        ]
+
+        with patch("pgvector.psycopg.register_vector"):
+            count = store.store_documents(documents)
+
+        assert count == 3
+        # One connection, one COPY, one commit for the whole batch
+        assert mock_get_pool.return_value.connection.call_count == 1
+        mock_cursor.copy.assert_called_once()
+        mock_conn.commit.assert_called_once()
+        # Partitions ensured once per distinct source
+        assert [c[0][0] for c in mock_ensure_partition.call_args_list] == ["aemo", "aer"]
+        # Empty documents are skipped (no DELETE for them)
+        deletes = [
+            c[0][1] for c in mock_cursor.execute.call_args_list
+            if "DELETE" in c[0][0]
+        ]
+        assert deletes == [("aemo", "a.md"), ("aer", "b.md")]
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
@@ -289,16 +521,12 @@ class TestPgVectorVectorStoreSearch:
         sql = mock_cursor.execute.call_args[0][0]
         assert "metadata @>" in sql
 
-
-class TestPgVectorVectorStoreStats:
-    """Test stats and sources."""
-
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_get_sources(self, mock_get_pool):
+    def test_search_hybrid_fuses_in_one_query(self, mock_get_pool):
         mock_cursor = MagicMock()
         mock_cursor.fetchall.return_value = [
-            ("aemo", 100),
-            ("guardian", 50),
+            ("aemo", "doc.md", 3, "rule 5.3.4", {"title": "test"}, 0.0325, 2, 1),
+            ("aemo", "doc.md", 7, "other", "{}", 0.0164, None, 1),
         ]
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
@@ -311,189 +539,685 @@ class TestPgVectorVectorStoreStats:
         mock_get_pool.return_value = mock_pool
 
         store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        sources = store.get_sources()
+        store._chunk_columns = frozenset({"content", "content_tsv"})
 
-        assert len(sources) == 2
-        assert sources[0]["source"] == "aemo"
-        assert sources[0]["chunk_count"] == 100
+        with patch("pgvector.psycopg.register_vector"):
+            results = store.search_hybrid(
+                [0.1], "rule 5.3.4", sources=["aemo"],
+                metadata_filter={"org": "AEMO"}, limit=5,
+            )
+
+        # One fused statement besides the per-transaction HNSW settings
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert len([s for s in statements if "WITH semantic" in s]) == 1
+        assert all(
+            "SET LOCAL" in s or "pg_extension" in s or "WITH semantic" in s
+            for s in statements
+        )
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "websearch_to_tsquery" in sql
+        assert "content_tsv @@" in sql
+        assert "FULL OUTER JOIN" in sql
+        assert params["query_text"] == "rule 5.3.4"
+        assert params["sources"] == ["aemo"]
+        assert params["candidates"] == 40
+        assert params["limit"] == 5
+
+        assert results[0]["chunk_index"] == 3
+        assert results[0]["semantic_rank"] == 2
+        assert results[0]["lexical_rank"] == 1
+        assert results[1]["semantic_rank"] is None
+        assert results[1]["metadata"] == {}
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_get_stats(self, mock_get_pool):
+    def test_search_hybrid_without_tsv_column(self, mock_get_pool):
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.side_effect = [(150,), (10,), (2,)]
+        mock_cursor.fetchall.side_effect = [[("content",), ("embedding",)], []]
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with patch("pgvector.psycopg.register_vector"):
+            assert store.search_hybrid([0.1], "rule 5.3.4", limit=5) == []
 
+        sql = mock_cursor.execute.call_args[0][0]
+        assert "to_tsvector('simple', content) @@ q" in sql
+        assert "content_tsv" not in sql
+
+    def test_search_hybrid_rejects_bad_limit(self):
         store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        stats = store.get_stats()
+        with pytest.raises(ValueError, match="limit"):
+            store.search_hybrid([0.1], "query", limit=0)
 
-        assert stats["total_chunks"] == 150
-        assert stats["total_documents"] == 10
-        assert stats["total_sources"] == 2
 
+class TestSearchTuning:
+    """Test per-query HNSW settings (ef_search, iterative scans, presets)."""
 
-class TestPgVectorVectorStoreClose:
-    """Test connection pool cleanup."""
+    def _mock_pool(self, mock_get_pool, extversion="0.8.0", rows=()):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (extversion,)
+        mock_cursor.fetchall.return_value = list(rows)
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_cursor
 
-    def test_close_with_pool(self):
+    @staticmethod
+    def _settings(mock_cursor):
+        return [
+            c[0][0] for c in mock_cursor.execute.call_args_list if "SET LOCAL" in c[0][0]
+        ]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_default_preset_sets_local_before_query(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool)
         store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        mock_pool = MagicMock()
-        store._pool = mock_pool
-        store._schema_ensured = True
-        store._known_partitions = {"aemo"}
 
-        store.close()
+        with patch("pgvector.psycopg.register_vector"):
+            store.search([0.1], metadata_filter={"org": "AEMO"})
 
-        mock_pool.close.assert_called_once()
-        assert store._pool is None
-        assert store._schema_ensured is False
-        assert len(store._known_partitions) == 0
+        assert self._settings(mock_cursor) == [
+            "SET LOCAL hnsw.ef_search = 40",
+            "SET LOCAL hnsw.iterative_scan = relaxed_order",
+        ]
+        assert "ORDER BY embedding" in mock_cursor.execute.call_args[0][0]
 
-    def test_close_without_pool(self):
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_explicit_overrides_and_limit_floor(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool)
         store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        store.close()  # Should not raise
 
+        with patch("pgvector.psycopg.register_vector"):
+            store.search([0.1], limit=100, preset="fast", iterative_scan="strict_order")
 
-class TestPgVectorVectorStoreDelete:
-    """Test document deletion."""
+        # ef_search is raised to the row count requested from the index
+        assert self._settings(mock_cursor) == [
+            "SET LOCAL hnsw.ef_search = 100",
+            "SET LOCAL hnsw.iterative_scan = strict_order",
+        ]
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_delete_document(self, mock_get_pool):
-        mock_cursor = MagicMock()
-        mock_cursor.rowcount = 5
-        mock_conn = MagicMock()
-        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
-        mock_conn.__exit__ = MagicMock(return_value=False)
-        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
-        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+    def test_old_pgvector_skips_iterative_scan(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool, extversion="0.7.4")
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
 
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        with patch("pgvector.psycopg.register_vector"):
+            store.search([0.1], preset="accurate")
+            store.search([0.1], preset="accurate")
 
-        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        deleted = store.delete_document("aemo", "test.md")
+        assert self._settings(mock_cursor) == ["SET LOCAL hnsw.ef_search = 200"] * 2
+        version_checks = [
+            c for c in mock_cursor.execute.call_args_list if "pg_extension" in c[0][0]
+        ]
+        assert len(version_checks) == 1
 
-        assert deleted == 5
-        mock_conn.commit.assert_called_once()
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_relaxed_order_results_resorted(self, mock_get_pool):
+        self._mock_pool(mock_get_pool, rows=[
+            ("aemo", "a.md", 0, "a", {}, 0.80),
+            ("aemo", "b.md", 0, "b", {}, 0.85),
+        ])
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
 
+        with patch("pgvector.psycopg.register_vector"):
+            results = store.search([0.1])
 
-class TestAnythingLLMView:
-    """Test AnythingLLM VIEW creation in ensure_ready."""
+        assert [r["filename"] for r in results] == ["b.md", "a.md"]
 
-    def test_view_name_constant(self):
-        assert ANYTHINGLLM_VIEW_NAME == "anythingllm_document_view"
+    def test_invalid_options_rejected(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with pytest.raises(ValueError, match="preset"):
+            store.search([0.1], preset="exhaustive")
+        with pytest.raises(ValueError, match="ef_search"):
+            store.search([0.1], ef_search=0)
+        with pytest.raises(ValueError, match="iterative_scan"):
+            store.search_hybrid([0.1], "q", iterative_scan="sideways")
+        with pytest.raises(ValueError, match="search_preset"):
+            PgVectorVectorStore(database_url="postgresql://localhost/test", search_preset="x")
+
+
+class TestMetadataColumns:
+    """Test promoted metadata columns and range/equality filters."""
+
+    COLUMNS = {"publication_date": "date", "organization": "text", "page_count": "numeric"}
+    MIGRATED = frozenset({
+        "content", "content_tsv", "meta_publication_date", "meta_organization", "meta_page_count",
+    })
+
+    def test_parse_metadata_columns(self):
+        assert parse_metadata_columns("publication_date:date, organization") == {
+            "publication_date": "date",
+            "organization": "text",
+        }
+        assert parse_metadata_columns("") == {}
+        with pytest.raises(ValueError, match="type"):
+            parse_metadata_columns("publication_date:timestamp")
+        with pytest.raises(ValueError, match="key"):
+            parse_metadata_columns("Bad-Key:text")
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_ensure_ready_creates_view(self, mock_get_pool):
+    def test_ensure_ready_only_creates_cast_functions(self, mock_get_pool):
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_cursor.fetchone.return_value = None
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
-
-        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=768)
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", view_name="",
+            metadata_columns=self.COLUMNS,
+        )
         store.ensure_ready()
 
-        calls = mock_cursor.execute.call_args_list
-        # Last execute call before commit should be the VIEW creation
-        view_call_sql = str(calls[-1])
-        assert "CREATE OR REPLACE VIEW" in view_call_sql
-        assert ANYTHINGLLM_VIEW_NAME in view_call_sql
+        statements = " ".join(c[0][0] for c in mock_cursor.execute.call_args_list)
+        assert "FUNCTION document_chunks_meta_date" in statements
+        assert "FUNCTION document_chunks_meta_numeric" in statements
+        # Columns and indexes are left to migrate_columns()
+        assert "meta_publication_date" not in statements
+        assert "meta_organization" not in statements
 
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_view_sql_maps_source_to_namespace(self, mock_get_pool):
+    def test_migrate_columns_adds_all_keys_in_one_alter(self, mock_get_pool, mock_ensure_ready):
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_cursor.fetchall.side_effect = [[("content",), ("meta_page_count",)], []]
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS,
+        )
+        assert store.migrate_columns() == [
+            "content_tsv", "meta_publication_date", "meta_organization",
+        ]
 
-        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
-        store.ensure_ready()
+        statements = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        alters = [s for s in statements if isinstance(s, str) and s.startswith("ALTER TABLE")]
+        assert len(alters) == 1
+        assert alters[0].count("ADD COLUMN") == 3
+        assert (
+            "ADD COLUMN IF NOT EXISTS meta_publication_date date GENERATED ALWAYS AS "
+            "(document_chunks_meta_date(metadata->>'publication_date')) STORED"
+        ) in alters[0]
+        assert (
+            "ADD COLUMN IF NOT EXISTS meta_organization text GENERATED ALWAYS AS "
+            "((metadata->>'organization')) STORED"
+        ) in alters[0]
+        assert "meta_page_count" not in alters[0]
+        for key in self.COLUMNS:
+            assert f"CREATE INDEX IF NOT EXISTS idx_document_chunks_meta_{key} " \
+                f"ON document_chunks (meta_{key})" in statements
+
+    def test_filters_fall_back_to_expressions_before_migration(self):
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS
+        )
+        store._chunk_columns = frozenset({"content", "meta_organization"})
 
-        calls = mock_cursor.execute.call_args_list
-        view_sql = str(calls[-1])
-        assert "source AS namespace" in view_sql
-        assert "jsonb_build_object" in view_sql
-        assert "'text'" in view_sql
+        conditions = store._column_filter_sql(
+            {"publication_date": {"gte": "2024-01-01"}, "organization": "AEMO"},
+            lambda value: "%s",
+            prefix="c.",
+        )
+
+        assert conditions == [
+            "document_chunks_meta_date(c.metadata->>'publication_date') >= %s::date",
+            "c.meta_organization = %s::text",
+        ]
+
+    def test_filters_compile_to_typed_conditions(self):
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS
+        )
+        store._chunk_columns = self.MIGRATED
+        params = []
+
+        def bind(value):
+            params.append(value)
+            return "%s"
+
+        conditions = store._column_filter_sql(
+            {
+                "publication_date": {"gte": "2024-01-01", "lt": "2025-01-01"},
+                "organization": {"in": ["AEMO", "AER"]},
+                "page_count": {"gt": 10},
+            },
+            bind,
+        )
+
+        assert conditions == [
+            "meta_publication_date >= %s::date",
+            "meta_publication_date < %s::date",
+            "meta_organization = ANY(%s::text[])",
+            "meta_page_count > %s::numeric",
+        ]
+        assert [str(params[0]), str(params[1])] == ["2024-01-01", "2025-01-01"]
+        assert params[2:] == [["AEMO", "AER"], 10]
+
+    @pytest.mark.parametrize("filters, message", [
+        ({"colour": "red"}, "Cannot filter"),
+        ({"organization": {"like": "A%"}}, "Unsupported filter operator"),
+        ({"publication_date": {"gte": "last year"}}, "ISO date"),
+        ({"organization": {"within_months": 3}}, "Unsupported filter operator"),
+        ({"publication_date": {"within_months": 0}}, "within_months"),
+        ({"page_count": "ten"}, "number"),
+    ])
+    def test_invalid_filters_rejected(self, filters, message):
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS
+        )
+        with pytest.raises(ValueError, match=message):
+            store.validate_filters(filters)
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_custom_view_name(self, mock_get_pool):
+    def test_search_within_months(self, mock_get_pool):
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_cursor.fetchall.return_value = []
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
-
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
         store = PgVectorVectorStore(
-            database_url="postgresql://localhost/test",
-            view_name="my_custom_view",
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS
         )
-        store.ensure_ready()
+        store._chunk_columns = self.MIGRATED
+        with patch("pgvector.psycopg.register_vector"):
+            store.search(
+                [0.1], sources=["aemo"], limit=5,
+                filters={"publication_date": {"within_months": 6}},
+            )
 
-        calls = mock_cursor.execute.call_args_list
-        view_sql = str(calls[-1])
-        assert "my_custom_view" in view_sql
-        assert "CREATE OR REPLACE VIEW" in view_sql
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "meta_publication_date >= current_date - make_interval(months => %s::int)" in sql
+        assert params == [[0.1], ["aemo"], 6, [0.1], 5]
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_empty_view_name_skips_creation(self, mock_get_pool):
+    def test_search_hybrid_named_filter_params(self, mock_get_pool):
         mock_cursor = MagicMock()
-        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_cursor.fetchall.return_value = []
         mock_conn = MagicMock()
         mock_conn.__enter__ = MagicMock(return_value=mock_conn)
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
-
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
         store = PgVectorVectorStore(
-            database_url="postgresql://localhost/test",
-            view_name="",
+            database_url="postgresql://localhost/test", metadata_columns=self.COLUMNS
         )
-        store.ensure_ready()
+        store._chunk_columns = self.MIGRATED
+        with patch("pgvector.psycopg.register_vector"):
+            store.search_hybrid([0.1], "tariff", filters={"organization": "AEMO"})
 
-        # 4 calls: CREATE EXTENSION + dimension check + CREATE TABLE + CREATE INDEX (no VIEW)
-        calls = mock_cursor.execute.call_args_list
-        assert len(calls) == 4
-        for call in calls:
-            assert "CREATE OR REPLACE VIEW" not in str(call)
+        sql, params = mock_cursor.execute.call_args[0]
+        names = [k for k, v in params.items() if v == "AEMO"]
+        assert len(names) == 1
+        assert f"meta_organization = %({names[0]})s::text" in sql
 
+    def test_base_backend_rejects_filters(self):
+        from app.backends.vectorstores.base import VectorStoreBackend
 
-class TestDimensionMismatch:
-    """Test embedding dimension mismatch detection and recovery."""
+        store = MagicMock(spec=VectorStoreBackend)
+        store.name = "dummy"
+        with pytest.raises(ValueError, match="does not support"):
+            VectorStoreBackend.validate_filters(store, {"organization": "AEMO"})
+        VectorStoreBackend.validate_filters(store, None)
 
-    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_no_mismatch_when_dims_match(self, mock_get_pool):
+
+class TestPgVectorVectorStoreStats:
+    """Test stats and sources."""
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_get_sources(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [
+            ("aemo", 100),
+            ("guardian", 50),
+        ]
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        sources = store.get_sources()
+
+        assert len(sources) == 2
+        assert sources[0]["source"] == "aemo"
+        assert sources[0]["chunk_count"] == 100
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_get_stats(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (150, 10, 2)
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        stats = store.get_stats()
+
+        assert stats["total_chunks"] == 150
+        assert stats["total_documents"] == 10
+        assert stats["total_sources"] == 2
+        # Single read of the maintained counters, no scan of document_chunks
+        assert mock_cursor.execute.call_count == 1
+        assert "document_chunk_stats" in mock_cursor.execute.call_args[0][0]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_reconcile_stats_reports_drift(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [("aemo", 100, 10), ("gone", 5, 1)],  # stored counters
+            [("aemo", 100, 10), ("guardian", 7, 2)],  # actual counts
+        ]
+        # Locked row + recount for "gone", then for "guardian"
+        mock_cursor.fetchone.side_effect = [(5, 1), (0, 0), None, (7, 2)]
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        assert store.reconcile_stats() == 2  # "gone" and "guardian"
+        sqls = [" ".join(str(c[0][0]).split()) for c in mock_cursor.execute.call_args_list]
+        assert not any(sql.startswith("LOCK TABLE") for sql in sqls)
+        # Only the drifted sources are rechecked, each under its row lock
+        locked = [c[0][1] for c in mock_cursor.execute.call_args_list if "FOR UPDATE" in str(c[0][0])]
+        assert locked == [("gone",), ("guardian",)]
+        mock_cursor.execute.assert_any_call(
+            "DELETE FROM document_chunk_stats WHERE source = %s", ("gone",)
+        )
+        upserts = [c[0][1] for c in mock_cursor.execute.call_args_list if "ON CONFLICT" in str(c[0][0])]
+        assert upserts == [("guardian", 7, 2)]
+        assert mock_conn.commit.call_count == 3
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_reconcile_stats_skips_drift_resolved_by_writer(self, mock_get_pool, mock_ensure_ready):
+        """A source whose counters caught up before the row lock is left alone."""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [("aemo", 100, 10)],  # stored counters
+            [("aemo", 103, 11)],  # actual counts, writer mid-commit
+        ]
+        mock_cursor.fetchone.side_effect = [(103, 11), (103, 11)]  # locked row, recount
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        assert store.reconcile_stats() == 0
+        assert not any("ON CONFLICT" in str(c[0][0]) for c in mock_cursor.execute.call_args_list)
+
+
+class TestStreamingReads:
+    """Test server-side cursor streaming of chunks and documents."""
+
+    def _mock_pool(self, mock_get_pool, rows):
+        mock_cursor = MagicMock()
+        mock_cursor.__iter__ = MagicMock(return_value=iter(rows))
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_conn, mock_cursor
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_iter_document_chunks_uses_named_cursor(self, mock_get_pool):
+        mock_conn, mock_cursor = self._mock_pool(mock_get_pool, [
+            (3, "third", {"a": 1}),
+            (4, "fourth", '{"b": 2}'),
+        ])
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        chunks = list(store.iter_document_chunks(
+            "aemo", "report.md", after_index=2, limit=2, itersize=50
+        ))
+
+        assert [c["chunk_index"] for c in chunks] == [3, 4]
+        assert chunks[1]["metadata"] == {"b": 2}
+        assert mock_conn.cursor.call_args.kwargs["name"]
+        assert mock_cursor.itersize == 50
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "chunk_index > %s" in sql and "LIMIT %s" in sql
+        assert params == ["aemo", "report.md", 2, 2]
+        mock_cursor.fetchall.assert_not_called()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_get_document_chunks_collects_stream(self, mock_get_pool):
+        self._mock_pool(mock_get_pool, [(0, "only", {})])
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        assert store.get_document_chunks("aemo", "report.md") == [
+            {"chunk_index": 0, "content": "only", "metadata": {}}
+        ]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_iter_documents_keyset(self, mock_get_pool):
+        _, mock_cursor = self._mock_pool(mock_get_pool, [
+            ("aemo", "b.md", {"title": "B"}),
+        ])
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        docs = list(store.iter_documents(source="aemo", after_filename="a.md"))
+
+        assert docs == [{"source": "aemo", "filename": "b.md", "metadata": {"title": "B"}}]
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "DISTINCT ON (source, filename)" in sql
+        assert params == ["aemo", "a.md"]
+
+
+class TestPgVectorVectorStoreClose:
+    """Test connection pool cleanup."""
+
+    def test_close_with_pool(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        mock_pool = MagicMock()
+        store._pool = mock_pool
+        store._schema_ensured = True
+        store._known_partitions = {"aemo"}
+
+        store.close()
+
+        mock_pool.close.assert_called_once()
+        assert store._pool is None
+        assert store._schema_ensured is False
+        assert len(store._known_partitions) == 0
+
+    def test_close_without_pool(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store.close()  # Should not raise
+
+
+class TestPgVectorVectorStoreDelete:
+    """Test document deletion."""
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_delete_document(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 5
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        deleted = store.delete_document("aemo", "test.md")
+
+        assert deleted == 5
+        mock_conn.commit.assert_called_once()
+        # Counters updated in the same transaction
+        stats_sql, stats_params = mock_cursor.execute.call_args[0]
+        assert "document_chunk_stats" in stats_sql
+        assert stats_params == ("aemo", -5, -1)
+        # The document embedding goes with it
+        assert any(
+            "DELETE FROM document_embeddings" in c[0][0]
+            for c in mock_cursor.execute.call_args_list
+        )
+
+
+class TestAnythingLLMView:
+    """Test AnythingLLM VIEW creation in ensure_ready."""
+
+    def test_view_name_constant(self):
+        assert ANYTHINGLLM_VIEW_NAME == "anythingllm_document_view"
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_ensure_ready_creates_view(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=768)
+        store.ensure_ready()
+
+        calls = mock_cursor.execute.call_args_list
+        # Last execute call before commit should be the VIEW creation
+        view_call_sql = str(calls[-1])
+        assert "CREATE OR REPLACE VIEW" in view_call_sql
+        assert ANYTHINGLLM_VIEW_NAME in view_call_sql
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_view_sql_maps_source_to_namespace(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store.ensure_ready()
+
+        calls = mock_cursor.execute.call_args_list
+        view_sql = str(calls[-1])
+        assert "source AS namespace" in view_sql
+        assert "jsonb_build_object" in view_sql
+        assert "'text'" in view_sql
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_custom_view_name(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test",
+            view_name="my_custom_view",
+        )
+        store.ensure_ready()
+
+        calls = mock_cursor.execute.call_args_list
+        view_sql = str(calls[-1])
+        assert "my_custom_view" in view_sql
+        assert "CREATE OR REPLACE VIEW" in view_sql
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_empty_view_name_skips_creation(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None  # Table doesn't exist yet
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test",
+            view_name="",
+        )
+        store.ensure_ready()
+
+        # 13 calls: CREATE EXTENSION + dimension check + CREATE TABLE
+        # + ADD COLUMN content_hash + document index
+        # + metadata GIN index + stats table + stats seed
+        # + document_embeddings table + its HNSW index
+        # + boilerplate_chunks + document_boilerplate tables
+        # + ADD COLUMN boilerplate_hash (no VIEW)
+        calls = mock_cursor.execute.call_args_list
+        assert len(calls) == 13
+        for call in calls:
+            assert "CREATE OR REPLACE VIEW" not in str(call)
+            # Generated columns are only added by migrate_columns()
+            assert "GENERATED" not in str(call) or "CREATE TABLE" in str(call)
+
+
+class TestDimensionMismatch:
+    """Test embedding dimension mismatch detection and recovery."""
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_no_mismatch_when_dims_match(self, mock_get_pool):
         """Table exists with matching dimensions — no drop, normal flow."""
         mock_cursor = MagicMock()
         mock_cursor.fetchone.return_value = (768,)  # Existing dims match
@@ -507,16 +1231,68 @@ class TestDimensionMismatch:
         mock_pool.connection.return_value = mock_conn
         mock_get_pool.return_value = mock_pool
 
-        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=768)
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=768)
+        store.ensure_ready()
+
+        # No DROP TABLE should be called
+        all_sql = " ".join(str(c) for c in mock_cursor.execute.call_args_list)
+        assert "DROP TABLE" not in all_sql
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_mismatch_empty_table_auto_drops(self, mock_get_pool):
+        """Dimension mismatch + empty table -> auto-drop and recreate."""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.side_effect = [(768,), (0,)]
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_pool = MagicMock()
+        mock_pool.connection.return_value = mock_conn
+        mock_get_pool.return_value = mock_pool
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=4096)
+        store.ensure_ready()
+
+        all_sql = " ".join(str(c) for c in mock_cursor.execute.call_args_list)
+        assert "DROP TABLE document_chunks CASCADE" in all_sql
+        assert "vector(4096)" in all_sql
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_mismatch_drop_resets_stats(self, mock_get_pool):
+        """The stats table is dropped with the chunks, then recreated and reseeded."""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.side_effect = [(768,), (500,)]
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test",
+            dimensions=4096,
+            drop_on_dimension_mismatch=True,
+        )
         store.ensure_ready()
 
-        # No DROP TABLE should be called
-        all_sql = " ".join(str(c) for c in mock_cursor.execute.call_args_list)
-        assert "DROP TABLE" not in all_sql
+        sqls = [" ".join(str(c[0][0]).split()) for c in mock_cursor.execute.call_args_list]
+        drop_chunks = sqls.index("DROP TABLE document_chunks CASCADE")
+        drop_stats = sqls.index("DROP TABLE IF EXISTS document_chunk_stats")
+        create_stats = next(i for i, s in enumerate(sqls) if "CREATE TABLE IF NOT EXISTS document_chunk_stats" in s)
+        reseed = next(i for i, s in enumerate(sqls) if s.startswith("INSERT INTO document_chunk_stats"))
+        # Dropped in the same transaction as the chunks, before the recreate
+        assert drop_chunks < drop_stats < create_stats < reseed
+        assert mock_conn.commit.call_count == 2
+        # The reseed counts the freshly created, empty table
+        assert "FROM document_chunks" in sqls[reseed]
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
-    def test_mismatch_empty_table_auto_drops(self, mock_get_pool):
-        """Dimension mismatch + empty table -> auto-drop and recreate."""
+    def test_mismatch_drop_clears_boilerplate(self, mock_get_pool):
+        """Shared boilerplate rows are dropped with the chunks, then recreated empty."""
         mock_cursor = MagicMock()
         mock_cursor.fetchone.side_effect = [(768,), (0,)]
         mock_conn = MagicMock()
@@ -524,17 +1300,20 @@ class TestDimensionMismatch:
         mock_conn.__exit__ = MagicMock(return_value=False)
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
-
-        mock_pool = MagicMock()
-        mock_pool.connection.return_value = mock_conn
-        mock_get_pool.return_value = mock_pool
+        mock_get_pool.return_value.connection.return_value = mock_conn
 
         store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=4096)
         store.ensure_ready()
 
-        all_sql = " ".join(str(c) for c in mock_cursor.execute.call_args_list)
-        assert "DROP TABLE document_chunks CASCADE" in all_sql
-        assert "vector(4096)" in all_sql
+        sqls = [" ".join(str(c[0][0]).split()) for c in mock_cursor.execute.call_args_list]
+        drop_links = sqls.index("DROP TABLE IF EXISTS document_boilerplate")
+        drop_chunks = sqls.index("DROP TABLE IF EXISTS boilerplate_chunks")
+        create_chunks = next(
+            i for i, s in enumerate(sqls) if "CREATE TABLE IF NOT EXISTS boilerplate_chunks" in s
+        )
+        # Links before the table they reference, both before the recreate
+        assert drop_links < drop_chunks < create_chunks
+        assert mock_conn.commit.call_count == 2
 
     @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
     def test_mismatch_with_data_raises_error(self, mock_get_pool):
@@ -606,3 +1385,582 @@ class TestDimensionMismatch:
         assert "vector(768)" in msg
         assert "4096" in msg
         assert "42 row(s)" in msg
+
+
+class TestIncrementalSync:
+    """Test content-hash lookup and incremental document sync."""
+
+    def _mock_conn(self, mock_get_pool, mock_cursor):
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_conn
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_get_chunk_hashes(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [(0, "h0"), (1, None), (2, "h2"), (2, "h2b")]
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        hashes = store.get_chunk_hashes("aemo", "doc.md")
+
+        # Legacy rows (NULL hash) and duplicated indexes are always rewritten
+        assert hashes == {0: "h0", 1: None, 2: None}
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_sync_chunks_writes_only_changed(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 2
+        mock_conn = self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        chunks = [
+            {"content": "kept", "chunk_index": 0, "metadata": {"t": 1}},
+            {"content": "changed", "chunk_index": 1, "embedding": [0.5], "metadata": {}},
+        ]
+
+        with patch("pgvector.psycopg.register_vector"):
+            written = store.sync_chunks("aemo", "doc.md", chunks)
+
+        assert written == 1
+        delete_call = mock_cursor.execute.call_args_list[1]
+        assert "NOT (chunk_index = ANY(%s))" in delete_call[0][0]
+        assert delete_call[0][1] == ("aemo", "doc.md", [0])
+
+        update_sql, update_rows = mock_cursor.executemany.call_args[0]
+        assert "IS DISTINCT FROM" in update_sql
+        assert update_rows == [('{"t": 1}', "aemo", "doc.md", 0, '{"t": 1}')]
+
+        copy = mock_cursor.copy.return_value.__enter__.return_value
+        assert copy.write_row.call_count == 1
+        assert copy.write_row.call_args[0][0][3] == "changed"
+        mock_conn.commit.assert_called_once()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_sync_chunks_nothing_changed_skips_copy(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 0
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        chunks = [{"content": "kept", "chunk_index": 0}]
+
+        with patch("pgvector.psycopg.register_vector"):
+            assert store.sync_chunks("aemo", "doc.md", chunks) == 0
+
+        mock_cursor.copy.assert_not_called()
+
+
+class TestStreamingStore:
+    """Test store_chunk_stream (one COPY fed batch by batch)."""
+
+    def _mock_conn(self, mock_get_pool, mock_cursor):
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_conn
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_batches_share_one_copy(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 0  # new document
+        mock_conn = self._mock_conn(mock_get_pool, mock_cursor)
+        consumed = []
+
+        def batches():
+            for batch in (["a", "b"], ["c"]):
+                consumed.append(batch)
+                yield [{"content": text, "embedding": [0.1]} for text in batch]
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with patch("pgvector.psycopg.register_vector"):
+            count = store.store_chunk_stream("aemo", "doc.md", batches(), document_id="9")
+
+        assert count == 3
+        mock_cursor.copy.assert_called_once()
+        copy = mock_cursor.copy.return_value.__enter__.return_value
+        rows = [c[0][0] for c in copy.write_row.call_args_list]
+        # Default chunk_index continues across batches
+        assert [(r[2], r[3]) for r in rows] == [(0, "a"), (1, "b"), (2, "c")]
+        assert rows[0][7] == {"document_id": "9"}
+        stats_call = mock_cursor.execute.call_args_list[2][0]
+        assert stats_call[1] == ("aemo", 3, 1)
+        mock_conn.commit.assert_called_once()
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._ensure_partition")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_producer_failure_rolls_back(
+        self, mock_get_pool, mock_ensure_ready, mock_ensure_partition
+    ):
+        mock_cursor = MagicMock()
+        mock_cursor.rowcount = 4  # replaced document
+        mock_conn = self._mock_conn(mock_get_pool, mock_cursor)
+
+        def batches():
+            yield [{"content": "a", "embedding": [0.1]}]
+            raise ValueError("embedding failed")
+
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with patch("pgvector.psycopg.register_vector"):
+            with pytest.raises(ValueError, match="embedding failed"):
+                store.store_chunk_stream("aemo", "doc.md", batches())
+
+        executed = [str(c) for c in mock_cursor.execute.call_args_list]
+        assert "DELETE FROM document_chunks" in executed[1]
+        assert "ROLLBACK TO SAVEPOINT store_chunks_sp" in executed[-1]
+        mock_conn.commit.assert_not_called()
+
+    def test_base_default_collects_batches(self):
+        from app.backends.vectorstores.base import VectorStoreBackend
+
+        store = MagicMock(spec=VectorStoreBackend)
+        store.store_chunks.return_value = 2
+        batches = iter([[{"content": "a"}], [{"content": "b"}]])
+
+        assert VectorStoreBackend.store_chunk_stream(store, "s", "f.md", batches) == 2
+        store.store_chunks.assert_called_once_with(
+            "s", "f.md", [{"content": "a"}, {"content": "b"}], document_id=None
+        )
+
+
+class TestIndexQuantization:
+    """Test quantized HNSW index modes and full-precision rerank."""
+
+    def _mock_conn(self, mock_get_pool, mock_cursor):
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_conn
+
+    def test_invalid_quantization_raises(self):
+        with pytest.raises(ValueError, match="index_quantization"):
+            PgVectorVectorStore(database_url="x", index_quantization="int8")
+
+    def test_halfvec_dimension_limit(self):
+        with pytest.raises(ValueError, match="at most 4000"):
+            PgVectorVectorStore(database_url="x", dimensions=4096, index_quantization="halfvec")
+        # binary supports wide embeddings
+        PgVectorVectorStore(database_url="x", dimensions=4096, index_quantization="binary")
+
+    @pytest.mark.parametrize("mode,expected", [
+        ("none", "embedding vector_cosine_ops"),
+        ("halfvec", "(embedding::halfvec(768)) halfvec_cosine_ops"),
+        ("binary", "(binary_quantize(embedding)::bit(768)) bit_hamming_ops"),
+    ])
+    def test_partition_index_matches_mode(self, mode, expected):
+        from psycopg import sql
+
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = (1,)
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        store = PgVectorVectorStore(database_url="x", index_quantization=mode)
+        store._ensure_partition("aemo", mock_conn)
+
+        hnsw_stmt = mock_cursor.execute.call_args_list[1][0][0]
+        assert isinstance(hnsw_stmt, sql.Composed)
+        rendered = repr(hnsw_stmt)
+        assert expected.split(" ")[-1] in rendered
+        assert store._index_spec()[1] in rendered
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_quantized_search_overfetches_and_reranks(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(
+            database_url="x", index_quantization="binary", rerank_factor=8,
+        )
+        with patch("pgvector.psycopg.register_vector"):
+            store.search([0.1], limit=5)
+
+        sql_text, params = mock_cursor.execute.call_args[0]
+        assert "binary_quantize(embedding)::bit(768) <~>" in sql_text
+        assert "ORDER BY score DESC" in sql_text
+        # [score embedding, ann embedding, candidates, limit]
+        assert params[-2:] == [40, 5]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_unquantized_search_unchanged(self, mock_get_pool):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = []
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="x")
+        with patch("pgvector.psycopg.register_vector"):
+            store.search([0.1], limit=5)
+
+        sql_text, params = mock_cursor.execute.call_args[0]
+        assert "candidates" not in sql_text
+        assert params[-1] == 5
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_migrate_rebuilds_and_drops_stale(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("document_chunks_aemo",)]
+        mock_conn = self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="x", index_quantization="halfvec")
+        assert store.migrate_index_quantization() == ["document_chunks_aemo"]
+
+        statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list[1:]]
+        assert "idx_aemo_embedding_halfvec_hnsw" in statements[0]
+        assert any("idx_aemo_embedding_hnsw" in s and "DROP" in s for s in statements)
+        assert any("idx_aemo_embedding_bit_hnsw" in s and "DROP" in s for s in statements)
+        mock_conn.commit.assert_called_once()
+
+
+class TestColumnMigration:
+    """Test the explicit migration for generated columns."""
+
+    def _mock_conn(self, mock_get_pool, mock_cursor):
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_conn
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_adds_missing_columns_and_indexes(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [
+            [("content",), ("embedding",)],
+            [("document_chunks_aemo",), ("document_chunks_aer",)],
+        ]
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="x")
+        assert store.migrate_columns() == ["content_tsv"]
+
+        statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        alters = [s for s in statements if "ALTER TABLE" in s]
+        assert len(alters) == 1
+        assert "ADD COLUMN IF NOT EXISTS content_tsv tsvector GENERATED ALWAYS AS" in alters[0]
+        assert any("idx_aemo_content_tsv" in s for s in statements)
+        assert any("idx_aer_content_tsv" in s for s in statements)
+        # Column list is re-read after the migration
+        assert store._chunk_columns is None
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_noop_when_columns_exist(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = [[("content",), ("content_tsv",)], []]
+        self._mock_conn(mock_get_pool, mock_cursor)
+
+        store = PgVectorVectorStore(database_url="x")
+        assert store.migrate_columns() == []
+
+        statements = [repr(c[0][0]) for c in mock_cursor.execute.call_args_list]
+        assert not any("ALTER TABLE" in s for s in statements)
+
+
+class TestTwoStageSearch:
+    """Test document embeddings and document-then-chunk search."""
+
+    def _mock_pool(self, mock_get_pool, rows=()):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = ("0.8.0",)
+        mock_cursor.fetchall.return_value = list(rows)
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_cursor
+
+    @staticmethod
+    def _query(mock_cursor):
+        return mock_cursor.execute.call_args[0]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_ensure_ready_creates_document_embeddings(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        mock_cursor.fetchone.return_value = None
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        store.ensure_ready()
+
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert any("CREATE TABLE IF NOT EXISTS document_embeddings" in s for s in sqls)
+        assert any("idx_document_embeddings_hnsw" in s for s in sqls)
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_store_document_embeddings_upserts(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=2)
+
+        with patch("pgvector.psycopg.register_vector"):
+            count = store.store_document_embeddings([
+                {"source": "aemo", "filename": "a.md", "embedding": [0.6, 0.8],
+                 "chunk_count": 3, "metadata": {"org": "AEMO"}},
+            ])
+
+        assert count == 1
+        sql, rows = mock_cursor.executemany.call_args[0]
+        assert "ON CONFLICT (source, filename) DO UPDATE" in sql
+        assert rows == [("aemo", "a.md", [0.6, 0.8], 3, '{"org": "AEMO"}')]
+
+    def test_store_document_embeddings_checks_dimensions(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test", dimensions=3)
+        with pytest.raises(ValueError, match="expected 3"):
+            store.store_document_embeddings([
+                {"source": "s", "filename": "a.md", "embedding": [1.0], "chunk_count": 1},
+            ])
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_search_two_stage_query_shape(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool, rows=[
+            ("aemo", "a.md", 2, "text", {"org": "AEMO"}, 0.9, [1.0, 0.0]),
+        ])
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        with patch("pgvector.psycopg.register_vector"):
+            results = store.search_two_stage(
+                [1.0, 0.0], sources=["aemo"], metadata_filter={"org": "AEMO"},
+                limit=5, document_limit=8,
+            )
+
+        sql, params = self._query(mock_cursor)
+        assert "FROM document_embeddings d" in sql
+        assert "candidates AS MATERIALIZED" in sql
+        assert "EXISTS (SELECT 1 FROM document_chunks c" in sql
+        assert params == [
+            ["aemo"], '{"org": "AEMO"}', [1.0, 0.0], 8, [1.0, 0.0], '{"org": "AEMO"}', 5,
+        ]
+        assert results == [{
+            "source": "aemo", "filename": "a.md", "chunk_index": 2,
+            "content": "text", "metadata": {"org": "AEMO"}, "score": 0.9,
+        }]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_search_two_stage_mmr_overfetches_and_diversifies(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool, rows=[
+            ("s", "a.md", 0, "a", {}, 1.0, [1.0, 0.0]),
+            ("s", "a.md", 1, "a-dup", {}, 0.99, [0.99, 0.01]),
+            ("s", "b.md", 0, "b", {}, 0.6, [0.6, 0.8]),
+        ])
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        with patch("pgvector.psycopg.register_vector"):
+            results = store.search_two_stage([1.0, 0.0], limit=2, mmr_lambda=0.3)
+
+        assert self._query(mock_cursor)[1][-1] == 8
+        assert [r["content"] for r in results] == ["a", "b"]
+
+    @pytest.mark.parametrize("kwargs, message", [
+        ({"limit": 0}, "limit must be"),
+        ({"document_limit": 5000}, "document_limit must be"),
+        ({"mmr_lambda": -0.1}, "mmr_lambda must be"),
+    ])
+    def test_search_two_stage_rejects_bad_options(self, kwargs, message):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with pytest.raises(ValueError, match=message):
+            store.search_two_stage([0.1], **kwargs)
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_backfill_only_missing_documents(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        mock_cursor.rowcount = 4
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        assert store.backfill_document_embeddings(source="aemo") == 4
+        sql, params = self._query(mock_cursor)
+        assert "avg(c.embedding)" in sql
+        assert "NOT EXISTS" in sql
+        assert params == ("aemo",)
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_search_include_embeddings(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool, rows=[
+            ("s", "a.md", 0, "a", {}, 0.9, [1.0, 0.0]),
+        ])
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        with patch("pgvector.psycopg.register_vector"):
+            results = store.search([1.0, 0.0], include_embeddings=True)
+
+        assert "AS score, embedding" in self._query(mock_cursor)[0]
+        assert results[0]["embedding"] == [1.0, 0.0]
+
+
+class TestBoilerplateDedup:
+    """Test shared boilerplate detection, references, report and purge."""
+
+    def test_hash_normalises_case_and_whitespace(self):
+        assert boilerplate_hash("  Subscribe\n\tNOW ") == boilerplate_hash("subscribe now")
+        assert boilerplate_hash("subscribe now") != boilerplate_hash("subscribe later")
+
+    def test_hash_normalises_non_ascii(self):
+        # No-break and ideographic spaces, accented and Cyrillic capitals
+        assert boilerplate_hash("ÉNERGIE\u00a0Québec\u3000ПОДПИСКА") == boilerplate_hash(
+            "énergie québec подписка"
+        )
+        assert boilerplate_hash("énergie québec") != boilerplate_hash("energie quebec")
+
+    def _mock_pool(self, mock_get_pool, fetches=()):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.side_effect = list(fetches)
+        mock_conn = MagicMock()
+        mock_conn.__enter__ = MagicMock(return_value=mock_conn)
+        mock_conn.__exit__ = MagicMock(return_value=False)
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_get_pool.return_value.connection.return_value = mock_conn
+        return mock_cursor
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_ensure_ready_adds_hash_column_when_enabled(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        mock_cursor.fetchone.return_value = None
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", boilerplate_dedup=True
+        )
+        store.ensure_ready()
+
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        column_sql = next(s for s in sqls if "ADD COLUMN IF NOT EXISTS boilerplate_hash" in s)
+        # Hashed in Python on write, never generated in SQL
+        assert "GENERATED" not in column_sql
+        assert any("idx_document_chunks_boilerplate" in s for s in sqls)
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._iter_rows")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_backfill_fills_missing_hashes(
+        self, mock_get_pool, mock_iter_rows, mock_ensure_ready
+    ):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        mock_iter_rows.return_value = iter([
+            ("aemo", 1, "Footer"),
+            ("aemo", 2, "ÉNERGIE\u00a0Québec"),
+        ])
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", boilerplate_dedup=True
+        )
+        assert store.backfill_boilerplate_hashes(batch_size=1) == 2
+
+        query = " ".join(mock_iter_rows.call_args[0][1].split())
+        assert query.endswith("WHERE boilerplate_hash IS NULL")
+
+        batches = [c[0][1] for c in mock_cursor.executemany.call_args_list]
+        assert batches == [
+            [(boilerplate_hash("footer"), "aemo", 1)],
+            [(boilerplate_hash("énergie québec"), "aemo", 2)],
+        ]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_match_registers_repeated_chunks(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = self._mock_pool(mock_get_pool, fetches=[
+            [("known", 7)],          # already registered
+            [("footer",)],           # repeated in enough other documents
+            [("footer", 8)],         # newly registered
+        ])
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", boilerplate_dedup=True
+        )
+
+        matched = store.match_boilerplate(
+            "guardian", "new.md",
+            {"known": "Subscribe", "footer": "Footer text", "body": "Unique"},
+            min_documents=3,
+        )
+
+        assert matched == {"known": 7, "footer": 8}
+        count_sql, count_params = mock_cursor.execute.call_args_list[1][0]
+        assert "HAVING COUNT(DISTINCT filename) >= %s" in count_sql
+        assert count_params == ("guardian", ["footer", "body"], "new.md", 3)
+        insert_params = mock_cursor.execute.call_args_list[2][0][1]
+        assert insert_params == ("guardian", ["footer"], ["Footer text"])
+
+    def test_match_disabled_without_dedup(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        assert store.match_boilerplate("s", "a.md", {"h": "x"}, 3) == {}
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_set_document_boilerplate_replaces_references(self, mock_get_pool):
+        mock_cursor = self._mock_pool(mock_get_pool)
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+
+        store.set_document_boilerplate("s", "a.md", {5: 8, 2: 7})
+
+        assert "DELETE FROM document_boilerplate" in mock_cursor.execute.call_args[0][0]
+        assert mock_cursor.executemany.call_args[0][1] == [
+            ("s", "a.md", 2, 7), ("s", "a.md", 5, 8),
+        ]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_report_estimates_bytes_reclaimed(self, mock_get_pool, mock_ensure_ready):
+        self._mock_pool(mock_get_pool, fetches=[
+            [("guardian", 2, 100, 5000, 100, 3)],
+        ])
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", dimensions=4, boilerplate_dedup=True
+        )
+
+        assert store.get_boilerplate_report() == [{
+            "source": "guardian",
+            "snippets": 2,
+            "chunks_deduplicated": 100,
+            "embeddings_saved": 100,
+            "bytes_reclaimed": 5000 + 100 * 16 - 100,
+            "pending_chunks": 3,
+        }]
+
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore.ensure_ready")
+    @patch("app.backends.vectorstores.pgvector_store.PgVectorVectorStore._get_pool")
+    def test_purge_moves_copies_to_references(self, mock_get_pool, mock_ensure_ready):
+        mock_cursor = self._mock_pool(mock_get_pool, fetches=[[("guardian", 4)]])
+        store = PgVectorVectorStore(
+            database_url="postgresql://localhost/test", boilerplate_dedup=True
+        )
+
+        with patch("app.services.search_cache.invalidate_sources"):
+            assert store.purge_boilerplate("guardian") == 4
+
+        purge_sql, purge_params = mock_cursor.execute.call_args_list[0][0]
+        assert "DELETE FROM document_chunks c" in purge_sql
+        assert "INSERT INTO document_boilerplate" in purge_sql
+        assert purge_params == ("guardian",)
+        stats_sql, stats_params = mock_cursor.execute.call_args_list[1][0]
+        assert "document_chunk_stats" in stats_sql
+        assert stats_params == ("guardian", -4, 0)
+
+    def test_purge_requires_dedup(self):
+        store = PgVectorVectorStore(database_url="postgresql://localhost/test")
+        with pytest.raises(ValueError, match="boilerplate_dedup"):
+            store.purge_boilerplate()
@@ -0,0 +1,149 @@
+"""Tests for vector ranking helpers."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.backends.vectorstores.ranking import (
+    candidate_limit,
+    cap_per_group,
+    mean_pool_embeddings,
+    mmr_select,
+    rank_results,
+    sum_unit_embeddings,
+)
+
+
+class TestMeanPoolEmbeddings:
+    """Test document embedding pooling."""
+
+    def test_pooled_vector_is_unit_length(self):
+        pooled = mean_pool_embeddings([[3, 0, 0], [0, 4, 0]])
+        assert np.linalg.norm(pooled) == pytest.approx(1.0)
+        assert pooled[0] == pytest.approx(pooled[1])
+
+    def test_chunks_normalised_before_mean(self):
+        # A long chunk must not outweigh a short one
+        pooled = mean_pool_embeddings([[100, 0], [0, 1]])
+        assert pooled[0] == pytest.approx(pooled[1])
+
+    def test_empty_raises(self):
+        with pytest.raises(ValueError, match="empty"):
+            mean_pool_embeddings([])
+
+    def test_partial_sums_pool_incrementally(self):
+        vectors = [[3, 0, 0], [0, 4, 0], [1, 1, 1]]
+        total = sum_unit_embeddings(vectors[:2]) + sum_unit_embeddings(vectors[2:])
+        assert mean_pool_embeddings([total]) == pytest.approx(mean_pool_embeddings(vectors))
+
+
+class TestMmrSelect:
+    """Test maximal marginal relevance selection."""
+
+    def test_lambda_one_is_relevance_order(self):
+        embeddings = [[0.5, 0.5], [1, 0], [0.9, 0.1]]
+        assert mmr_select([1, 0], embeddings, k=3, lambda_mult=1.0) == [1, 2, 0]
+
+    def test_diversity_skips_near_duplicate(self):
+        embeddings = [[1, 0], [0.99, 0.01], [0.6, 0.8]]
+        assert mmr_select([1, 0], embeddings, k=2, lambda_mult=0.3) == [0, 2]
+
+    def test_k_larger_than_candidates(self):
+        assert sorted(mmr_select([1, 0], [[1, 0], [0, 1]], k=5)) == [0, 1]
+
+    def test_empty_candidates(self):
+        assert mmr_select([1, 0], [], k=3) == []
+
+    def test_invalid_lambda_raises(self):
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            mmr_select([1, 0], [[1, 0]], k=1, lambda_mult=1.5)
+
+    def test_group_cap(self):
+        embeddings = [[1, 0], [0.99, 0.01], [0.98, 0.02], [0.5, 0.5]]
+        groups = ["a", "a", "a", "b"]
+        picked = mmr_select(
+            [1, 0], embeddings, k=3, lambda_mult=1.0, groups=groups, max_per_group=2
+        )
+        assert picked == [0, 1, 3]
+
+    def test_explicit_relevance(self):
+        picked = mmr_select([1, 0], [[1, 0], [0, 1]], k=2, lambda_mult=1.0, relevance=[0.1, 0.9])
+        assert picked == [1, 0]
+
+
+class TestCapPerGroup:
+    """Test the vectorised per-group cap."""
+
+    def test_keeps_first_rows_of_each_group(self):
+        assert cap_per_group(["a", "b", "a", "a", "b", "c"], 2).tolist() == [0, 1, 2, 4, 5]
+
+    def test_empty(self):
+        assert cap_per_group([], 1).tolist() == []
+
+
+class TestRankResults:
+    """Test the post-retrieval ranking stage."""
+
+    @staticmethod
+    def _result(filename, index, embedding, score):
+        return {
+            "source": "s", "filename": filename, "chunk_index": index,
+            "content": f"{filename}#{index}", "metadata": {}, "score": score,
+            "embedding": embedding,
+        }
+
+    @pytest.fixture
+    def candidates(self):
+        return [
+            self._result("a.md", 0, [1, 0], 0.99),
+            self._result("a.md", 1, [0.99, 0.01], 0.98),
+            self._result("a.md", 2, [0.98, 0.02], 0.97),
+            self._result("b.md", 0, [0.6, 0.8], 0.6),
+        ]
+
+    def test_plain_truncation_strips_embeddings(self, candidates):
+        results = rank_results([1, 0], candidates, 2)
+        assert [r["content"] for r in results] == ["a.md#0", "a.md#1"]
+        assert all("embedding" not in r for r in results)
+
+    def test_max_per_document(self, candidates):
+        results = rank_results([1, 0], candidates, 3, max_per_document=1)
+        assert [r["content"] for r in results] == ["a.md#0", "b.md#0"]
+
+    def test_mmr_diversifies(self, candidates):
+        results = rank_results([1, 0], candidates, 2, mmr_lambda=0.3)
+        assert [r["content"] for r in results] == ["a.md#0", "b.md#0"]
+
+    def test_mmr_skipped_without_embeddings(self, candidates):
+        for candidate in candidates:
+            del candidate["embedding"]
+        results = rank_results([1, 0], candidates, 2, mmr_lambda=0.3)
+        assert [r["content"] for r in results] == ["a.md#0", "a.md#1"]
+
+    def test_reranker_reorders(self, candidates):
+        reranker = MagicMock()
+        reranker.rerank.return_value = [0.1, 0.2, 0.3, 0.9]
+
+        results = rank_results([1, 0], candidates, 2, reranker=reranker, query_text="q")
+
+        reranker.rerank.assert_called_once_with("q", ["a.md#0", "a.md#1", "a.md#2", "b.md#0"])
+        assert [r["content"] for r in results] == ["b.md#0", "a.md#2"]
+        assert results[0]["rerank_score"] == pytest.approx(0.9)
+
+    def test_reranker_score_count_mismatch(self, candidates):
+        reranker = MagicMock()
+        reranker.rerank.return_value = [0.1]
+        with pytest.raises(ValueError, match="1 scores for 4 candidates"):
+            rank_results([1, 0], candidates, 2, reranker=reranker)
+
+    def test_invalid_options(self, candidates):
+        with pytest.raises(ValueError, match="mmr_lambda"):
+            rank_results([1, 0], candidates, 2, mmr_lambda=2)
+        with pytest.raises(ValueError, match="max_per_document"):
+            rank_results([1, 0], candidates, 2, max_per_document=0)
+
+
+def test_candidate_limit():
+    assert candidate_limit(10) == 40
+    assert candidate_limit(500) == 1000
@@ -0,0 +1,101 @@
+"""Tests for the shared search flow."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.config import Config
+from app.services.search_cache import SearchCache, _MemoryBackend, get_search_cache, reset_search_cache
+from app.services.vector_search import run_search
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    # Shared-backend cache, so results are cached as with REDIS_URL set
+    with patch("app.services.search_cache._cache", SearchCache(_MemoryBackend(100))):
+        yield
+    reset_search_cache()
+
+
+def _embedder():
+    embedder = MagicMock()
+    embedder.model = "test-model"
+    embedder.embed_single.return_value = [1.0, 0.0]
+    embedder.embed.return_value = [[1.0, 0.0]]
+    return embedder
+
+
+def _result(filename, chunk_index, score):
+    return {
+        "source": "aemo", "filename": filename, "chunk_index": chunk_index,
+        "content": "text", "metadata": {}, "score": score,
+    }
+
+
+class TestRunSearch:
+    """Test mode dispatch, over-fetch and result caching."""
+
+    @pytest.mark.parametrize("mode, method", [
+        ("vector", "search"),
+        ("hybrid", "search_hybrid"),
+        ("two_stage", "search_two_stage"),
+    ])
+    def test_dispatches_by_mode(self, mode, method):
+        store = MagicMock()
+        getattr(store, method).return_value = [_result("a.md", 0, 0.9)]
+
+        results = run_search(store, _embedder(), None, "tariff", sources=[], limit=5, mode=mode)
+
+        assert results == [_result("a.md", 0, 0.9)]
+        kwargs = getattr(store, method).call_args.kwargs
+        assert kwargs["limit"] == 5
+        assert kwargs["sources"] is None
+        assert "include_embeddings" not in kwargs
+        assert ("query_text" in kwargs) == (mode == "hybrid")
+
+    def test_post_stage_overfetches_and_caps(self):
+        store = MagicMock()
+        store.search.return_value = [_result("a.md", i, 0.9 - i / 100) for i in range(3)]
+
+        results = run_search(store, _embedder(), None, "tariff", limit=2, max_per_document=1)
+
+        assert store.search.call_args.kwargs["limit"] > 2
+        assert [(r["filename"], r["chunk_index"]) for r in results] == [("a.md", 0)]
+
+    def test_mmr_requests_embeddings(self):
+        store = MagicMock()
+        store.search.return_value = []
+
+        run_search(store, _embedder(), None, "tariff", mmr_lambda=0.5)
+
+        assert store.search.call_args.kwargs["include_embeddings"] is True
+
+    def test_repeat_search_served_from_cache(self):
+        store = MagicMock()
+        store.search.return_value = [_result("a.md", 0, 0.9)]
+        embedder = _embedder()
+
+        first = run_search(store, embedder, None, "tariff")
+        second = run_search(store, embedder, None, "tariff")
+
+        assert first == second
+        store.search.assert_called_once()
+
+    def test_unknown_mode_rejected(self):
+        with pytest.raises(ValueError, match="mode"):
+            run_search(MagicMock(), _embedder(), None, "tariff", mode="fuzzy")
+
+    def test_results_not_cached_without_shared_backend(self):
+        store = MagicMock()
+        store.search.return_value = [_result("a.md", 0, 0.9)]
+        embedder = _embedder()
+        reset_search_cache()
+        with patch.object(Config, "REDIS_URL", ""):
+            get_search_cache()
+
+        run_search(store, embedder, None, "tariff")
+        run_search(store, embedder, None, "tariff")
+
+        # The query embedding is reused; results are recomputed
+        embedder.embed_single.assert_called_once()
+        assert store.search.call_count == 2
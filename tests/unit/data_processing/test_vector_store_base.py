@@ -2,7 +2,27 @@
 
 import pytest
 
-from app.backends.vectorstores.base import VectorStoreBackend, VectorStoreResult
+from app.backends.vectorstores.base import (
+    VectorStoreBackend,
+    VectorStoreResult,
+    chunk_content_hash,
+    embedding_fingerprint,
+)
+
+
+class TestChunkContentHash:
+    """The stored hash covers content and how it was embedded."""
+
+    def test_fingerprint_changes_hash(self):
+        plain = chunk_content_hash("text")
+        model_a = chunk_content_hash("text", embedding_fingerprint("model-a"))
+        model_b = chunk_content_hash("text", embedding_fingerprint("model-b"))
+        contextual = chunk_content_hash("text", embedding_fingerprint("model-a", contextual=True))
+        assert len({plain, model_a, model_b, contextual}) == 4
+
+    def test_deterministic(self):
+        fp = embedding_fingerprint("model-a")
+        assert chunk_content_hash("text", fp) == chunk_content_hash("text", fp)
 
 
 class TestVectorStoreResult:
@@ -88,6 +108,12 @@ class TestVectorStoreBackendABC:
         store.ensure_ready()  # no-op
         store.close()  # no-op
         assert store.get_document_chunks("src", "file") == []
+        assert store.search_hybrid([0.1], "text") == []
+        assert store.reconcile_stats() == 0
+        assert store.store_documents([
+            {"source": "src", "filename": "a", "chunks": [{}, {}]},
+            {"source": "src", "filename": "b", "chunks": [{}]},
+        ]) == 3
 
     def test_is_available_delegates_to_is_configured(self):
         """is_available() should return is_configured() by default."""
@@ -0,0 +1,187 @@
+"""Tests for app.services.llm_cache."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services import llm_cache
+from app.services.llm_cache import (
+    CachingLLMClient,
+    _PostgresBackend,
+    _SqliteBackend,
+    llm_cache_key,
+    with_llm_cache,
+)
+from app.services.llm_client import LLMResult
+
+
+def _messages(system="sys", user="doc"):
+    return [{"role": "system", "content": system}, {"role": "user", "content": user}]
+
+
+def _inner(content="answer"):
+    client = MagicMock()
+    client.name = "ollama"
+    client.model = "llama3.1:8b"
+    client.chat.return_value = LLMResult(content=content, model="llama3.1:8b", finish_reason="stop")
+    return client
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    return _SqliteBackend(tmp_path / "cache.sqlite3", max_entries=100, max_age_days=30)
+
+
+class TestCacheKey:
+    """Keys cover model, prompts, response format and max_tokens."""
+
+    def test_same_request_same_key(self):
+        assert llm_cache_key("m", _messages()) == llm_cache_key("m", _messages())
+
+    @pytest.mark.parametrize("changed", [
+        dict(model="other"),
+        dict(messages=_messages(system="other")),
+        dict(messages=_messages(user="other")),
+        dict(response_format="json"),
+        dict(max_tokens=10),
+    ])
+    def test_any_part_changes_key(self, changed):
+        base = dict(model="m", messages=_messages(), response_format=None, max_tokens=None)
+        assert llm_cache_key(**base) != llm_cache_key(**{**base, **changed})
+
+
+class TestCachingLLMClient:
+    """Repeated requests are served from the cache."""
+
+    def test_second_call_is_a_hit(self, sqlite_backend):
+        inner = _inner()
+        client = CachingLLMClient(inner, sqlite_backend)
+
+        first = client.chat(_messages(), response_format="json")
+        second = client.chat(_messages(), response_format="json")
+
+        inner.chat.assert_called_once()
+        assert second == first
+        metrics = client.get_metrics()
+        assert (metrics["hits"], metrics["misses"], metrics["hit_rate"]) == (1, 1, 0.5)
+        assert metrics["entries"] == 1
+        assert metrics["backend"] == "sqlite"
+
+    def test_timeout_passed_through_on_miss(self, sqlite_backend):
+        inner = _inner()
+        CachingLLMClient(inner, sqlite_backend).chat(_messages(), timeout=15)
+        assert inner.chat.call_args.kwargs["timeout"] == 15
+
+    def test_empty_response_not_cached(self, sqlite_backend):
+        inner = _inner(content="  ")
+        client = CachingLLMClient(inner, sqlite_backend)
+        client.chat(_messages())
+        client.chat(_messages())
+        assert inner.chat.call_count == 2
+
+    def test_backend_failure_falls_through(self):
+        backend = MagicMock()
+        backend.get.side_effect = Exception("disk full")
+        backend.set.side_effect = Exception("disk full")
+        inner = _inner()
+
+        result = CachingLLMClient(inner, backend).chat(_messages())
+
+        assert result.content == "answer"
+
+    def test_delegates_identity(self, sqlite_backend):
+        inner = _inner()
+        client = CachingLLMClient(inner, sqlite_backend)
+        assert client.name == "ollama"
+        assert client.model == "llama3.1:8b"
+        assert client.is_configured() is inner.is_configured.return_value
+
+    def test_eviction_runs_periodically(self, sqlite_backend):
+        backend = MagicMock(wraps=sqlite_backend)
+        client = CachingLLMClient(_inner(), backend)
+        with patch.object(llm_cache, "EVICT_EVERY", 2):
+            client.chat(_messages(user="a"))
+            backend.evict.assert_not_called()
+            client.chat(_messages(user="b"))
+        backend.evict.assert_called_once()
+
+
+class TestSqliteBackend:
+    """Size and age eviction in the SQLite store."""
+
+    def test_evicts_least_recently_used_over_limit(self, tmp_path):
+        backend = _SqliteBackend(tmp_path / "c.sqlite3", max_entries=2, max_age_days=30)
+        now = time.time()
+        with patch("app.services.llm_cache.time.time", side_effect=[now + i for i in range(4)]):
+            backend.set("a", "m", "A", "stop")
+            backend.set("b", "m", "B", "stop")
+            backend.set("c", "m", "C", "stop")
+            backend.get("a")  # refreshes "a"
+        assert backend.evict() == 1
+        assert backend.get("b") is None
+        assert backend.get("a") == ("m", "A", "stop")
+
+    def test_expired_entries_not_served(self, tmp_path):
+        backend = _SqliteBackend(tmp_path / "c.sqlite3", max_entries=10, max_age_days=1)
+        with patch("app.services.llm_cache.time.time", return_value=0.0):
+            backend.set("old", "m", "X", "stop")
+        assert backend.get("old") is None
+        assert backend.evict() == 1
+        assert backend.count() == 0
+
+
+class TestPostgresBackend:
+    """SQL issued against the shared pool."""
+
+    def _pool(self, cursor):
+        conn = MagicMock()
+        conn.__enter__ = MagicMock(return_value=conn)
+        conn.__exit__ = MagicMock(return_value=False)
+        conn.cursor.return_value.__enter__ = MagicMock(return_value=cursor)
+        conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        pool = MagicMock()
+        pool.connection.return_value = conn
+        return pool
+
+    def test_creates_table_and_reads_with_age_limit(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("m", "A", "stop")
+        backend = _PostgresBackend(self._pool(cursor), max_entries=10, max_age_days=7)
+
+        assert "CREATE TABLE IF NOT EXISTS llm_response_cache" in cursor.execute.call_args_list[0][0][0]
+        assert backend.get("k") == ("m", "A", "stop")
+        sql, params = cursor.execute.call_args[0]
+        assert "RETURNING model, content, finish_reason" in sql
+        assert params == ("k", 7)
+
+    def test_evict_deletes_expired_then_overflow(self):
+        cursor = MagicMock()
+        cursor.rowcount = 2
+        backend = _PostgresBackend(self._pool(cursor), max_entries=10, max_age_days=7)
+
+        assert backend.evict() == 4
+        expired_sql, overflow_sql = [c[0][0] for c in cursor.execute.call_args_list[-2:]]
+        assert "make_interval(days => %s)" in expired_sql
+        assert "OFFSET %s" in overflow_sql
+
+
+class TestWithLlmCache:
+    """Factory picks the store and never breaks the client."""
+
+    def test_sqlite_when_no_database(self, tmp_path):
+        with patch("app.services.db_pool.is_configured", return_value=False):
+            client = with_llm_cache(_inner(), path=tmp_path / "c.sqlite3")
+        assert isinstance(client, CachingLLMClient)
+        assert client.get_metrics()["backend"] == "sqlite"
+
+    def test_unavailable_store_returns_client(self):
+        inner = _inner()
+        with patch("app.services.db_pool.get_pool", side_effect=ValueError("no db")):
+            assert with_llm_cache(inner, backend="postgres") is inner
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown LLM cache backend"):
+            with_llm_cache(_inner(), backend="redis")
@@ -348,3 +348,37 @@ class TestLoadSchedules:
         scheduler.load_schedules()
 
         assert "disabled_scraper" not in scheduler._jobs
+
+
+class TestVectorStatsReconcile:
+    """Tests for the periodic vector store counter reconcile job."""
+
+    def setup_method(self):
+        schedule_lib.clear()
+
+    def teardown_method(self):
+        schedule_lib.clear()
+
+    def test_schedules_single_job(self):
+        """Re-adding the job replaces the previous one."""
+        scheduler = Scheduler()
+        scheduler.add_vector_stats_reconcile(24)
+        scheduler.add_vector_stats_reconcile(6)
+
+        assert len(schedule_lib.get_jobs()) == 1
+        assert schedule_lib.get_jobs()[0].interval == 6
+        # Maintenance jobs are not reported as scraper jobs
+        assert scheduler.get_status()["job_count"] == 0
+
+    @patch("app.container.get_container")
+    def test_reconcile_calls_vector_store(self, mock_get_container):
+        mock_get_container.return_value.vector_store.reconcile_stats.return_value = 1
+        Scheduler()._reconcile_vector_stats()
+        mock_get_container.return_value.vector_store.reconcile_stats.assert_called_once()
+
+    @patch("app.container.get_container")
+    def test_reconcile_failure_is_logged_not_raised(self, mock_get_container):
+        mock_get_container.return_value.vector_store.reconcile_stats.side_effect = (
+            RuntimeError("db down")
+        )
+        Scheduler()._reconcile_vector_stats()  # Should not raise
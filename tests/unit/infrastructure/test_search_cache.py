@@ -0,0 +1,165 @@
+"""Tests for app.services.search_cache."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+from app.config import Config
+from app.services.search_cache import (
+    SearchCache,
+    _MemoryBackend,
+    _RedisBackend,
+    normalize_query,
+)
+
+
+def _cache(**kwargs) -> SearchCache:
+    return SearchCache(_MemoryBackend(max_entries=kwargs.pop("max_entries", 100)), **kwargs)
+
+
+class TestQueryEmbeddingCache:
+    """Query embeddings keyed by model + normalised text."""
+
+    def test_normalize_query(self):
+        assert normalize_query("  energy\n  policy\t") == "energy policy"
+
+    def test_embed_query_reuses_cached_vector(self):
+        cache = _cache()
+        embedder = MagicMock()
+        embedder.name = "ollama"
+        embedder.model = "nomic-embed-text"
+        embedder.embed_single.return_value = [0.1, 0.2]
+
+        assert cache.embed_query(embedder, "energy policy") == [0.1, 0.2]
+        assert cache.embed_query(embedder, " energy   policy ") == [0.1, 0.2]
+        embedder.embed_single.assert_called_once()
+
+    def test_different_model_misses(self):
+        cache = _cache()
+        cache.set_query_embedding("ollama:a", "q", [1.0])
+        assert cache.get_query_embedding("ollama:a", "q") == [1.0]
+        assert cache.get_query_embedding("ollama:b", "q") is None
+
+    def test_disabled_cache_always_embeds(self):
+        cache = _cache(enabled=False)
+        embedder = MagicMock()
+        embedder.embed_single.return_value = [0.5]
+        cache.embed_query(embedder, "q")
+        cache.embed_query(embedder, "q")
+        assert embedder.embed_single.call_count == 2
+        assert cache.result_key([0.5], None, {}) is None
+
+
+class TestResultCache:
+    """Result cache invalidated by per-source generations."""
+
+    def test_round_trip(self):
+        cache = _cache()
+        key = cache.result_key([0.1], ["aemo"], {"limit": 5})
+        assert cache.get_results(key) is None
+        cache.set_results(key, [{"source": "aemo", "score": 0.9}])
+        assert cache.get_results(cache.result_key([0.1], ["aemo"], {"limit": 5})) == [
+            {"source": "aemo", "score": 0.9}
+        ]
+
+    def test_params_and_source_order(self):
+        cache = _cache()
+        cache.set_results(cache.result_key([0.1], ["a", "b"], {"limit": 5}), [{"x": 1}])
+        assert cache.get_results(cache.result_key([0.1], ["b", "a"], {"limit": 5})) == [{"x": 1}]
+        assert cache.get_results(cache.result_key([0.1], ["a", "b"], {"limit": 6})) is None
+
+    def test_bump_invalidates_only_affected_sources(self):
+        cache = _cache()
+        aemo_key = cache.result_key([0.1], ["aemo"], {})
+        aer_key = cache.result_key([0.1], ["aer"], {})
+        all_key = cache.result_key([0.1], None, {})
+        for key in (aemo_key, aer_key, all_key):
+            cache.set_results(key, [{"k": key}])
+
+        cache.bump_generation(["aemo"])
+
+        assert cache.get_results(cache.result_key([0.1], ["aemo"], {})) is None
+        assert cache.get_results(cache.result_key([0.1], None, {})) is None
+        assert cache.get_results(cache.result_key([0.1], ["aer"], {})) is not None
+
+    def test_key_taken_before_ingest_is_not_served_after(self):
+        """Results computed during an ingest stay under the old generation."""
+        cache = _cache()
+        key = cache.result_key([0.1], ["aemo"], {})
+        cache.bump_generation(["aemo"])  # ingest commits mid-search
+        cache.set_results(key, [{"stale": True}])
+        assert cache.get_results(cache.result_key([0.1], ["aemo"], {})) is None
+
+    def test_backend_errors_are_misses(self):
+        backend = MagicMock()
+        backend.get_counters.side_effect = ConnectionError("down")
+        backend.get.side_effect = ConnectionError("down")
+        backend.incr.side_effect = ConnectionError("down")
+        cache = SearchCache(backend)
+
+        assert cache.result_key([0.1], None, {}) is None
+        assert cache.get_query_embedding("m", "q") is None
+        cache.bump_generation(["aemo"])  # Should not raise
+
+
+class TestBackends:
+    """Memory and Redis storage backends."""
+
+    def test_memory_lru_eviction(self):
+        backend = _MemoryBackend(max_entries=2)
+        backend.set("a", "1", 60)
+        backend.set("b", "2", 60)
+        backend.get("a")  # a becomes most recent
+        backend.set("c", "3", 60)
+        assert backend.get("b") is None
+        assert backend.get("a") == "1"
+
+    def test_memory_ttl_expiry(self):
+        backend = _MemoryBackend(max_entries=10)
+        with patch("app.services.search_cache.time.monotonic", return_value=100.0):
+            backend.set("a", "1", 5)
+        with patch("app.services.search_cache.time.monotonic", return_value=106.0):
+            assert backend.get("a") is None
+
+    def test_redis_backend_uses_setex_and_mget(self):
+        client = MagicMock()
+        client.mget.return_value = ["3", None]
+        backend = _RedisBackend(client)
+
+        backend.set("k", "v", 30)
+        client.setex.assert_called_once_with("k", 30, "v")
+        assert backend.get_counters(["g1", "g2"]) == [3, 0]
+
+
+class TestSingleton:
+    """get_search_cache() backend selection."""
+
+    def setup_method(self):
+        from app.services.search_cache import reset_search_cache
+
+        reset_search_cache()
+
+    def teardown_method(self):
+        from app.services.search_cache import reset_search_cache
+
+        reset_search_cache()
+
+    def test_memory_backend_without_redis(self):
+        from app.services.search_cache import get_search_cache
+
+        with patch.object(Config, "REDIS_URL", ""):
+            cache = get_search_cache()
+        assert isinstance(cache._backend, _MemoryBackend)
+        assert get_search_cache() is cache
+        # Per-process generations cannot see other processes' ingests
+        assert not cache.caches_results
+        assert cache.result_key([0.1], None, {}) is None
+
+    def test_redis_backend_when_configured(self):
+        from app.services.search_cache import get_search_cache
+
+        with patch.object(Config, "REDIS_URL", "redis://localhost:6379/0"), \
+             patch("app.services.redis_pool.get_redis", return_value=MagicMock()):
+            cache = get_search_cache()
+        assert isinstance(cache._backend, _RedisBackend)
+        assert cache.caches_results
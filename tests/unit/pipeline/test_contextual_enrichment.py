@@ -166,6 +166,7 @@ class TestPgVectorIngestWithEnrichment:
         mock_store.test_connection.return_value = True
         mock_store.store_chunks.return_value = 2
         mock_store.name = "pgvector"
+        mock_store.get_chunk_hashes.return_value = {}  # new document
 
         with patch("app.backends.rag.vector_adapter.get_logger"), \
              patch("app.services.chunking.get_logger"):
@@ -218,6 +219,7 @@ class TestPgVectorIngestWithEnrichment:
         mock_store.test_connection.return_value = True
         mock_store.store_chunks.return_value = 1
         mock_store.name = "pgvector"
+        mock_store.get_chunk_hashes.return_value = {}  # new document
 
         with patch("app.backends.rag.vector_adapter.get_logger"), \
              patch("app.services.chunking.get_logger"):
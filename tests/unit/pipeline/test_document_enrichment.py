@@ -3,9 +3,13 @@
 from __future__ import annotations
 
 import json
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock
 
+import pytest
+
 
 from app.services.document_enrichment import DocumentEnrichmentService
 from app.services.llm_client import LLMResult
@@ -234,6 +238,164 @@ class TestEnrichChunks:
         assert "Document outline:" in user_msg
 
 
+    def test_enrich_chunks_positions_subset(self):
+        chunks = [
+            self._make_chunk("Chunk 0", 0),
+            self._make_chunk("Chunk 1", 1),
+            self._make_chunk("Chunk 2", 2),
+        ]
+        llm_responses = [
+            LLMResult(content="Context for chunk 2.", model="m", finish_reason="stop"),
+        ]
+        service, mock_llm = self._make_service(llm_responses=llm_responses)
+        service._max_tokens = 1  # Long-doc path so neighbours are used
+
+        result = service.enrich_chunks(chunks, "# Doc\n" + "x" * 100, positions=[2])
+
+        assert result == ["Context for chunk 2.\n\nChunk 2"]
+        assert mock_llm.chat.call_count == 1
+        # Neighbour context still comes from the full list
+        user_msg = mock_llm.chat.call_args[0][0][1]["content"]
+        assert "[preceding chunk 1]: Chunk 1" in user_msg
+    def test_concurrent_results_keep_order(self):
+        chunks = [self._make_chunk(f"Chunk {i}", i) for i in range(6)]
+        mock_llm = MagicMock()
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def chat(messages, **kwargs):
+            current = messages[1]["content"].rsplit("\n", 1)[-1]
+            with lock:
+                in_flight.append(current)
+                peak.append(len(in_flight))
+            # Later chunks finish first
+            time.sleep(0.02 * (6 - int(current.split()[-1])))
+            with lock:
+                in_flight.remove(current)
+            return LLMResult(content=f"About {current}.", model="m", finish_reason="stop")
+
+        mock_llm.chat.side_effect = chat
+        service = DocumentEnrichmentService(mock_llm, concurrency=3)
+
+        result = service.enrich_chunks(chunks, "short text")
+
+        assert result == [f"About Chunk {i}.\n\nChunk {i}" for i in range(6)]
+        assert max(peak) == 3
+
+    def test_concurrent_per_chunk_fallback(self):
+        chunks = [self._make_chunk(f"Chunk {i}", i) for i in range(4)]
+
+        def chat(messages, **kwargs):
+            if messages[1]["content"].endswith("Chunk 2"):
+                raise TimeoutError("read timed out")
+            return LLMResult(content="Context.", model="m", finish_reason="stop")
+
+        mock_llm = MagicMock()
+        mock_llm.chat.side_effect = chat
+        service = DocumentEnrichmentService(mock_llm, concurrency=4)
+
+        result = service.enrich_chunks(chunks, "short text")
+
+        assert result[2] == "Chunk 2"
+        assert result[3] == "Context.\n\nChunk 3"
+
+    def test_timeout_and_progress(self):
+        chunks = [self._make_chunk(f"Chunk {i}", i) for i in range(3)]
+        mock_llm = MagicMock()
+        mock_llm.chat.return_value = LLMResult(content="C.", model="m", finish_reason="stop")
+        service = DocumentEnrichmentService(mock_llm, concurrency=2, chunk_timeout=15)
+        events = []
+
+        service.enrich_chunks(chunks, "short text", progress=lambda done, total: events.append((done, total)))
+
+        assert all(c.kwargs == {"timeout": 15} for c in mock_llm.chat.call_args_list)
+        assert events == [(1, 3), (2, 3), (3, 3)]
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError, match="concurrency"):
+            DocumentEnrichmentService(MagicMock(), concurrency=0)
+
+
+class TestBatchedEnrichChunks:
+    """Tier 2: several chunks situated per request."""
+
+    def _chunks(self, n):
+        from app.services.chunking import Chunk
+        return [Chunk(content=f"Chunk {i}", index=i) for i in range(n)]
+
+    def _result(self, content):
+        return LLMResult(content=content, model="m", finish_reason="stop")
+
+    def test_batch_sends_context_once(self):
+        mock_llm = MagicMock()
+        mock_llm.chat.side_effect = [
+            self._result(json.dumps({"contexts": ["A.", "B.", "C."]})),
+            self._result("D."),  # a final single chunk uses the per-chunk prompt
+        ]
+        service = DocumentEnrichmentService(mock_llm, batch_size=3)
+
+        result = service.enrich_chunks(self._chunks(4), "the whole document")
+
+        assert result == ["A.\n\nChunk 0", "B.\n\nChunk 1", "C.\n\nChunk 2", "D.\n\nChunk 3"]
+        assert mock_llm.chat.call_count == 2
+        first_call = mock_llm.chat.call_args_list[0]
+        user_msg = first_call[0][0][1]["content"]
+        assert user_msg.count("the whole document") == 1
+        assert "Chunk 3 (document chunk 2):\nChunk 2" in user_msg
+        assert first_call.kwargs["response_format"] == "json"
+
+    def test_bare_json_array_accepted(self):
+        mock_llm = MagicMock()
+        mock_llm.chat.return_value = self._result(json.dumps(["A.", "B."]))
+        service = DocumentEnrichmentService(mock_llm, batch_size=2)
+
+        assert service.enrich_chunks(self._chunks(2), "doc") == ["A.\n\nChunk 0", "B.\n\nChunk 1"]
+
+    def test_count_mismatch_falls_back_per_chunk(self):
+        mock_llm = MagicMock()
+        mock_llm.chat.side_effect = [
+            self._result(json.dumps({"contexts": ["only one"]})),
+            self._result("X."),
+            self._result("Y."),
+        ]
+        service = DocumentEnrichmentService(mock_llm, batch_size=2)
+
+        result = service.enrich_chunks(self._chunks(2), "doc")
+
+        assert result == ["X.\n\nChunk 0", "Y.\n\nChunk 1"]
+        assert mock_llm.chat.call_count == 3
+
+    def test_invalid_json_falls_back_per_chunk(self):
+        mock_llm = MagicMock()
+        mock_llm.chat.side_effect = [self._result("not json"), self._result("X."), Exception("down")]
+        service = DocumentEnrichmentService(mock_llm, batch_size=2)
+
+        result = service.enrich_chunks(self._chunks(2), "doc")
+
+        assert result == ["X.\n\nChunk 0", "Chunk 1"]
+
+    def test_long_doc_batch_uses_outline_and_neighbours(self):
+        mock_llm = MagicMock()
+        mock_llm.chat.return_value = self._result(json.dumps({"contexts": ["A.", "B."]}))
+        service = DocumentEnrichmentService(mock_llm, max_tokens=1, batch_size=2)
+
+        result = service.enrich_chunks(
+            self._chunks(5), "# Heading\n" + "x" * 100, window=1, positions=[2, 3]
+        )
+
+        assert result == ["A.\n\nChunk 2", "B.\n\nChunk 3"]
+        user_msg = mock_llm.chat.call_args[0][0][1]["content"]
+        assert user_msg.startswith("Document outline:\n# Heading")
+        assert "[preceding chunk 1]: Chunk 1" in user_msg
+        assert "[following chunk 4]: Chunk 4" in user_msg
+        assert "[preceding chunk 0]" not in user_msg
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError, match="batch_size"):
+            DocumentEnrichmentService(MagicMock(), batch_size=0)
+
+
 class TestExtractOutline:
     def test_extracts_headings(self):
         service = DocumentEnrichmentService(MagicMock())
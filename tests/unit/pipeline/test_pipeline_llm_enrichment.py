@@ -262,3 +262,52 @@ class TestRunLLMEnrichment:
 
         assert parse_metadata["extra"]["llm_keywords"] == "alpha, beta, gamma"
         assert parse_metadata["extra"]["llm_entities"] == "Org A, Person B"
+
+
+class TestStartModelWarmer:
+    def _config(self, mock_config, **overrides):
+        mock_config.LLM_WARM_INTERVAL = 240
+        mock_config.LLM_BACKEND = "ollama"
+        mock_config.LLM_ENRICHMENT_ENABLED = False
+        mock_config.CONTEXTUAL_ENRICHMENT_ENABLED = False
+        for key, value in overrides.items():
+            setattr(mock_config, key, value)
+
+    def test_not_started_without_enrichment(self, pipeline):
+        with patch("app.orchestrator.pipeline.Config") as mock_config:
+            self._config(mock_config)
+            assert pipeline._start_model_warmer() is None
+
+    @pytest.mark.parametrize("overrides", [
+        {"LLM_WARM_INTERVAL": 0},
+        {"LLM_BACKEND": "api"},
+    ])
+    def test_not_started_when_off_or_not_ollama(self, pipeline, overrides):
+        with patch("app.orchestrator.pipeline.Config") as mock_config:
+            self._config(mock_config, LLM_ENRICHMENT_ENABLED=True, **overrides)
+            assert pipeline._start_model_warmer() is None
+
+    def test_started_for_contextual_enrichment_setting(self, pipeline, mock_container):
+        mock_container.settings.get.side_effect = lambda key, default="": (
+            "true" if key == "pipeline.contextual_enrichment_enabled" else ""
+        )
+        mock_container.llm_client.is_configured.return_value = True
+
+        with patch("app.orchestrator.pipeline.Config") as mock_config, \
+                patch("app.services.llm_client.ModelWarmer") as mock_warmer:
+            self._config(mock_config)
+            warmer = pipeline._start_model_warmer()
+
+        mock_warmer.assert_called_once_with(mock_container.llm_client, interval=240)
+        assert warmer is mock_warmer.return_value.start.return_value
+
+    def test_unreadable_config_is_non_fatal(self, pipeline):
+        with patch("app.orchestrator.pipeline.Config"):
+            assert pipeline._start_model_warmer() is None
+
+    def test_stopped_after_run(self, pipeline):
+        warmer = MagicMock()
+        with patch.object(pipeline, "_start_model_warmer", return_value=warmer), \
+                patch.object(pipeline, "_create_scraper_generator", side_effect=RuntimeError("boom")):
+            pipeline.run()
+        warmer.stop.assert_called_once()
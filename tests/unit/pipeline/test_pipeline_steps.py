@@ -136,8 +136,10 @@ class TestParseDocument:
         docx_file.write_bytes(b"fake docx")
 
         mock_tika = Mock()
-        mock_tika.extract_text.return_value = "Office text content."
-        mock_tika.extract_metadata.return_value = {"title": "Office Doc"}
+        mock_tika.extract_text_and_metadata.return_value = (
+            "Office text content.",
+            {"title": "Office Doc"},
+        )
         pipeline.container.tika_client = mock_tika
 
         doc_metadata = Mock()
@@ -150,8 +152,9 @@ class TestParseDocument:
         assert md_path == docx_file.with_suffix(".md")
         assert md_path.exists()
         assert meta["title"] == "Office Doc"
-        mock_tika.extract_text.assert_called_once_with(docx_file)
-        mock_tika.extract_metadata.assert_called_once_with(docx_file)
+        mock_tika.extract_text_and_metadata.assert_called_once_with(docx_file)
+        mock_tika.extract_text.assert_not_called()
+        mock_tika.extract_metadata.assert_not_called()
         pipeline.container.parser_backend.parse_document.assert_not_called()
 
     @patch("app.orchestrator.pipeline.Config")
@@ -164,7 +167,7 @@ class TestParseDocument:
         docx_file.write_bytes(b"fake docx")
 
         mock_tika = Mock()
-        mock_tika.extract_text.return_value = "   "
+        mock_tika.extract_text_and_metadata.return_value = ("   ", {})
         pipeline.container.tika_client = mock_tika
 
         with pytest.raises(ParserBackendError, match="empty text"):
@@ -655,6 +658,21 @@ class TestCleanupLocalFiles:
 
         assert not archive_pdf.exists()
 
+    def test_deletes_docling_json_sidecar(self, pipeline, tmp_path):
+        """DoclingDocument JSON written by the parser is cleaned up."""
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        md = tmp_path / "doc.md"
+        md.write_text("# Content")
+        sidecar = tmp_path / "doc.docling.json"
+        sidecar.write_text("{}")
+
+        result = {"verified": True, "rag_indexed": False}
+
+        pipeline._cleanup_local_files(pdf, md, None, {}, result)
+
+        assert not sidecar.exists()
+
     def test_cleanup_failure_is_nonfatal(self, pipeline, tmp_path):
         """OSError during unlink doesn't propagate."""
         pdf = tmp_path / "doc.pdf"
@@ -352,3 +352,34 @@ class TestPipelineMetrics:
         assert data["scrapers"] == []
         assert data["totals"]["processed"] == 0
         assert data["totals"]["failed"] == 0
+
+    def test_llm_cache_disabled(self, client):
+        with patch("app.web.blueprints.metrics_logs.ScraperRegistry") as mock_reg, \
+                patch.object(Config, "LLM_CACHE_ENABLED", False):
+            mock_reg.list_scrapers.return_value = []
+            resp = client.get("/metrics/pipeline")
+
+        assert resp.get_json()["llm_cache"] == {"enabled": False}
+
+    def test_llm_cache_hit_rate(self, client, mock_container):
+        from app.services.llm_cache import CachingLLMClient
+
+        cached = MagicMock(spec=CachingLLMClient)
+        cached.get_metrics.return_value = {"enabled": True, "hits": 3, "misses": 1, "hit_rate": 0.75}
+        mock_container.llm_client = cached
+
+        with patch("app.web.blueprints.metrics_logs.ScraperRegistry") as mock_reg, \
+                patch.object(Config, "LLM_CACHE_ENABLED", True):
+            mock_reg.list_scrapers.return_value = []
+            resp = client.get("/metrics/pipeline")
+
+        assert resp.get_json()["llm_cache"]["hit_rate"] == 0.75
+
+    def test_llm_latency_histograms(self, client):
+        latency = {"ollama:llama3.1:8b": {"count": 2, "buckets": {"le_1": 2}}}
+        with patch("app.web.blueprints.metrics_logs.ScraperRegistry") as mock_reg, \
+                patch("app.web.blueprints.metrics_logs.llm_latency_metrics", return_value=latency):
+            mock_reg.list_scrapers.return_value = []
+            resp = client.get("/metrics/pipeline")
+
+        assert resp.get_json()["llm_latency"] == latency